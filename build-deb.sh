@@ -7,6 +7,16 @@ if [ -z "$VERSION" ]; then
   VERSION=$(grep -oP 'version\s*=\s*"\K[^"]+' pyproject.toml 2>/dev/null || echo "1.0.0")
 fi
 PACKAGE_NAME="dbcalm"
+# PyInstaller bundle mode:
+# - onefile (default): single executables in /usr/bin that unpack themselves
+#   to a temporary directory on every start
+# - onedir: unpacked bundles in /usr/lib/dbcalm with links in /usr/bin, no
+#   unpacking on start so short runs like cron's `dbcalm backup` start fast
+BUNDLE="${BUNDLE:-onefile}"
+if [ "$BUNDLE" != "onefile" ] && [ "$BUNDLE" != "onedir" ]; then
+  echo "BUNDLE must be onefile or onedir, got: $BUNDLE"
+  exit 1
+fi
 ARCH="amd64"
 
 #remove old build directory if it exists
@@ -35,9 +45,11 @@ echo "Building ${PACKAGE_NAME} version ${VERSION} for ${ARCH}..."
 
 # Create binary executables with pyinstaller
 echo "Creating executables..."
-pyinstaller --onefile --hidden-import passlib.handlers.bcrypt --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}.py
-pyinstaller --onefile --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}-cmd.py
-pyinstaller --onefile --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}-mariadb-cmd.py
+# the subcommands are imported by name, collect_submodules has to import
+# them from the source tree to bundle them
+PYTHONPATH=. pyinstaller --${BUNDLE} --hidden-import passlib.handlers.bcrypt --collect-submodules dbcalm.cli --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}.py
+pyinstaller --${BUNDLE} --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}-cmd.py
+pyinstaller --${BUNDLE} --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}-mariadb-cmd.py
 rm -f ${PACKAGE_NAME}.spec
 rm -f ${PACKAGE_NAME}-cmd.spec
 rm -f ${PACKAGE_NAME}-mariadb-cmd.spec
@@ -47,9 +59,15 @@ mkdir -p "build/debian/usr/bin"
 
 # Copy binaries to the right location
 echo "Copying binaries to debian package structure..."
-cp "dist/production/${PACKAGE_NAME}" "build/debian/usr/bin/"
-cp "dist/production/${PACKAGE_NAME}-cmd" "build/debian/usr/bin/"
-cp "dist/production/${PACKAGE_NAME}-mariadb-cmd" "build/debian/usr/bin/"
+for binary in ${PACKAGE_NAME} ${PACKAGE_NAME}-cmd ${PACKAGE_NAME}-mariadb-cmd; do
+  if [ "$BUNDLE" = "onedir" ]; then
+    mkdir -p "build/debian/usr/lib/$PACKAGE_NAME"
+    cp -r "dist/production/$binary" "build/debian/usr/lib/$PACKAGE_NAME/"
+    ln -s "../lib/$PACKAGE_NAME/$binary/$binary" "build/debian/usr/bin/$binary"
+  else
+    cp "dist/production/$binary" "build/debian/usr/bin/"
+  fi
+done
 
 cp templates/${PACKAGE_NAME}-api.service "build/debian/usr/lib/systemd/system/"
 cp templates/${PACKAGE_NAME}-cmd.service "build/debian/usr/lib/systemd/system/"
@@ -6,6 +6,16 @@ if [ -z "$VERSION" ]; then
   VERSION=$(grep -oP 'version\s*=\s*"\K[^"]+' pyproject.toml 2>/dev/null || echo "1.0.0")
 fi
 PACKAGE_NAME="dbcalm"
+# PyInstaller bundle mode:
+# - onefile (default): single executables in /usr/bin that unpack themselves
+#   to a temporary directory on every start
+# - onedir: unpacked bundles in /usr/lib/dbcalm with links in /usr/bin, no
+#   unpacking on start so short runs like cron's `dbcalm backup` start fast
+BUNDLE="${BUNDLE:-onefile}"
+if [ "$BUNDLE" != "onefile" ] && [ "$BUNDLE" != "onedir" ]; then
+  echo "BUNDLE must be onefile or onedir, got: $BUNDLE"
+  exit 1
+fi
 ARCH="x86_64"
 
 # Remove old build directory if it exists
@@ -32,18 +42,26 @@ echo "Building ${PACKAGE_NAME} version ${VERSION} for ${ARCH}..."
 
 # Create binary executables with pyinstaller
 echo "Creating executables..."
-pyinstaller --onefile --hidden-import passlib.handlers.bcrypt --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}.py
-pyinstaller --onefile --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}-cmd.py
-pyinstaller --onefile --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}-mariadb-cmd.py
+# the subcommands are imported by name, collect_submodules has to import
+# them from the source tree to bundle them
+PYTHONPATH=. pyinstaller --${BUNDLE} --hidden-import passlib.handlers.bcrypt --collect-submodules dbcalm.cli --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}.py
+pyinstaller --${BUNDLE} --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}-cmd.py
+pyinstaller --${BUNDLE} --clean --workpath=./build/pyinstaller --distpath=dist/production ${PACKAGE_NAME}-mariadb-cmd.py
 rm -f ${PACKAGE_NAME}.spec
 rm -f ${PACKAGE_NAME}-cmd.spec
 rm -f ${PACKAGE_NAME}-mariadb-cmd.spec
 
 # Copy binaries to staging directory
 echo "Copying binaries to staging directory..."
-cp "dist/production/${PACKAGE_NAME}" "build/rpm/staging/usr/bin/"
-cp "dist/production/${PACKAGE_NAME}-cmd" "build/rpm/staging/usr/bin/"
-cp "dist/production/${PACKAGE_NAME}-mariadb-cmd" "build/rpm/staging/usr/bin/"
+for binary in ${PACKAGE_NAME} ${PACKAGE_NAME}-cmd ${PACKAGE_NAME}-mariadb-cmd; do
+  if [ "$BUNDLE" = "onedir" ]; then
+    mkdir -p "build/rpm/staging/usr/lib/$PACKAGE_NAME"
+    cp -r "dist/production/$binary" "build/rpm/staging/usr/lib/$PACKAGE_NAME/"
+    ln -s "../lib/$PACKAGE_NAME/$binary/$binary" "build/rpm/staging/usr/bin/$binary"
+  else
+    cp "dist/production/$binary" "build/rpm/staging/usr/bin/"
+  fi
+done
 
 # Copy systemd service files to staging
 cp "templates/${PACKAGE_NAME}-api.service" "build/rpm/staging/usr/lib/systemd/system/"
@@ -72,6 +72,25 @@ def unlink_socket(count: int = 0) -> bool:
                 return False
     return True
 
+def read_request(connection: socket.socket) -> bytes:
+    """Read a full request from a client connection.
+
+    Clients shut down their write side once the request is sent, so an
+    empty read marks the end of the message. Clients that keep the socket
+    open are still supported: a 0.2 second pause after data has been
+    received is treated as the end of the message.
+    """
+    all_data = str.encode("")
+    while True:
+        r, _, _ = select([connection],[],[], 0.2)
+        if r:
+            data = connection.recv(4096)
+            if not data:
+                return all_data
+            all_data += data
+        elif(len(all_data)):
+            return all_data
+
 def start_server() -> dict:
     if not unlink_socket():
         logger.error("Could not unlink socket %s", Config.CMD_SOCKET_PATH)
@@ -95,20 +114,10 @@ def start_server() -> dict:
         # Wait for a connection
         connection, _ = sock.accept()
         try:
-
-            # Receive the data in small chunks and retransmit it
-            all_data = str.encode("")
-            while True:
-                # Check if there is data to read from the socket
-                # with a timeout of 0.2 seconds
-                r, _, _ = select([connection],[],[], 0.2)
-                if r:
-                    data = connection.recv(16)
-                    all_data += data
-                elif(len(all_data)):
-                    response = process_data(all_data)
-                    connection.sendall(json.dumps(response).encode("utf-8"))
-                    break
+            all_data = read_request(connection)
+            if len(all_data):
+                response = process_data(all_data)
+                connection.sendall(json.dumps(response).encode("utf-8"))
 
         except Exception:
             response = {"code": 500, "status": "error"}
@@ -118,6 +127,5 @@ def start_server() -> dict:
         finally:
             # Clean up the connection
             connection.close()
-            start_server()
 
 start_server()
@@ -3,7 +3,6 @@
 import json
 import socket
 import stat
-import threading
 import time
 from pathlib import Path
 from select import select
@@ -11,11 +10,12 @@ from select import select
 from dbcalm.config.config import Config
 from dbcalm.config.config_factory import config_factory
 from dbcalm.config.validator import Validator as ConfigValidator
-from dbcalm.handler.process_queue_handler import ProcessQueueHandler
 from dbcalm.logger.logger_factory import logger_factory
-from dbcalm_mariadb_cmd.adapter.adapter_factory import adapter_factory
-from dbcalm_mariadb_cmd.command.validator import VALID_REQUEST
-from dbcalm_mariadb_cmd.command.validator import Validator as CommandValidator
+from dbcalm_mariadb_cmd.binlog.binlog_archiver import BinlogArchiver
+from dbcalm_mariadb_cmd.capability.capability_probe import capability_probe
+from dbcalm_mariadb_cmd.capability.liveness_monitor import LivenessMonitor
+from dbcalm_mariadb_cmd.command.handler import handle_command
+from dbcalm_mariadb_cmd.scheduler.scheduler import Scheduler
 
 config = config_factory()
 validator = ConfigValidator(config)
@@ -25,33 +25,7 @@ validator.validate_backup_path()
 logger = logger_factory()
 
 def process_data(data: bytes) -> dict:
-    command_data = json.loads(data.decode())
-
-    validator = CommandValidator()
-    response_code, message = validator.validate(command_data)
-    if(response_code != VALID_REQUEST):
-        logger.error(
-            "%s, command: %s ,arguments: %s",
-            message, command_data["cmd"], command_data["args"])
-
-        return {"code": response_code, "status": message }
-
-    adapter = adapter_factory()
-    # get the method from the adapter based on command called
-    method = getattr(adapter, command_data["cmd"])
-    # unpack arguments and call commands
-    process, queue = method(*command_data["args"].values())
-
-    queue_hander = ProcessQueueHandler(queue)
-
-    # Start a thread to process the queue
-    threading.Thread(target=queue_hander.handle, daemon=False).start()
-
-    command_id = (process[0].command_id
-                 if isinstance(process, list)
-                 else process.command_id)
-
-    return {"code": 202, "status": "Accepted", "id": command_id }
+    return handle_command(json.loads(data.decode()))
 
 
 def apply_parent_permissions(file_path: Path) -> None:
@@ -79,6 +53,25 @@ def unlink_socket(count: int = 0) -> bool:
                 return False
     return True
 
+def read_request(connection: socket.socket) -> bytes:
+    """Read a full request from a client connection.
+
+    Clients shut down their write side once the request is sent, so an
+    empty read marks the end of the message. Clients that keep the socket
+    open are still supported: a 0.2 second pause after data has been
+    received is treated as the end of the message.
+    """
+    all_data = str.encode("")
+    while True:
+        r, _, _ = select([connection],[],[], 0.2)
+        if r:
+            data = connection.recv(4096)
+            if not data:
+                return all_data
+            all_data += data
+        elif(len(all_data)):
+            return all_data
+
 def start_server() -> dict:
     if not unlink_socket():
         logger.error("Could not unlink socket %s", Config.MARIADB_CMD_SOCKET_PATH)
@@ -102,20 +95,10 @@ def start_server() -> dict:
         # Wait for a connection
         connection, _ = sock.accept()
         try:
-
-            # Receive the data in small chunks and retransmit it
-            all_data = str.encode("")
-            while True:
-                # Check if there is data to read from the socket
-                # with a timeout of 0.2 seconds
-                r, _, _ = select([connection],[],[], 0.2)
-                if r:
-                    data = connection.recv(16)
-                    all_data += data
-                elif(len(all_data)):
-                    response = process_data(all_data)
-                    connection.sendall(json.dumps(response).encode("utf-8"))
-                    break
+            all_data = read_request(connection)
+            if len(all_data):
+                response = process_data(all_data)
+                connection.sendall(json.dumps(response).encode("utf-8"))
 
         except Exception:
             response = {"code": 500, "status": "error"}
@@ -125,6 +108,15 @@ def start_server() -> dict:
         finally:
             # Clean up the connection
             connection.close()
-            start_server()
+
+# Detect versions and tool options once up front, requests only look them up
+capability_probe().refresh()
+LivenessMonitor(capability_probe()).start()
+
+if config.value("scheduler") == "internal":
+    Scheduler(handle_command).start()
+
+if config.value("binlog_archive"):
+    BinlogArchiver(config).start()
 
 start_server()
@@ -1,9 +1,33 @@
 #!/usr/bin/env python3
 
 import argparse
+import importlib
+import multiprocessing
 import sys
+from types import ModuleType
 
-from dbcalm.cli import backup, cleanup, clients, server, users
+# Subcommand -> module providing configure_parser() and run(). Modules are
+# only imported for the subcommand being run: cron starts `dbcalm backup`
+# every few minutes and it should not pay for importing the API server.
+COMMANDS = {
+    "server": "dbcalm.cli.server",
+    "users": "dbcalm.cli.users",
+    "clients": "dbcalm.cli.clients",
+    "backup": "dbcalm.cli.backup",
+    "cleanup": "dbcalm.cli.cleanup",
+    "test-restore": "dbcalm.cli.restore_test",
+}
+
+
+def load_commands(argv: list[str]) -> dict[str, ModuleType]:
+    """Import the module of the requested subcommand.
+
+    All modules are imported when no known subcommand is given, so the
+    top level help can list every subcommand.
+    """
+    requested = next((arg for arg in argv if not arg.startswith("-")), None)
+    names = [requested] if requested in COMMANDS else list(COMMANDS)
+    return {name: importlib.import_module(COMMANDS[name]) for name in names}
 
 
 def main() -> None:
@@ -20,20 +44,11 @@ def main() -> None:
 
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
-    # Server command
-    subparsers.add_parser("server", help="Start the API server")
-
-    # Users command
-    users_parser = users.configure_parser(subparsers)
-
-    # Clients command
-    clients_parser = clients.configure_parser(subparsers)
-
-    # Backup command
-    backup.configure_parser(subparsers)
-
-    # Cleanup command
-    cleanup.configure_parser(subparsers)
+    commands = load_commands(sys.argv[1:])
+    parsers = {
+        name: module.configure_parser(subparsers)
+        for name, module in commands.items()
+    }
 
     args = parser.parse_args()
 
@@ -43,20 +58,21 @@ def main() -> None:
         sys.exit(0)
 
     # Route to appropriate handler
+    command = commands[args.command]
     if args.command == "server":
-        server.run()
-    elif args.command == "users":
-        users.run(args, users_parser)
-    elif args.command == "clients":
-        clients.run(args, clients_parser)
-    elif args.command == "backup":
-        backup.run(args)
-    elif args.command == "cleanup":
-        cleanup.run(args)
+        command.run()
+    elif args.command in ("users", "clients"):
+        command.run(args, parsers[args.command])
+    elif args.command in ("backup", "cleanup", "test-restore"):
+        command.run(args)
     else:
         parser.print_help()
         sys.exit(1)
 
 
 if __name__ == "__main__":
+    # `server` with api_workers above 1 spawns its workers by running this
+    # executable again, in a frozen build they have to be caught here
+    # rather than parse the worker's arguments as a subcommand
+    multiprocessing.freeze_support()
     main()
@@ -12,6 +12,8 @@ class RestoreQueryField(str, Enum):
     BACKUP_ID = "backup_id"
     BACKUP_TIMESTAMP = "backup_timestamp"
     PROCESS_ID = "process_id"
+    UNTIL_TIME = "until_time"
+    UNTIL_GTID = "until_gtid"
 
 
 class RestoreOrderField(str, Enum):
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
-from dbcalm.data.data_types.enum_types import BackupType
+from dbcalm.data.data_types.enum_types import BackupEngine, BackupType
+from dbcalm.util.backup_scope import normalize_patterns
 
 
 class BackupRequest(BaseModel):
@@ -27,6 +28,31 @@ class BackupRequest(BaseModel):
             "Auto-detected (uses latest backup) if not provided"
         ),
     )
+    include: list[str] | None = Field(
+        None,
+        description=(
+            "Limit the backup to these schemas or tables: 'schema' or "
+            "'schema.table', '*' matches any part of a name. "
+            "Taken from the schedule if not provided"
+        ),
+    )
+    exclude: list[str] | None = Field(
+        None,
+        description=(
+            "Leave these schemas or tables out of the backup, same patterns "
+            "as include"
+        ),
+    )
+    engine: BackupEngine | None = Field(
+        None,
+        description=(
+            "'physical' (backup tool copying the data files), 'logical' "
+            "(parallel SQL dump, full backups only) or 'snapshot' (volume "
+            "snapshot of the data directory, full backups of the whole "
+            "instance only). Taken from the schedule, else backup_engine "
+            "from the config, if not provided"
+        ),
+    )
     schedule_id: int | None = Field(
         None,
         description=(
@@ -36,3 +62,8 @@ class BackupRequest(BaseModel):
     )
 
 
+
+    @field_validator("include", "exclude")
+    @classmethod
+    def validate_scope(cls, v: list[str] | None) -> list[str] | None:
+        return normalize_patterns(v)
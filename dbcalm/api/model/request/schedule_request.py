@@ -1,4 +1,7 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ValidationInfo, field_validator
+
+from dbcalm.data.data_types.enum_types import BackupEngine
+from dbcalm.util.backup_scope import normalize_patterns
 
 # Constants for validation
 MAX_DAY_OF_WEEK = 6
@@ -19,12 +22,15 @@ class ScheduleRequest(BaseModel):
     retention_value: int | None = None
     retention_unit: str | None = None
     enabled: bool = True
+    include: list[str] | None = None
+    exclude: list[str] | None = None
+    engine: BackupEngine | None = None
 
     @field_validator("backup_type")
     @classmethod
     def validate_backup_type(cls, v: str) -> str:
-        if v not in ["full", "incremental"]:
-            msg = "backup_type must be 'full' or 'incremental'"
+        if v not in ["full", "incremental", "test_restore"]:
+            msg = "backup_type must be 'full', 'incremental' or 'test_restore'"
             raise ValueError(msg)
         return v
 
@@ -102,3 +108,35 @@ class ScheduleRequest(BaseModel):
             msg = "retention_unit must be 'days', 'weeks', or 'months'"
             raise ValueError(msg)
         return v
+
+    @field_validator("include", "exclude")
+    @classmethod
+    def validate_scope(
+        cls,
+        v: list[str] | None,
+        info: ValidationInfo,
+    ) -> list[str] | None:
+        v = normalize_patterns(v)
+        if v is not None and info.data.get("backup_type") == "test_restore":
+            msg = f"{info.field_name} only applies to backup schedules"
+            raise ValueError(msg)
+        return v
+
+    @field_validator("engine")
+    @classmethod
+    def validate_engine(
+        cls,
+        v: BackupEngine | None,
+        info: ValidationInfo,
+    ) -> BackupEngine | None:
+        if v in (BackupEngine.LOGICAL, BackupEngine.SNAPSHOT) and (
+            info.data.get("backup_type") != "full"
+        ):
+            msg = f"{v.value} backups are always full backups"
+            raise ValueError(msg)
+        if v == BackupEngine.SNAPSHOT and (
+            info.data.get("include") or info.data.get("exclude")
+        ):
+            msg = "snapshot backups always cover the whole instance"
+            raise ValueError(msg)
+        return v
@@ -21,6 +21,47 @@ class BackupResponse(BaseResponse):
         description="When the backup completed (null if still running)",
     )
     process_id: int = Field(description="ID of the process that created this backup")
+    size_bytes: int | None = Field(
+        default=None,
+        description="Size of the backup on disk (null if unknown)",
+    )
+    storage_location: str | None = Field(
+        default=None,
+        description=(
+            "Where a streamed backup was stored, a path or s3:// URL "
+            "(null for backups kept as a folder)"
+        ),
+    )
+    include: list[str] | None = Field(
+        default=None,
+        description=(
+            "Schemas and tables a partial backup was limited to "
+            "(null for every table)"
+        ),
+    )
+    exclude: list[str] | None = Field(
+        default=None,
+        description="Schemas and tables left out of a partial backup",
+    )
+    engine: str | None = Field(
+        default=None,
+        description=(
+            "'logical' for SQL dumps, 'snapshot' for copies of a volume "
+            "snapshot, null for physical backups"
+        ),
+    )
+    snapshot: str | None = Field(
+        default=None,
+        description=(
+            "Volume snapshot kept as the backup (null if it was copied)"
+        ),
+    )
+    lock_seconds: float | None = Field(
+        default=None,
+        description=(
+            "Seconds writes were blocked to take the backup (null if unknown)"
+        ),
+    )
     schedule_id: int | None = Field(
         default=None,
         description=(
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from pydantic import Field
+
+from dbcalm.api.model.response.base_response import BaseResponse
+from dbcalm.api.model.response.list_response import PaginationInfo
+
+
+class BinlogResponse(BaseResponse):
+    """Response model for a single archived binary log."""
+
+    name: str = Field(description="File name of the log on the server")
+    size_bytes: int = Field(description="Size of the compressed archive copy")
+    first_event_time: datetime = Field(description="Time of the first event")
+    last_event_time: datetime = Field(description="Time of the last event")
+    end_position: int = Field(description="Position after the last event")
+    start_gtid: str | None = Field(
+        description="GTID state before the first event (null without GTIDs)",
+    )
+    end_gtid: str | None = Field(
+        description="GTID state after the last event (null without GTIDs)",
+    )
+    archived_at: datetime = Field(description="When the log was archived")
+
+
+class BinlogListResponse(BaseResponse):
+    """Response model for paginated list of archived binary logs."""
+
+    items: list[BinlogResponse] = Field(description="List of binary logs")
+    pagination: PaginationInfo = Field(description="Pagination metadata")
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from pydantic import ConfigDict, Field
+
+from dbcalm.api.model.response.base_response import BaseResponse
+from dbcalm.api.model.response.list_response import PaginationInfo
+
+
+class CleanupPreviewBackup(BaseResponse):
+    model_config = ConfigDict(from_attributes=True)
+    """A backup evaluated by the retention rules."""
+
+    id: str = Field(description="Unique backup identifier")
+    from_backup_id: str | None = Field(
+        description="ID of the base backup, null for full backups",
+    )
+    schedule_id: int | None = Field(description="ID of the schedule")
+    start_time: datetime = Field(description="When the backup started")
+    size_bytes: int | None = Field(
+        description="Size of the backup on disk (null if unknown)",
+    )
+
+
+class KeptBackup(CleanupPreviewBackup):
+    """A backup past its retention that is kept because others depend on it."""
+
+    required_by: list[str] = Field(
+        description="IDs of kept backups taken directly from this backup",
+    )
+
+
+class CleanupPreviewResponse(BaseResponse):
+    """What a cleanup run would delete right now."""
+
+    expired: list[CleanupPreviewBackup] = Field(
+        description="Page of the backups that would be deleted, oldest first",
+    )
+    pagination: PaginationInfo = Field(
+        description="Pagination metadata of the expired backups",
+    )
+    kept_for_dependents: list[KeptBackup] = Field(
+        description="Backups past retention kept because dependents need them",
+    )
+    bytes_reclaimed: int = Field(
+        description="Disk space freed by deleting all expired backups",
+    )
+    unknown_size_count: int = Field(
+        description="Expired backups without a recorded size",
+    )
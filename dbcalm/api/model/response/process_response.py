@@ -25,6 +25,16 @@ class ProcessResponse(BaseResponse):
     )
     type: str = Field(description="Type of process (backup, restore, etc.)")
     args: dict = Field(description="Arguments passed to the command")
+    metrics: dict | None = Field(
+        default=None,
+        description=(
+            "Measurements taken while the process ran, e.g. lock_seconds, "
+            "and with cgroup enabled cpu_seconds, cpu_throttled_seconds, "
+            "read_bytes, write_bytes and memory_peak_bytes of its commands, "
+            "with throttle enabled throttled_seconds and throughput_mb_s "
+            "(null if there are none)"
+        ),
+    )
 
 
 class ProcessListResponse(BaseResponse):
@@ -16,7 +16,7 @@ class RestoreResponse(BaseResponse):
         description="When the restore completed (null if still running)",
     )
     target: RestoreTarget = Field(
-        description="Restore target (database or folder)",
+        description="Restore target (database, folder, table or schema)",
     )
     target_path: str = Field(description="Path where data was restored")
     backup_id: str = Field(description="ID of the backup that was restored")
@@ -24,6 +24,18 @@ class RestoreResponse(BaseResponse):
         description="Timestamp of the backup",
     )
     process_id: int = Field(description="ID of the restore process")
+    until_time: datetime | None = Field(
+        default=None,
+        description="Point in time the backup was rolled forward to",
+    )
+    until_gtid: str | None = Field(
+        default=None,
+        description="Last transaction replayed on top of the backup",
+    )
+    tables: list[str] | None = Field(
+        default=None,
+        description="Tables or schemas imported by a table or schema restore",
+    )
 
 
 class RestoreListResponse(BaseResponse):
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from pydantic import Field
+
+from dbcalm.api.model.response.base_response import BaseResponse
+from dbcalm.api.model.response.list_response import PaginationInfo
+
+
+class RestoreTestResponse(BaseResponse):
+    """Response model for a single test restore."""
+
+    id: int = Field(description="Unique test restore identifier")
+    schedule_id: int | None = Field(
+        description="Schedule that ran the test restore (null if run by hand)",
+    )
+    backup_id: str = Field(description="Newest backup of the restored chain")
+    chain_length: int = Field(
+        description="Number of backups restored (full backup and incrementals)",
+    )
+    start_time: datetime = Field(description="When the test restore started")
+    end_time: datetime | None = Field(
+        description="When the test restore finished",
+    )
+    restore_seconds: float | None = Field(
+        description="Time to copy and prepare the chain, the recovery time",
+    )
+    startup_seconds: float | None = Field(
+        description="Time to start the throwaway server (null if not checked)",
+    )
+    status: str = Field(description="Outcome (success or failed)")
+    message: str | None = Field(description="Error of a failed test restore")
+
+
+class RestoreTestListResponse(BaseResponse):
+    """Response model for paginated list of test restores."""
+
+    items: list[RestoreTestResponse] = Field(description="List of test restores")
+    pagination: PaginationInfo = Field(description="Pagination metadata")
+
+
+class RtoResponse(BaseResponse):
+    """Restore times of successful test restores of one chain length."""
+
+    chain_length: int = Field(description="Number of backups in the chain")
+    runs: int = Field(description="Successful test restores of this length")
+    average_seconds: float = Field(description="Average restore time")
+    max_seconds: float = Field(description="Slowest restore time")
@@ -35,6 +35,24 @@ class ScheduleResponse(BaseResponse):
         description="Retention period unit (days, weeks, months)",
     )
     enabled: bool = Field(description="Whether the schedule is enabled")
+    include: list[str] | None = Field(
+        default=None,
+        description=(
+            "Schemas and tables (schema or schema.table, * wildcards) the "
+            "backups are limited to, null for every table"
+        ),
+    )
+    exclude: list[str] | None = Field(
+        default=None,
+        description="Schemas and tables left out of the backups",
+    )
+    engine: str | None = Field(
+        default=None,
+        description=(
+            "'physical' or 'logical' backups, null for the configured "
+            "backup_engine"
+        ),
+    )
     created_at: datetime = Field(description="When the schedule was created")
     updated_at: datetime = Field(description="When the schedule was last updated")
 
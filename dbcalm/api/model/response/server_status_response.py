@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from pydantic import Field
+
+from dbcalm.api.model.response.base_response import BaseResponse
+
+
+class ServerStateChangeResponse(BaseResponse):
+    state: str = Field(description="Server state after the change (up or down)")
+    changed_at: datetime = Field(description="When the change was detected")
+
+
+class ServerStatusResponse(BaseResponse):
+    """Database server state as seen by the mariadb command service."""
+
+    state: str = Field(
+        description="Current server state (up, down or unknown)",
+    )
+    since: datetime | None = Field(
+        default=None,
+        description="When the server entered the current state",
+    )
+    changes: list[ServerStateChangeResponse] = Field(
+        description="Recent state changes, latest first",
+    )
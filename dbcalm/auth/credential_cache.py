@@ -0,0 +1,85 @@
+import hashlib
+import hmac
+import time
+
+import jwt
+from passlib.context import CryptContext
+
+from dbcalm.auth.jwt_settings import jwt_settings
+from dbcalm.data.model.client import Client
+from dbcalm.util.ttl_cache import TTLCache
+
+# How long a successful bcrypt verification of a client secret is trusted
+CLIENT_SECRET_TTL = 300  # seconds
+# Upper bound for keeping a decoded token, the token's own exp always wins
+TOKEN_TTL = 60  # seconds
+
+secret_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_verified_secrets = TTLCache(ttl=CLIENT_SECRET_TTL)
+_decoded_tokens = TTLCache(ttl=TOKEN_TTL, max_size=4096)
+
+
+def _fingerprint(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def verify_client_secret(client: Client, secret: str) -> bool:
+    """Check a client secret against the stored bcrypt hash.
+
+    Successful verifications are remembered per client for CLIENT_SECRET_TTL
+    so repeated client_credentials grants skip bcrypt. Only a sha256
+    fingerprint of the secret is kept in memory, together with the stored
+    hash it was verified against: if the client is deleted and recreated
+    (or its secret changes) the stored hash no longer matches and bcrypt
+    runs again.
+    """
+    fingerprint = _fingerprint(secret)
+    cached = _verified_secrets.get(client.id)
+    if cached is not None:
+        stored_hash, cached_fingerprint = cached
+        if stored_hash == client.secret and hmac.compare_digest(
+            cached_fingerprint,
+            fingerprint,
+        ):
+            return True
+
+    if not secret_context.verify(secret, client.secret):
+        return False
+
+    _verified_secrets.set(client.id, (client.secret, fingerprint))
+    return True
+
+
+def revoke_client(client_id: str) -> None:
+    """Forget any cached verification for a client (on update or delete)."""
+    _verified_secrets.delete(client_id)
+
+
+def decode_token(token: str) -> dict:
+    """Decode and verify a JWT, caching the payload by token hash.
+
+    Raises the same jwt exceptions as jwt.decode so callers can keep their
+    existing error handling.
+    """
+    key = _fingerprint(token)
+    payload = _decoded_tokens.get(key)
+    now = time.time()
+    if payload is not None and payload.get("exp", 0) > now:
+        return payload
+
+    jwt_secret_key, jwt_algorithm = jwt_settings()
+    payload = jwt.decode(token, jwt_secret_key, algorithms=[jwt_algorithm])
+
+    ttl = TOKEN_TTL
+    if payload.get("exp") is not None:
+        ttl = min(TOKEN_TTL, payload["exp"] - now)
+    if ttl > 0:
+        _decoded_tokens.set(key, payload, ttl=ttl)
+    return payload
+
+
+def clear() -> None:
+    """Drop all cached credentials and tokens."""
+    _verified_secrets.clear()
+    _decoded_tokens.clear()
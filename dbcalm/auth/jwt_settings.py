@@ -0,0 +1,17 @@
+from functools import cache
+
+from dbcalm.config.config_factory import config_factory
+
+
+@cache
+def jwt_settings() -> tuple[str, str]:
+    """Return the JWT secret key and algorithm.
+
+    Read once per process, the yaml config is parsed from disk on every
+    lookup so it should stay out of the per-request path.
+    """
+    config = config_factory()
+    return (
+        config.value("jwt_secret_key"),
+        config.value("jwt_algorithm", default="HS256"),
+    )
@@ -0,0 +1,95 @@
+import argparse
+import sys
+
+from dbcalm.service.cleanup_trigger import CleanupTrigger
+from dbcalm.service.retention_planner import RetentionPlanner
+
+# HTTP style status code the command service returns for accepted jobs
+HTTP_ACCEPTED = 202
+
+
+def cleanup() -> None:
+    """Delete backups that have passed their schedule's retention period.
+
+    Expired backups are worked out locally and handed to the command
+    service, which deletes them in the background.
+    """
+    backup_ids, response = CleanupTrigger().submit()
+
+    if response is None:
+        print("Nothing to clean up")
+        sys.exit(0)
+
+    if response.get("code") != HTTP_ACCEPTED:
+        print(f"Error: Cleanup request failed: {response.get('status')}")
+        sys.exit(1)
+
+    print(
+        f"Success: cleanup of {len(backup_ids)} backups accepted "
+        f"(PID: {response.get('id', 'unknown')})",
+    )
+    for backup_id in backup_ids:
+        print(f"  {backup_id}")
+    sys.exit(0)
+
+
+def format_size(size: int) -> str:
+    value = float(size)
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if value < 1024 or unit == "TB":  # noqa: PLR2004
+            break
+        value /= 1024
+    return f"{value:.1f} {unit}"
+
+
+def preview() -> None:
+    """Print what a cleanup run would delete, without deleting anything."""
+    plan = RetentionPlanner().current_plan()
+
+    if not plan.expired:
+        print("Nothing to clean up")
+    else:
+        print(f"Would delete {plan.expired_count} backups:")
+        for row in plan.expired:
+            size = "unknown size" if row.size_bytes is None else format_size(
+                row.size_bytes,
+            )
+            print(f"  {row.id} (schedule {row.schedule_id}, {size})")
+
+    if plan.kept_for_dependents:
+        print(
+            f"Kept for dependent backups ({len(plan.kept_for_dependents)}):",
+        )
+        for backup_id, (_, required_by) in plan.kept_for_dependents.items():
+            print(f"  {backup_id} (needed by {', '.join(required_by)})")
+
+    reclaimed = f"Space reclaimed: {format_size(plan.bytes_reclaimed)}"
+    if plan.unknown_size_count:
+        reclaimed += f" (+{plan.unknown_size_count} backups of unknown size)"
+    print(reclaimed)
+    sys.exit(0)
+
+
+def run(args: argparse.Namespace) -> None:
+    """Handle cleanup command execution."""
+    if getattr(args, "dry_run", False):
+        preview()
+    else:
+        cleanup()
+
+
+def configure_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Configure the cleanup subcommand parser.
+
+    Args:
+        subparsers: Subparser action from main argument parser
+    """
+    cleanup_parser = subparsers.add_parser(
+        "cleanup",
+        help="Delete backups past their retention period (for cron use)",
+    )
+    cleanup_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report what would be deleted and the space reclaimed",
+    )
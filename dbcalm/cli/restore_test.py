@@ -0,0 +1,68 @@
+import argparse
+import sys
+
+from dbcalm_mariadb_cmd_client.client import Client
+
+# HTTP style status code the command service returns for accepted jobs
+HTTP_ACCEPTED = 202
+
+
+def submit_test_restore(
+    backup_id: str | None = None,
+    schedule_id: int | None = None,
+) -> None:
+    """Test restore a backup chain by submitting it to the command service.
+
+    The command service restores the chain into a scratch folder, records
+    how long that took and removes the folder again.
+
+    Args:
+        backup_id: Newest backup of the chain, the latest backup if None
+        schedule_id: Optional schedule ID that triggered this test restore
+    """
+    args = {"id": backup_id}
+    if schedule_id is not None:
+        args["schedule_id"] = schedule_id
+
+    response = Client().command("test_restore", args)
+
+    if response.get("code") != HTTP_ACCEPTED:
+        print(f"Error: Test restore request failed: {response.get('status')}")
+        sys.exit(1)
+
+    print(
+        "Success: test restore request accepted "
+        f"(PID: {response.get('id', 'unknown')})",
+    )
+    sys.exit(0)
+
+
+def run(args: argparse.Namespace) -> None:
+    """Handle test-restore command execution."""
+    submit_test_restore(
+        getattr(args, "backup_id", None),
+        getattr(args, "schedule_id", None),
+    )
+
+
+def configure_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Configure the test-restore subcommand parser.
+
+    Args:
+        subparsers: Subparser action from main argument parser
+    """
+    test_restore_parser = subparsers.add_parser(
+        "test-restore",
+        help="Restore a backup chain into a scratch folder (for cron use)",
+    )
+    test_restore_parser.add_argument(
+        "--backup-id",
+        required=False,
+        help="Newest backup of the chain to test, defaults to the latest",
+    )
+    test_restore_parser.add_argument(
+        "--schedule-id",
+        type=int,
+        required=False,
+        help="Schedule ID that triggered this test restore",
+    )
@@ -1,3 +1,4 @@
+import argparse
 import os
 
 import uvicorn
@@ -22,13 +23,17 @@ from dbcalm.routes import (
     get_backup,
     get_schedule,
     list_backups,
+    list_binlogs,
     list_clients,
     list_processes,
+    list_restore_tests,
     list_restores,
     list_schedules,
+    server_status,
     token,
     update_client,
     update_schedule,
+    verify_backup,
 )
 from dbcalm.routes import (
     status as status_route,
@@ -60,11 +65,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Routes that do blocking work (SQLite, bcrypt, synchronous command socket
+# calls) are plain `def` so FastAPI runs them in its threadpool. Only routes
+# that await non-blocking calls are `async def`, anything blocking in them
+# would stall the event loop for every other request.
 app.include_router(authorize.router, prefix="/auth", tags=["Authentication"])
 app.include_router(token.router, prefix="/auth", tags=["Authentication"])
 app.include_router(create_backup.router, tags=["Backups"])
 app.include_router(list_backups.router, tags=["Backups"])
 app.include_router(get_backup.router, tags=["Backups"])
+app.include_router(verify_backup.router, tags=["Backups"])
 app.include_router(cleanup.router, tags=["Cleanup"])
 app.include_router(list_clients.router, tags=["Clients"])
 app.include_router(delete_client.router, tags=["Clients"])
@@ -72,6 +82,8 @@ app.include_router(update_client.router, tags=["Clients"])
 app.include_router(create_client.router, tags=["Clients"])
 app.include_router(create_restore.router, tags=["Restores"])
 app.include_router(list_restores.router, tags=["Restores"])
+app.include_router(list_restore_tests.router, tags=["Restores"])
+app.include_router(list_binlogs.router, tags=["Restores"])
 app.include_router(list_processes.router, tags=["Processes"])
 app.include_router(list_schedules.router, tags=["Schedules"])
 app.include_router(get_schedule.router, tags=["Schedules"])
@@ -79,6 +91,7 @@ app.include_router(create_schedule.router, tags=["Schedules"])
 app.include_router(update_schedule.router, tags=["Schedules"])
 app.include_router(delete_schedule.router, tags=["Schedules"])
 app.include_router(status_route.router, tags=["Status"])
+app.include_router(server_status.router, tags=["Status"])
 
 @app.exception_handler(Exception)
 async def global_exception_handler(
@@ -96,6 +109,17 @@ async def global_exception_handler(
         content={"detail": "Internal server error"},
     )
 
+def configure_parser(
+    subparsers: argparse._SubParsersAction,
+) -> argparse.ArgumentParser:
+    """Configure the server subcommand parser.
+
+    Args:
+        subparsers: Subparser action from main argument parser
+    """
+    return subparsers.add_parser("server", help="Start the API server")
+
+
 def run() -> None:
     """Start the API server"""
     # Initialize logger early so all errors get logged
@@ -152,11 +176,19 @@ def run() -> None:
         },
     }
 
+    # Every worker is a separate process with its own copy of the config
+    # cache, JWT settings and database engine, they share the SQLite database
+    # (in WAL mode). Schedules run in the mariadb command service, never in
+    # the API, so extra workers can't trigger duplicate backups.
+    workers = config.value("api_workers", 1)
     uvicorn_args = {
-            "app": app,
+            # uvicorn imports the app in each worker, which needs an import
+            # string rather than the app object
+            "app": "dbcalm.cli.server:app" if workers > 1 else app,
             "host": config.value("api_host", "0.0.0.0"),  # noqa: S104
             "port": config.value("api_port", 8335),
             "log_config": uvicorn_log_config,
+            "workers": workers,
         }
     if config.value("ssl_cert") and config.value("ssl_key"):
         ssl_cert = config.value("ssl_cert")
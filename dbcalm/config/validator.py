@@ -5,6 +5,10 @@ from pathlib import Path
 from dbcalm.config.config import Config
 from dbcalm.errors.validation_error import ValidationError
 
+# Jobs done by the services' own threads, no cgroup can hold them. Their
+# rate limits (cleanup_rate_limit, verify_rate_limit) bound them instead
+IN_PROCESS_JOB_TYPES = ["cleanup_backups", "verify_backup", "gc_repository"]
+
 
 class Validator:
     ## This class is used to validate the configuration
@@ -54,6 +58,99 @@ class Validator:
             )
             raise ValidationError(msg)
 
+        # Validate the supported modes of optional settings
+        self.validate_choice("scheduler", ["cron", "internal"])
+        self.validate_choice("backup_engine", ["physical", "logical", "snapshot"])
+        self.validate_choice("snapshot_type", ["btrfs", "lvm", "zfs"])
+
+        # Validate scheduler_jitter is a non-negative number if set
+        scheduler_jitter = self.config.value("scheduler_jitter")
+        if scheduler_jitter is not None and (
+            not isinstance(scheduler_jitter, int) or scheduler_jitter < 0
+        ):
+            msg = (
+                "scheduler_jitter must be a non-negative number of seconds in "
+                f"{self.config.CONFIG_PATH}"
+            )
+            raise ValidationError(msg)
+
+        # Validate api_workers is a positive number if set
+        api_workers = self.config.value("api_workers")
+        if api_workers is not None and (
+            not isinstance(api_workers, int) or api_workers < 1
+        ):
+            msg = (
+                "api_workers must be a number of at least 1 in "
+                f"{self.config.CONFIG_PATH}"
+            )
+            raise ValidationError(msg)
+
+        self.validate_cgroup_limits()
+
+        # API workers share one log file, only logrotate can rotate it
+        rotating = any(
+            self.config.value(key) is not None
+            for key in ("log_max_bytes", "log_rotate_when")
+        )
+        if rotating and api_workers is not None and api_workers > 1:
+            msg = (
+                f"log_max_bytes and log_rotate_when in {self.config.CONFIG_PATH} "
+                "can't be used with more than one api_workers, rotate the log "
+                "with logrotate instead"
+            )
+            raise ValidationError(msg)
+
+        self.validate_removed_forward()
+
+    def validate_cgroup_limits(self) -> None:
+        """cgroup_limits maps job types to their limits."""
+        options = ["io_weight", "io_max", "cpu_quota", "memory_max", "cpus"]
+        cgroup_limits = self.config.value("cgroup_limits")
+        if cgroup_limits is None:
+            return
+        if not isinstance(cgroup_limits, dict) or not all(
+            isinstance(limits, dict) for limits in cgroup_limits.values()
+        ):
+            msg = (
+                "cgroup_limits must map job types to their limits in "
+                f"{self.config.CONFIG_PATH}"
+            )
+            raise ValidationError(msg)
+        for job_type, limits in cgroup_limits.items():
+            if job_type in IN_PROCESS_JOB_TYPES:
+                msg = (
+                    f"cgroup_limits of {job_type} in {self.config.CONFIG_PATH} "
+                    "can't apply, the service does that work itself, limit it "
+                    "with cleanup_rate_limit or verify_rate_limit instead"
+                )
+                raise ValidationError(msg)
+            unknown = sorted(set(limits) - set(options))
+            if unknown:
+                msg = (
+                    f"cgroup_limits of {job_type} can only set {options} in "
+                    f"{self.config.CONFIG_PATH}, got: {', '.join(unknown)}"
+                )
+                raise ValidationError(msg)
+
+    def validate_removed_forward(self) -> None:
+        """forward piped streamed backups to a command, storage_backend replaced it."""
+        if self.config.value("forward") is not None:
+            msg = (
+                f"forward in {self.config.CONFIG_PATH} is no longer supported, "
+                "set storage_backend to local, filesystem or s3 to choose "
+                "where streamed backups are written"
+            )
+            raise ValidationError(msg)
+
+    def validate_choice(self, key: str, valid_values: list[str]) -> None:
+        value = self.config.value(key)
+        if value is not None and value not in valid_values:
+            msg = (
+                f"{key} must be one of {valid_values} in "
+                f"{self.config.CONFIG_PATH}, got: {value}"
+            )
+            raise ValidationError(msg)
+
     def validate_backup_path(self) -> None:
         # Check if backup path exists
         backup_path = Path(self.config.value("backup_dir"))
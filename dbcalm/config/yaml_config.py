@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any
+from typing import Any, ClassVar
 
 import yaml
 
@@ -7,14 +7,29 @@ from dbcalm.config.config import Config
 
 
 class YamlConfig(Config):
+    # parsed config per file with the (mtime, size) it was parsed at, the file
+    # is only parsed again when it changes on disk
+    _cache: ClassVar[dict[str, tuple[tuple[int, int], dict]]] = {}
+
+    def load(self) -> dict:
+        path = self.CONFIG_PATH
+        stat = Path(path).stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = YamlConfig._cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with Path.open(path) as file:
+            config = yaml.safe_load(file) or {}
+        YamlConfig._cache[path] = (signature, config)
+        return config
+
     def value(self, key: str, default: Any = None) -> Any:  # noqa: ANN401
-        with Path.open(self.CONFIG_PATH) as file:
-            config = yaml.safe_load(file)
-            value = config.get(key)
-            if value is None:
-                return default
-            if isinstance(value, str) and (value.lower() == "true" or value == "1"):
-                return "1"
-            if value is True:
-                return "1"
-            return value
+        value = self.load().get(key)
+        if value is None:
+            return default
+        if isinstance(value, str) and (value.lower() == "true" or value == "1"):
+            return "1"
+        if value is True:
+            return "1"
+        return value
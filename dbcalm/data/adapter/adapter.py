@@ -2,6 +2,7 @@
 from abc import ABC, abstractmethod
 
 from pydantic import BaseModel
+from sqlalchemy.sql.expression import Executable
 
 
 class Adapter(ABC):
@@ -19,6 +20,10 @@ class Adapter(ABC):
     ) -> tuple[list[BaseModel], int]:
         pass
 
+    @abstractmethod
+    def execute(self, statement: Executable) -> list[tuple]:
+        pass
+
     @abstractmethod
     def create(self, model: BaseModel) -> BaseModel:
         pass
@@ -35,3 +40,6 @@ class Adapter(ABC):
     def delete(self, model: BaseModel, query: dict) -> bool:
         pass
 
+    @abstractmethod
+    def delete_many(self, model: BaseModel, field: str, values: list) -> int:
+        pass
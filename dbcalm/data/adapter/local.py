@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from typing import TYPE_CHECKING, ClassVar
 
+from sqlalchemy import Engine, event, inspect
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlmodel import Session, SQLModel, create_engine
 
@@ -9,33 +14,130 @@ from dbcalm.config.config import Config
 from dbcalm.data.adapter.adapter import Adapter
 from dbcalm.logger.logger_factory import logger_factory
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from sqlite3 import Connection
+
+    from sqlalchemy.pool import ConnectionPoolEntry
+    from sqlalchemy.sql.expression import Executable
+
+DELETE_BATCH_SIZE = 500
+# How long a writer waits for another process (API worker, command service)
+# to release the database lock
+BUSY_TIMEOUT = 5000  # milliseconds
+# Errors of schema changes another process starting at the same time made
+# first
+ALREADY_APPLIED = ("duplicate column name", "already exists")
+
+
+def sqlite_pragmas(
+    dbapi_connection: Connection,
+    _connection_record: ConnectionPoolEntry,
+) -> None:
+    """Per connection settings, the database is shared by several processes.
+
+    WAL lets readers continue while one process writes, synchronous=NORMAL
+    is the recommended pairing for WAL and only risks the last commits on
+    power loss, not corruption.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")
+    cursor.close()
+
+
+@contextmanager
+def already_applied() -> Iterator[None]:
+    """Skip a schema change that another process made first."""
+    try:
+        yield
+    except OperationalError as e:
+        if not any(message in str(e.orig) for message in ALREADY_APPLIED):
+            raise
+
 
 class Local(Adapter):
+    # engines per database file, shared by all adapters in the process, the
+    # schema of a file is brought up to date with its engine
+    _engines: ClassVar[dict[str, Engine]] = {}
+    # API routes construct adapters from several threadpool workers at once,
+    # concurrent migrations race on CREATE TABLE
+    _schema_lock = threading.Lock()
+
     def __init__(self) -> None:
         self.session  = self.session()
         self.logger = logger_factory()
         super().__init__()
 
-    def session(self) -> Session:
-        engine = create_engine(
-            "sqlite:///" + Config.DB_PATH,
-            pool_size=5,
-            max_overflow=10,
-            pool_pre_ping=True,
-            pool_recycle=3600,
-            echo=False,
-            connect_args={"check_same_thread": False},
-
-        )
-        SQLModel.metadata.create_all(engine)
+    def __del__(self) -> None:
+        # hand the connection back to the shared pool as soon as the adapter
+        # is dropped, the session's reference cycles would otherwise keep it
+        # checked out until the next garbage collection
+        session = self.__dict__.get("session")
+        if session is not None:
+            session.close()
 
-       # Create the database tables if they don't exist
-        session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    def session(self) -> Session:
+        session_factory = sessionmaker(bind=self.engine(), expire_on_commit=False)
 
         session = scoped_session(session_factory)
 
         return session()
 
+    def engine(self) -> Engine:
+        """Engine for the configured database, created once per process.
+
+        Creating the engine and checking the schema is most of the work of a
+        short request, so it is only done for the first adapter of a
+        database file.
+        """
+        with Local._schema_lock:
+            engine = Local._engines.get(Config.DB_PATH)
+            if engine is None:
+                engine = create_engine(
+                    "sqlite:///" + Config.DB_PATH,
+                    pool_size=5,
+                    max_overflow=10,
+                    pool_pre_ping=True,
+                    pool_recycle=3600,
+                    echo=False,
+                    connect_args={"check_same_thread": False},
+
+                )
+                event.listen(engine, "connect", sqlite_pragmas)
+                self.migrate(engine)
+                Local._engines[Config.DB_PATH] = engine
+        return engine
+
+    def migrate(self, engine: Engine) -> None:
+        """Create missing tables and bring existing ones up to date.
+
+        Columns and indexes added to a model later are added to its table.
+        New columns must be nullable. Services starting together migrate the
+        same file, changes one of them made first count as done.
+        """
+        with engine.begin() as connection:
+            inspector = inspect(connection)
+            for table in SQLModel.metadata.sorted_tables:
+                if not inspector.has_table(table.name):
+                    with already_applied():
+                        table.create(connection)
+                    continue
+                existing = {c["name"] for c in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    with already_applied():
+                        connection.exec_driver_sql(
+                            f'ALTER TABLE "{table.name}" '
+                            f'ADD COLUMN "{column.name}" {column_type}',
+                        )
+                for index in table.indexes:
+                    with already_applied():
+                        index.create(connection, checkfirst=True)
+
     def get(self, model: SQLModel, query: dict) -> SQLModel|None:
         # Convert dict to list of QueryFilter objects (all equality)
         from dbcalm.util.parse_query_with_operators import QueryFilter  # noqa: PLC0415
@@ -143,6 +245,13 @@ class Local(Adapter):
 
         return items, count
 
+    def execute(self, statement: Executable) -> list[tuple]:
+        """Run a select statement and return its rows.
+
+        For set based queries that don't map to a single model listing.
+        """
+        return self.session.execute(statement).all()
+
     def _convert_value_type(self, column, value: str):  # noqa: ANN202, ANN001, PLR0911, C901
         """Convert string value to appropriate type based on column type."""
         # Try to get the column's Python type
@@ -202,3 +311,23 @@ class Local(Adapter):
         self.session.commit()
         return True
 
+    def delete_many(self, model: SQLModel, field: str, values: list) -> int:
+        """Delete all rows whose field is in values in a single transaction."""
+        column = getattr(model, field)
+        deleted = 0
+        try:
+            # stay below SQLite's limit on bound parameters per statement
+            for start in range(0, len(values), DELETE_BATCH_SIZE):
+                batch = values[start:start + DELETE_BATCH_SIZE]
+                deleted += (
+                    self.session.query(model)
+                    .filter(column.in_(batch))
+                    .delete(synchronize_session=False)
+                )
+            self.session.commit()
+        except Exception:
+            self.logger.exception("error deleting")
+            self.session.rollback()
+            raise
+        return deleted
+
@@ -4,7 +4,18 @@ from enum import Enum
 class RestoreTarget(str, Enum):
     DATABASE = "database"
     FOLDER = "folder"
+    # single tables or schemas imported into the running server
+    TABLE = "table"
+    SCHEMA = "schema"
 
 class BackupType(str, Enum):
     FULL = "full"
     INCREMENTAL = "incremental"
+
+class BackupEngine(str, Enum):
+    # mariabackup/xtrabackup copying the data files
+    PHYSICAL = "physical"
+    # SQL dumps of the tables, loaded into any server version
+    LOGICAL = "logical"
+    # LVM, ZFS or btrfs snapshot of the data directory's volume
+    SNAPSHOT = "snapshot"
@@ -1,16 +1,21 @@
 
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime
-from sqlmodel import Column, Field, SQLModel
+from sqlalchemy import DateTime, Index
+from sqlmodel import JSON, Column, Field, SQLModel
 
 
 def now() -> datetime:
     return datetime.now(tz=UTC)
 
 class Backup(SQLModel, table=True):
+    # retention looks up a schedule's backups older than a cutoff
+    __table_args__ = (
+        Index("ix_backup_schedule_id_start_time", "schedule_id", "start_time"),
+    )
+
     id: str = Field(primary_key=True)
-    from_backup_id: str | None
+    from_backup_id: str | None = Field(default=None, index=True)
     schedule_id: int | None = None  # None for manual backups
     start_time: datetime = Field(
         default_factory=now,
@@ -20,6 +25,26 @@ class Backup(SQLModel, table=True):
         default=None, sa_column=Column(DateTime(timezone=True)),
     )
     process_id: int
+    size_bytes: int | None = None  # None for backups made before sizes were kept
+    # where a streamed backup was uploaded to (path or s3:// URL), None for
+    # backups kept as a folder in backup_dir
+    storage_location: str | None = None
+    # include and exclude patterns of a partial backup, both None for a
+    # backup of the whole instance, see BackupScope
+    include: list | None = Field(
+        default=None, sa_column=Column(JSON(none_as_null=True)),
+    )
+    exclude: list | None = Field(
+        default=None, sa_column=Column(JSON(none_as_null=True)),
+    )
+    # "logical" for SQL dumps, "snapshot" for copies of a volume snapshot,
+    # None for physical backups of the backup tool
+    engine: str | None = None
+    # volume snapshot a snapshot backup kept instead of copying it, dropped
+    # with the backup
+    snapshot: str | None = None
+    # how long writes were blocked for a consistent backup, None if unknown
+    lock_seconds: float | None = None
 
 Backup.model_rebuild()
 
@@ -0,0 +1,32 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import JSON, Column, Field, SQLModel
+
+
+def now() -> datetime:
+    return datetime.now(tz=UTC)
+
+
+class BackupManifest(SQLModel, table=True):
+    """Size and checksum of every file of a completed backup.
+
+    Kept in the database rather than in the backup folder, restores copy the
+    whole folder into the data directory.
+    """
+    backup_id: str = Field(primary_key=True)
+    algorithm: str
+    # path relative to the backup folder -> {"size": bytes, "checksum": hex}
+    files: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    created_at: datetime = Field(
+        default_factory=now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    verified_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True)),
+    )
+    # "ok" or "failed", None until the first verification
+    verify_status: str | None = None
+
+
+BackupManifest.model_rebuild()
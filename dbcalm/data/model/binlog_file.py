@@ -0,0 +1,39 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import Column, Field, SQLModel
+
+
+def now() -> datetime:
+    return datetime.now(tz=UTC)
+
+
+class BinlogFile(SQLModel, table=True):
+    """A binary log archived by the binlog archiver.
+
+    Written by the mariadb command service once the server rotated to the
+    next log and this one was compressed into binlog_dir.
+    """
+    name: str = Field(primary_key=True)  # e.g. mariadb-bin.000042
+    path: str  # compressed copy in binlog_dir
+    size_bytes: int  # of the compressed copy
+    # timestamps of the first and last event, restores to a point in time
+    # replay the logs whose range reaches it
+    first_event_time: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True),
+    )
+    last_event_time: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True),
+    )
+    end_position: int  # size of the uncompressed log, events start at 4
+    # GTID state before the first and after the last event, in the notation
+    # of gtid_binlog_pos (MariaDB) or gtid_executed (MySQL)
+    start_gtid: str | None = None
+    end_gtid: str | None = None
+    archived_at: datetime = Field(
+        default_factory=now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+
+BinlogFile.model_rebuild()
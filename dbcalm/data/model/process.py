@@ -20,3 +20,9 @@ class Process(SQLModel, table=True):
     )
     type: str
     args: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    # measurements a task records while it runs, such as lock_seconds of
+    # a snapshot backup, and the resources its cgroup accounted, None when
+    # there are none
+    metrics: dict | None = Field(
+        default=None, sa_column=Column(JSON(none_as_null=True)),
+    )
@@ -3,7 +3,7 @@
 from datetime import UTC, datetime
 
 from sqlalchemy import DateTime
-from sqlmodel import Column, Field, SQLModel
+from sqlmodel import JSON, Column, Field, SQLModel
 
 from dbcalm.data.data_types.enum_types import RestoreTarget
 
@@ -28,5 +28,14 @@ class Restore(SQLModel, table=True):
         default=None, sa_column=Column(DateTime(timezone=True)),
     )
     process_id: int
+    # target of a restore to a point in time, archived binary logs were
+    # replayed on top of the backup up to it
+    until_time: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True)),
+    )
+    until_gtid: str | None = None
+    # schema.table names of a table restore, schema names of a schema
+    # restore, imported into the running server
+    tables: list | None = Field(default=None, sa_column=Column(JSON))
 
 
@@ -0,0 +1,40 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import Column, Field, SQLModel
+
+
+def now() -> datetime:
+    return datetime.now(tz=UTC)
+
+
+class RestoreTest(SQLModel, table=True):
+    """A test restore of a backup chain into a scratch folder.
+
+    Written by the mariadb command service when a test_restore command
+    finishes, the scratch folder is gone by then.
+    """
+    id: int | None = Field(default=None, primary_key=True)
+    schedule_id: int | None = None  # None for test restores run by hand
+    # newest backup of the chain, the full backup it depends on and the
+    # incrementals in between are restored as well
+    backup_id: str = Field(index=True)
+    chain_length: int
+    start_time: datetime = Field(
+        default_factory=now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    end_time: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True)),
+    )
+    # copying and preparing the chain, the recovery time a real restore of
+    # it needs before the data directory can be used
+    restore_seconds: float | None = None
+    # starting the throwaway server, None when the sanity check is disabled
+    startup_seconds: float | None = None
+    # "success" or "failed"
+    status: str
+    message: str | None = None
+
+
+RestoreTest.model_rebuild()
@@ -2,7 +2,7 @@
 from datetime import UTC, datetime
 
 from sqlalchemy import DateTime
-from sqlmodel import Column, Field, SQLModel
+from sqlmodel import JSON, Column, Field, SQLModel
 
 
 def now() -> datetime:
@@ -11,7 +11,9 @@ def now() -> datetime:
 
 class Schedule(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    backup_type: str = Field(nullable=False)  # "full" or "incremental"
+    # "full", "incremental" or "test_restore" (restores the latest backup
+    # chain into a scratch folder instead of taking a backup)
+    backup_type: str = Field(nullable=False)
     # "daily", "weekly", "monthly", "hourly", "interval"
     frequency: str = Field(nullable=False)
     day_of_week: int | None = None  # 0-6 (0=Sunday), only for weekly
@@ -23,6 +25,16 @@ class Schedule(SQLModel, table=True):
     retention_value: int | None = None  # retention period value (e.g., 7, 30, 52)
     retention_unit: str | None = None  # "days", "weeks", "months"
     enabled: bool = Field(default=True, nullable=False)
+    # scope of the backups: schema or schema.table patterns (* wildcards),
+    # None backs up every table, see BackupScope
+    include: list | None = Field(
+        default=None, sa_column=Column(JSON(none_as_null=True)),
+    )
+    exclude: list | None = Field(
+        default=None, sa_column=Column(JSON(none_as_null=True)),
+    )
+    # "physical" or "logical", None takes backup_engine from the config
+    engine: str | None = None
     created_at: datetime = Field(
         default_factory=now,
         sa_column=Column(DateTime(timezone=True), nullable=False),
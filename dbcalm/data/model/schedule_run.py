@@ -0,0 +1,33 @@
+
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import Column, Field, SQLModel
+
+
+def now() -> datetime:
+    return datetime.now(tz=UTC)
+
+
+class ScheduleRun(SQLModel, table=True):
+    """A scheduled fire that did not start a backup.
+
+    Written by the internal scheduler for missed, coalesced, skipped and
+    failed fires. Fires that started a backup are already recorded as a
+    Backup row with the schedule_id.
+    """
+    id: int | None = Field(default=None, primary_key=True)
+    schedule_id: int = Field(nullable=False)
+    scheduled_time: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    # "missed", "coalesced", "skipped" or "failed"
+    status: str = Field(nullable=False)
+    message: str | None = None
+    created_at: datetime = Field(
+        default_factory=now,
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+
+ScheduleRun.model_rebuild()
@@ -0,0 +1,32 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime
+from sqlmodel import Column, Field, SQLModel
+
+
+def now() -> datetime:
+    return datetime.now(tz=UTC)
+
+
+class ServerStateChange(SQLModel, table=True):
+    """The MySQL/MariaDB server went up or down.
+
+    Written by the liveness monitor in the mariadb command service when the
+    result of its ping changes, the latest row is the current state. Each
+    ping that confirms the state updates its checked_at, the monitor's
+    heartbeat.
+    """
+    id: int | None = Field(default=None, primary_key=True)
+    # "up" or "down"
+    state: str = Field(nullable=False)
+    changed_at: datetime = Field(
+        default_factory=now,
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True),
+    )
+    checked_at: datetime | None = Field(
+        default_factory=now,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+
+
+ServerStateChange.model_rebuild()
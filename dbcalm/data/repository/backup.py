@@ -1,6 +1,11 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import ColumnElement, Table, and_, func, or_, select
+
 from dbcalm.data.adapter.adapter_factory import adapter_factory
 from dbcalm.data.model.backup import Backup
 from dbcalm.errors.not_found_error import NotFoundError
+from dbcalm.util.backup_scope import BackupScope
 from dbcalm.util.parse_query_with_operators import QueryFilter
 
 
@@ -24,6 +29,144 @@ class BackupRepository:
         items, total = self.adapter.get_list(Backup, query, order, page, per_page)
         return items, total
 
+    def ids(self) -> set[str]:
+        """Ids of all backups, without loading the rows."""
+        backup = Backup.__table__
+        return {row[0] for row in self.adapter.execute(select(backup.c.id))}
+
+    def storage_locations(self, ids: list[str]) -> dict[str, str]:
+        """Backup id -> where it was stored, for the streamed backups in ids."""
+        backup = Backup.__table__
+        return dict(
+            self.adapter.execute(
+                select(backup.c.id, backup.c.storage_location).where(
+                    backup.c.id.in_(ids),
+                    backup.c.storage_location.is_not(None),
+                ),
+            ),
+        )
+
+    def _retention_queries(self, cutoffs: dict[int, datetime]) -> tuple:
+        """Condition selecting the backups to delete, and the pinned CTE.
+
+        The CTE has an `id` column of expired backups kept for dependents
+        and a `required_by` column holding the id of a dependent.
+        """
+        def expired(table: Table) -> ColumnElement[bool]:
+            # a row predicate rather than a subquery, tens of thousands of
+            # expired ids make IN lists the slowest part of the query. False
+            # rather than NULL for manual backups, so negating it works
+            return and_(
+                table.c.schedule_id.is_not(None),
+                or_(
+                    *(
+                        and_(
+                            table.c.schedule_id == schedule_id,
+                            table.c.start_time < cutoff.astimezone(UTC),
+                        )
+                        for schedule_id, cutoff in cutoffs.items()
+                    ),
+                ),
+            )
+
+        # walk up from every kept backup through expired bases
+        backup = Backup.__table__
+        child = backup.alias("child")
+        base = backup.alias("base")
+        pinned = (
+            select(base.c.id, child.c.id.label("required_by"))
+            .join(base, child.c.from_backup_id == base.c.id)
+            .where(expired(base), ~expired(child))
+            .cte("pinned", recursive=True)
+        )
+        parent = backup.alias("parent")
+        grandparent = backup.alias("grandparent")
+        pinned = pinned.union(
+            select(grandparent.c.id, parent.c.id)
+            .join(pinned, parent.c.id == pinned.c.id)
+            .join(grandparent, parent.c.from_backup_id == grandparent.c.id)
+            .where(expired(grandparent)),
+        )
+
+        to_delete = and_(
+            expired(backup),
+            backup.c.id.not_in(select(pinned.c.id)),
+        )
+        return to_delete, pinned
+
+    def retention_rows(
+        self,
+        cutoffs: dict[int, datetime],
+        page: int | None = None,
+        per_page: int | None = None,
+    ) -> tuple[list, list]:
+        """Resolve retention for all backups with set based queries.
+
+        Args:
+            cutoffs: schedule id -> backups started before this are expired
+            page: page of the rows to delete, all of them when None
+            per_page: rows to delete per page
+
+        Returns:
+            Tuple of (rows to delete ordered by start_time, rows of expired
+            backups pinned by kept dependents with a `required_by` column
+            holding the id of a dependent). Rows have id, from_backup_id,
+            schedule_id, start_time and size_bytes.
+        """
+        backup = Backup.__table__
+        to_delete, pinned = self._retention_queries(cutoffs)
+        columns = [
+            backup.c.id,
+            backup.c.from_backup_id,
+            backup.c.schedule_id,
+            backup.c.start_time,
+            backup.c.size_bytes,
+        ]
+        deleted = select(*columns).where(to_delete).order_by(backup.c.start_time)
+        if page and per_page:
+            deleted = deleted.offset((page - 1) * per_page).limit(per_page)
+        kept = (
+            select(*columns, pinned.c.required_by)
+            .join(pinned, backup.c.id == pinned.c.id)
+            .order_by(backup.c.start_time)
+        )
+        return self.adapter.execute(deleted), self.adapter.execute(kept)
+
+    def retention_totals(
+        self,
+        cutoffs: dict[int, datetime],
+    ) -> tuple[int, int, int]:
+        """Count the backups retention deletes without loading them.
+
+        Returns:
+            Tuple of (backups to delete, bytes they take up, how many of
+            them have no recorded size)
+        """
+        backup = Backup.__table__
+        to_delete, _ = self._retention_queries(cutoffs)
+        count, size, unknown = self.adapter.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(backup.c.size_bytes), 0),
+                func.count() - func.count(backup.c.size_bytes),
+            ).where(to_delete),
+        )[0]
+        return count, size, unknown
+
+    def retention_ids(self, cutoffs: dict[int, datetime]) -> list[str]:
+        """Ids of the backups retention deletes, oldest first."""
+        backup = Backup.__table__
+        to_delete, _ = self._retention_queries(cutoffs)
+        return [
+            row[0]
+            for row in self.adapter.execute(
+                select(backup.c.id).where(to_delete).order_by(backup.c.start_time),
+            )
+        ]
+
+    def delete_many(self, ids: list[str]) -> int:
+        return self.adapter.delete_many(Backup, "id", ids)
+
     def required_backups(self, backup: Backup) -> list:
         required_backups = [backup.id]
         current = backup
@@ -39,6 +182,35 @@ class BackupRepository:
         required_backups.reverse()
         return required_backups
 
+    def oldest_start_time(self) -> datetime | None:
+        """Start of the oldest kept backup, None without backups."""
+        backup = Backup.__table__
+        (oldest,) = self.adapter.execute(select(func.min(backup.c.start_time)))[0]
+        # sqlite hands back naive datetimes, they are stored in UTC
+        if oldest is not None and oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=UTC)
+        return oldest
+
+    def latest_ended_before(self, moment: datetime) -> Backup | None:
+        """The most recent physical backup of the whole instance at moment.
+
+        Partial, logical and snapshot backups are left out, binary logs
+        replay into every table of a prepared data directory.
+        """
+        backup = Backup.__table__
+        rows = self.adapter.execute(
+            select(Backup)
+            .where(
+                backup.c.end_time <= moment.astimezone(UTC),
+                backup.c.include.is_(None),
+                backup.c.exclude.is_(None),
+                backup.c.engine.is_(None),
+            )
+            .order_by(backup.c.end_time.desc())
+            .limit(1),
+        )
+        return rows[0][0] if rows else None
+
     def latest_backup(self) -> Backup | None:
         # get list of backups ordered by end_time desc
         # and limit 1 and return the first item
@@ -50,3 +222,45 @@ class BackupRepository:
             backup = None
 
         return backup
+
+    def latest_base(self, scope: BackupScope) -> Backup | None:
+        """The most recent backup an incremental of scope can build on.
+
+        That is a physical backup of the same tables, logical and snapshot
+        backups have no incrementals.
+        """
+        backup = Backup.__table__
+        whole = and_(backup.c.include.is_(None), backup.c.exclude.is_(None))
+        query = (
+            select(Backup)
+            .where(backup.c.engine.is_(None))
+            .order_by(backup.c.end_time.desc())
+        )
+        if not scope.partial:
+            rows = self.adapter.execute(query.where(whole).limit(1))
+            return rows[0][0] if rows else None
+        # patterns are JSON lists, compared here rather than in SQL
+        for (candidate,) in self.adapter.execute(query.where(~whole)):
+            if BackupScope(candidate.include, candidate.exclude) == scope:
+                return candidate
+        return None
+
+    def kept_snapshots(self, ids: list[str]) -> list[str]:
+        """Volume snapshots kept as the backups with these ids."""
+        backup = Backup.__table__
+        rows = self.adapter.execute(
+            select(backup.c.snapshot).where(
+                backup.c.id.in_(ids),
+                backup.c.snapshot.is_not(None),
+            ),
+        )
+        return [snapshot for (snapshot,) in rows]
+
+    def latest_for_schedule(self, schedule_id: int) -> Backup | None:
+        """Return the most recently started backup created by a schedule."""
+        query_filters = [
+            QueryFilter(field="schedule_id", operator="eq", value=str(schedule_id)),
+        ]
+        order_filters = [QueryFilter(field="start_time", operator="eq", value="desc")]
+        items, _ = self.adapter.get_list(Backup, query_filters, order_filters, 1, 1)
+        return items[0] if items else None
@@ -0,0 +1,19 @@
+from dbcalm.data.adapter.adapter_factory import adapter_factory
+from dbcalm.data.model.backup_manifest import BackupManifest
+
+
+class BackupManifestRepository:
+    def __init__(self) -> None:
+        self.adapter = adapter_factory()
+
+    def create(self, manifest: BackupManifest) -> BackupManifest:
+        return self.adapter.create(manifest)
+
+    def get(self, backup_id: str) -> BackupManifest | None:
+        return self.adapter.get(BackupManifest, {"backup_id": backup_id})
+
+    def update(self, manifest: BackupManifest) -> BackupManifest:
+        return self.adapter.update(manifest)
+
+    def delete_many(self, backup_ids: list[str]) -> int:
+        return self.adapter.delete_many(BackupManifest, "backup_id", backup_ids)
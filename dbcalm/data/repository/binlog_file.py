@@ -0,0 +1,86 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import select
+
+from dbcalm.data.adapter.adapter_factory import adapter_factory
+from dbcalm.data.model.binlog_file import BinlogFile
+from dbcalm.util.gtid import gtid_state_contains
+from dbcalm.util.parse_query_with_operators import QueryFilter
+
+
+class BinlogFileRepository:
+    def __init__(self) -> None:
+        self.adapter = adapter_factory()
+
+    def get(self, name: str) -> BinlogFile | None:
+        return self.adapter.get(BinlogFile, {"name": name})
+
+    def save(self, binlog: BinlogFile) -> BinlogFile:
+        """Catalog an archived log, replacing an entry of the same name.
+
+        Names repeat after RESET MASTER, the newer log wins.
+        """
+        existing = self.get(binlog.name)
+        if existing is None:
+            return self.adapter.create(binlog)
+        for field, value in binlog.model_dump().items():
+            setattr(existing, field, value)
+        return self.adapter.update(existing)
+
+    def get_list(
+            self,
+            page: int | None = 1,
+            per_page: int | None = 25,
+    ) -> tuple[list[BinlogFile], int]:
+        """Newest logs first."""
+        return self.adapter.get_list(
+            BinlogFile,
+            None,
+            [QueryFilter(field="name", operator="eq", value="desc")],
+            page,
+            per_page,
+        )
+
+    def latest(self) -> BinlogFile | None:
+        items, _ = self.get_list(1, 1)
+        return items[0] if items else None
+
+    def since(self, name: str) -> list[BinlogFile]:
+        """The log called name and all newer ones, oldest first."""
+        table = BinlogFile.__table__
+        rows = self.adapter.execute(
+            select(BinlogFile).where(table.c.name >= name).order_by(table.c.name),
+        )
+        return [row[0] for row in rows]
+
+    def containing_gtid(self, gtid: str) -> BinlogFile | None:
+        """The log holding the transaction gtid.
+
+        Raises:
+            ValueError: If gtid is not a GTID
+        """
+        table = BinlogFile.__table__
+        rows = self.adapter.execute(
+            select(table.c.name, table.c.start_gtid, table.c.end_gtid).order_by(
+                table.c.name,
+            ),
+        )
+        for row in rows:
+            if gtid_state_contains(row.end_gtid, gtid) and not gtid_state_contains(
+                row.start_gtid,
+                gtid,
+            ):
+                return self.get(row.name)
+        return None
+
+    def ended_before(self, moment: datetime) -> list[tuple[str, str]]:
+        """Name and path of the logs whose last event is older than moment."""
+        table = BinlogFile.__table__
+        return self.adapter.execute(
+            select(table.c.name, table.c.path)
+            .where(table.c.last_event_time < moment.astimezone(UTC))
+            .order_by(table.c.name),
+        )
+
+    def delete_many(self, names: list[str]) -> int:
+        return self.adapter.delete_many(BinlogFile, "name", names)
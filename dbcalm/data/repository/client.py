@@ -2,6 +2,7 @@ import uuid
 
 from passlib.context import CryptContext
 
+from dbcalm.auth.credential_cache import revoke_client
 from dbcalm.data.adapter.adapter_factory import adapter_factory
 from dbcalm.data.model.client import Client
 
@@ -25,6 +26,7 @@ class ClientRepository:
         """
         client = self.get(client_id)
         if client:
+            revoke_client(client_id)
             client.label = label
             return self.adapter.update(client)
         return None
@@ -48,6 +50,7 @@ class ClientRepository:
         Returns:
             bool: True if client was deleted, False otherwise
         """
+        revoke_client(client_id)
         return self.adapter.delete(Client, {"id": client_id})
 
     def create(self, label: str) -> Client:
@@ -0,0 +1,59 @@
+from sqlalchemy import func, select
+
+from dbcalm.data.adapter.adapter_factory import adapter_factory
+from dbcalm.data.model.restore_test import RestoreTest
+from dbcalm.util.parse_query_with_operators import QueryFilter
+
+
+class RestoreTestRepository:
+    def __init__(self) -> None:
+        self.adapter = adapter_factory()
+
+    def create(self, restore_test: RestoreTest) -> RestoreTest:
+        return self.adapter.create(restore_test)
+
+    def get_list(
+            self,
+            page: int | None = 1,
+            per_page: int | None = 25,
+    ) -> tuple[list[RestoreTest], int]:
+        """Latest test restores first."""
+        return self.adapter.get_list(
+            RestoreTest,
+            None,
+            [QueryFilter(field="start_time", operator="eq", value="desc")],
+            page,
+            per_page,
+        )
+
+    def latest_for_schedule(self, schedule_id: int) -> RestoreTest | None:
+        """Return the most recently started test restore of a schedule."""
+        items, _ = self.adapter.get_list(
+            RestoreTest,
+            [QueryFilter(field="schedule_id", operator="eq", value=str(schedule_id))],
+            [QueryFilter(field="start_time", operator="eq", value="desc")],
+            1,
+            1,
+        )
+        return items[0] if items else None
+
+    def rto_by_chain_length(self) -> list[tuple]:
+        """Restore times of successful test restores per chain length.
+
+        Returns:
+            Rows of chain_length, runs, average_seconds and max_seconds,
+            shortest chains first
+        """
+        table = RestoreTest.__table__
+        statement = (
+            select(
+                table.c.chain_length,
+                func.count().label("runs"),
+                func.avg(table.c.restore_seconds).label("average_seconds"),
+                func.max(table.c.restore_seconds).label("max_seconds"),
+            )
+            .where(table.c.status == "success")
+            .group_by(table.c.chain_length)
+            .order_by(table.c.chain_length)
+        )
+        return self.adapter.execute(statement)
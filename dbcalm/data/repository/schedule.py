@@ -2,6 +2,7 @@ from datetime import UTC, datetime
 
 from dbcalm.data.adapter.adapter_factory import adapter_factory
 from dbcalm.data.model.schedule import Schedule
+from dbcalm.util.parse_query_with_operators import QueryFilter
 
 
 class ScheduleRepository:
@@ -16,6 +17,22 @@ class ScheduleRepository:
     def get(self, schedule_id: int) -> Schedule | None:
         return self.adapter.get(Schedule, {"id": str(schedule_id)})
 
+    def get_many(self, schedule_ids: set[int]) -> dict[int, Schedule]:
+        """Schedules by id in one query, missing ids are left out."""
+        if not schedule_ids:
+            return {}
+        query = QueryFilter(
+            field="id",
+            operator="in",
+            value=[str(schedule_id) for schedule_id in schedule_ids],
+        )
+        schedules, _ = self.get_list(
+            [query],
+            page=None,
+            per_page=None,
+        )
+        return {schedule.id: schedule for schedule in schedules}
+
     def get_list(
         self,
         query: list | None = None,
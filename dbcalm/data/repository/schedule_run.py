@@ -0,0 +1,30 @@
+from dbcalm.data.adapter.adapter_factory import adapter_factory
+from dbcalm.data.model.schedule_run import ScheduleRun
+from dbcalm.util.parse_query_with_operators import QueryFilter
+
+
+class ScheduleRunRepository:
+    def __init__(self) -> None:
+        self.adapter = adapter_factory()
+
+    def create(self, schedule_run: ScheduleRun) -> ScheduleRun:
+        return self.adapter.create(schedule_run)
+
+    def get_list(
+        self,
+        query: list | None = None,
+        order: list | None = None,
+        page: int | None = 1,
+        per_page: int | None = 25,
+    ) -> tuple[list[ScheduleRun], int]:
+        return self.adapter.get_list(ScheduleRun, query, order, page, per_page)
+
+    def latest(self, schedule_id: int) -> ScheduleRun | None:
+        items, _ = self.adapter.get_list(
+            ScheduleRun,
+            [QueryFilter(field="schedule_id", operator="eq", value=str(schedule_id))],
+            [QueryFilter(field="scheduled_time", operator="eq", value="desc")],
+            1,
+            1,
+        )
+        return items[0] if items else None
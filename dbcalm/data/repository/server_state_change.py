@@ -0,0 +1,29 @@
+from dbcalm.data.adapter.adapter_factory import adapter_factory
+from dbcalm.data.model.server_state_change import ServerStateChange, now
+from dbcalm.util.parse_query_with_operators import QueryFilter
+
+
+class ServerStateChangeRepository:
+    def __init__(self) -> None:
+        self.adapter = adapter_factory()
+
+    def create(self, change: ServerStateChange) -> ServerStateChange:
+        return self.adapter.create(change)
+
+    def recent(self, limit: int = 10) -> list[ServerStateChange]:
+        """Latest changes first."""
+        items, _ = self.adapter.get_list(
+            ServerStateChange,
+            None,
+            [QueryFilter(field="changed_at", operator="eq", value="desc")],
+            1,
+            limit,
+        )
+        return items
+
+    def checked(self) -> None:
+        """The latest state was confirmed just now."""
+        latest = self.recent(1)
+        if latest:
+            latest[0].checked_at = now()
+            self.adapter.update(latest[0])
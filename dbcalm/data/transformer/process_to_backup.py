@@ -34,4 +34,10 @@ def process_to_backup(process: Process) -> Backup:
         start_time=process.start_time,
         end_time=process.end_time,
         process_id=process.id,
+        storage_location=process.args.get("storage_location"),
+        include=process.args.get("include"),
+        exclude=process.args.get("exclude"),
+        engine=process.args.get("engine"),
+        snapshot=process.args.get("snapshot"),
+        lock_seconds=(process.metrics or {}).get("lock_seconds"),
     )
@@ -1,4 +1,4 @@
-
+from datetime import datetime
 
 from dbcalm.data.model.process import Process
 from dbcalm.data.model.restore import Restore
@@ -21,6 +21,8 @@ def process_to_restore(process: Process) -> Restore:
         if backup:
             backup_timestamp = backup.start_time
 
+    until_time = process.args.get("until_time")
+
     return Restore(
         start_time=process.start_time,
         end_time=process.end_time,
@@ -29,4 +31,7 @@ def process_to_restore(process: Process) -> Restore:
         backup_id=backup_id,
         backup_timestamp=backup_timestamp,
         process_id=process.id,
+        until_time=datetime.fromisoformat(until_time) if until_time else None,
+        until_gtid=process.args.get("until_gtid"),
+        tables=process.args.get("tables"),
     )
@@ -9,11 +9,21 @@ from dbcalm.data.adapter.adapter_factory import (
     adapter_factory as data_adapter_factory,
 )
 from dbcalm.data.data_types.enum_types import RestoreTarget
-from dbcalm.data.model.backup import Backup
+from dbcalm.data.model.backup_manifest import BackupManifest
 from dbcalm.data.model.process import Process
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.backup_manifest import BackupManifestRepository
 from dbcalm.data.transformer.process_to_backup import process_to_backup
 from dbcalm.data.transformer.process_to_restore import process_to_restore
+from dbcalm.logger.correlation import correlation
 from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.service.backup_verifier import ALGORITHM
+from dbcalm.service.backup_verifier_factory import backup_verifier_factory
+from dbcalm.storage.dedup_store_factory import dedup_store_factory
+from dbcalm.storage.storage_backend_factory import storage_backend_factory
+from dbcalm.util.checkpoint_dir import checkpoint_dir
+from dbcalm.util.folder_size import folder_size
+from dbcalm_mariadb_cmd_client.client import Client
 
 
 class ProcessQueueHandler:
@@ -28,34 +38,49 @@ class ProcessQueueHandler:
             process = self.queue.get(block=True) # type: Process
             self.queue.task_done()
 
-            if process.return_code != 0:
-                self.logger.error(
-                    "Process %d failed with return code %d",
-                    process.pid, process.return_code,
-                )
+            with correlation(process.command_id):
+                self.handle_process(process)
 
-                self.logger.error(process.error)
-                self.cleanup(process)
-                continue
+    def handle_process(self, process: Process) -> None:
+        if process.return_code != 0:
+            self.logger.error(
+                "Process %d failed with return code %d",
+                process.pid, process.return_code,
+            )
+
+            self.logger.error(process.error)
+            self.cleanup(process)
+            return
+
+        if process.type == "backup":
+            backup = process_to_backup(process)
+            if backup.storage_location is not None:
+                backup.size_bytes = self.stored_size(backup.storage_location)
+            else:
+                backup.size_bytes = self.backup_size(backup.id)
+            self.data_adapter.create(backup)
+            self.logger.debug("Backup %s created", backup.id)
+            # streamed backups were checked by the upload and are not local
+            if backup.storage_location is None:
+                # after the record, reading the whole backup back can take a
+                # while and incrementals must be able to find it meanwhile
+                self.create_manifest(backup.id)
+                self.store_in_repository(backup.id)
+        elif process.type == "restore":
+            restore = process_to_restore(process)
+            self.data_adapter.create(restore)
+            self.logger.debug("Restore %s created", restore.id)
 
-            if process.type == "backup":
-                backup = process_to_backup(process)
-                self.data_adapter.create(backup)
-                self.logger.debug("Backup %s created", backup.id)
-            elif process.type == "restore":
-                restore = process_to_restore(process)
-                self.data_adapter.create(restore)
-                self.logger.debug("Restore %s created", restore.id)
-
-                # Clean up tmp folder for database restores in background
-                if restore.target == RestoreTarget.DATABASE:
-                    threading.Thread(
-                        target=self.remove_tmp_restore_folder,
-                        args=(restore.target_path,),
-                        daemon=True,
-                    ).start()
-            elif process.type == "cleanup_backups":
-                self.process_cleanup_backups(process)
+            # Clean up tmp folder for database, table and schema restores
+            # in background, only folder restores are kept
+            if restore.target != RestoreTarget.FOLDER:
+                threading.Thread(
+                    target=self.remove_tmp_restore_folder,
+                    args=(restore.target_path,),
+                    daemon=True,
+                ).start()
+        elif process.type == "cleanup_backups":
+            self.process_cleanup_backups(process)
 
     def cleanup(self, process: Process) -> None:
 
@@ -68,11 +93,101 @@ class ProcessQueueHandler:
             # Handle partial failures - delete records for folders that were deleted
             self.process_cleanup_backups(process)
 
+    def backup_size(self, id: str) -> int | None:
+        backup_dir = self.config.value("backup_dir").rstrip("/")
+        try:
+            return folder_size(f"{backup_dir}/{id}")
+        except OSError:
+            self.logger.exception("Failed to determine size of backup %s", id)
+            return None
+
+    def stored_size(self, location: str) -> int | None:
+        try:
+            return storage_backend_factory().size(location)
+        except Exception:
+            self.logger.exception("Failed to determine size of %s", location)
+            return None
+
+    def create_manifest(self, id: str) -> None:
+        backup_dir = self.config.value("backup_dir").rstrip("/")
+        try:
+            files = backup_verifier_factory().manifest(f"{backup_dir}/{id}")
+            BackupManifestRepository().create(
+                BackupManifest(backup_id=id, algorithm=ALGORITHM, files=files),
+            )
+        except Exception:
+            self.logger.exception("Failed to create manifest of backup %s", id)
+        else:
+            self.logger.debug("Manifest of backup %s created", id)
+
+    def store_in_repository(self, id: str) -> None:
+        # after the manifest, which is made from the complete folder
+        store = dedup_store_factory()
+        folder = Path(f"{self.config.value('backup_dir').rstrip('/')}/{id}")
+        # streamed backups are a single archive, nothing to deduplicate
+        if store is None or not folder.is_dir():
+            return
+        try:
+            stats = store.add(id, folder)
+            store.trim(folder)
+        except Exception:
+            self.logger.exception(
+                "Failed to store backup %s in the repository, keeping the folder",
+                id,
+            )
+        else:
+            self.logger.info(
+                "Backup %s stored in the repository: %d bytes, %d bytes new",
+                id,
+                stats["size"],
+                stats["written"],
+            )
+
+    def delete_stored_backups(self, ids: list[str]) -> None:
+        # streamed backups have no folder, their uploads go with the records
+        try:
+            locations = BackupRepository().storage_locations(ids).values()
+            backend = storage_backend_factory() if locations else None
+        except Exception:
+            self.logger.exception("Failed to look up stored backups")
+            return
+        for location in locations:
+            try:
+                backend.delete(location)
+            except Exception:
+                self.logger.exception("Failed to delete stored backup %s", location)
+            else:
+                self.logger.debug("Deleted stored backup %s", location)
+
+    def collect_repository(self) -> None:
+        # the repository belongs to the database user, so its gc runs in the
+        # mariadb command service
+        if self.config.value("repository_format", "directory") != "dedup":
+            return
+        try:
+            Client().command("gc_repository", {})
+        except Exception:
+            self.logger.exception("Failed to start repository gc")
+
+    def drop_snapshots(self, snapshots: list[str]) -> None:
+        # volume snapshots kept as backups are removed by the mariadb command
+        # service, which took them
+        if not snapshots:
+            return
+        try:
+            Client().command("drop_snapshots", {"snapshots": snapshots})
+        except Exception:
+            self.logger.exception("Failed to drop %d snapshots", len(snapshots))
+
     def remove_backup_folder(self, id: str) -> None:
         # do cleanup of backup folder in case it was created but not completed
         backup_dir = self.config.value("backup_dir").rstrip("/")
-        backup_path = Path(f"{backup_dir}/{id}")
-        if backup_path.exists():
+        for backup_path in (
+            Path(f"{backup_dir}/{id}"),
+            Path(checkpoint_dir(backup_dir, id)),
+        ):
+            if not backup_path.exists():
+                continue
             try:
                 shutil.rmtree(backup_path)
                 self.logger.debug(
@@ -106,7 +221,8 @@ class ProcessQueueHandler:
 
         After the command service deletes backup folders, this method:
         - Checks which folders were actually deleted
-        - Deletes the corresponding backup records from the database
+        - Deletes the corresponding backup records from the database in one
+          batched transaction
         - Only deletes records if the folder no longer exists
 
         This follows the same pattern for both success and failure:
@@ -124,30 +240,34 @@ class ProcessQueueHandler:
             return
 
         backup_dir = self.config.value("backup_dir").rstrip("/")
-        records_deleted = 0
-
+        deleted_ids = []
         for backup_id in backup_ids:
             folder_path = Path(f"{backup_dir}/{backup_id}")
 
             # Only delete the record if the folder no longer exists
-            if not folder_path.exists():
-                try:
-                    self.data_adapter.delete(Backup, {"id": backup_id})
-                    records_deleted += 1
-                    self.logger.debug(
-                        "Deleted backup record %s (folder no longer exists)",
-                        backup_id,
-                    )
-                except Exception:
-                    self.logger.exception(
-                        "Failed to delete backup record %s from database",
-                        backup_id,
-                    )
-            else:
+            if folder_path.exists():
                 self.logger.warning(
                     "Backup folder %s still exists, keeping record",
                     folder_path,
                 )
+            else:
+                deleted_ids.append(backup_id)
+
+        records_deleted = 0
+        if deleted_ids:
+            self.delete_stored_backups(deleted_ids)
+            try:
+                snapshots = BackupRepository().kept_snapshots(deleted_ids)
+                records_deleted = BackupRepository().delete_many(deleted_ids)
+                BackupManifestRepository().delete_many(deleted_ids)
+            except Exception:
+                self.logger.exception(
+                    "Failed to delete %d backup records from database",
+                    len(deleted_ids),
+                )
+            else:
+                self.collect_repository()
+                self.drop_snapshots(snapshots)
 
         self.logger.info(
             "Cleanup complete: deleted %d backup records out of %d",
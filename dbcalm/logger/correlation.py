@@ -0,0 +1,31 @@
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Id of the command (process command_id) the current thread is working on
+correlation_id: ContextVar[str | None] = ContextVar("correlation_id", default=None)
+
+
+@contextmanager
+def correlation(id: str | None) -> Iterator[None]:
+    """Tag every log record emitted inside the block with the given id."""
+    token = correlation_id.set(id)
+    try:
+        yield
+    finally:
+        correlation_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Copy the current correlation id onto the record.
+
+    Has to run in the thread that emits the record, before it is handed to
+    another thread for writing.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = correlation_id.get()
+        if current is not None:
+            record.correlation_id = current
+        return True
@@ -1,4 +1,5 @@
 import logging
+import logging.handlers
 from pathlib import Path
 
 from dbcalm.config.config_factory import config_factory
@@ -26,8 +27,8 @@ class FileLogger:
         if not log_file_path.exists():
             log_file_path.touch()
 
-        # Create file handler
-        file_handler = logging.FileHandler(log_file)
+        # Create file handler, reopened once logrotate moved the file
+        file_handler = logging.handlers.WatchedFileHandler(log_file)
 
         # Determine log level
         log_level = logging.DEBUG
@@ -3,13 +3,17 @@ import logging
 from dbcalm.config.config_factory import config_factory
 from dbcalm.errors.validation_error import ValidationError
 from dbcalm.logger.file_logger import FileLogger
+from dbcalm.logger.queue_logger import QueueLogger
 
 
 def logger_factory() -> logging.Logger:
     config = config_factory()
+    log = config.value("log")
 
-    if config.value("log") is None or config.value("log")  == "file":
+    if log is None or log == "file":
         return FileLogger().get_logger()
+    if log == "queue":
+        return QueueLogger().get_logger()
 
     msg = "Unknown logger type"
     raise ValidationError(msg)
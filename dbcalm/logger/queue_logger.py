@@ -0,0 +1,239 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from functools import cache
+from pathlib import Path
+
+from dbcalm.config.config_factory import config_factory
+from dbcalm.logger.correlation import CorrelationFilter
+from dbcalm.logger.json_formatter import JsonFormatter
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BACKUP_COUNT = 5
+LOG_FORMATS = ["text", "json"]
+
+# Directory holding the top level packages, used to turn file paths of log
+# calls into dotted module names
+SOURCE_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+@cache
+def module_path(pathname: str) -> str:
+    """Dotted module name for a source file, e.g. dbcalm_cmd.process.runner."""
+    try:
+        relative = Path(pathname).resolve().relative_to(SOURCE_ROOT)
+    except ValueError:
+        return Path(pathname).stem
+    return ".".join(relative.with_suffix("").parts)
+
+
+def service_name(project_name: str) -> str:
+    """Name of the running program, e.g. dbcalm-cmd, or dbcalm-server for a
+    dbcalm subcommand.
+    """
+    program = Path(sys.argv[0]).stem
+    if program != project_name:
+        return program or project_name
+    command = next((arg for arg in sys.argv[1:] if not arg.startswith("-")), None)
+    return f"{program}-{command}" if command else program
+
+
+def parse_level(level: str) -> int:
+    try:
+        return logging.getLevelNamesMapping()[str(level).upper()]
+    except KeyError:
+        msg = f"Invalid log level: {level}"
+        raise SystemExit(msg) from KeyError
+
+
+class ModuleLevelFilter(logging.Filter):
+    """Apply per module log levels, the longest matching prefix wins.
+
+    Modules without a configured level use the default level.
+    """
+
+    def __init__(self, default_level: int, levels: dict[str, int]) -> None:
+        super().__init__()
+        self.default_level = default_level
+        # longest prefixes first so the most specific entry matches
+        self.levels = sorted(levels.items(), key=lambda item: -len(item[0]))
+
+    @cache  # noqa: B019 - one filter per process, bounded by module count
+    def level_for(self, module: str) -> int:
+        for prefix, level in self.levels:
+            if module == prefix or module.startswith(prefix + "."):
+                return level
+        return self.default_level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.module_path = module_path(record.pathname)
+        return record.levelno >= self.level_for(record.module_path)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller.
+
+    Records are dropped when the bounded queue is full. The number of
+    dropped records is logged as a warning once the queue has room again.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge args and render the traceback here, the record is written by
+        # another thread, but keep the exception separate from the message
+        # so the JSON formatter can put it in its own field
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped:
+            with self._dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped and not self._put(self._dropped_record(record, dropped)):
+                self._count_dropped(dropped)
+        if not self._put(record):
+            self._count_dropped(1)
+
+    def _put(self, record: logging.LogRecord) -> bool:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            return False
+        return True
+
+    def _count_dropped(self, count: int) -> None:
+        with self._dropped_lock:
+            self.dropped += count
+
+    def _dropped_record(
+        self,
+        record: logging.LogRecord,
+        dropped: int,
+    ) -> logging.LogRecord:
+        warning = copy.copy(record)
+        warning.levelno = logging.WARNING
+        warning.levelname = "WARNING"
+        warning.msg = warning.message = (
+            f"Log queue full, dropped {dropped} log records"
+        )
+        warning.exc_text = None
+        return warning
+
+
+class QueueLogger:
+    """Logger whose records are written to file by a background thread.
+
+    Log calls only put the record on a bounded queue, a QueueListener
+    thread does the file I/O, so slow disks never stall requests or runner
+    threads. Supports text or JSON lines (`log_format`), correlation ids
+    and per module levels (`log_levels`).
+
+    Every service appends to the shared log file and logrotate rotates it,
+    the file is reopened once it was moved. Rotating in process isn't safe
+    with several processes writing one file, with `log_max_bytes` or
+    `log_rotate_when` set each service rotates a log file of its own.
+    """
+
+    _listener: logging.handlers.QueueListener | None = None
+
+    def __init__(self) -> None:
+        self.config = config_factory()
+        self.logger = logging.getLogger(self.config.PROJECT_NAME)
+
+        if self.logger.handlers:
+            return
+
+        default_level = parse_level(self.config.value("log_level", "debug"))
+        levels = {
+            module: parse_level(level)
+            for module, level in (self.config.value("log_levels") or {}).items()
+        }
+        # the logger lets everything through that any module may log, the
+        # handler's filter applies the per module levels
+        self.logger.setLevel(min([default_level, *levels.values()]))
+        self.logger.propagate = False
+
+        log_queue = queue.Queue(
+            int(self.config.value("log_queue_size", DEFAULT_QUEUE_SIZE)),
+        )
+        queue_handler = DroppingQueueHandler(log_queue)
+        queue_handler.addFilter(ModuleLevelFilter(default_level, levels))
+        queue_handler.addFilter(CorrelationFilter())
+
+        QueueLogger._listener = logging.handlers.QueueListener(
+            log_queue,
+            self.file_handler(),
+        )
+        QueueLogger._listener.start()
+        atexit.register(QueueLogger.stop)
+
+        self.logger.addHandler(queue_handler)
+
+    @classmethod
+    def stop(cls) -> None:
+        """Write out queued records and stop the writer thread."""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
+    def file_handler(self) -> logging.Handler:
+        project = self.config.PROJECT_NAME
+        rotate_when = self.config.value("log_rotate_when")
+        max_bytes = self.config.value("log_max_bytes")
+        rotating = rotate_when is not None or max_bytes is not None
+        name = service_name(project) if rotating else project
+        log_file = self.config.value("log_file", f"/var/log/{project}/{name}.log")
+        Path(log_file).touch(exist_ok=True)
+
+        backup_count = int(
+            self.config.value("log_backup_count", DEFAULT_BACKUP_COUNT),
+        )
+        if rotate_when is not None:
+            handler = logging.handlers.TimedRotatingFileHandler(
+                log_file,
+                when=rotate_when,
+                backupCount=backup_count,
+                utc=True,
+            )
+        elif max_bytes is not None:
+            handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=int(max_bytes),
+                backupCount=backup_count,
+            )
+        else:
+            handler = logging.handlers.WatchedFileHandler(log_file)
+
+        log_format = self.config.value("log_format", "text")
+        if log_format not in LOG_FORMATS:
+            msg = f"Invalid log format: {log_format}"
+            raise SystemExit(msg)
+        if log_format == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(
+                logging.Formatter(
+                    "{asctime} - {levelname} - [{correlation_id}] {message}",
+                    style="{",
+                    defaults={"correlation_id": "-"},
+                ),
+            )
+        return handler
+
+    def get_logger(self) -> logging.Logger:
+        """Returns the configured logger instance."""
+        return self.logger
@@ -32,7 +32,7 @@ router = APIRouter()
         },
     },
 )
-async def authorize(
+def authorize(
     user_login: Annotated[
         UserLogin,
         Body(
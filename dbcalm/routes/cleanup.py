@@ -0,0 +1,147 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from dbcalm.api.model.response.cleanup_preview_response import (
+    CleanupPreviewBackup,
+    CleanupPreviewResponse,
+    KeptBackup,
+)
+from dbcalm.api.model.response.list_response import PaginationInfo
+from dbcalm.api.model.response.status_response import StatusResponse
+from dbcalm.auth.verify_token import verify_token
+from dbcalm.service.cleanup_trigger import CleanupTrigger
+from dbcalm.service.retention_planner import RetentionPlanner
+from dbcalm.util.process_status_response import process_status_response
+
+HTTP_ACCEPTED = 202
+
+router = APIRouter()
+
+
+@router.post(
+    "/cleanup",
+    status_code=202,
+    responses={
+        200: {
+            "description": "No backups have passed their retention period",
+            "content": {
+                "application/json": {
+                    "example": {"status": "nothing to clean up"},
+                },
+            },
+        },
+        202: {
+            "description": "Cleanup accepted and started - processing in background",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "status": "Accepted",
+                        "link": "/status/0b7c9a6e-3f0e-4a57-9d8e-1c2f3a4b5c6d",
+                        "pid": "0b7c9a6e-3f0e-4a57-9d8e-1c2f3a4b5c6d",
+                    },
+                },
+            },
+        },
+    },
+)
+async def cleanup(
+    response: Response,
+    _: Annotated[dict, Depends(verify_token)],
+) -> StatusResponse:
+    """
+    Delete backups that have passed their schedule's retention period.
+
+    **This is an asynchronous operation** - returns 202 Accepted immediately
+    and the folders are deleted in the background, rate limited so the
+    database sharing the disk isn't starved of I/O. Use the returned `link`
+    to poll for completion status.
+
+    Manual backups and schedules without retention are never cleaned up, and
+    a backup that a kept incremental depends on is always kept.
+    """
+    _, process = await CleanupTrigger().submit_async()
+    if process is None:
+        response.status_code = 200
+        return StatusResponse(status="nothing to clean up")
+
+    if process["code"] != HTTP_ACCEPTED:
+        raise HTTPException(status_code=process["code"], detail=process["status"])
+
+    return process_status_response(process, response)
+
+
+@router.get(
+    "/cleanup/preview",
+    responses={
+        200: {
+            "description": "Backups a cleanup run would delete",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "expired": [
+                            {
+                                "id": "2024-09-01-03-00-00",
+                                "from_backup_id": None,
+                                "schedule_id": 1,
+                                "start_time": "2024-09-01T03:00:00Z",
+                                "size_bytes": 1073741824,
+                            },
+                        ],
+                        "pagination": {
+                            "total": 1,
+                            "page": 1,
+                            "per_page": 25,
+                            "total_pages": 1,
+                        },
+                        "kept_for_dependents": [
+                            {
+                                "id": "2024-09-08-03-00-00",
+                                "from_backup_id": None,
+                                "schedule_id": 1,
+                                "start_time": "2024-09-08T03:00:00Z",
+                                "size_bytes": 1073741824,
+                                "required_by": ["2024-09-09-03-00-00"],
+                            },
+                        ],
+                        "bytes_reclaimed": 1073741824,
+                        "unknown_size_count": 0,
+                    },
+                },
+            },
+        },
+    },
+)
+def cleanup_preview(
+    _: Annotated[dict, Depends(verify_token)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    per_page: Annotated[int, Query(ge=1, le=1000)] = 25,
+) -> CleanupPreviewResponse:
+    """
+    Show what a cleanup run would delete, without deleting anything.
+
+    Evaluates every schedule's retention rules against all backups. The
+    expired backups are paginated, `bytes_reclaimed` covers all of them but
+    only counts backups with a recorded size, `unknown_size_count` tells how
+    many were left out. Backups past retention that kept incrementals still
+    depend on are listed under `kept_for_dependents`.
+    """
+    plan = RetentionPlanner().current_plan(page=page, per_page=per_page)
+    return CleanupPreviewResponse(
+        expired=[CleanupPreviewBackup.model_validate(row) for row in plan.expired],
+        pagination=PaginationInfo(
+            total=plan.expired_count,
+            page=page,
+            per_page=per_page,
+            total_pages=(plan.expired_count + per_page - 1) // per_page,
+        ),
+        kept_for_dependents=[
+            KeptBackup(
+                **CleanupPreviewBackup.model_validate(row).model_dump(),
+                required_by=required_by,
+            )
+            for row, required_by in plan.kept_for_dependents.values()
+        ],
+        bytes_reclaimed=plan.bytes_reclaimed,
+        unknown_size_count=plan.unknown_size_count,
+    )
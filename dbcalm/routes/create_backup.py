@@ -1,4 +1,3 @@
-from datetime import UTC, datetime
 from typing import Annotated
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Response
@@ -6,10 +5,10 @@ from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from dbcalm.api.model.request.backup_request import BackupRequest
 from dbcalm.api.model.response.status_response import StatusResponse
 from dbcalm.auth.verify_token import verify_token
-from dbcalm.data.repository.backup import BackupRepository
-from dbcalm.util.kebab import kebab_case
+from dbcalm.service.backup_trigger import BackupTrigger
 from dbcalm.util.process_status_response import process_status_response
-from dbcalm_mariadb_cmd_client.client import Client
+
+HTTP_NOT_FOUND = 404
 
 router = APIRouter()
 
@@ -109,6 +108,17 @@ async def create_backup(
                         "from_backup_id": "2024-10-17-03-00-00",
                     },
                 },
+                "partial_backup": {
+                    "summary": "Partial backup",
+                    "description": (
+                        "Back up the shop schema without its cache table"
+                    ),
+                    "value": {
+                        "type": "full",
+                        "include": ["shop"],
+                        "exclude": ["shop.cache"],
+                    },
+                },
             },
         ),
     ],
@@ -131,6 +141,28 @@ async def create_backup(
     - Valid credentials file must exist
     - For incremental backups: at least one previous backup must exist
 
+    **Partial backups:**
+    - `include` limits the backup to schemas or tables, `exclude` leaves
+      some out: `schema` or `schema.table`, `*` matches any part of a name
+    - Backups of a schedule take its `include` and `exclude` by default
+    - Incrementals build on a backup with the same scope, the latest one
+      if `from_backup_id` is not specified
+    - Partial backups restore to a folder or by table and schema only
+
+    **Logical backups** (`engine` `logical`):
+    - Tables are dumped as compressed SQL by parallel sessions sharing one
+      consistent snapshot, for moving data between server versions
+    - Always full backups, restored by loading them into a running server
+
+    **Snapshot backups** (`engine` `snapshot`):
+    - Commits are blocked only while an LVM, ZFS or btrfs snapshot of the
+      data directory's volume is taken, the files are then copied from it
+      while the server takes writes
+    - With `snapshot_keep` the snapshot itself is kept as the backup and
+      dropped by retention with it
+    - Always full backups of the whole instance, the lock time is reported
+      as `lock_seconds`
+
     **Backup ID:**
     - Auto-generated timestamp format: YYYY-MM-DD-HH-MM-SS
     - Or provide custom ID (converted to kebab-case)
@@ -140,33 +172,17 @@ async def create_backup(
     - Includes `link` field pointing to `/status/{pid}` for progress tracking
     - Includes `resource_id` (the backup ID)
     """
-    client = Client()
-
-    if request.id is None:
-        id = datetime.now(tz=UTC).strftime("%Y-%m-%d-%H-%M-%S")
-    else:
-        id = kebab_case(request.id)
-
-    from_backup_id = request.from_backup_id
-    if request.type == "incremental" and from_backup_id is None:
-
-        latest_backup = BackupRepository().latest_backup()
-        if not latest_backup:
-           raise HTTPException(
-            status_code=404,
-            detail="No backups found to create incremental backup from",
-        )
-        from_backup_id = latest_backup.id
-
-    args = {"id": id}
-    if request.schedule_id is not None:
-        args["schedule_id"] = request.schedule_id
-
-    if from_backup_id is not None:
-        args["from_backup_id"] = from_backup_id
-        process = client.command("incremental_backup", args)
-    else:
-        process = client.command("full_backup", args)
+    id, process = await BackupTrigger().submit_async(
+        request.type,
+        id=request.id,
+        from_backup_id=request.from_backup_id,
+        schedule_id=request.schedule_id,
+        include=request.include,
+        exclude=request.exclude,
+        engine=request.engine,
+    )
+    if process["code"] == HTTP_NOT_FOUND:
+        raise HTTPException(status_code=404, detail=process["status"])
 
     return process_status_response(process, response, resource_id=id)
 
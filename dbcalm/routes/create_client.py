@@ -31,7 +31,7 @@ class CreateClientRequest(BaseModel):
         },
     },
 )
-async def create_client(
+def create_client(
     request: Annotated[
         CreateClientRequest,
         Body(
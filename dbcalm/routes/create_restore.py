@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Annotated
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Response
@@ -5,22 +6,55 @@ from pydantic import BaseModel, Field
 
 from dbcalm.api.model.response.status_response import StatusResponse
 from dbcalm.auth.verify_token import verify_token
-from dbcalm.data.data_types.enum_types import RestoreTarget
+from dbcalm.data.data_types.enum_types import BackupEngine, RestoreTarget
+from dbcalm.data.model.backup import Backup
 from dbcalm.data.repository.backup import BackupRepository
 from dbcalm.errors.not_found_error import NotFoundError
+from dbcalm.errors.validation_error import ValidationError
+from dbcalm.service.recovery_planner import RecoveryPlanner
+from dbcalm.util.backup_scope import BackupScope
 from dbcalm.util.process_status_response import process_status_response
+from dbcalm.util.table_names import parse_table_name
 from dbcalm_mariadb_cmd_client.client import Client
 
 
 class RestoreRequest(BaseModel):
     """Request to restore a backup."""
 
-    id: str = Field(..., description="ID of the backup to restore")
+    id: str | None = Field(
+        None,
+        description=(
+            "ID of the backup to restore, for a restore to a point in time "
+            "the newest backup before the target is used when left out"
+        ),
+    )
     target: RestoreTarget = Field(
         ...,
         description=(
-            "Restore target: 'database' (to MySQL data dir) or "
-            "'folder' (to custom folder for inspection)"
+            "Restore target: 'database' (to MySQL data dir), "
+            "'folder' (to custom folder for inspection), 'table' or "
+            "'schema' (imported into the running server)"
+        ),
+    )
+    tables: list[str] | None = Field(
+        None,
+        description=(
+            "What a 'table' or 'schema' restore imports: schema.table "
+            "names for 'table', schema names for 'schema'"
+        ),
+    )
+    until_time: datetime | None = Field(
+        None,
+        description=(
+            "Roll the backup forward to this moment by replaying archived "
+            "binary logs (UTC unless an offset is given)"
+        ),
+    )
+    until_gtid: str | None = Field(
+        None,
+        description=(
+            "Roll the backup forward up to and including this transaction, "
+            "e.g. 0-1-1234 (MariaDB) or <source uuid>:1234 (MySQL)"
         ),
     )
 
@@ -51,6 +85,23 @@ router = APIRouter()
                 },
             },
         },
+        422: {
+            "description": (
+                "Point in time not covered by archived binary logs, or "
+                "invalid tables for a table or schema restore"
+            ),
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": (
+                            "Archived binary logs reach 2024-10-17 14:00:12, "
+                            "not 2024-10-17 14:32:00+00:00. Run FLUSH BINARY "
+                            "LOGS to archive the current log."
+                        ),
+                    },
+                },
+            },
+        },
         503: {
             "description": "Service unavailable - server configuration issue",
             "content": {
@@ -90,7 +141,7 @@ router = APIRouter()
         },
     },
 )
-async def create_restore(
+def create_restore(
     request: Annotated[
         RestoreRequest,
         Body(
@@ -105,6 +156,28 @@ async def create_restore(
                         "target": "database",
                     },
                 },
+                "restore_to_point_in_time": {
+                    "summary": "Restore to a point in time",
+                    "description": (
+                        "Restore the newest backup before the given moment "
+                        "and replay archived binary logs up to it"
+                    ),
+                    "value": {
+                        "target": "database",
+                        "until_time": "2024-10-17T14:32:00Z",
+                    },
+                },
+                "restore_table": {
+                    "summary": "Restore single tables",
+                    "description": (
+                        "Import tables from a backup into the running server"
+                    ),
+                    "value": {
+                        "id": "2024-10-17-03-00-00",
+                        "target": "table",
+                        "tables": ["shop.orders", "shop.order_items"],
+                    },
+                },
                 "restore_to_folder": {
                     "summary": "Restore to folder for inspection",
                     "description": (
@@ -140,27 +213,156 @@ async def create_restore(
     **For folder restore:**
     - No special requirements, data is restored to a temporary inspection folder
 
+    **Restore to a point in time** (`until_time` or `until_gtid`):
+    - Needs archived binary logs (`binlog_archive: true`) reaching the target
+    - Without `id` the newest backup that finished before the target is used
+    - The backup is prepared, rolled forward by replaying the binary logs
+      into a throwaway server and then copied back or left in the folder
+    - The status `output` reports replay progress while it runs
+
+    **Table and schema restore** (`target` `table` or `schema`):
+    - The server keeps running, only the listed tables (or every table of
+      the listed schemas) are replaced
+    - Only their files are taken from the backup, prepared with `--export`
+      and swapped in with `ALTER TABLE ... DISCARD/IMPORT TABLESPACE`
+    - Tables must exist with the definition they had at backup time and be
+      file-per-table InnoDB tables, partitioned tables are not supported
+    - The backup user needs the ALTER privilege on them
+
+    **Partial backups** (taken with `include` or `exclude`):
+    - Restore to a folder, or by table and schema for tables they hold
+    - They can't replace the data directory or roll forward to a point in
+      time, a point in time restore picks the newest whole backup
+
+    **Logical backups** (taken with `engine` `logical`):
+    - Loaded into the running server by parallel sessions: `database`
+      loads every dumped table, `table` and `schema` the listed ones
+    - Dumped tables are dropped and created again, other tables are kept
+    - `folder` leaves the dump files in a folder
+    - They can't roll forward to a point in time
+
+    **Snapshot backups** (taken with `engine` `snapshot`):
+    - `database` copies the data files back, with the server stopped and
+      an empty data directory, the server recovers them on startup
+    - `folder` copies them into a folder
+    - They can't be restored by table or schema or to a point in time
+
     **Response:**
     - Returns immediately with 202 Accepted
     - Includes `link` field pointing to `/status/{pid}` for progress tracking
     - Includes `resource_id` (the backup ID being restored)
     """
-    backup = BackupRepository().get(request.id)
-    if backup is None:
-        msg = f"Backup with id {request.id} not found"
-        raise HTTPException(status_code=404, detail=msg)
+    args = {"target": request.target}
+    tables = partial_tables(request)
+    if tables is not None:
+        args["tables"] = tables
+    if request.until_time is not None or request.until_gtid is not None:
+        try:
+            backups = RecoveryPlanner().plan(
+                request.until_time,
+                request.until_gtid,
+                request.id,
+            )
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=str(e)) from e
+        if request.until_time is not None:
+            args["until_time"] = request.until_time.isoformat()
+        if request.until_gtid is not None:
+            args["until_gtid"] = request.until_gtid
+    else:
+        if request.id is None:
+            raise HTTPException(
+                status_code=422,
+                detail="id is required unless until_time or until_gtid is given",
+            )
+        backup = BackupRepository().get(request.id)
+        if backup is None:
+            msg = f"Backup with id {request.id} not found"
+            raise HTTPException(status_code=404, detail=msg)
 
-    # Get all backups needed to restore from the base backup to the current one
-    # will return current id only if not an incremental backup
-    try:
-        backups = BackupRepository().required_backups(backup)
-    except NotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e)) from e
+        # Get all backups needed to restore from the base backup to the
+        # current one, will return current id only if not an incremental
+        try:
+            backups = BackupRepository().required_backups(backup)
+        except NotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        check_scope(backup, request.target, tables)
 
     client = Client()
     process = client.command(
         "restore_backup",
-        {"id_list": backups, "target": request.target},
+        {"id_list": backups, **args},
     )
 
-    return process_status_response(process, response, resource_id=request.id)
+    return process_status_response(process, response, resource_id=backups[-1])
+
+
+def partial_tables(request: RestoreRequest) -> list[str] | None:
+    """Checked table or schema names of a table or schema restore."""
+    if request.target not in (RestoreTarget.TABLE, RestoreTarget.SCHEMA):
+        if request.tables is not None:
+            raise HTTPException(
+                status_code=422,
+                detail="tables is only used by table and schema restores",
+            )
+        return None
+    if request.until_time is not None or request.until_gtid is not None:
+        raise HTTPException(
+            status_code=422,
+            detail="Table and schema restores can't roll forward to a point in time",
+        )
+    if not request.tables:
+        raise HTTPException(
+            status_code=422,
+            detail=f"tables is required for a {request.target.value} restore",
+        )
+    try:
+        for name in request.tables:
+            parse_table_name(
+                name,
+                schema_only=request.target == RestoreTarget.SCHEMA,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return [name.strip() for name in request.tables]
+
+
+def check_scope(
+    backup: Backup,
+    target: RestoreTarget,
+    tables: list[str] | None,
+) -> None:
+    """Refuse restores a partial backup doesn't hold the tables for.
+
+    Incrementals have the scope of their full backup, the restored backup
+    speaks for the whole chain.
+    """
+    scope = BackupScope(backup.include, backup.exclude)
+    if not scope.partial:
+        return
+    # logical backups load their tables without replacing the others
+    if target == RestoreTarget.DATABASE and backup.engine != BackupEngine.LOGICAL:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Backup {backup.id} is a partial backup of {scope.describe()}, "
+                "restore it to a folder or by table or schema"
+            ),
+        )
+    missing = [
+        name for name in tables or []
+        if not scope.covers(*parse_table_name(
+            name,
+            schema_only=target == RestoreTarget.SCHEMA,
+        ))
+    ]
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Backup {backup.id} only holds {scope.describe()}, not "
+                + ", ".join(missing)
+            ),
+        )
@@ -5,8 +5,10 @@ from fastapi import APIRouter, Body, Depends, HTTPException
 from dbcalm.api.model.request.schedule_request import ScheduleRequest
 from dbcalm.api.model.response.schedule_response import ScheduleResponse
 from dbcalm.auth.verify_token import verify_token
+from dbcalm.data.data_types.enum_types import BackupEngine
 from dbcalm.data.model.schedule import Schedule
 from dbcalm.data.repository.schedule import ScheduleRepository
+from dbcalm.util.backup_scope import BackupScope
 from dbcalm_cmd_client.client import Client
 
 # HTTP status code for accepted async operations
@@ -33,6 +35,9 @@ router = APIRouter()
                         "interval_value": None,
                         "interval_unit": None,
                         "enabled": True,
+                        "include": None,
+                        "exclude": None,
+                        "engine": None,
                         "created_at": "2024-10-18T10:30:00",
                         "updated_at": "2024-10-18T10:30:00",
                     },
@@ -41,7 +46,7 @@ router = APIRouter()
         },
     },
 )
-async def create_schedule(
+def create_schedule(
     request: Annotated[
         ScheduleRequest,
         Body(
@@ -94,6 +99,24 @@ async def create_schedule(
                         "enabled": True,
                     },
                 },
+                "partial_backup": {
+                    "summary": "Critical schemas every 5 minutes",
+                    "description": (
+                        "Schedule incremental backups of the shop and crm "
+                        "schemas every 5 minutes, without the cache table. "
+                        "Their chain needs a full schedule with the same "
+                        "include and exclude"
+                    ),
+                    "value": {
+                        "backup_type": "incremental",
+                        "frequency": "interval",
+                        "interval_value": 5,
+                        "interval_unit": "minutes",
+                        "include": ["shop", "crm"],
+                        "exclude": ["shop.cache"],
+                        "enabled": True,
+                    },
+                },
             },
         ),
     ],
@@ -114,13 +137,21 @@ async def create_schedule(
             page=None,
             per_page=None,
         )[0]
+        # the chain of an incremental needs full backups of the same tables
+        scope = BackupScope(request.include, request.exclude)
+        full_schedules = [
+            full for full in full_schedules
+            if BackupScope(full.include, full.exclude) == scope
+            and full.engine in (None, BackupEngine.PHYSICAL)
+        ]
 
         if not full_schedules:
             raise HTTPException(
                 status_code=400,
                 detail=(
                     "Cannot create incremental backup schedule without at least "
-                    "one enabled full backup schedule"
+                    "one enabled full backup schedule with the same include "
+                    "and exclude"
                 ),
             )
 
@@ -136,6 +167,9 @@ async def create_schedule(
         retention_value=request.retention_value,
         retention_unit=request.retention_unit,
         enabled=request.enabled,
+        include=request.include,
+        exclude=request.exclude,
+        engine=request.engine,
     )
 
     created_schedule = schedule_repo.create(schedule)
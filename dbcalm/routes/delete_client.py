@@ -16,7 +16,7 @@ router = APIRouter()
         },
     },
 )
-async def delete_client(
+def delete_client(
     _: Annotated[dict, Depends(verify_token)],
     client_id: str | None = None,
 ) -> None:
@@ -28,7 +28,7 @@ router = APIRouter()
         },
     },
 )
-async def delete_schedule(
+def delete_schedule(
     schedule_id: int,
     _: Annotated[dict, Depends(verify_token)],
 ) -> DeleteResponse:
@@ -28,7 +28,7 @@ router = APIRouter()
         },
     },
 )
-async def get_backup(
+def get_backup(
     backup_id: str,
     _: Annotated[dict, Depends(verify_token)],
 ) -> BackupResponse:
@@ -35,7 +35,7 @@ router = APIRouter()
         },
     },
 )
-async def get_schedule(
+def get_schedule(
     schedule_id: int,
     _: Annotated[dict, Depends(verify_token)],
 ) -> ScheduleResponse:
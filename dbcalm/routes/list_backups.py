@@ -53,7 +53,7 @@ router = APIRouter()
         },
     },
 )
-async def list_backups(
+def list_backups(
     _: Annotated[dict, Depends(verify_token)],
     query: Annotated[
         str | None,
@@ -137,18 +137,19 @@ async def list_backups(
         per_page=per_page,
     )
 
-    # Fetch schedule data for backups that have a schedule
-    schedule_repository = ScheduleRepository()
+    # Fetch schedule data for backups that have a schedule, in one query
+    schedules = ScheduleRepository().get_many(
+        {item.schedule_id for item in items if item.schedule_id},
+    )
     backup_responses = []
     for item in items:
         backup_data = item.model_dump()
 
         # Add retention info from schedule if available
-        if item.schedule_id:
-            schedule = schedule_repository.get(item.schedule_id)
-            if schedule:
-                backup_data["retention_value"] = schedule.retention_value
-                backup_data["retention_unit"] = schedule.retention_unit
+        schedule = schedules.get(item.schedule_id)
+        if schedule:
+            backup_data["retention_value"] = schedule.retention_value
+            backup_data["retention_unit"] = schedule.retention_unit
 
         backup_responses.append(BackupResponse(**backup_data))
 
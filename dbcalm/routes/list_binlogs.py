@@ -0,0 +1,68 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from dbcalm.api.model.response.binlog_response import (
+    BinlogListResponse,
+    BinlogResponse,
+)
+from dbcalm.api.model.response.list_response import PaginationInfo
+from dbcalm.auth.verify_token import verify_token
+from dbcalm.data.repository.binlog_file import BinlogFileRepository
+
+router = APIRouter()
+
+
+@router.get(
+    "/binlogs",
+    responses={
+        200: {
+            "description": "List of archived binary logs, newest first",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [
+                            {
+                                "name": "mariadb-bin.000042",
+                                "size_bytes": 18351204,
+                                "first_event_time": "2024-10-18T04:12:09Z",
+                                "last_event_time": "2024-10-18T05:40:51Z",
+                                "end_position": 104857987,
+                                "start_gtid": "0-1-18322",
+                                "end_gtid": "0-1-20117",
+                                "archived_at": "2024-10-18T05:41:00Z",
+                            },
+                        ],
+                        "pagination": {
+                            "total": 1,
+                            "page": 1,
+                            "per_page": 25,
+                            "total_pages": 1,
+                        },
+                    },
+                },
+            },
+        },
+    },
+)
+def list_binlogs(
+    _: Annotated[dict, Depends(verify_token)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    per_page: Annotated[int, Query(ge=1, le=1000)] = 25,
+) -> BinlogListResponse:
+    """
+    Binary logs kept by the binlog archiver (`binlog_archive: true`).
+
+    Together they cover the time from the oldest backup up to the last
+    rotated log, the range a restore to a point in time can reach.
+    """
+    items, total = BinlogFileRepository().get_list(page, per_page)
+    return BinlogListResponse(
+        items=[BinlogResponse(**item.model_dump()) for item in items],
+        pagination=PaginationInfo(
+            total=total,
+            page=page,
+            per_page=per_page,
+            total_pages=(total + per_page - 1) // per_page,
+        ),
+    )
@@ -48,7 +48,7 @@ router = APIRouter()
         },
     },
 )
-async def list_clients(
+def list_clients(
     _: Annotated[dict, Depends(verify_token)],
     query: Annotated[
         str | None,
@@ -79,7 +79,7 @@ router = APIRouter()
         },
     },
 )
-async def list_processes(
+def list_processes(
     _: Annotated[dict, Depends(verify_token)],
     query: Annotated[
         str | None,
@@ -0,0 +1,111 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from dbcalm.api.model.response.list_response import PaginationInfo
+from dbcalm.api.model.response.restore_test_response import (
+    RestoreTestListResponse,
+    RestoreTestResponse,
+    RtoResponse,
+)
+from dbcalm.auth.verify_token import verify_token
+from dbcalm.data.repository.restore_test import RestoreTestRepository
+
+router = APIRouter()
+
+
+@router.get(
+    "/restore-tests",
+    responses={
+        200: {
+            "description": "List of test restores, latest first",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [
+                            {
+                                "id": 12,
+                                "schedule_id": 3,
+                                "backup_id": "2024-10-18-03-00-00",
+                                "chain_length": 4,
+                                "start_time": "2024-10-18T05:00:00Z",
+                                "end_time": "2024-10-18T05:07:41Z",
+                                "restore_seconds": 431.2,
+                                "startup_seconds": 28.9,
+                                "status": "success",
+                                "message": None,
+                            },
+                        ],
+                        "pagination": {
+                            "total": 1,
+                            "page": 1,
+                            "per_page": 25,
+                            "total_pages": 1,
+                        },
+                    },
+                },
+            },
+        },
+    },
+)
+def list_restore_tests(
+    _: Annotated[dict, Depends(verify_token)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    per_page: Annotated[int, Query(ge=1, le=1000)] = 25,
+) -> RestoreTestListResponse:
+    items, total = RestoreTestRepository().get_list(page, per_page)
+    return RestoreTestListResponse(
+        items=[RestoreTestResponse(**item.model_dump()) for item in items],
+        pagination=PaginationInfo(
+            total=total,
+            page=page,
+            per_page=per_page,
+            total_pages=(total + per_page - 1) // per_page,
+        ),
+    )
+
+
+@router.get(
+    "/restore-tests/rto",
+    responses={
+        200: {
+            "description": "Measured restore times per backup chain length",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "chain_length": 1,
+                            "runs": 8,
+                            "average_seconds": 212.4,
+                            "max_seconds": 240.1,
+                        },
+                        {
+                            "chain_length": 4,
+                            "runs": 3,
+                            "average_seconds": 418.0,
+                            "max_seconds": 431.2,
+                        },
+                    ],
+                },
+            },
+        },
+    },
+)
+def restore_test_rto(
+    _: Annotated[dict, Depends(verify_token)],
+) -> list[RtoResponse]:
+    """
+    Recovery time objective as measured by successful test restores.
+
+    Restoring a chain means copying the full backup and preparing it and
+    every incremental on top, so the time grows with the chain length.
+    """
+    return [
+        RtoResponse(
+            chain_length=row.chain_length,
+            runs=row.runs,
+            average_seconds=row.average_seconds,
+            max_seconds=row.max_seconds,
+        )
+        for row in RestoreTestRepository().rto_by_chain_length()
+    ]
@@ -60,7 +60,7 @@ router = APIRouter()
         },
     },
 )
-async def list_restores(
+def list_restores(
     _: Annotated[dict, Depends(verify_token)],
     query: Annotated[
         str | None,
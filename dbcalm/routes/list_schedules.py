@@ -68,7 +68,7 @@ router = APIRouter()
         },
     },
 )
-async def list_schedules(
+def list_schedules(
     _: Annotated[dict, Depends(verify_token)],
     query: Annotated[
         str | None,
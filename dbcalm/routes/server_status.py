@@ -0,0 +1,83 @@
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from dbcalm.api.model.response.server_status_response import (
+    ServerStateChangeResponse,
+    ServerStatusResponse,
+)
+from dbcalm.auth.verify_token import verify_token
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.repository.server_state_change import (
+    ServerStateChangeRepository,
+)
+
+# Number of state changes returned with the current state
+RECENT_CHANGES = 10
+# Longest interval between pings of the liveness monitor, as its default
+DEFAULT_LIVENESS_MAX_INTERVAL = 60
+# Intervals without a ping after which the stored state is no longer trusted
+STALE_INTERVALS = 3
+
+router = APIRouter()
+
+@router.get(
+    "/status",
+    responses={
+        200: {
+            "description": "Database server status",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "state": "up",
+                        "since": "2024-10-18T03:02:11Z",
+                        "changes": [
+                            {"state": "up", "changed_at": "2024-10-18T03:02:11Z"},
+                            {
+                                "state": "down",
+                                "changed_at": "2024-10-18T02:58:40Z",
+                            },
+                        ],
+                    },
+                },
+            },
+        },
+    },
+)
+def get_server_status(
+    _: Annotated[dict, Depends(verify_token)],
+) -> ServerStatusResponse:
+    changes = ServerStateChangeRepository().recent(RECENT_CHANGES)
+    if not changes:
+        # the command service has not checked the server yet
+        return ServerStatusResponse(state="unknown", changes=[])
+
+    state, since = changes[0].state, changes[0].changed_at
+    checked_at = changes[0].checked_at
+    if checked_at is None or stale(checked_at):
+        # the command service stopped checking, the server may be in any state
+        state, since = "unknown", checked_at
+
+    return ServerStatusResponse(
+        state=state,
+        since=since,
+        changes=[
+            ServerStateChangeResponse(
+                state=change.state,
+                changed_at=change.changed_at,
+            )
+            for change in changes
+        ],
+    )
+
+
+def stale(checked_at: datetime) -> bool:
+    max_interval = float(config_factory().value(
+        "liveness_max_interval",
+        DEFAULT_LIVENESS_MAX_INTERVAL,
+    ))
+    if checked_at.tzinfo is None:
+        checked_at = checked_at.replace(tzinfo=UTC)
+    age = datetime.now(tz=UTC) - checked_at
+    return age > timedelta(seconds=max_interval * STALE_INTERVALS)
@@ -49,7 +49,7 @@ router = APIRouter()
         },
     },
 )
-async def get_status(
+def get_status(
     status_id: str,
     _: Annotated[dict, Depends(verify_token)],
 ) -> StatusResponse:
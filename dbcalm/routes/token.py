@@ -3,13 +3,13 @@ from typing import Annotated
 
 import jwt
 from fastapi import APIRouter, Body, HTTPException
-from passlib.context import CryptContext
 from pydantic import Field
 
 from dbcalm.api.model.request.token_auth_code_request import TokenAuthCodeRequest
 from dbcalm.api.model.request.token_client_request import TokenClientRequest
 from dbcalm.api.model.response.token_response import TokenResponse
-from dbcalm.config.config_factory import config_factory
+from dbcalm.auth.credential_cache import verify_client_secret
+from dbcalm.auth.jwt_settings import jwt_settings
 from dbcalm.data.adapter.adapter_factory import (
     adapter_factory as data_adapter_factory,
 )
@@ -17,7 +17,6 @@ from dbcalm.data.model.client import Client
 from dbcalm.data.repository.auth_code import AuthCodeRepository
 
 router = APIRouter()
-secret_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 @router.post(
     "/token",
@@ -40,7 +39,7 @@ secret_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         },
     },
 )
-async def issue_token(
+def issue_token(
     request_data: Annotated[
         TokenClientRequest | TokenAuthCodeRequest,
         Body(
@@ -71,15 +70,13 @@ async def issue_token(
     ],
 ) -> TokenResponse:
     adapter = data_adapter_factory()
-    config = config_factory()
-    jwt_secret_key = config.value("jwt_secret_key")
-    jwt_algorithm = config.value("jwt_algorithm", default="HS256")
+    jwt_secret_key, jwt_algorithm = jwt_settings()
 
     if request_data.grant_type == "client_credentials":
         client = adapter.get(Client, {"id":request_data.client_id})
-        if not client or not secret_context.verify(
+        if not client or not verify_client_secret(
+            client,
             request_data.client_secret,
-            client.secret,
         ):
             raise HTTPException(status_code=400, detail="Invalid client credentials")
 
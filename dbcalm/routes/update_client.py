@@ -33,7 +33,7 @@ class UpdateClientRequest(BaseModel):
         },
     },
 )
-async def update_client(
+def update_client(
     _: Annotated[dict, Depends(verify_token)],
     client_id: str,
     request: Annotated[
@@ -5,7 +5,9 @@ from fastapi import APIRouter, Body, Depends, HTTPException
 from dbcalm.api.model.request.schedule_request import ScheduleRequest
 from dbcalm.api.model.response.schedule_response import ScheduleResponse
 from dbcalm.auth.verify_token import verify_token
+from dbcalm.data.data_types.enum_types import BackupEngine
 from dbcalm.data.repository.schedule import ScheduleRepository
+from dbcalm.util.backup_scope import BackupScope
 from dbcalm_cmd_client.client import Client
 
 # HTTP status code for accepted async operations
@@ -40,7 +42,7 @@ router = APIRouter()
         },
     },
 )
-async def update_schedule(
+def update_schedule(
     schedule_id: int,
     request: Annotated[
         ScheduleRequest,
@@ -80,9 +82,13 @@ async def update_schedule(
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
 
-    # Validate: if changing to incremental, require at least one enabled
-    # full backup schedule
-    if request.backup_type == "incremental" and schedule.backup_type != "incremental":
+    # Validate: if changing to incremental or changing the scope of one,
+    # require at least one enabled full backup schedule of that scope
+    scope = BackupScope(request.include, request.exclude)
+    if request.backup_type == "incremental" and (
+        schedule.backup_type != "incremental"
+        or BackupScope(schedule.include, schedule.exclude) != scope
+    ):
         from dbcalm.util.parse_query_with_operators import QueryFilter  # noqa: PLC0415
 
         full_schedules = schedule_repo.get_list(
@@ -94,13 +100,19 @@ async def update_schedule(
             page=None,
             per_page=None,
         )[0]
+        full_schedules = [
+            full for full in full_schedules
+            if BackupScope(full.include, full.exclude) == scope
+            and full.engine in (None, BackupEngine.PHYSICAL)
+        ]
 
         if not full_schedules:
             raise HTTPException(
                 status_code=400,
                 detail=(
                     "Cannot change to incremental backup schedule without at least "
-                    "one enabled full backup schedule"
+                    "one enabled full backup schedule with the same include "
+                    "and exclude"
                 ),
             )
 
@@ -115,6 +127,9 @@ async def update_schedule(
     schedule.retention_value = request.retention_value
     schedule.retention_unit = request.retention_unit
     schedule.enabled = request.enabled
+    schedule.include = request.include
+    schedule.exclude = request.exclude
+    schedule.engine = request.engine
 
     schedule_repo.update(schedule)
 
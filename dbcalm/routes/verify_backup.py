@@ -0,0 +1,69 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from dbcalm.api.model.response.status_response import StatusResponse
+from dbcalm.auth.verify_token import verify_token
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.backup_manifest import BackupManifestRepository
+from dbcalm.util.process_status_response import process_status_response
+from dbcalm_mariadb_cmd_client.client import Client
+
+router = APIRouter()
+
+
+@router.post(
+    "/backups/{backup_id}/verify",
+    status_code=202,
+    responses={
+        202: {
+            "description": "Verification accepted and started",
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/StatusResponse"},
+                    "example": {
+                        "status": "Accepted",
+                        "link": "/status/0b6f1f0e-7d2c-4c35-9a43-2f0b1c6d9e21",
+                        "pid": "0b6f1f0e-7d2c-4c35-9a43-2f0b1c6d9e21",
+                        "resource_id": "2024-10-17-03-00-00",
+                    },
+                },
+            },
+        },
+        404: {
+            "description": "Backup or its manifest not found",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Backup with id xyz not found"},
+                },
+            },
+        },
+    },
+)
+def verify_backup(
+    backup_id: str,
+    _: Annotated[dict, Depends(verify_token)],
+    response: Response,
+) -> StatusResponse:
+    """
+    Check a backup for missing or corrupted files.
+
+    **This is an asynchronous operation** - returns 202 Accepted immediately.
+    Use the returned `link` to poll for the result at `/status/{pid}`.
+
+    Every file is compared with the size and checksum recorded when the
+    backup completed. The process fails if files are missing or changed,
+    its error lists them. Reads are throttled to `verify_rate_limit` MB/s.
+
+    Backups made before manifests were recorded can't be verified.
+    """
+    if BackupRepository().get(backup_id) is None:
+        msg = f"Backup with id {backup_id} not found"
+        raise HTTPException(status_code=404, detail=msg)
+
+    if BackupManifestRepository().get(backup_id) is None:
+        msg = f"Backup with id {backup_id} has no manifest"
+        raise HTTPException(status_code=404, detail=msg)
+
+    process = Client().command("verify_backup", {"id": backup_id})
+    return process_status_response(process, response, resource_id=backup_id)
@@ -0,0 +1,107 @@
+from datetime import UTC, datetime
+
+from dbcalm.util.backup_scope import scope_args
+from dbcalm.util.kebab import kebab_case
+from dbcalm_mariadb_cmd_client.client import Client
+
+
+class BackupTrigger:
+    """Submit backup jobs to the mariadb command service.
+
+    Used by both the API and the CLI. Only the backup id is generated here,
+    the command service resolves the incremental base and validates and
+    records the job, so the CLI does not need database access or an API
+    client and token.
+    """
+
+    def __init__(self, client: Client | None = None) -> None:
+        self.client = client if client is not None else Client()
+
+    def command(  # noqa: PLR0913
+        self,
+        backup_type: str,
+        *,
+        id: str | None = None,
+        from_backup_id: str | None = None,
+        schedule_id: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        engine: str | None = None,
+    ) -> tuple[str, str, dict]:
+        """Build a full or incremental backup command.
+
+        For incremental backups without from_backup_id the command service
+        uses the latest backup and answers 404 if there is none.
+        Without include, exclude and engine, backups of a schedule take
+        the schedule's.
+
+        Returns:
+            Tuple of (backup id, command name, command arguments)
+        """
+        if id is None:
+            id = datetime.now(tz=UTC).strftime("%Y-%m-%d-%H-%M-%S")
+        else:
+            id = kebab_case(id)
+
+        args = {"id": id}
+        if schedule_id is not None:
+            args["schedule_id"] = schedule_id
+        args |= scope_args(include, exclude)
+        if engine is not None:
+            args["engine"] = engine
+
+        if backup_type == "incremental":
+            args["from_backup_id"] = from_backup_id
+            return id, "incremental_backup", args
+
+        return id, "full_backup", args
+
+    def submit(  # noqa: PLR0913
+        self,
+        backup_type: str,
+        *,
+        id: str | None = None,
+        from_backup_id: str | None = None,
+        schedule_id: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        engine: str | None = None,
+    ) -> tuple[str, dict]:
+        """Send a backup command.
+
+        Returns:
+            Tuple of (backup id, command service response)
+        """
+        id, cmd, args = self.command(
+            backup_type,
+            id=id,
+            from_backup_id=from_backup_id,
+            schedule_id=schedule_id,
+            include=include,
+            exclude=exclude,
+            engine=engine,
+        )
+        return id, self.client.command(cmd, args)
+
+    async def submit_async(  # noqa: PLR0913
+        self,
+        backup_type: str,
+        *,
+        id: str | None = None,
+        from_backup_id: str | None = None,
+        schedule_id: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        engine: str | None = None,
+    ) -> tuple[str, dict]:
+        """Send a backup command without blocking the event loop."""
+        id, cmd, args = self.command(
+            backup_type,
+            id=id,
+            from_backup_id=from_backup_id,
+            schedule_id=schedule_id,
+            include=include,
+            exclude=exclude,
+            engine=engine,
+        )
+        return id, await self.client.command_async(cmd, args)
@@ -0,0 +1,189 @@
+import hashlib
+import mmap
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dbcalm.storage.dedup_store import DedupStore, RepositoryError
+from dbcalm.util.rate_limiter import RateLimiter
+
+# Recorded with every manifest so the hash can change without breaking old ones
+ALGORITHM = "blake2b-128"
+DIGEST_SIZE = 16  # bytes
+# Files are hashed and throttled in pieces of this size, hashlib releases
+# the GIL while it works on each piece so the pool threads run in parallel
+CHUNK_SIZE = 8 * 1024 * 1024  # bytes
+
+# Defaults for manifests and verification, see verify_workers and
+# verify_rate_limit
+DEFAULT_VERIFY_WORKERS = 4
+DEFAULT_VERIFY_RATE_LIMIT = 50  # MB/s, 0 disables the limit
+
+
+class VerifyResult:
+    """Differences between a backup folder and its manifest."""
+
+    def __init__(
+        self,
+        checked: int,
+        missing: list[str],
+        corrupt: list[str],
+        unexpected: list[str],
+    ) -> None:
+        self.checked = checked
+        self.missing = missing
+        # size or checksum differs from the manifest
+        self.corrupt = corrupt
+        # files the manifest doesn't know, reported but not a failure
+        self.unexpected = unexpected
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.corrupt
+
+    def problems(self) -> list[str]:
+        return [
+            *(f"missing: {path}" for path in self.missing),
+            *(f"corrupt: {path}" for path in self.corrupt),
+            *(f"unexpected: {path}" for path in self.unexpected),
+        ]
+
+
+class BackupVerifier:
+    """Build and check per-file checksum manifests of backup folders.
+
+    Files are read through mmap and hashed by a pool of `workers` threads
+    that share one rate limiter, so verification can run over the whole
+    backup directory without starving the database of I/O.
+    """
+
+    def __init__(self, workers: int, rate_limiter: RateLimiter) -> None:
+        self.workers = max(1, workers)
+        self.rate_limiter = rate_limiter
+
+    def manifest(self, folder: str | Path) -> dict[str, dict]:
+        """Size and checksum of every regular file below folder."""
+        folder = Path(folder)
+        paths = self.files(folder)
+        with ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="manifest",
+        ) as pool:
+            results = pool.map(self.checksum, (folder / path for path in paths))
+            return {
+                path: {"size": size, "checksum": checksum}
+                for path, (size, checksum) in zip(paths, results, strict=True)
+            }
+
+    def verify(self, folder: str | Path, files: dict[str, dict]) -> VerifyResult:
+        """Compare folder with a manifest made by manifest()."""
+        folder = Path(folder)
+        present = set(self.files(folder)) if folder.is_dir() else set()
+        return self._compare(
+            present,
+            files,
+            lambda path: self.matches(folder / path, files[path]),
+        )
+
+    def verify_stored(
+        self,
+        store: DedupStore,
+        backup_id: str,
+        files: dict[str, dict],
+    ) -> VerifyResult:
+        """Compare a backup kept in the dedup repository with its manifest.
+
+        The files are read back out of the packs, so this also catches
+        chunks that went missing or were damaged in the repository.
+        """
+        stored = store.files(backup_id)
+
+        def matches(path: str) -> bool:
+            if stored[path]["size"] != files[path]["size"]:
+                return False
+            try:
+                return self.digest(store.read(backup_id, path)) == (
+                    files[path]["size"],
+                    files[path]["checksum"],
+                )
+            except (RepositoryError, OSError):
+                return False
+
+        return self._compare(set(stored), files, matches)
+
+    def _compare(
+        self,
+        present: set[str],
+        files: dict[str, dict],
+        matches: Callable[[str], bool],
+    ) -> VerifyResult:
+        expected = sorted(path for path in files if path in present)
+        with ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="verify",
+        ) as pool:
+            intact = pool.map(matches, expected)
+            corrupt = [
+                path
+                for path, ok in zip(expected, intact, strict=True)
+                if not ok
+            ]
+
+        return VerifyResult(
+            checked=len(expected),
+            missing=sorted(path for path in files if path not in present),
+            corrupt=corrupt,
+            unexpected=sorted(present.difference(files)),
+        )
+
+    def matches(self, path: Path, entry: dict) -> bool:
+        try:
+            # a changed size needs no reading
+            if path.stat().st_size != entry["size"]:
+                return False
+            return self.checksum(path) == (entry["size"], entry["checksum"])
+        except OSError:
+            return False
+
+    def checksum(self, path: Path) -> tuple[int, str]:
+        """Size and hex digest of a file."""
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        with path.open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            # empty files can't be mapped
+            if size == 0:
+                return size, digest.hexdigest()
+            with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mapped) as view:
+                    for offset in range(0, size, CHUNK_SIZE):
+                        with view[offset:offset + CHUNK_SIZE] as chunk:
+                            self.rate_limiter.acquire(len(chunk))
+                            digest.update(chunk)
+        return size, digest.hexdigest()
+
+    def digest(self, chunks: Iterable[bytes]) -> tuple[int, str]:
+        """Size and hex digest of a file read as a stream of pieces."""
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        size = 0
+        for chunk in chunks:
+            self.rate_limiter.acquire(len(chunk))
+            digest.update(chunk)
+            size += len(chunk)
+        return size, digest.hexdigest()
+
+    def files(self, folder: Path) -> list[str]:
+        """Paths of the regular files below folder, relative to it."""
+        paths = []
+        stack = [str(folder)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        paths.append(
+                            Path(entry.path).relative_to(folder).as_posix(),
+                        )
+        return sorted(paths)
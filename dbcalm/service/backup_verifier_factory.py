@@ -0,0 +1,16 @@
+from dbcalm.config.config_factory import config_factory
+from dbcalm.service.backup_verifier import (
+    DEFAULT_VERIFY_RATE_LIMIT,
+    DEFAULT_VERIFY_WORKERS,
+    BackupVerifier,
+)
+from dbcalm.util.rate_limiter import RateLimiter
+
+
+def backup_verifier_factory() -> BackupVerifier:
+    config = config_factory()
+    workers = int(config.value("verify_workers", DEFAULT_VERIFY_WORKERS))
+    rate_limit = float(
+        config.value("verify_rate_limit", DEFAULT_VERIFY_RATE_LIMIT),
+    )
+    return BackupVerifier(workers, RateLimiter(rate_limit * 1024 * 1024))
@@ -0,0 +1,58 @@
+import asyncio
+
+from dbcalm.config.config_factory import config_factory
+from dbcalm.service.retention_planner import RetentionPlanner
+from dbcalm.util.checkpoint_dir import checkpoint_dir
+from dbcalm_cmd_client.client import Client
+
+
+class CleanupTrigger:
+    """Submit retention cleanup to the command service.
+
+    Expired backups are worked out here, the command service deletes the
+    folders with bounded parallelism and an I/O rate limit and removes the
+    backup records once their folders are gone.
+    """
+
+    def __init__(
+        self,
+        client: Client | None = None,
+        planner: RetentionPlanner | None = None,
+    ) -> None:
+        self.client = client if client is not None else Client()
+        self.planner = planner if planner is not None else RetentionPlanner()
+        self.config = config_factory()
+
+    def command_args(self) -> dict | None:
+        """Arguments for a cleanup_backups command, None if nothing expired."""
+        backup_ids = self.planner.expired_backups()
+        if not backup_ids:
+            return None
+
+        backup_dir = self.config.value("backup_dir").rstrip("/")
+        folders = [f"{backup_dir}/{backup_id}" for backup_id in backup_ids] + [
+            checkpoint_dir(backup_dir, backup_id) for backup_id in backup_ids
+        ]
+        return {"backup_ids": backup_ids, "folders": folders}
+
+    def submit(self) -> tuple[list[str], dict | None]:
+        """Send a cleanup_backups command for all expired backups.
+
+        Returns:
+            Tuple of (expired backup ids, command service response). The
+            response is None when nothing has expired.
+        """
+        args = self.command_args()
+        if args is None:
+            return [], None
+        return args["backup_ids"], self.client.command("cleanup_backups", args)
+
+    async def submit_async(self) -> tuple[list[str], dict | None]:
+        """Like submit(), planning runs in a worker thread."""
+        args = await asyncio.to_thread(self.command_args)
+        if args is None:
+            return [], None
+        return args["backup_ids"], await self.client.command_async(
+            "cleanup_backups",
+            args,
+        )
@@ -50,9 +50,16 @@ class CronFileBuilder:
         raise ValueError(msg)
 
     def generate_cron_command(self, schedule: Schedule) -> str:
-        """Generate the dbcalm backup command that will be executed by cron."""
+        """Generate the dbcalm backup command that will be executed by cron.
+
+        The backup CLI submits the job straight to the mariadb command
+        socket, it doesn't go through the API or need client credentials.
+        """
         # Build command to call dbcalm backup CLI with schedule_id
-        backup_cmd = f"/usr/bin/dbcalm backup {schedule.backup_type}"
+        if schedule.backup_type == "test_restore":
+            backup_cmd = "/usr/bin/dbcalm test-restore"
+        else:
+            backup_cmd = f"/usr/bin/dbcalm backup {schedule.backup_type}"
         schedule_arg = f"--schedule-id {schedule.id}"
         log_file = f"/var/log/{self.config.PROJECT_NAME}/cron-{schedule.id}.log"
         log_redirect = f">> {log_file} 2>&1"
@@ -61,11 +68,14 @@ class CronFileBuilder:
     def build_cron_file_content(self, schedules: list[Schedule]) -> str:
         """Build complete cron file content from list of schedules.
 
-        Only includes enabled schedules.
+        Only includes enabled schedules, and none at all when the internal
+        scheduler of the mariadb command service runs them instead.
         Returns complete file content as string.
         """
         # Filter to only enabled schedules
         enabled_schedules = [s for s in schedules if s.enabled]
+        if self.config.value("scheduler") == "internal":
+            enabled_schedules = []
 
         # Build header
         timestamp = datetime.now(tz=UTC).strftime("%Y-%m-%d %H:%M:%S UTC")
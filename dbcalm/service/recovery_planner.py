@@ -0,0 +1,115 @@
+from datetime import UTC, datetime
+
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.binlog_file import BinlogFileRepository
+from dbcalm.errors.not_found_error import NotFoundError
+from dbcalm.errors.validation_error import ValidationError
+from dbcalm.util.backup_scope import BackupScope
+from dbcalm.util.gtid import parse_gtid
+
+
+class RecoveryPlanner:
+    """Pick the backup a restore to a point in time starts from.
+
+    That is the newest backup that was complete before the target, so
+    only the binary logs written since it finished have to be replayed.
+    Partial and logical backups are never picked, the binary logs hold
+    changes to every table and replay onto a prepared data directory. The
+    archive has to reach the target: logs are archived once the server
+    rotates away from them, FLUSH BINARY LOGS makes the current one count.
+    """
+
+    def __init__(self) -> None:
+        self.backups = BackupRepository()
+        self.binlogs = BinlogFileRepository()
+
+    def plan(
+        self,
+        until_time: datetime | None = None,
+        until_gtid: str | None = None,
+        backup_id: str | None = None,
+    ) -> list[str]:
+        """Backup chain to restore before replaying up to the target.
+
+        Args:
+            until_time: Replay events before this moment
+            until_gtid: Replay up to and including this transaction
+            backup_id: Start from this backup instead of the newest fitting one
+
+        Returns:
+            Backup ids, full backup first, like required_backups
+
+        Raises:
+            ValidationError: If the target is invalid or not archived yet
+            NotFoundError: If no backup precedes the target
+        """
+        if (until_time is None) == (until_gtid is None):
+            msg = "Restore to a point in time needs either until_time or until_gtid"
+            raise ValidationError(msg)
+
+        before = (
+            self._gtid_bound(until_gtid)
+            if until_gtid is not None
+            else self._time_bound(_utc(until_time))
+        )
+
+        if backup_id is not None:
+            backup = self.backups.get(backup_id)
+            if backup is None:
+                msg = f"Backup with id {backup_id} not found"
+                raise NotFoundError(msg)
+            if backup.end_time is None or _utc(backup.end_time) > before:
+                msg = f"Backup {backup_id} did not finish before the target"
+                raise ValidationError(msg)
+            scope = BackupScope(backup.include, backup.exclude)
+            if scope.partial:
+                msg = (
+                    f"Backup {backup_id} is a partial backup "
+                    f"({scope.describe()}), binary logs can only be "
+                    "replayed onto a backup of the whole instance"
+                )
+                raise ValidationError(msg)
+            if backup.engine is not None:
+                msg = (
+                    f"Backup {backup_id} is a {backup.engine} backup, binary logs "
+                    "are only replayed onto physical backups"
+                )
+                raise ValidationError(msg)
+        else:
+            backup = self.backups.latest_ended_before(before)
+            if backup is None:
+                msg = f"No backup finished before {before}"
+                raise NotFoundError(msg)
+
+        return self.backups.required_backups(backup)
+
+    def _gtid_bound(self, until_gtid: str) -> datetime:
+        try:
+            parse_gtid(until_gtid)
+        except ValueError as e:
+            raise ValidationError(str(e)) from e
+        binlog = self.binlogs.containing_gtid(until_gtid)
+        if binlog is None:
+            msg = f"No archived binary log contains GTID {until_gtid}"
+            raise ValidationError(msg)
+        # the exact time of the transaction is unknown, backups that
+        # finished before its log started certainly precede it
+        return _utc(binlog.first_event_time)
+
+    def _time_bound(self, until_time: datetime) -> datetime:
+        latest = self.binlogs.latest()
+        if latest is None or _utc(latest.last_event_time) < until_time:
+            reach = "nothing" if latest is None else latest.last_event_time
+            msg = (
+                f"Archived binary logs reach {reach}, not {until_time}. "
+                "Run FLUSH BINARY LOGS to archive the current log."
+            )
+            raise ValidationError(msg)
+        return until_time
+
+
+def _utc(moment: datetime) -> datetime:
+    # sqlite hands back naive datetimes, they are stored in UTC
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=UTC)
+    return moment
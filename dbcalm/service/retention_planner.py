@@ -0,0 +1,112 @@
+import calendar
+from datetime import UTC, datetime, timedelta
+
+from dbcalm.data.model.schedule import Schedule
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.schedule import ScheduleRepository
+
+RETENTION_UNITS = ["days", "weeks", "months"]
+
+
+def subtract_months(moment: datetime, months: int) -> datetime:
+    """Go back whole calendar months, clamping to the end of shorter months."""
+    month_index = moment.year * 12 + moment.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+def retention_cutoff(schedule: Schedule, now: datetime) -> datetime | None:
+    """Backups of the schedule started before the cutoff are expired.
+
+    Returns None when the schedule keeps its backups forever.
+    """
+    value = schedule.retention_value
+    unit = schedule.retention_unit
+    if not value or value < 1 or unit not in RETENTION_UNITS:
+        return None
+    if unit == "days":
+        return now - timedelta(days=value)
+    if unit == "weeks":
+        return now - timedelta(weeks=value)
+    return subtract_months(now, value)
+
+
+class RetentionPlan:
+    """Outcome of evaluating retention rules against all backups."""
+
+    def __init__(
+        self,
+        expired: list,
+        pinned: list,
+        totals: tuple[int, int, int] = (0, 0, 0),
+    ) -> None:
+        # rows (id, from_backup_id, schedule_id, start_time, size_bytes) of
+        # the backups to delete on the requested page, oldest first
+        self.expired = expired
+        # over all pages, counted in the database
+        self.expired_count, self.bytes_reclaimed, self.unknown_size_count = totals
+        # expired by their own retention but kept because kept backups were
+        # taken from them: backup id -> (row, ids of those direct dependents)
+        self.kept_for_dependents = {}
+        for row in pinned:
+            entry = self.kept_for_dependents.setdefault(row.id, (row, []))
+            entry[1].append(row.required_by)
+
+    @property
+    def expired_ids(self) -> list[str]:
+        return [row.id for row in self.expired]
+
+
+class RetentionPlanner:
+    """Work out which backups have passed their schedule's retention.
+
+    Manual backups and backups of schedules without a retention period are
+    never expired. Expiry is chain aware: a backup that another kept backup
+    was taken from (directly or through other incrementals) is kept as well,
+    so cleanup never leaves an incremental without its base.
+    """
+
+    def cutoffs(
+        self,
+        schedules: list[Schedule],
+        now: datetime,
+    ) -> dict[int, datetime]:
+        cutoffs = {}
+        for schedule in schedules:
+            cutoff = retention_cutoff(schedule, now)
+            if cutoff is not None:
+                cutoffs[schedule.id] = cutoff
+        return cutoffs
+
+    def current_plan(
+        self,
+        now: datetime | None = None,
+        page: int | None = None,
+        per_page: int | None = None,
+    ) -> RetentionPlan:
+        """Evaluate retention against every backup in the database.
+
+        Expiry, chain resolution and the totals run as set based queries in
+        the database, only the requested page of expired rows is loaded
+        (all of them when page is None).
+        """
+        cutoffs = self.current_cutoffs(now)
+        if not cutoffs:
+            return RetentionPlan([], [])
+        repository = BackupRepository()
+        expired, pinned = repository.retention_rows(cutoffs, page, per_page)
+        return RetentionPlan(expired, pinned, repository.retention_totals(cutoffs))
+
+    def current_cutoffs(self, now: datetime | None = None) -> dict[int, datetime]:
+        now = now if now is not None else datetime.now(tz=UTC)
+        schedules, _ = ScheduleRepository().get_list(None, None, None, None)
+        return self.cutoffs(schedules, now)
+
+    def expired_backups(self, now: datetime | None = None) -> list[str]:
+        """Return the ids of all expired backups, oldest first."""
+        cutoffs = self.current_cutoffs(now)
+        if not cutoffs:
+            return []
+        return BackupRepository().retention_ids(cutoffs)
@@ -0,0 +1,42 @@
+import zlib
+from collections.abc import Iterator
+
+# InnoDB writes whole pages, so chunk boundaries are only considered at
+# multiples of the default page size. A changed page then only changes the
+# chunk it is in, and the boundaries can be decided per block in C (crc32)
+# instead of rolling a hash over every byte in Python.
+BLOCK_SIZE = 16 * 1024  # bytes
+MIN_BLOCKS = 4  # 64 KiB
+MAX_BLOCKS = 64  # 1 MiB
+# A block whose crc32 has these bits clear ends a chunk, on average every
+# 16 blocks after the minimum (about 320 KiB chunks). Smaller chunks share
+# more between backups with scattered page changes but grow the index.
+CUT_MASK = 0x0F
+
+
+def chunk_boundaries(data: bytes | memoryview) -> Iterator[tuple[int, int]]:
+    """Content defined chunk boundaries as (start, end) offsets.
+
+    Whether a block ends a chunk depends only on its own content, so after
+    an insert or a changed block the boundaries line up again with those of
+    the previous version at the next cut point.
+    """
+    view = memoryview(data)
+    size = len(view)
+    start = 0
+    offset = 0
+    while offset < size:
+        end = min(offset + BLOCK_SIZE, size)
+        blocks = (end - start + BLOCK_SIZE - 1) // BLOCK_SIZE
+        if (
+            end == size
+            or blocks >= MAX_BLOCKS
+            or (
+                blocks >= MIN_BLOCKS
+                and zlib.crc32(view[offset:end]) & CUT_MASK == 0
+            )
+        ):
+            yield start, end
+            start = end
+        offset = end
+    view.release()
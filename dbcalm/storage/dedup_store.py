@@ -0,0 +1,371 @@
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sqlite3
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.storage.chunker import chunk_boundaries
+
+DIGEST_SIZE = 32  # bytes
+# Packs are closed once they reach this size
+PACK_SIZE = 64 * 1024 * 1024  # bytes
+# Packs with more unreferenced than referenced data are rewritten by gc,
+# others keep their dead chunks until more of them are unused
+REPACK_DEAD_RATIO = 0.5
+# Small files mariabackup/xtrabackup read from --incremental-basedir, they
+# stay in the backup folder so incrementals can still be taken from it
+CHECKPOINT_FILES = [
+    "xtrabackup_checkpoints",
+    "mariadb_backup_checkpoints",
+    "xtrabackup_info",
+    "mariadb_backup_info",
+]
+
+
+class RepositoryError(Exception):
+    """A chunk a snapshot references is missing or damaged."""
+
+
+class DedupStore:
+    """Content addressed repository of deduplicated backup files.
+
+    Layout below `root`:
+
+    - packs/<name>.pack: chunk data appended back to back
+    - index.sqlite3: chunk hash -> pack, offset and length
+    - snapshots/<backup id>.json: files of a backup with the hashes of
+      their chunks in order
+
+    Files are split with content defined chunking (see chunker), chunks
+    already in the index are only referenced. Adding backups and reading
+    them back take a shared lock on the repository, gc an exclusive one.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.packs = self.root / "packs"
+        self.snapshots = self.root / "snapshots"
+        self.logger = logger_factory()
+        self.packs.mkdir(parents=True, exist_ok=True)
+        self.snapshots.mkdir(parents=True, exist_ok=True)
+        with self._index() as index:
+            index.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "hash TEXT PRIMARY KEY, pack TEXT NOT NULL, "
+                "offset INTEGER NOT NULL, length INTEGER NOT NULL"
+                ") WITHOUT ROWID",
+            )
+
+    def has(self, backup_id: str) -> bool:
+        return self._snapshot_path(backup_id).exists()
+
+    def backup_ids(self) -> list[str]:
+        return sorted(path.stem for path in self.snapshots.glob("*.json"))
+
+    def add(self, backup_id: str, folder: str | Path) -> dict:
+        """Store the files of a backup folder.
+
+        Returns:
+            Dict with the number of files, their total size and the bytes
+            of new chunks that had to be written
+        """
+        folder = Path(folder)
+        # the snapshot is written under the lock as well, gc would otherwise
+        # see the new chunks as unreferenced
+        with self._lock(fcntl.LOCK_SH), self._index() as index:
+            writer = _PackWriter(self.packs, index)
+            try:
+                files = [
+                    self._add_file(folder, path, writer)
+                    for path in _regular_files(folder)
+                ]
+            finally:
+                writer.close()
+
+            snapshot = {"backup_id": backup_id, "files": files}
+            temporary = self._snapshot_path(backup_id).with_suffix(".tmp")
+            with temporary.open("w") as file:
+                json.dump(snapshot, file)
+                file.flush()
+                os.fsync(file.fileno())
+            temporary.replace(self._snapshot_path(backup_id))
+
+        return {
+            "files": len(files),
+            "size": sum(entry["size"] for entry in files),
+            "written": writer.written,
+        }
+
+    def _add_file(self, folder: Path, path: Path, writer: "_PackWriter") -> dict:
+        chunks = []
+        with path.open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            mode = os.fstat(file.fileno()).st_mode & 0o7777
+            # empty files can't be mapped
+            if size > 0:
+                with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as data:
+                    data.madvise(mmap.MADV_SEQUENTIAL)
+                    for start, end in chunk_boundaries(data):
+                        chunks.append(writer.add(data[start:end]))
+        return {
+            "path": path.relative_to(folder).as_posix(),
+            "size": size,
+            "mode": mode,
+            "chunks": chunks,
+        }
+
+    def trim(self, folder: str | Path) -> None:
+        """Remove everything but the checkpoint files from a stored folder."""
+        folder = Path(folder)
+        for entry in folder.iterdir():
+            if entry.name in CHECKPOINT_FILES and entry.is_file():
+                continue
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
+
+    def files(self, backup_id: str) -> dict[str, dict]:
+        """Files of a stored backup: path -> {"size", "mode", "chunks"}."""
+        with self._snapshot_path(backup_id).open() as file:
+            snapshot = json.load(file)
+        return {entry["path"]: entry for entry in snapshot["files"]}
+
+    def read(self, backup_id: str, path: str) -> Iterator[bytes]:
+        """Stream the contents of one file of a stored backup chunk by chunk."""
+        entry = self.files(backup_id)[path]
+        with self._lock(fcntl.LOCK_SH), self._index() as index, _PackReader(
+            self.packs,
+            index,
+        ) as reader:
+            yield from reader.chunks(entry["chunks"])
+
+    def restore(
+        self,
+        backup_id: str,
+        target: str | Path,
+        select: Callable[[str], bool] | None = None,
+    ) -> None:
+        """Write the files of a stored backup below target.
+
+        select picks the paths to write, all of them without it.
+        """
+        target = Path(target)
+        files = self.files(backup_id)
+        if select is not None:
+            files = {path: entry for path, entry in files.items() if select(path)}
+        with self._lock(fcntl.LOCK_SH), self._index() as index, _PackReader(
+            self.packs,
+            index,
+        ) as reader:
+            for path, entry in files.items():
+                destination = target / path
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                with destination.open("wb") as file:
+                    for chunk in reader.chunks(entry["chunks"]):
+                        file.write(chunk)
+                destination.chmod(entry["mode"])
+
+    def gc(self, keep: set[str]) -> dict:
+        """Drop snapshots of backups not in keep and the chunks only they used.
+
+        Returns:
+            Dict with the snapshots and chunks removed and the bytes freed
+        """
+        with self._lock(fcntl.LOCK_EX), self._index() as index:
+            removed_snapshots = 0
+            for backup_id in self.backup_ids():
+                if backup_id not in keep:
+                    self._snapshot_path(backup_id).unlink()
+                    removed_snapshots += 1
+
+            referenced = set()
+            for backup_id in self.backup_ids():
+                for entry in self.files(backup_id).values():
+                    referenced.update(entry["chunks"])
+
+            live: dict[str, list[tuple]] = {}
+            dead = []
+            for row in index.execute("SELECT hash, pack, offset, length FROM chunks"):
+                if row[0] in referenced:
+                    live.setdefault(row[1], []).append(row)
+                else:
+                    dead.append(row[0])
+            index.executemany(
+                "DELETE FROM chunks WHERE hash = ?",
+                ((chunk_hash,) for chunk_hash in dead),
+            )
+            index.commit()
+
+            freed = 0
+            # listed up front, packs written by repacking are not collected
+            for pack in sorted(self.packs.glob("*.pack")):
+                freed += self._collect_pack(index, pack, live.get(pack.stem, []))
+
+        stats = {
+            "snapshots": removed_snapshots,
+            "chunks": len(dead),
+            "freed": freed,
+        }
+        self.logger.info("Repository gc: %s", stats)
+        return stats
+
+    def _collect_pack(self, index: sqlite3.Connection, pack: Path, live: list) -> int:
+        """Delete or rewrite a pack with unreferenced data, return bytes freed."""
+        size = pack.stat().st_size
+        live_bytes = sum(row[3] for row in live)
+        if not live:
+            # includes packs of interrupted adds that never made it to the index
+            pack.unlink()
+            return size
+        if size - live_bytes <= size * REPACK_DEAD_RATIO:
+            return 0
+
+        writer = _PackWriter(self.packs, index)
+        with pack.open("rb") as file:
+            for chunk_hash, _, offset, length in live:
+                writer.move(chunk_hash, os.pread(file.fileno(), length, offset))
+        writer.close()
+        pack.unlink()
+        return size - live_bytes
+
+    def _snapshot_path(self, backup_id: str) -> Path:
+        return self.snapshots / f"{backup_id}.json"
+
+    @contextmanager
+    def _index(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.root / "index.sqlite3", timeout=30)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            yield connection
+            connection.commit()
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _lock(self, operation: int) -> Iterator[None]:
+        with (self.root / "lock").open("a") as file:
+            fcntl.flock(file.fileno(), operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class _PackWriter:
+    """Append chunks to pack files and index them once a pack is synced."""
+
+    def __init__(self, packs: Path, index: sqlite3.Connection) -> None:
+        self.packs = packs
+        self.index = index
+        self.written = 0
+        self._file = None
+        self._name = None
+        self._size = 0
+        # chunks in the open pack, not in the index yet
+        self._pending: dict[str, tuple[str, int, int]] = {}
+
+    def add(self, data: bytes) -> str:
+        """Store a chunk unless it is already stored, return its hash."""
+        chunk_hash = hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+        if chunk_hash in self._pending or self.index.execute(
+            "SELECT 1 FROM chunks WHERE hash = ?",
+            (chunk_hash,),
+        ).fetchone():
+            return chunk_hash
+        self._append(chunk_hash, data)
+        return chunk_hash
+
+    def move(self, chunk_hash: str, data: bytes) -> None:
+        """Store a chunk that is indexed in another pack, used by gc."""
+        self._append(chunk_hash, data)
+
+    def _append(self, chunk_hash: str, data: bytes) -> None:
+        if self._file is None:
+            self._name = uuid.uuid4().hex
+            self._file = (self.packs / f"{self._name}.pack").open("wb")
+            self._size = 0
+        self._file.write(data)
+        self._pending[chunk_hash] = (self._name, self._size, len(data))
+        self._size += len(data)
+        self.written += len(data)
+        if self._size >= PACK_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        # INSERT OR REPLACE so chunks moved by gc point at their new pack
+        self.index.executemany(
+            "INSERT OR REPLACE INTO chunks (hash, pack, offset, length) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                (chunk_hash, pack, offset, length)
+                for chunk_hash, (pack, offset, length) in self._pending.items()
+            ),
+        )
+        self.index.commit()
+        self._pending = {}
+
+    def close(self) -> None:
+        self._flush()
+
+
+class _PackReader:
+    """Read chunks from packs, keeping the pack files open while in use."""
+
+    def __init__(self, packs: Path, index: sqlite3.Connection) -> None:
+        self.packs = packs
+        self.index = index
+        self._files: dict[str, int] = {}
+
+    def __enter__(self) -> "_PackReader":  # noqa: PYI034
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        for descriptor in self._files.values():
+            os.close(descriptor)
+
+    def chunks(self, hashes: list[str]) -> Iterator[bytes]:
+        for chunk_hash in hashes:
+            row = self.index.execute(
+                "SELECT pack, offset, length FROM chunks WHERE hash = ?",
+                (chunk_hash,),
+            ).fetchone()
+            if row is None:
+                msg = f"Chunk {chunk_hash} is missing from the repository"
+                raise RepositoryError(msg)
+            pack, offset, length = row
+            if pack not in self._files:
+                self._files[pack] = os.open(self.packs / f"{pack}.pack", os.O_RDONLY)
+            data = os.pread(self._files[pack], length, offset)
+            # the hash is the checksum, damaged packs are never restored from
+            digest = hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+            if digest != chunk_hash:
+                msg = f"Chunk {chunk_hash} in pack {pack} is damaged"
+                raise RepositoryError(msg)
+            yield data
+
+
+def _regular_files(folder: Path) -> list[Path]:
+    paths = []
+    stack = [folder]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    paths.append(Path(entry.path))
+    return sorted(paths)
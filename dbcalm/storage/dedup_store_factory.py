@@ -0,0 +1,14 @@
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.storage.dedup_store import DedupStore
+
+
+def dedup_store_factory(config: Config | None = None) -> DedupStore | None:
+    """The deduplicating repository, None unless repository_format is dedup."""
+    config = config if config is not None else config_factory()
+    if config.value("repository_format", "directory") != "dedup":
+        return None
+    root = config.value("repository_dir") or (
+        f"{config.value('backup_dir').rstrip('/')}/repository"
+    )
+    return DedupStore(root)
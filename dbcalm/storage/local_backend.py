@@ -0,0 +1,79 @@
+import contextlib
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from dbcalm.storage.storage_backend import (
+    READ_SIZE,
+    StorageBackend,
+    StoredObject,
+)
+
+
+class LocalBackend(StorageBackend):
+    """Streamed backups as files in a local directory, by default backup_dir."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def upload(self, key: str, stream: BinaryIO) -> StoredObject:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / key
+        # only complete files get the real name
+        partial = path.with_name(path.name + ".part")
+        descriptor = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o640)
+        try:
+            size = 0
+            while piece := stream.read(READ_SIZE):
+                descriptor = self._write(partial, descriptor, piece, size)
+                size += len(piece)
+            os.fsync(descriptor)
+            partial.replace(path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        finally:
+            # may already be closed by a failed retry of _write
+            with contextlib.suppress(OSError):
+                os.close(descriptor)
+        self._sync_dir()
+        return StoredObject(str(path), size)
+
+    def download(self, location: str) -> Iterator[bytes]:
+        with Path(location).open("rb") as file:
+            while piece := file.read(READ_SIZE):
+                yield piece
+
+    def size(self, location: str) -> int | None:
+        try:
+            return Path(location).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def delete(self, location: str) -> None:
+        Path(location).unlink(missing_ok=True)
+
+    def location(self, key: str) -> str:
+        return str(self.root / key)
+
+    def _write(
+        self,
+        path: Path,  # noqa: ARG002
+        descriptor: int,
+        piece: bytes,
+        offset: int,
+    ) -> int:
+        """Write piece at offset, return the descriptor to continue with."""
+        written = 0
+        while written < len(piece):
+            written += os.pwrite(descriptor, piece[written:], offset + written)
+        return descriptor
+
+    def _sync_dir(self) -> None:
+        # makes the rename durable
+        descriptor = os.open(self.root, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
@@ -0,0 +1,57 @@
+import contextlib
+import os
+import time
+from pathlib import Path
+
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.storage.local_backend import LocalBackend
+from dbcalm.storage.storage_backend import StorageError
+
+DEFAULT_RETRIES = 5
+RETRY_DELAY = 1.0  # seconds, doubled on every retry
+
+
+class RemoteFsBackend(LocalBackend):
+    """Streamed backups on a mounted remote filesystem (NFS, SMB, sshfs).
+
+    Network filesystems fail writes transiently (ESTALE, EIO, timeouts on
+    soft mounts). The piece being written is still in memory, so after a
+    failed write the partial file is reopened, cut back to the last good
+    offset and the upload resumes there instead of failing the backup.
+    """
+
+    def __init__(self, root: str | Path, retries: int = DEFAULT_RETRIES) -> None:
+        super().__init__(root)
+        self.retries = retries
+        self.logger = logger_factory()
+
+    def _write(
+        self,
+        path: Path,
+        descriptor: int,
+        piece: bytes,
+        offset: int,
+    ) -> int:
+        delay = RETRY_DELAY
+        for attempt in range(self.retries + 1):
+            try:
+                if attempt > 0:
+                    with contextlib.suppress(OSError):
+                        os.close(descriptor)
+                    descriptor = os.open(path, os.O_WRONLY)
+                    os.ftruncate(descriptor, offset)
+                return super()._write(path, descriptor, piece, offset)
+            except OSError as e:
+                if attempt == self.retries:
+                    msg = f"Writing {path} failed at offset {offset}: {e}"
+                    raise StorageError(msg) from e
+                self.logger.warning(
+                    "Writing %s failed at offset %d, retrying in %.0fs: %s",
+                    path,
+                    offset,
+                    delay,
+                    e,
+                )
+                time.sleep(delay)
+                delay *= 2
+        return descriptor
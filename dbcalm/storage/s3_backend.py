@@ -0,0 +1,284 @@
+import json
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import BinaryIO, TypeVar
+
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.storage.s3_client import S3Client, S3Error
+from dbcalm.storage.storage_backend import (
+    StorageBackend,
+    StorageError,
+    StoredObject,
+)
+
+# S3 needs parts of at least 5 MiB (except the last) and allows 10000, the
+# default covers backups up to 640 GB, raise s3_part_size for larger ones
+MIN_PART_SIZE = 5 * 1024 * 1024  # bytes
+DEFAULT_PART_SIZE = 64 * 1024 * 1024  # bytes
+MAX_PARTS = 10000
+DEFAULT_UPLOAD_WORKERS = 4
+DEFAULT_RETRIES = 5
+RETRY_DELAY = 1.0  # seconds, doubled on every retry
+
+T = TypeVar("T")
+
+
+class S3Backend(StorageBackend):
+    """Streamed backups in an S3 compatible object store.
+
+    Streams are cut into parts of `part_size` and sent as a multipart
+    upload by `workers` threads, so reading the backup pipe and uploading
+    overlap and at most workers + 1 parts are held in memory. Failed parts
+    are retried with backoff. The upload id and finished parts are kept in
+    a state file below `state_dir`: uploads from a seekable source (a file)
+    that were interrupted continue where they stopped, uploads from a pipe
+    can't be rewound and are aborted instead.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: S3Client,
+        bucket: str,
+        prefix: str,
+        state_dir: str | Path,
+        *,
+        part_size: int = DEFAULT_PART_SIZE,
+        workers: int = DEFAULT_UPLOAD_WORKERS,
+        retries: int = DEFAULT_RETRIES,
+    ) -> None:
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.state_dir = Path(state_dir)
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.logger = logger_factory()
+
+    def upload(self, key: str, stream: BinaryIO) -> StoredObject:
+        object_key = self.prefix + key
+        first = stream.read(self.part_size)
+        state = self._load_state(key)
+        if len(first) < self.part_size and state is None:
+            # small enough for a single request
+            self._retry(
+                f"upload of {object_key}",
+                lambda: self.client.put_object(self.bucket, object_key, first),
+            )
+            return StoredObject(self.location(key), len(first))
+        return self._upload_parts(key, stream, first, state)
+
+    def download(self, location: str) -> Iterator[bytes]:
+        try:
+            yield from self.client.get_object(self.bucket, self._key(location))
+        except S3Error as e:
+            raise StorageError(str(e)) from e
+
+    def size(self, location: str) -> int | None:
+        try:
+            return self.client.head_object(self.bucket, self._key(location))
+        except S3Error as e:
+            raise StorageError(str(e)) from e
+
+    def delete(self, location: str) -> None:
+        try:
+            self.client.delete_object(self.bucket, self._key(location))
+        except S3Error as e:
+            raise StorageError(str(e)) from e
+
+    def location(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self.prefix}{key}"
+
+    def _upload_parts(
+        self,
+        key: str,
+        stream: BinaryIO,
+        first: bytes,
+        state: dict | None,
+    ) -> StoredObject:
+        object_key = self.prefix + key
+        resumable = stream.seekable()
+        done: dict[int, tuple[str, int]] = {}
+        if state is not None and resumable:
+            upload_id = state["upload_id"]
+            done = self._resume(object_key, upload_id, stream)
+            self.logger.info(
+                "Resuming upload of %s after %d parts",
+                object_key,
+                len(done),
+            )
+            first = stream.read(self.part_size)
+        else:
+            if state is not None:
+                self._abort(object_key, state["upload_id"])
+            upload_id = self._retry(
+                f"start of upload of {object_key}",
+                lambda: self.client.create_multipart_upload(self.bucket, object_key),
+            )
+            self._save_state(key, {"upload_id": upload_id})
+
+        number = len(done) + 1
+        size = sum(part_size for _, part_size in done.values())
+        pending: dict[Future, tuple[int, int]] = {}
+        pool = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="s3-upload",
+        )
+        try:
+            data = first
+            while data:
+                if number > MAX_PARTS:
+                    msg = (
+                        f"{object_key} needs more than {MAX_PARTS} parts, "
+                        "raise s3_part_size"
+                    )
+                    raise StorageError(msg)  # noqa: TRY301
+                future = pool.submit(
+                    self._upload_part,
+                    object_key,
+                    upload_id,
+                    number,
+                    data,
+                )
+                pending[future] = (number, len(data))
+                size += len(data)
+                number += 1
+                # keep at most workers parts in flight
+                if len(pending) >= self.workers:
+                    self._collect(pending, done, FIRST_COMPLETED)
+                data = stream.read(self.part_size)
+            self._collect(pending, done, ALL_COMPLETED)
+
+            self._retry(
+                f"completion of upload of {object_key}",
+                lambda: self.client.complete_multipart_upload(
+                    self.bucket,
+                    object_key,
+                    upload_id,
+                    {number: etag for number, (etag, _) in done.items()},
+                ),
+            )
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            if not resumable:
+                self._abort(object_key, upload_id)
+                self._remove_state(key)
+            raise
+        finally:
+            pool.shutdown(wait=True)
+        self._remove_state(key)
+        return StoredObject(self.location(key), size)
+
+    def _collect(
+        self,
+        pending: dict[Future, tuple[int, int]],
+        done: dict[int, tuple[str, int]],
+        return_when: str,
+    ) -> None:
+        finished, _ = wait(pending, return_when=return_when)
+        for future in finished:
+            number, size = pending.pop(future)
+            done[number] = (future.result(), size)
+
+    def _upload_part(
+        self,
+        object_key: str,
+        upload_id: str,
+        number: int,
+        data: bytes,
+    ) -> str:
+        return self._retry(
+            f"part {number} of {object_key}",
+            lambda: self.client.upload_part(
+                self.bucket,
+                object_key,
+                upload_id,
+                number,
+                data,
+            ),
+        )
+
+    def _resume(
+        self,
+        object_key: str,
+        upload_id: str,
+        stream: BinaryIO,
+    ) -> dict[int, tuple[str, int]]:
+        """Parts the store already has, stream is moved past them."""
+        uploaded = self._retry(
+            f"listing parts of {object_key}",
+            lambda: self.client.list_parts(self.bucket, object_key, upload_id),
+        )
+        done = {}
+        # only a gapless run from the first part can be skipped, parts are
+        # all part_size long except the last
+        for number in range(1, len(uploaded) + 1):
+            if number not in uploaded or uploaded[number][1] != self.part_size:
+                break
+            done[number] = uploaded[number]
+        stream.seek(len(done) * self.part_size)
+        return done
+
+    def _abort(self, object_key: str, upload_id: str) -> None:
+        try:
+            self.client.abort_multipart_upload(self.bucket, object_key, upload_id)
+        except S3Error:
+            self.logger.warning(
+                "Failed to abort upload %s of %s",
+                upload_id,
+                object_key,
+                exc_info=True,
+            )
+
+    def _retry(self, what: str, call: Callable[[], T]) -> T:
+        delay = RETRY_DELAY
+        for attempt in range(self.retries + 1):
+            try:
+                return call()
+            except S3Error as e:
+                if attempt == self.retries:
+                    msg = f"S3 {what} failed: {e}"
+                    raise StorageError(msg) from e
+                self.logger.warning(
+                    "S3 %s failed, retrying in %.0fs: %s",
+                    what,
+                    delay,
+                    e,
+                )
+                time.sleep(delay)
+                delay *= 2
+        msg = f"S3 {what} failed"
+        raise StorageError(msg)
+
+    def _key(self, location: str) -> str:
+        bucket_prefix = f"s3://{self.bucket}/"
+        if not location.startswith(bucket_prefix):
+            msg = f"{location} is not in bucket {self.bucket}"
+            raise StorageError(msg)
+        return location.removeprefix(bucket_prefix)
+
+    def _state_path(self, key: str) -> Path:
+        return self.state_dir / f"{key}.upload.json"
+
+    def _load_state(self, key: str) -> dict | None:
+        try:
+            with self._state_path(key).open() as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_state(self, key: str, state: dict) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        with self._state_path(key).open("w") as file:
+            json.dump(state, file)
+
+    def _remove_state(self, key: str) -> None:
+        self._state_path(key).unlink(missing_ok=True)
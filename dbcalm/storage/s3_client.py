@@ -0,0 +1,234 @@
+import hashlib
+import hmac
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from urllib.parse import quote
+from xml.etree import ElementTree as ET
+
+import requests
+
+from dbcalm.storage.storage_backend import READ_SIZE
+
+DEFAULT_REGION = "us-east-1"
+REQUEST_TIMEOUT = 300  # seconds, a part upload can take a while
+NOT_FOUND = 404
+# S3 answers with 2xx for success only
+SUCCESS_CODES = range(200, 300)
+
+
+class S3Error(Exception):
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class S3Client:
+    """The few S3 calls streamed uploads need, signed with AWS SigV4.
+
+    Uses path style URLs (`<endpoint>/<bucket>/<key>`) which AWS and the
+    S3 compatible stores (MinIO, Ceph RGW, Garage) all accept, and keeps
+    the dependency footprint at `requests`.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        region: str = DEFAULT_REGION,
+    ) -> None:
+        self.endpoint = endpoint.rstrip("/")
+        self.host = self.endpoint.split("://", 1)[-1]
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.session = requests.Session()
+
+    def create_multipart_upload(self, bucket: str, key: str) -> str:
+        response = self._request("POST", bucket, key, params={"uploads": ""})
+        return _find(_parse(response.content), "UploadId")
+
+    def upload_part(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        number: int,
+        data: bytes,
+    ) -> str:
+        """Upload one part, return its ETag."""
+        response = self._request(
+            "PUT",
+            bucket,
+            key,
+            params={"partNumber": str(number), "uploadId": upload_id},
+            data=data,
+        )
+        return response.headers["ETag"]
+
+    def complete_multipart_upload(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        parts: dict[int, str],
+    ) -> None:
+        body = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for number, etag in sorted(parts.items())
+        )
+        response = self._request(
+            "POST",
+            bucket,
+            key,
+            params={"uploadId": upload_id},
+            data=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+        )
+        # errors after the upload started come back as 200 with an Error body
+        if b"<Error>" in response.content:
+            msg = f"Completing upload of {key} failed: {response.text}"
+            raise S3Error(msg, response.status_code)
+
+    def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        self._request("DELETE", bucket, key, params={"uploadId": upload_id})
+
+    def list_parts(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+    ) -> dict[int, tuple[str, int]]:
+        """Parts already uploaded: number -> (etag, size)."""
+        parts = {}
+        marker = "0"
+        while True:
+            response = self._request(
+                "GET",
+                bucket,
+                key,
+                params={"uploadId": upload_id, "part-number-marker": marker},
+            )
+            root = _parse(response.content)
+            for part in _children(root, "Part"):
+                parts[int(_find(part, "PartNumber"))] = (
+                    _find(part, "ETag"),
+                    int(_find(part, "Size")),
+                )
+            if _find(root, "IsTruncated") != "true":
+                return parts
+            marker = _find(root, "NextPartNumberMarker")
+
+    def put_object(self, bucket: str, key: str, data: bytes) -> None:
+        self._request("PUT", bucket, key, data=data)
+
+    def head_object(self, bucket: str, key: str) -> int | None:
+        """Size of an object, None if it doesn't exist."""
+        try:
+            response = self._request("HEAD", bucket, key)
+        except S3Error as e:
+            if e.status == NOT_FOUND:
+                return None
+            raise
+        return int(response.headers["Content-Length"])
+
+    def get_object(self, bucket: str, key: str) -> Iterator[bytes]:
+        response = self._request("GET", bucket, key, stream=True)
+        with response:
+            yield from response.iter_content(READ_SIZE)
+
+    def delete_object(self, bucket: str, key: str) -> None:
+        self._request("DELETE", bucket, key)
+
+    def _request(  # noqa: PLR0913
+        self,
+        method: str,
+        bucket: str,
+        key: str,
+        *,
+        params: dict[str, str] | None = None,
+        data: bytes = b"",
+        stream: bool = False,
+    ) -> requests.Response:
+        path = "/" + quote(f"{bucket}/{key}", safe="/~")
+        query = "&".join(
+            f"{quote(name, safe='~')}={quote(value, safe='~')}"
+            for name, value in sorted((params or {}).items())
+        )
+        headers = self._sign(method, path, query, data)
+        url = self.endpoint + path + (f"?{query}" if query else "")
+        try:
+            response = self.session.request(
+                method,
+                url,
+                data=data or None,
+                headers=headers,
+                stream=stream,
+                timeout=REQUEST_TIMEOUT,
+            )
+        except requests.RequestException as e:
+            msg = f"{method} {bucket}/{key} failed: {e}"
+            raise S3Error(msg) from e
+        if response.status_code not in SUCCESS_CODES:
+            msg = f"{method} {bucket}/{key} failed: {response.status_code} "
+            msg += response.text[:500] if method != "HEAD" else ""
+            raise S3Error(msg, response.status_code)
+        return response
+
+    def _sign(self, method: str, path: str, query: str, data: bytes) -> dict:
+        moment = datetime.now(tz=UTC)
+        timestamp = moment.strftime("%Y%m%dT%H%M%SZ")
+        date = moment.strftime("%Y%m%d")
+        payload_hash = hashlib.sha256(data).hexdigest()
+        headers = {
+            "host": self.host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": timestamp,
+        }
+        signed_headers = ";".join(sorted(headers))
+        canonical_request = "\n".join(
+            [
+                method,
+                path,
+                query,
+                *(f"{name}:{headers[name]}" for name in sorted(headers)),
+                "",
+                signed_headers,
+                payload_hash,
+            ],
+        )
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                timestamp,
+                scope,
+                hashlib.sha256(canonical_request.encode()).hexdigest(),
+            ],
+        )
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return headers
+
+
+def _parse(content: bytes) -> ET.Element:
+    # responses of the store the config points at, not of arbitrary parties
+    return ET.fromstring(content)  # noqa: S314
+
+
+def _children(element: ET.Element, name: str) -> list:
+    # responses use the S3 namespace, match on the local name only
+    return [child for child in element if child.tag.rsplit("}", 1)[-1] == name]
+
+
+def _find(element: ET.Element, name: str) -> str:
+    children = _children(element, name)
+    if not children:
+        msg = f"S3 response has no {name}"
+        raise S3Error(msg)
+    return children[0].text or ""
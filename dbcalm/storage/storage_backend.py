@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import BinaryIO
+
+# Pieces streams are read and copied in
+READ_SIZE = 1024 * 1024  # bytes
+
+
+class StorageError(Exception):
+    """An upload, download or delete failed after all retries."""
+
+
+class StoredObject:
+    """Where an uploaded backup ended up."""
+
+    def __init__(self, location: str, size: int) -> None:
+        self.location = location
+        self.size = size
+
+
+class StorageBackend(ABC):
+    """Destination of streamed backups.
+
+    Objects are addressed by key, a file name like
+    `backup-<id>.xbstream.zst`. Backends turn keys into locations (a path
+    or URL) that are recorded on the Backup and that delete() and
+    download() accept back.
+    """
+
+    @abstractmethod
+    def upload(self, key: str, stream: BinaryIO) -> StoredObject:
+        """Store everything read from stream until EOF under key.
+
+        Nothing is visible under key until the upload completed.
+        """
+
+    @abstractmethod
+    def download(self, location: str) -> Iterator[bytes]:
+        """Read a stored object back in pieces."""
+
+    @abstractmethod
+    def size(self, location: str) -> int | None:
+        """Size of a stored object, None if it doesn't exist."""
+
+    @abstractmethod
+    def delete(self, location: str) -> None:
+        pass
+
+    @abstractmethod
+    def location(self, key: str) -> str:
+        pass
@@ -0,0 +1,56 @@
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.storage import remote_fs_backend, s3_backend
+from dbcalm.storage.local_backend import LocalBackend
+from dbcalm.storage.remote_fs_backend import RemoteFsBackend
+from dbcalm.storage.s3_backend import S3Backend
+from dbcalm.storage.s3_client import DEFAULT_REGION, S3Client
+from dbcalm.storage.storage_backend import StorageBackend
+
+
+def storage_backend_factory(config: Config | None = None) -> StorageBackend:
+    """Where streamed backups go, chosen by storage_backend."""
+    config = config if config is not None else config_factory()
+    backup_dir = config.value("backup_dir").rstrip("/")
+    backend = config.value("storage_backend", "local")
+    if backend == "local":
+        return LocalBackend(backup_dir)
+    if backend == "filesystem":
+        return RemoteFsBackend(
+            _required(config, "storage_path"),
+            retries=int(
+                config.value("storage_retries", remote_fs_backend.DEFAULT_RETRIES),
+            ),
+        )
+    if backend == "s3":
+        return S3Backend(
+            S3Client(
+                _required(config, "s3_endpoint"),
+                _required(config, "s3_access_key"),
+                _required(config, "s3_secret_key"),
+                config.value("s3_region", DEFAULT_REGION),
+            ),
+            _required(config, "s3_bucket"),
+            config.value("s3_prefix", ""),
+            # upload ids of interrupted uploads, to resume or abort them
+            f"{backup_dir}/uploads",
+            # configured in MB
+            part_size=int(float(config.value("s3_part_size", 0)) * 1024 * 1024)
+            or s3_backend.DEFAULT_PART_SIZE,
+            workers=int(
+                config.value("s3_upload_workers", s3_backend.DEFAULT_UPLOAD_WORKERS),
+            ),
+            retries=int(
+                config.value("storage_retries", s3_backend.DEFAULT_RETRIES),
+            ),
+        )
+    msg = f"Invalid storage_backend: {backend}. Supported: local, filesystem, s3"
+    raise ValueError(msg)
+
+
+def _required(config: Config, key: str) -> str:
+    value = config.value(key)
+    if not value:
+        msg = f"{key} is required for storage_backend {config.value('storage_backend')}"
+        raise ValueError(msg)
+    return value
@@ -0,0 +1,123 @@
+import re
+
+# schema or schema.table, * matches any part of a name
+PATTERN = re.compile(r"^[A-Za-z0-9_$*]+(\.[A-Za-z0-9_$*]+)?$")
+
+
+class BackupScope:
+    """Which tables a backup holds, from include and exclude patterns.
+
+    Patterns are `schema` (all its tables) or `schema.table`, `*` matches
+    any part of a name. Without include patterns every table is included,
+    exclude patterns are taken out of that. A backup with neither is a
+    backup of the whole instance, anything else is a partial backup: it
+    can be restored to a folder or by table and schema, not as the data
+    directory of a server.
+    """
+
+    def __init__(
+        self,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+    ) -> None:
+        self.include = normalize_patterns(include)
+        self.exclude = normalize_patterns(exclude)
+
+    @property
+    def partial(self) -> bool:
+        return self.include is not None or self.exclude is not None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BackupScope):
+            return NotImplemented
+        return (self.include, self.exclude) == (other.include, other.exclude)
+
+    def __hash__(self) -> int:
+        return hash((tuple(self.include or ()), tuple(self.exclude or ())))
+
+    def covers(self, schema: str, table: str | None = None) -> bool:
+        """Whether a table, or some table of a schema, is in the backup."""
+        if table is not None:
+            name = f"{schema}.{table}"
+            included = self.include is None or re.match(
+                pattern_regex(self.include),
+                name,
+            )
+            excluded = self.exclude is not None and re.match(
+                pattern_regex(self.exclude),
+                name,
+            )
+            return bool(included) and not excluded
+
+        included = self.include is None or any(
+            _schema_matches(pattern, schema) for pattern in self.include
+        )
+        # a schema counts as long as not all of it is excluded
+        excluded = any(
+            _schema_matches(pattern, schema)
+            for pattern in self.exclude or []
+            if "." not in pattern
+        )
+        return included and not excluded
+
+    def describe(self) -> str:
+        if not self.partial:
+            return "the whole instance"
+        described = ", ".join(self.include) if self.include else "every table"
+        if self.exclude is not None:
+            described += " without " + ", ".join(self.exclude)
+        return described
+
+
+def normalize_patterns(patterns: list[str] | None) -> list[str] | None:
+    """Checked, sorted and deduplicated patterns, None for none at all.
+
+    Raises:
+        ValueError: If a pattern isn't `schema` or `schema.table`
+    """
+    if not patterns:
+        return None
+    normalized = set()
+    for pattern in patterns:
+        pattern = pattern.strip()  # noqa: PLW2901
+        if not PATTERN.match(pattern):
+            msg = f"{pattern} is not a schema or schema.table pattern"
+            raise ValueError(msg)
+        normalized.add(pattern)
+    return sorted(normalized)
+
+
+def scope_args(
+    include: list[str] | None,
+    exclude: list[str] | None,
+) -> dict:
+    """Command arguments recording a scope, empty for the whole instance."""
+    args = {}
+    if include is not None:
+        args["include"] = include
+    if exclude is not None:
+        args["exclude"] = exclude
+    return args
+
+
+def pattern_regex(patterns: list[str]) -> str:
+    """Regex of the schema.table names the patterns match.
+
+    In the form the backup tools' --tables and --tables-exclude take.
+    """
+    alternatives = []
+    for pattern in patterns:
+        schema, _, table = pattern.partition(".")
+        alternatives.append(
+            _wildcard_regex(schema) + r"\." + _wildcard_regex(table or "*"),
+        )
+    return "^(" + "|".join(alternatives) + ")$"
+
+
+def _wildcard_regex(part: str) -> str:
+    return "[^.]*".join(re.escape(piece) for piece in part.split("*"))
+
+
+def _schema_matches(pattern: str, schema: str) -> bool:
+    schema_pattern = _wildcard_regex(pattern.partition(".")[0])
+    return re.fullmatch(schema_pattern, schema) is not None
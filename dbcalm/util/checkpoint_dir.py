@@ -0,0 +1,9 @@
+def checkpoint_dir(backup_dir: str, id: str) -> str:
+    """Folder the backup tool writes a backup's LSN checkpoints to.
+
+    Kept next to the backup (--extra-lsndir) so incrementals can be based
+    on streamed backups, which have no folder of their own to read them
+    from. It sits directly in backup_dir like backup folders, which is
+    where cleanup is allowed to delete.
+    """
+    return f"{backup_dir.rstrip('/')}/{id}.checkpoints"
@@ -0,0 +1,20 @@
+import os
+from pathlib import Path
+
+
+def folder_size(path: str | Path) -> int:
+    """Total size in bytes of the regular files below path.
+
+    Uses os.scandir, whose entries carry cached stat data on most
+    filesystems, and does not follow symlinks.
+    """
+    total = 0
+    stack = [str(path)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
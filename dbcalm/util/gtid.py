@@ -0,0 +1,49 @@
+import re
+
+# MariaDB domain-server-sequence, e.g. 0-1-1234
+MARIADB_GTID = re.compile(r"^(\d+)-(\d+)-(\d+)$")
+# MySQL source_uuid:transaction, e.g. 3e11fa47-71ca-11e1-9e33-c80aa9429562:23
+MYSQL_GTID = re.compile(r"^([0-9a-fA-F-]{36}):(\d+)$")
+
+
+def parse_gtid(gtid: str) -> tuple[str, int]:
+    """Split a single GTID into the stream it belongs to and its number.
+
+    The stream is the replication domain on MariaDB and the source uuid on
+    MySQL, numbers only compare within a stream.
+
+    Raises:
+        ValueError: If gtid is neither a MariaDB nor a MySQL GTID
+    """
+    gtid = gtid.strip()
+    match = MARIADB_GTID.match(gtid)
+    if match:
+        return match.group(1), int(match.group(3))
+    match = MYSQL_GTID.match(gtid)
+    if match:
+        return match.group(1).lower(), int(match.group(2))
+    msg = f"{gtid} is not a GTID"
+    raise ValueError(msg)
+
+
+def gtid_state_contains(state: str | None, gtid: str) -> bool:
+    """Whether a GTID state includes a transaction.
+
+    state is a gtid_binlog_pos (`0-1-100,1-1-5`, the last transaction of
+    each domain) or a gtid_executed set (`uuid:1-100:105,uuid2:1-3`).
+    """
+    stream, number = parse_gtid(gtid)
+    for part in (state or "").replace("\n", "").split(","):
+        match = MARIADB_GTID.match(part.strip())
+        if match:
+            if match.group(1) == stream:
+                return number <= int(match.group(3))
+            continue
+        source, _, intervals = part.strip().partition(":")
+        if source.lower() != stream:
+            continue
+        for interval in intervals.split(":"):
+            start, _, end = interval.partition("-")
+            if int(start) <= number <= int(end or start):
+                return True
+    return False
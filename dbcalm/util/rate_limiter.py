@@ -0,0 +1,44 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by the workers of one job.
+
+    `acquire(amount)` blocks until `amount` units (bytes, files, ...) fit in
+    the configured rate. A rate of 0 or less disables limiting. Requests
+    larger than the burst size are let through once the bucket is full and
+    push the bucket into debt, so a single large request can't deadlock.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, amount: float) -> float:
+        """Wait until `amount` can be spent and return the seconds waited."""
+        if not self.enabled or amount <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= min(amount, self.burst):
+                    self._tokens -= amount
+                    return waited
+                wait = (min(amount, self.burst) - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
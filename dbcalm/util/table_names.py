@@ -0,0 +1,20 @@
+import re
+
+# Names stored on disk as they are, others are encoded in file names
+# (e.g. @002d for -) and can't be matched against backup files
+PLAIN_NAME = re.compile(r"^[A-Za-z0-9_$]+$")
+
+
+def parse_table_name(name: str, *, schema_only: bool = False) -> tuple[str, str | None]:
+    """Split `schema.table` into its parts, or check a schema name.
+
+    Raises:
+        ValueError: If name isn't a plain schema.table (or schema) name
+    """
+    parts = name.strip().split(".")
+    expected = 1 if schema_only else 2
+    if len(parts) != expected or not all(PLAIN_NAME.match(part) for part in parts):
+        kind = "schema" if schema_only else "schema.table"
+        msg = f"{name} is not a {kind} name"
+        raise ValueError(msg)
+    return parts[0], None if schema_only else parts[1]
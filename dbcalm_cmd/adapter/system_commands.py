@@ -1,13 +1,20 @@
 import uuid
 from queue import Queue
 
+from dbcalm.config.config_factory import config_factory
 from dbcalm.data.model.process import Process
 from dbcalm.data.model.schedule import Schedule
 from dbcalm.logger.logger_factory import logger_factory
 from dbcalm.service.cron_file_builder import CronFileBuilder
+from dbcalm.util.rate_limiter import RateLimiter
 from dbcalm_cmd.adapter import adapter
+from dbcalm_cmd.cleanup.folder_deleter import FolderDeleter
 from dbcalm_cmd.process.runner import Runner
 
+# Defaults for retention cleanup, see cleanup_workers/cleanup_rate_limit
+DEFAULT_CLEANUP_WORKERS = 4
+DEFAULT_CLEANUP_RATE_LIMIT = 100  # MB/s, 0 disables the limit
+
 
 class SystemCommands(adapter.Adapter):
     def __init__(
@@ -16,6 +23,7 @@ class SystemCommands(adapter.Adapter):
         ) -> None:
         self.command_runner = command_runner
         self.logger = logger_factory()
+        self.config = config_factory()
         self.cron_file_builder = CronFileBuilder()
 
     def update_cron_schedules(self, schedules: list) -> tuple[Process, Queue]:
@@ -87,6 +95,11 @@ class SystemCommands(adapter.Adapter):
     ) -> tuple[Process, Queue]:
         """Delete multiple backup folders.
 
+        Folders are deleted in the background by a FolderDeleter with
+        `cleanup_workers` threads, throttled to `cleanup_rate_limit` MB/s so
+        the freed I/O doesn't stall the database sharing the disk. The
+        threads are the service's own, cgroup_limits can't apply to them.
+
         Args:
             backup_ids: List of backup IDs to delete (stored in process args)
             folders: List of folder paths to delete
@@ -94,12 +107,25 @@ class SystemCommands(adapter.Adapter):
         Returns:
             Tuple of (Process, Queue) for tracking execution
         """
-        # Build command to delete all folders in a single rm call
-        # This is more efficient than running separate commands
-        command = ["/bin/rm", "-rf", *folders]
+        workers = int(
+            self.config.value("cleanup_workers", DEFAULT_CLEANUP_WORKERS),
+        )
+        rate_limit = float(
+            self.config.value("cleanup_rate_limit", DEFAULT_CLEANUP_RATE_LIMIT),
+        )
+        deleter = FolderDeleter(
+            workers,
+            RateLimiter(rate_limit * 1024 * 1024),
+        )
 
-        return self.command_runner.execute(
-            command=command,
+        def task() -> tuple[int, str, str]:
+            deleted, errors = deleter.delete(folders)
+            output = f"Deleted {len(deleted)} of {len(folders)} backup folders"
+            return (1 if errors else 0), output, "\n".join(errors)
+
+        return self.command_runner.execute_task(
+            task,
+            command=f"cleanup_backups ({len(folders)} folders)",
             command_type="cleanup_backups",
             args={"backup_ids": backup_ids},
         )
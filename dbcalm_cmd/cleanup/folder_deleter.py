@@ -0,0 +1,90 @@
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.util.rate_limiter import RateLimiter
+
+# Large files are shrunk in steps of this size before they are unlinked so
+# the filesystem frees their extents gradually instead of in one burst
+TRUNCATE_STEP = 256 * 1024 * 1024  # bytes
+# Minimum I/O charged per file, unlinking many small tablespace files is
+# mostly metadata work that a pure byte count would not throttle
+MIN_FILE_COST = 64 * 1024  # bytes
+
+
+class FolderDeleter:
+    """Delete backup folders with bounded parallelism and an I/O rate limit.
+
+    Folders are handled one after another, the files inside a folder are
+    removed by a pool of `workers` threads that share one rate limiter.
+    Directories are removed bottom up once their files are gone.
+    """
+
+    def __init__(self, workers: int, rate_limiter: RateLimiter) -> None:
+        self.workers = max(1, workers)
+        self.rate_limiter = rate_limiter
+        self.logger = logger_factory()
+
+    def delete(self, folders: list[str]) -> tuple[list[str], list[str]]:
+        """Delete all folders.
+
+        Returns:
+            Tuple of (deleted folders, error messages for folders that
+            could not be fully deleted)
+        """
+        deleted = []
+        errors = []
+        with ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="cleanup",
+        ) as pool:
+            for folder in folders:
+                try:
+                    self.delete_folder(Path(folder), pool)
+                except OSError as e:
+                    self.logger.exception("Failed to delete %s", folder)
+                    errors.append(f"{folder}: {e}")
+                else:
+                    deleted.append(folder)
+        return deleted, errors
+
+    def delete_folder(self, folder: Path, pool: ThreadPoolExecutor) -> None:
+        if not folder.exists() and not folder.is_symlink():
+            return
+        if folder.is_symlink() or not folder.is_dir():
+            msg = f"{folder} is not a directory"
+            raise NotADirectoryError(msg)
+
+        directories = []
+        files = []
+        for root, dirnames, filenames in os.walk(folder):
+            directories.append(root)
+            files.extend(Path(root, name) for name in filenames)
+            # symlinks to directories are listed but not followed, unlink them
+            files.extend(
+                Path(root, name)
+                for name in dirnames
+                if Path(root, name).is_symlink()
+            )
+
+        # list() re-raises the first error from the workers
+        list(pool.map(self.remove_file, files))
+
+        for directory in reversed(directories):
+            Path(directory).rmdir()
+
+    def remove_file(self, path: Path) -> None:
+        info = path.lstat()
+        if stat.S_ISREG(info.st_mode) and info.st_size > TRUNCATE_STEP:
+            with path.open("r+b") as file:
+                size = info.st_size
+                while size > TRUNCATE_STEP:
+                    size -= TRUNCATE_STEP
+                    self.rate_limiter.acquire(TRUNCATE_STEP)
+                    file.truncate(size)
+            self.rate_limiter.acquire(max(size, MIN_FILE_COST))
+        else:
+            self.rate_limiter.acquire(max(info.st_size, MIN_FILE_COST))
+        path.unlink()
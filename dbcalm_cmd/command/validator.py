@@ -1,4 +1,8 @@
 
+from pathlib import Path
+
+from dbcalm.config.config_factory import config_factory
+
 VALID_REQUEST = 200
 INVALID_REQUEST = 400
 
@@ -194,7 +198,23 @@ class Validator:
 
         return VALID_REQUEST, ""
 
-    def validate(self, command_data: dict) -> tuple[int, str]:
+    def validate_cleanup_folders(self, folders: list) -> tuple[int, str]:
+        """Only allow deleting backup folders directly inside backup_dir."""
+        if not isinstance(folders, list):
+            return INVALID_REQUEST, "folders must be a list"
+
+        backup_dir = Path(config_factory().value("backup_dir")).resolve()
+        for folder in folders:
+            path = Path(str(folder))
+            if not path.is_absolute() or path.resolve().parent != backup_dir:
+                return (
+                    INVALID_REQUEST,
+                    f"Folder {folder} is not a backup folder in {backup_dir}",
+                )
+
+        return VALID_REQUEST, ""
+
+    def validate(self, command_data: dict) -> tuple[int, str]:  # noqa: PLR0911
         if command_data["cmd"] not in self.commands:
             return INVALID_REQUEST, "Invalid command"
 
@@ -219,4 +239,7 @@ class Validator:
                 if status != VALID_REQUEST:
                     return status, f"Schedule at index {idx}: {message}"
 
+        if command_data["cmd"] == "cleanup_backups":
+            return self.validate_cleanup_folders(command_data["args"]["folders"])
+
         return VALID_REQUEST, ""
@@ -0,0 +1,249 @@
+import itertools
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.logger.logger_factory import logger_factory
+
+CGROUP_MOUNT = Path("/sys/fs/cgroup")
+# A cgroup with children can't hold processes itself, the service's own
+# processes move into this leaf
+SERVICE_LEAF = "service"
+CONTROLLERS = ("cpu", "cpuset", "io", "memory")
+# cpu.max period, cpu_quota is a share of it
+CPU_PERIOD = 100000  # microseconds
+# Shell joining a cgroup, then running the command in its place
+JOIN_SCRIPT = 'echo $$ > "$0" && exec "$@"'
+
+# The job cgroup the current thread's task runs its commands in
+current_cgroup: ContextVar["JobCgroup | None"] = ContextVar(
+    "current_cgroup",
+    default=None,
+)
+
+
+class CgroupError(Exception):
+    """The cgroup tree can't be used for jobs."""
+
+
+@contextmanager
+def job_cgroup(cgroup: "JobCgroup | None") -> Iterator[None]:
+    """Run the commands started inside the block in cgroup."""
+    token = current_cgroup.set(cgroup)
+    try:
+        yield
+    finally:
+        current_cgroup.reset(token)
+
+
+def in_current_cgroup(command: list[str]) -> list[str]:
+    """command, joining the cgroup of the current task first if it has one.
+
+    For commands a task starts itself rather than through run_sequence.
+    """
+    cgroup = current_cgroup.get()
+    return cgroup.wrap(command) if cgroup is not None else command
+
+
+def block_device(device: str) -> str:
+    """major:minor of a device, a partition's disk for a partition.
+
+    io.max only limits whole disks.
+    """
+    if not device.startswith("/"):
+        return device
+    rdev = Path(device).stat().st_rdev
+    number = f"{os.major(rdev)}:{os.minor(rdev)}"
+    sys_dev = Path(f"/sys/dev/block/{number}")
+    if (sys_dev / "partition").exists():
+        return (sys_dev.resolve().parent / "dev").read_text().strip()
+    return number
+
+
+def limit_settings(limits: dict) -> list[tuple[str, str]]:
+    """cgroup interface files and the values to write for a job type."""
+    settings = []
+    if limits.get("io_weight") is not None:
+        settings.append(("io.weight", f"default {int(limits['io_weight'])}"))
+    io_max = limits.get("io_max") or []
+    for line in [io_max] if isinstance(io_max, str) else io_max:
+        device, *values = line.split()
+        settings.append(("io.max", " ".join([block_device(device), *values])))
+    if limits.get("cpu_quota") is not None:
+        share = float(str(limits["cpu_quota"]).rstrip("%")) / 100
+        settings.append(("cpu.max", f"{int(share * CPU_PERIOD)} {CPU_PERIOD}"))
+    if limits.get("memory_max") is not None:
+        settings.append(("memory.max", str(limits["memory_max"])))
+    if limits.get("cpus") is not None:
+        settings.append(("cpuset.cpus", str(limits["cpus"])))
+    return settings
+
+
+def enable_controllers(cgroup: Path) -> None:
+    """Let the children of cgroup use every controller it has."""
+    available = (cgroup / "cgroup.controllers").read_text().split()
+    enabled = [name for name in CONTROLLERS if name in available]
+    if enabled:
+        (cgroup / "cgroup.subtree_control").write_text(
+            " ".join(f"+{name}" for name in enabled),
+        )
+
+
+class JobCgroup:
+    """A transient cgroup running the commands of one job."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.logger = logger_factory()
+
+    def wrap(self, command: list[str]) -> list[str]:
+        """Command joining this cgroup before it starts.
+
+        The shell execs the command, so it keeps the pid the runner records
+        and its children start inside the cgroup too.
+        """
+        return [
+            "/bin/sh", "-c", JOIN_SCRIPT,
+            str(self.path / "cgroup.procs"),
+            *command,
+        ]
+
+    def freeze(self, frozen: bool) -> None:  # noqa: FBT001
+        """Stop or resume every process of the job."""
+        (self.path / "cgroup.freeze").write_text("1" if frozen else "0")
+
+    def usage(self) -> dict:
+        """CPU, IO and memory used by the job's processes."""
+        usage = {}
+        cpu = self._stat("cpu.stat")
+        if cpu:
+            usage["cpu_seconds"] = round(cpu.get("usage_usec", 0) / 1e6, 3)
+            usage["cpu_throttled_seconds"] = round(
+                cpu.get("throttled_usec", 0) / 1e6,
+                3,
+            )
+        io = self._io_stat()
+        if io is not None:
+            usage["read_bytes"], usage["write_bytes"] = io
+        peak = self.path / "memory.peak"
+        if peak.exists():
+            usage["memory_peak_bytes"] = int(peak.read_text())
+        return usage
+
+    def release(self) -> dict:
+        """Usage of the finished job, then remove its cgroup."""
+        try:
+            usage = self.usage()
+        except (OSError, ValueError):
+            self.logger.exception("Could not read usage of %s", self.path)
+            usage = {}
+        try:
+            self.path.rmdir()
+        except OSError as e:
+            # processes the job left behind keep it alive
+            self.logger.warning("Could not remove cgroup %s: %s", self.path, e)
+        return usage
+
+    def _stat(self, name: str) -> dict[str, int]:
+        path = self.path / name
+        if not path.exists():
+            return {}
+        return {
+            key: int(value)
+            for key, value in (
+                line.split() for line in path.read_text().splitlines() if line
+            )
+        }
+
+    def _io_stat(self) -> tuple[int, int] | None:
+        path = self.path / "io.stat"
+        if not path.exists():
+            return None
+        read = written = 0
+        for line in path.read_text().splitlines():
+            fields = dict(
+                field.split("=", 1) for field in line.split()[1:] if "=" in field
+            )
+            read += int(fields.get("rbytes", 0))
+            written += int(fields.get("wbytes", 0))
+        return read, written
+
+
+class JobCgroups:
+    """Transient cgroups isolating backup, restore and cleanup commands.
+
+    With `cgroup` enabled every command the runner starts runs in a cgroup
+    of its own below one per job type, the type's cgroup carries the limits
+    of `cgroup_limits` for all its jobs together. The tree is the service's
+    own cgroup, which systemd hands over with Delegate=yes, or cgroup_root.
+    Without a usable tree jobs run unconfined, backups don't fail over it.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.logger = logger_factory()
+        self.enabled = bool(config.value("cgroup", False))  # noqa: FBT003
+        self.limits = config.value("cgroup_limits") or {}
+        root = config.value("cgroup_root")
+        self.root = Path(root) if root is not None else None
+        self._prepared = False
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def create(self, job_type: str, command_id: str) -> JobCgroup | None:
+        """Cgroup for a new job of job_type, None when jobs run unconfined."""
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                root = self.prepare()
+                type_cgroup = root / job_type
+                # kept from an earlier start of the service
+                type_cgroup.mkdir(exist_ok=True)
+                enable_controllers(type_cgroup)
+                # written for every job, they may have been changed by hand
+                for name, value in limit_settings(
+                    self.limits.get(job_type) or {},
+                ):
+                    (type_cgroup / name).write_text(value)
+                leaf = type_cgroup / f"{command_id}-{next(self._sequence)}"
+                leaf.mkdir()
+        except (OSError, ValueError, CgroupError) as e:
+            self.logger.warning("Running %s job without a cgroup: %s", job_type, e)
+            return None
+        return JobCgroup(leaf)
+
+    def prepare(self) -> Path:
+        """Root of the job cgroups, set up on first use."""
+        if self.root is None:
+            self.root = self.own_cgroup()
+        if not self._prepared:
+            leaf = self.root / SERVICE_LEAF
+            leaf.mkdir(exist_ok=True)
+            for pid in (self.root / "cgroup.procs").read_text().split():
+                (leaf / "cgroup.procs").write_text(pid)
+            enable_controllers(self.root)
+            self._prepared = True
+        return self.root
+
+    @staticmethod
+    def own_cgroup() -> Path:
+        """cgroup v2 directory of this process, without the service leaf."""
+        for line in Path("/proc/self/cgroup").read_text().splitlines():
+            hierarchy, _controllers, path = line.split(":", 2)
+            if hierarchy == "0":
+                cgroup = CGROUP_MOUNT / path.lstrip("/")
+                return cgroup.parent if cgroup.name == SERVICE_LEAF else cgroup
+        msg = "no cgroup v2 hierarchy, /sys/fs/cgroup has to be cgroup2"
+        raise CgroupError(msg)
+
+
+@cache
+def job_cgroups() -> JobCgroups:
+    """The job cgroups shared by every runner of the command service."""
+    return JobCgroups(config_factory())
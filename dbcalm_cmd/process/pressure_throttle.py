@@ -0,0 +1,330 @@
+import contextlib
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Protocol
+
+from dbcalm.config.config import Config
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm_cmd.process.job_cgroups import CGROUP_MOUNT, JobCgroup
+
+PRESSURE_DIR = Path("/proc/pressure")
+# cgroups of the database server's systemd unit, the first that exists is
+# watched unless throttle_server_cgroup names one
+SERVER_CGROUPS = (
+    "system.slice/mariadb.service",
+    "system.slice/mysql.service",
+    "system.slice/mysqld.service",
+)
+# Percent of time some tasks stalled on a resource that throttles jobs
+DEFAULT_IO_PRESSURE = 10
+DEFAULT_CPU_PRESSURE = 40
+DEFAULT_THROTTLE_INTERVAL = 1  # seconds
+# Share of every interval a throttled job still runs, so it always finishes
+DEFAULT_MIN_DUTY = 0.25
+# Running share regained per interval without pressure, halved with it
+DUTY_STEP = 0.1
+# How often a paused job checks whether it holds up the server
+BLOCKING_CHECK = 0.1  # seconds
+
+
+class LoadProbe(Protocol):
+    """Load of something the jobs compete with, 1.0 at its limit."""
+
+    def __call__(self) -> float: ...
+
+    def blocking(self) -> bool:
+        """True while sessions wait on a lock a job may hold."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class PressureGauge:
+    """Stall time from a pressure file, between two samples.
+
+    Either a host-wide /proc/pressure file or the io.pressure and
+    cpu.pressure of a cgroup. The total stall counter is used rather than
+    avg10, it follows the pauses of a throttled job within one interval.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._last = self._read()
+
+    def sample(self) -> float:
+        """Percent of the time since the last sample some tasks stalled."""
+        current = self._read()
+        last, self._last = self._last, current
+        if current is None or last is None or current[1] <= last[1]:
+            return 0.0
+        return 100 * (current[0] - last[0]) / ((current[1] - last[1]) * 1e6)
+
+    def _read(self) -> tuple[int, float] | None:
+        try:
+            text = self.path.read_text()
+        except OSError:
+            return None
+        for line in text.splitlines():
+            kind, *fields = line.split()
+            if kind == "some":
+                values = dict(field.split("=", 1) for field in fields)
+                return int(values["total"]), time.monotonic()
+        return None
+
+
+class ResourcePressure:
+    """Stalls the database server suffers on a resource.
+
+    Read from the server's cgroup. Without one the host's stalls are used,
+    less those of the job's own cgroup, so a backup doesn't throttle
+    itself for its own IO.
+    """
+
+    def __init__(
+            self,
+            resource: str,
+            server_cgroup: Path | None,
+            job_cgroup: JobCgroup | None,
+            pressure_dir: Path = PRESSURE_DIR,
+        ) -> None:
+        self.own = None
+        if server_cgroup is not None:
+            self.gauge = PressureGauge(server_cgroup / f"{resource}.pressure")
+            return
+        self.gauge = PressureGauge(pressure_dir / resource)
+        if job_cgroup is not None:
+            self.own = PressureGauge(job_cgroup.path / f"{resource}.pressure")
+
+    def sample(self) -> float:
+        """Percent of the time since the last sample the server stalled."""
+        stalled = self.gauge.sample()
+        if self.own is not None:
+            stalled = max(0.0, stalled - self.own.sample())
+        return stalled
+
+
+class ThrottledJob:
+    """Duty cycle of one job's commands, shortened while the server is loaded.
+
+    Every interval the job runs for its duty share and is paused for the
+    rest. The duty is halved while any load is above its limit and grows
+    back by DUTY_STEP while none is. A job is never paused while sessions
+    of the server wait on a lock, it may be the one holding it (the backup
+    lock mariabackup takes at the end), and a paused job is resumed as
+    soon as they do.
+    """
+
+    def __init__(
+            self,
+            throttle: "PressureThrottle",
+            pid: int,
+            cgroup: JobCgroup | None,
+        ) -> None:
+        self.throttle = throttle
+        self.pid = pid
+        self.cgroup = cgroup
+        self.logger = logger_factory()
+        self.pressures = {
+            resource: ResourcePressure(
+                resource,
+                throttle.server_cgroup,
+                cgroup,
+                throttle.pressure_dir,
+            )
+            for resource in throttle.limits
+        }
+        self.duty = 1.0
+        self.throttled_seconds = 0.0
+        self.io_bytes = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        for probe in self.throttle.probes:
+            probe.close()
+
+    def metrics(self, usage: dict, seconds: float) -> dict:
+        """Time paused and the rate data moved at, paused time included."""
+        io_bytes = (
+            usage["read_bytes"] + usage["write_bytes"]
+            if "read_bytes" in usage else self.io_bytes
+        )
+        return {
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "throughput_mb_s": round(io_bytes / 1024 / 1024 / max(seconds, 0.001), 3),
+        }
+
+    def load(self) -> float:
+        """The highest load relative to its limit."""
+        loads = [
+            pressure.sample() / self.throttle.limits[resource]
+            for resource, pressure in self.pressures.items()
+        ]
+        loads.extend(probe() for probe in self.throttle.probes)
+        return max(loads, default=0.0)
+
+    def blocking(self) -> bool:
+        """True while the server waits on a lock the job may hold."""
+        return any(probe.blocking() for probe in self.throttle.probes)
+
+    def _run(self) -> None:
+        interval = self.throttle.interval
+        try:
+            while not self._stopped.is_set():
+                self._sample_io()
+                if self.blocking():
+                    # full speed through the lock, its load isn't ours to shed
+                    self.duty = 1.0
+                elif self.load() > 1:
+                    self.duty = max(self.throttle.min_duty, self.duty / 2)
+                else:
+                    self.duty = min(1.0, self.duty + DUTY_STEP)
+                if self._stopped.wait(self.duty * interval):
+                    return
+                if self.duty < 1:
+                    self._pause((1 - self.duty) * interval)
+        except OSError:
+            # the job keeps running at full speed
+            self.logger.exception("Throttling process %d stopped", self.pid)
+
+    def _pause(self, seconds: float) -> None:
+        if self.blocking():
+            return
+        self._signal(frozen=True)
+        paused = time.monotonic()
+        try:
+            until = paused + seconds
+            while not self._stopped.wait(
+                min(BLOCKING_CHECK, max(until - time.monotonic(), 0)),
+            ):
+                if time.monotonic() >= until or self.blocking():
+                    break
+        finally:
+            self._signal(frozen=False)
+            self.throttled_seconds += time.monotonic() - paused
+
+    def _signal(self, frozen: bool) -> None:  # noqa: FBT001
+        if self.cgroup is not None:
+            self.cgroup.freeze(frozen)
+            return
+        number = signal.SIGSTOP if frozen else signal.SIGCONT
+        for pid in process_tree(self.pid):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, number)
+
+    def _sample_io(self) -> None:
+        # read by the job cgroup's accounting instead when there is one
+        if self.cgroup is not None:
+            return
+        with contextlib.suppress(OSError, ValueError):
+            fields = dict(
+                line.split(": ", 1)
+                for line in Path(f"/proc/{self.pid}/io").read_text().splitlines()
+            )
+            self.io_bytes = int(fields["read_bytes"]) + int(fields["write_bytes"])
+
+
+def process_tree(pid: int) -> list[int]:
+    """pid and its descendants, parents first."""
+    pids = [pid]
+    for parent in pids:
+        for task in Path(f"/proc/{parent}/task").glob("*"):
+            with contextlib.suppress(OSError):
+                pids.extend(
+                    int(child) for child in (task / "children").read_text().split()
+                )
+    return pids
+
+
+class PressureThrottle:
+    """Slows backups down while the host's IO or CPU is under pressure.
+
+    With `throttle` enabled the commands of the job types in
+    `throttle_job_types` are duty cycled (see ThrottledJob) whenever the
+    pressure stall information of the database server's cgroup goes above
+    `throttle_io_pressure` or `throttle_cpu_pressure` percent, or a load
+    probe of the command service goes above its limit. Jobs with a cgroup
+    are frozen through it, others are stopped with SIGSTOP and SIGCONT.
+    Tasks, which run their commands from the service's own process, are
+    only throttled through their cgroup.
+    """
+
+    def __init__(
+            self,
+            config: Config,
+            probes: list[LoadProbe] | None = None,
+            pressure_dir: Path = PRESSURE_DIR,
+        ) -> None:
+        self.enabled = bool(config.value("throttle", False))  # noqa: FBT003
+        self.job_types = config.value("throttle_job_types", ["backup"])
+        self.limits = {
+            "io": float(config.value("throttle_io_pressure", DEFAULT_IO_PRESSURE)),
+            "cpu": float(
+                config.value("throttle_cpu_pressure", DEFAULT_CPU_PRESSURE),
+            ),
+        }
+        self.interval = float(
+            config.value("throttle_interval", DEFAULT_THROTTLE_INTERVAL),
+        )
+        self.min_duty = float(config.value("throttle_min_duty", DEFAULT_MIN_DUTY))
+        self.probes = probes or []
+        self.pressure_dir = pressure_dir
+        self.logger = logger_factory()
+        self.server_cgroup = server_cgroup(config) if self.enabled else None
+
+    def watch(
+            self,
+            job_type: str,
+            pid: int,
+            cgroup: JobCgroup | None,
+        ) -> ThrottledJob | None:
+        """Start throttling a running job, None for jobs left alone."""
+        if not self.enabled or job_type not in self.job_types:
+            return None
+        job = ThrottledJob(self, pid, cgroup)
+        job.start()
+        return job
+
+    def watch_task(
+            self,
+            job_type: str,
+            cgroup: JobCgroup | None,
+        ) -> ThrottledJob | None:
+        """Start throttling the commands a task runs in cgroup.
+
+        Without a cgroup there is nothing to pause, stopping the task's
+        process would stop the service.
+        """
+        if not self.enabled or job_type not in self.job_types:
+            return None
+        if cgroup is None:
+            self.logger.warning(
+                "%s job runs without a cgroup and can't be throttled",
+                job_type,
+            )
+            return None
+        return self.watch(job_type, os.getpid(), cgroup)
+
+
+def server_cgroup(config: Config) -> Path | None:
+    """cgroup of the database server, None if it can't be found."""
+    configured = config.value("throttle_server_cgroup")
+    candidates = [configured] if configured is not None else SERVER_CGROUPS
+    for candidate in candidates:
+        path = CGROUP_MOUNT / candidate
+        if (path / "io.pressure").exists():
+            return path
+    logger_factory().warning(
+        "No pressure of the database server's cgroup in %s, throttling on "
+        "host pressure less the backup's own",
+        ", ".join(str(CGROUP_MOUNT / candidate) for candidate in candidates),
+    )
+    return None
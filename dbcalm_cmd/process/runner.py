@@ -3,15 +3,24 @@ import subprocess
 import sys
 import threading
 import uuid
+from collections.abc import Callable
 from datetime import UTC, datetime
 from queue import Queue
 
+from dbcalm.config.config_factory import config_factory
 from dbcalm.data.adapter.adapter_factory import (
     adapter_factory as data_adapter_factory,
 )
 from dbcalm.data.model.process import Process
 from dbcalm.data.repository.process import ProcessRepository
+from dbcalm.logger.correlation import correlation, correlation_id
 from dbcalm.logger.logger_factory import logger_factory
+from dbcalm_cmd.process.job_cgroups import (
+    in_current_cgroup,
+    job_cgroup,
+    job_cgroups,
+)
+from dbcalm_cmd.process.pressure_throttle import LoadProbe, PressureThrottle
 
 
 def get_clean_env_for_system_binaries() -> dict[str, str]:
@@ -34,9 +43,12 @@ def get_clean_env_for_system_binaries() -> dict[str, str]:
 
 
 class Runner:
-    def __init__(self) -> None:
+    def __init__(self, load_probes: list[LoadProbe] | None = None) -> None:
+        """load_probes add the load of the database to the host's pressure."""
         self.data_adapter = data_adapter_factory()
         self.logger = logger_factory()
+        self.cgroups = job_cgroups()
+        self.throttle = PressureThrottle(config_factory(), load_probes)
 
     def create_process(  # noqa: PLR0913
             self, pid: int,
@@ -102,18 +114,20 @@ class Runner:
         if args is None:
             args = {}
         start_time = datetime.now(tz=UTC)
+        if command_id is None:
+            command_id = self.generate_command_id()
 
-        self.logger.info("Executing command: %s", " ".join(command))
+        with correlation(command_id):
+            self.logger.info("Executing command: %s", " ".join(command))
+        cgroup = self.cgroups.create(command_type, command_id)
         process = subprocess.Popen(  # noqa: S603
-            command,
+            cgroup.wrap(command) if cgroup is not None else command,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
             env=get_clean_env_for_system_binaries(),
         )
-
-        if command_id is None:
-            command_id = self.generate_command_id()
+        throttled = self.throttle.watch(command_type, process.pid, cgroup)
 
         process_model = self.create_process(
             pid=process.pid,
@@ -127,20 +141,144 @@ class Runner:
             queue = Queue()
 
         def capture_output() -> None:
-            stdout, stderr = process.communicate()
-            end_time = datetime.now(tz=UTC)
-            self.update_process(
-                process_model,
-                end_time,
-                stdout,
-                stderr,
-                process.returncode,
-            )
+            with correlation(command_id):
+                stdout, stderr = process.communicate()
+                end_time = datetime.now(tz=UTC)
+                if throttled is not None:
+                    throttled.stop()
+                metrics = cgroup.release() if cgroup is not None else {}
+                if throttled is not None:
+                    metrics |= throttled.metrics(
+                        metrics,
+                        (end_time - start_time).total_seconds(),
+                    )
+                if metrics:
+                    process_model.metrics = metrics
+                self.update_process(
+                    process_model,
+                    end_time,
+                    stdout,
+                    stderr,
+                    process.returncode,
+                )
             queue.put(process_model)
 
         threading.Thread(target=capture_output, daemon=False).start()
         return process_model, queue
 
+    def execute_task(  # noqa: PLR0913
+            self,
+            task: Callable[..., tuple[int, str, str]],
+            command: str,
+            command_type: str,
+            args: dict | None=None,
+            *,
+            progress: bool = False,
+            metrics: dict | None=None,
+        ) -> tuple[Process, Queue]:
+        """Run a Python callable in the background and track it as a process.
+
+        Used for work the service does itself instead of through an external
+        binary. The task returns (returncode, stdout, stderr) and the process
+        record gets the pid of the service. With progress the task is called
+        with a report(message) callable that stores message as the output of
+        the running process, for clients polling its status. What the task
+        puts into metrics is stored on the process record when it ends, with
+        the resources used by the commands it ran through run_sequence.
+        """
+        if args is None:
+            args = {}
+        start_time = datetime.now(tz=UTC)
+        command_id = self.generate_command_id()
+
+        with correlation(command_id):
+            self.logger.info("Executing task: %s", command)
+        process_model = self.create_process(
+            pid=os.getpid(),
+            command=command,
+            command_id=command_id,
+            start_time=start_time,
+            command_type=command_type,
+            args=args,
+        )
+        queue = Queue()
+        report_lock = threading.Lock()
+        cgroup = self.cgroups.create(command_type, command_id)
+        throttled = self.throttle.watch_task(command_type, cgroup)
+
+        def report(message: str) -> None:
+            # tasks may report from worker threads
+            with report_lock:
+                process_model.output = message
+                self.data_adapter.update(process_model)
+
+        def run_task() -> None:
+            with correlation(command_id), job_cgroup(cgroup):
+                try:
+                    returncode, stdout, stderr = (
+                        task(report) if progress else task()
+                    )
+                except Exception as e:
+                    self.logger.exception("Task %s failed", command)
+                    returncode, stdout, stderr = 1, "", str(e)
+                end_time = datetime.now(tz=UTC)
+                if throttled is not None:
+                    throttled.stop()
+                usage = cgroup.release() if cgroup is not None else {}
+                if throttled is not None:
+                    usage |= throttled.metrics(
+                        usage,
+                        (end_time - start_time).total_seconds(),
+                    )
+                if metrics or usage:
+                    process_model.metrics = {**(metrics or {}), **usage}
+                self.update_process(
+                    process_model,
+                    end_time,
+                    stdout,
+                    stderr,
+                    returncode,
+                )
+            queue.put(process_model)
+
+        threading.Thread(target=run_task, daemon=False).start()
+        return process_model, queue
+
+    def run_sequence(self, commands: list[list[str]]) -> tuple[int, str, str]:
+        """Run commands one after another inside a task, stop at a failure.
+
+        They run in the cgroup of the task, if it has one.
+
+        Returns:
+            Tuple of (returncode, output, error) of the commands that ran
+        """
+        stdout, stderr = [], []
+        for index, command in enumerate(commands, 1):
+            self.logger.debug(
+                "Starting command %d of %d: %s",
+                index,
+                len(commands),
+                command,
+            )
+            result = subprocess.run(  # noqa: S603
+                in_current_cgroup(command),
+                capture_output=True,
+                text=True,
+                check=False,
+                env=get_clean_env_for_system_binaries(),
+            )
+            stdout.append(result.stdout)
+            stderr.append(result.stderr)
+            if result.returncode != 0:
+                self.logger.error(
+                    "Command %d failed: %s with return code %d",
+                    index,
+                    " ".join(command),
+                    result.returncode,
+                )
+                return result.returncode, "".join(stdout), "".join(stderr)
+        return 0, "".join(stdout), "".join(stderr)
+
     def run_commands(  # noqa: PLR0913
             self,
             commands: list[list[str]],
@@ -150,6 +288,8 @@ class Runner:
             master_queue: Queue | None=None,
             has_one_queue: Queue | None=None,
         ) -> None:
+            # runs in its own thread, tag everything it logs with the command
+            correlation_id.set(command_id)
             local_queue = Queue()
             finished_processes = []
             try:
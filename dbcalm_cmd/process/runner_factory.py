@@ -1,5 +1,6 @@
+from dbcalm_cmd.process.pressure_throttle import LoadProbe
 from dbcalm_cmd.process.runner import Runner
 
 
-def runner_factory() -> Runner:
-    return Runner()
+def runner_factory(load_probes: list[LoadProbe] | None = None) -> Runner:
+    return Runner(load_probes)
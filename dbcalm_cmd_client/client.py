@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import contextlib
 import json
 import socket
 import time
@@ -53,7 +54,7 @@ class Client:
             r, _, _ = select([sock], [], [], 0.2)
             data = None
             if r:
-                data = sock.recv(16)
+                data = sock.recv(4096)
             if r and data:
                 all_data += data
             elif(len(all_data)):
@@ -74,6 +75,50 @@ class Client:
         sock.sendall(
             json.dumps(message).encode("utf-8"),
         )
+        # signal the end of the request so the server doesn't have to wait
+        sock.shutdown(socket.SHUT_WR)
         response = self.response(sock)
         sock.close()
         return json.loads(response)
+
+    async def command_async(self, cmd: str, args: dict) -> dict:
+        """Send a command without blocking the event loop.
+
+        Same protocol and timeout as command(), for use in async routes.
+        """
+        # asyncio is only needed by the API, the CLI should not import it
+        import asyncio  # noqa: PLC0415
+
+        server_address = Config.CMD_SOCKET_PATH
+        try:
+            reader, writer = await asyncio.open_unix_connection(server_address)
+        except OSError:
+            self.logger.exception("error connecting to socket %s", server_address)
+            return {"code": 500, "status": "Error connecting to command socket"}
+
+        try:
+            writer.write(json.dumps({"cmd": cmd, "args": args}).encode("utf-8"))
+            # signal the end of the request so the server doesn't have to wait
+            writer.write_eof()
+            await writer.drain()
+            # the server closes the connection after sending its response
+            response = await asyncio.wait_for(reader.read(), self.timeout)
+        except TimeoutError:
+            self.logger.warning(
+                "Socket response timed out after %s seconds",
+                self.timeout,
+            )
+            return {
+                "code": 503,
+                "status": "Service unavailable - command timed out",
+            }
+        finally:
+            writer.close()
+            # also on timeout and cancellation, or the transport is left for
+            # the garbage collector to close
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+
+        if not response:
+            return {"code": 500, "status": "Empty response from command socket"}
+        return json.loads(response)
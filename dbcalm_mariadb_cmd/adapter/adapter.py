@@ -1,8 +1,32 @@
 
+import shutil
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from queue import Queue
 
 from dbcalm.data.data_types.enum_types import RestoreTarget
 from dbcalm.data.model.process import Process
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.backup_manifest import BackupManifestRepository
+from dbcalm.service.backup_verifier_factory import backup_verifier_factory
+from dbcalm.storage.dedup_store import RepositoryError
+from dbcalm.storage.dedup_store_factory import dedup_store_factory
+from dbcalm.storage.storage_backend import StorageError
+from dbcalm.storage.storage_backend_factory import storage_backend_factory
+from dbcalm.util.get_tmp_dir import get_tmp_dir
+from dbcalm_mariadb_cmd.binlog.binlog_replayer import BinlogReplayer, ReplayError
+from dbcalm_mariadb_cmd.partial.tablespace_importer import (
+    TablespaceImporter,
+    TablespaceImportError,
+)
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+from dbcalm_mariadb_cmd.restore_test.restore_tester import RestoreTester
+from dbcalm_mariadb_cmd.snapshot.volume import SnapshotError, volume_factory
+from dbcalm_mariadb_cmd.stream.backup_streamer import BackupStreamer
+from dbcalm_mariadb_cmd.stream.chain_stager import ChainStager
+from dbcalm_mariadb_cmd.stream.stream_extractor import StreamExtractError
 
 
 class Adapter(ABC):
@@ -11,7 +35,13 @@ class Adapter(ABC):
         self.default_stream_compression = "gzip"
 
     @abstractmethod
-    def full_backup(self, id: str, schedule_id: int | None = None) -> Process:
+    def full_backup(
+        self,
+        id: str,
+        schedule_id: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+    ) -> Process:
         pass
 
     @abstractmethod
@@ -20,10 +50,339 @@ class Adapter(ABC):
         id: str,
         from_backup_id: str,
         schedule_id: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
     ) -> Process:
         pass
 
     @abstractmethod
-    def restore_backup(self, id_list: list, target: RestoreTarget) -> Process:
+    def restore_backup(
+        self,
+        id_list: list,
+        target: RestoreTarget,
+        until_time: str | None = None,
+        until_gtid: str | None = None,
+        tables: list[str] | None = None,
+    ) -> Process:
         pass
 
+    def stream_backup(self, command: list, args: dict) -> tuple[Process, Queue]:
+        """Run a streaming backup command and upload its output.
+
+        The location is known up front and recorded in the process args,
+        the backup record picks it up from there.
+        """
+        key = self.command_builder.stream_key(args["id"])
+        backend = storage_backend_factory(self.config)
+        streamer = BackupStreamer(backend)
+        compress_cmd = self.command_builder.compress_cmd()
+        return self.command_runner.execute_task(
+            lambda: streamer.run(key, command, compress_cmd),
+            command=" ".join(command),
+            command_type="backup",
+            args={**args, "storage_location": backend.location(key)},
+        )
+
+    def verify_backup(self, id: str) -> tuple[Process, Queue]:
+        """Check a backup folder against the manifest made when it completed.
+
+        Same for every server type, subclasses provide command_runner and
+        config. Backups in the dedup repository are read back from it. The
+        result is stored on the manifest, missing and corrupt files are
+        listed in the process error.
+        """
+        backup_dir = self.config.value("backup_dir").rstrip("/")
+
+        def task() -> tuple[int, str, str]:
+            repository = BackupManifestRepository()
+            manifest = repository.get(id)
+            if manifest is None:
+                return 1, "", f"Backup {id} has no manifest"
+
+            verifier = backup_verifier_factory()
+            store = dedup_store_factory()
+            if store is not None and store.has(id):
+                result = verifier.verify_stored(store, id, manifest.files)
+            else:
+                result = verifier.verify(f"{backup_dir}/{id}", manifest.files)
+            manifest.verified_at = datetime.now(tz=UTC)
+            manifest.verify_status = "ok" if result.ok else "failed"
+            repository.update(manifest)
+
+            output = (
+                f"Verified {result.checked} of {len(manifest.files)} files: "
+                f"{len(result.missing)} missing, {len(result.corrupt)} corrupt"
+            )
+            return (0 if result.ok else 1), output, "\n".join(result.problems())
+
+        return self.command_runner.execute_task(
+            task,
+            command=f"verify_backup {id}",
+            command_type="verify_backup",
+            args={"id": id},
+        )
+
+    def test_restore(
+        self,
+        id: str,
+        id_list: list[str],
+        schedule_id: int | None = None,
+    ) -> tuple[Process, Queue]:
+        """Restore a backup chain into a scratch folder and discard it again.
+
+        id_list is the chain ending in backup id, filled in by the resolver.
+        """
+        tester = RestoreTester(self.command_builder, self.config)
+        args = {"id": id, "id_list": id_list}
+        if schedule_id is not None:
+            args["schedule_id"] = schedule_id
+
+        return self.command_runner.execute_task(
+            lambda: tester.run(id_list, schedule_id),
+            command=f"test_restore {id}",
+            command_type="test_restore",
+            args=args,
+        )
+
+    def restore_staged(
+        self,
+        id_list: list,
+        target: RestoreTarget,
+        restore_dir: str,
+    ) -> tuple[Process, Queue]:
+        """Restore a chain with streamed or deduplicated members.
+
+        The chain is unpacked to a staging folder first (see ChainStager),
+        the usual restore commands then read it from there.
+        """
+        backup_dir = self.config.value("backup_dir").rstrip("/")
+        stager = ChainStager(self.command_builder, self.config)
+
+        def task() -> tuple[int, str, str]:
+            source_dir = get_tmp_dir(backup_dir, "staging")
+            try:
+                stager.stage(id_list, source_dir)
+                return self.command_runner.run_sequence(
+                    self.command_builder.build_restore_cmds(
+                        restore_dir,
+                        id_list,
+                        target,
+                        source_dir,
+                    ),
+                )
+            except (StreamExtractError, StorageError, RepositoryError, OSError) as e:
+                return 1, "", f"Staging backups failed: {e}"
+            finally:
+                shutil.rmtree(source_dir, ignore_errors=True)
+
+        return self.command_runner.execute_task(
+            task,
+            command=f"restore_backup {' '.join(id_list)}",
+            command_type="restore",
+            args={"id_list": id_list, "target": target, "tmp_dir": restore_dir},
+        )
+
+    def restore_to_point(
+        self,
+        id_list: list,
+        target: RestoreTarget,
+        restore_dir: str,
+        until_time: str | None,
+        until_gtid: str | None,
+    ) -> tuple[Process, Queue]:
+        """Restore a chain and replay archived binary logs on top of it.
+
+        The chain is prepared like a folder restore, rolled forward by the
+        BinlogReplayer and only then copied back for database restores.
+        The restore time grows with the replayed window, not with a longer
+        chain of incrementals.
+        """
+        backup_dir = self.config.value("backup_dir").rstrip("/")
+        stager = ChainStager(self.command_builder, self.config)
+        replayer = BinlogReplayer(self.config)
+        until = datetime.fromisoformat(until_time) if until_time else None
+
+        def task(report: Callable[[str], None]) -> tuple[int, str, str]:
+            source_dir = None
+            try:
+                if stager.required(id_list):
+                    report(f"Staging {len(id_list)} backups")
+                    source_dir = get_tmp_dir(backup_dir, "staging")
+                    stager.stage(id_list, source_dir)
+                report(f"Preparing {len(id_list)} backups")
+                returncode, output, error = self.command_runner.run_sequence(
+                    self.command_builder.build_restore_cmds(
+                        restore_dir,
+                        id_list,
+                        RestoreTarget.FOLDER,
+                        source_dir,
+                    ),
+                )
+                if returncode != 0:
+                    return returncode, output, error
+
+                prepared = f"{restore_dir}/{id_list[0]}"
+                summary = replayer.replay(
+                    Path(prepared),
+                    Path(restore_dir) / "replay",
+                    until,
+                    until_gtid,
+                    report,
+                )
+                if target == RestoreTarget.DATABASE:
+                    report("Copying the restored data back")
+                    returncode, output, error = self.command_runner.run_sequence(
+                        [self.command_builder.build_copy_back_cmd(prepared)],
+                    )
+                    if returncode != 0:
+                        return returncode, output, error
+            except (
+                ReplayError,
+                StreamExtractError,
+                StorageError,
+                RepositoryError,
+                OSError,
+            ) as e:
+                return 1, "", f"Restore to a point in time failed: {e}"
+            finally:
+                if source_dir is not None:
+                    shutil.rmtree(source_dir, ignore_errors=True)
+            return 0, summary, ""
+
+        args = {"id_list": id_list, "target": target, "tmp_dir": restore_dir}
+        if until_time is not None:
+            args["until_time"] = until_time
+        if until_gtid is not None:
+            args["until_gtid"] = until_gtid
+        return self.command_runner.execute_task(
+            task,
+            command=f"restore_backup {' '.join(id_list)}",
+            command_type="restore",
+            args=args,
+            progress=True,
+        )
+
+    def restore_tables(
+        self,
+        id_list: list,
+        target: RestoreTarget,
+        restore_dir: str,
+        tables: list[str],
+    ) -> tuple[Process, Queue]:
+        """Restore single tables or schemas into the running server.
+
+        Only the files of the selected tables (and what preparing needs)
+        are staged from the chain, streams included, prepared with --export
+        and imported by the TablespaceImporter. The time taken grows with
+        the restored tables rather than with the whole instance.
+        """
+        backup_dir = self.config.value("backup_dir").rstrip("/")
+        stager = ChainStager(self.command_builder, self.config)
+        importer = TablespaceImporter(self.config)
+        selection = TablespaceSelection.for_target(target, tables)
+
+        def task(report: Callable[[str], None]) -> tuple[int, str, str]:
+            source_dir = get_tmp_dir(backup_dir, "staging")
+            try:
+                report(f"Staging the tables from {len(id_list)} backups")
+                stager.stage(id_list, source_dir, selection)
+                report(f"Preparing {len(id_list)} backups")
+                returncode, output, error = self.command_runner.run_sequence(
+                    self.command_builder.build_restore_cmds(
+                        restore_dir,
+                        id_list,
+                        target,
+                        source_dir,
+                    ),
+                )
+                if returncode != 0:
+                    return returncode, output, error
+                summary = importer.run(
+                    Path(restore_dir) / id_list[0],
+                    selection,
+                    report,
+                )
+            except (
+                TablespaceImportError,
+                StreamExtractError,
+                StorageError,
+                RepositoryError,
+                OSError,
+            ) as e:
+                return 1, "", f"Restoring tables failed: {e}"
+            finally:
+                shutil.rmtree(source_dir, ignore_errors=True)
+            return 0, summary, ""
+
+        return self.command_runner.execute_task(
+            task,
+            command=f"restore_backup {' '.join(id_list)}",
+            command_type="restore",
+            args={
+                "id_list": id_list,
+                "target": target,
+                "tmp_dir": restore_dir,
+                "tables": tables,
+            },
+            progress=True,
+        )
+
+    def gc_repository(self) -> tuple[Process, Queue]:
+        """Drop data of deleted backups from the dedup repository."""
+        store = dedup_store_factory()
+
+        def task() -> tuple[int, str, str]:
+            if store is None:
+                return 0, "Backups are not kept in a dedup repository", ""
+            stats = store.gc(BackupRepository().ids())
+            return 0, (
+                f"Removed {stats['snapshots']} snapshots and {stats['chunks']} "
+                f"chunks, freed {stats['freed']} bytes"
+            ), ""
+
+        return self.command_runner.execute_task(
+            task,
+            command="gc_repository",
+            command_type="gc_repository",
+        )
+
+    def drop_snapshots(self, snapshots: list[str]) -> tuple[Process, Queue]:
+        """Remove the volume snapshots kept by deleted snapshot backups."""
+
+        def task() -> tuple[int, str, str]:
+            try:
+                volume = volume_factory(self.config)
+            except SnapshotError as e:
+                return 1, "", str(e)
+            dropped, failed = 0, []
+            for name in snapshots:
+                try:
+                    if volume.exists(name):
+                        volume.remove(name)
+                        dropped += 1
+                except SnapshotError as e:
+                    failed.append(str(e))
+            output = f"Dropped {dropped} of {len(snapshots)} snapshots"
+            return (1 if failed else 0), output, "\n".join(failed)
+
+        return self.command_runner.execute_task(
+            task,
+            command="drop_snapshots",
+            command_type="drop_snapshots",
+            args={"snapshots": snapshots},
+        )
+
+    def backup_source(
+        self,
+        backup_id: str,
+        work_dir: str,
+        report: Callable[[str], None] | None = None,
+    ) -> Path:
+        """Folder holding a backup, written below work_dir when staged."""
+        stager = ChainStager(self.command_builder, self.config)
+        if not stager.required([backup_id]):
+            return Path(self.config.value("backup_dir").rstrip("/")) / backup_id
+        if report is not None:
+            report(f"Staging backup {backup_id}")
+        stager.stage([backup_id], work_dir)
+        return Path(work_dir) / backup_id
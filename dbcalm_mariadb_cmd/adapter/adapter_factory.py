@@ -1,11 +1,18 @@
 from dbcalm.config.config_factory import config_factory
+from dbcalm.data.data_types.enum_types import BackupEngine
 from dbcalm_mariadb_cmd.adapter.adapter import Adapter
+from dbcalm_mariadb_cmd.adapter.logical_factory import logical_factory
 from dbcalm_mariadb_cmd.adapter.mariadb_factory import mariadb_factory
 from dbcalm_mariadb_cmd.adapter.mysql_factory import mysql_factory
+from dbcalm_mariadb_cmd.adapter.snapshot_factory import snapshot_factory
 
 
-def adapter_factory() -> Adapter:
+def adapter_factory(engine: str | None = None) -> Adapter:
     config = config_factory()
+    if engine == BackupEngine.LOGICAL:
+        return logical_factory(config)
+    if engine == BackupEngine.SNAPSHOT:
+        return snapshot_factory(config)
     db_type = config.value("db_type")
     if db_type == "mariadb":
         return mariadb_factory(config)
@@ -0,0 +1,184 @@
+import shutil
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from queue import Queue
+
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.data_types.enum_types import BackupEngine, RestoreTarget
+from dbcalm.data.model.process import Process
+from dbcalm.data.model.restore_test import RestoreTest
+from dbcalm.data.repository.restore_test import RestoreTestRepository
+from dbcalm.storage.dedup_store import RepositoryError
+from dbcalm.util.backup_scope import BackupScope, scope_args
+from dbcalm.util.get_tmp_dir import get_tmp_dir
+from dbcalm_cmd.process.runner import Runner
+from dbcalm_mariadb_cmd.adapter import adapter
+from dbcalm_mariadb_cmd.builder.backup_cmd_builder import BackupCommandBuilder
+from dbcalm_mariadb_cmd.logical.logical_dumper import DumpError, LogicalDumper
+from dbcalm_mariadb_cmd.logical.logical_loader import LoadError, LogicalLoader
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+
+
+class Logical(adapter.Adapter):
+    """Logical backups: parallel SQL dumps loaded back into a running server.
+
+    Works the same for MariaDB and MySQL and across server versions, for
+    moving data between them and for schemas small enough that dumping
+    beats copying the data files. Dumps are always full backups, they
+    restore into the running server (database, table and schema targets)
+    or as the dump files into a folder, never to a point in time. The
+    command builder of the server type is only used to stage backups kept
+    in the dedup repository.
+    """
+
+    def __init__(
+            self,
+            command_builder: BackupCommandBuilder,
+            command_runner: Runner,
+        ) -> None:
+        self.command_builder = command_builder
+        self.command_runner = command_runner
+        self.config = config_factory()
+        self.backup_dir = self.config.value("backup_dir").rstrip("/")
+
+    def full_backup(
+        self,
+        id: str,
+        schedule_id: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+    ) -> tuple[Process, Queue]:
+        dumper = LogicalDumper(self.config)
+        scope = BackupScope(include, exclude)
+        metrics = {}
+
+        def task(report: Callable[[str], None]) -> tuple[int, str, str]:
+            try:
+                summary = dumper.dump(
+                    Path(self.backup_dir) / id,
+                    scope,
+                    report,
+                )
+            except (DumpError, OSError) as e:
+                return 1, "", f"Logical backup failed: {e}"
+            finally:
+                if dumper.lock_seconds is not None:
+                    metrics["lock_seconds"] = dumper.lock_seconds
+            return 0, summary, ""
+
+        args = {"id": id, "engine": BackupEngine.LOGICAL.value}
+        if schedule_id is not None:
+            args["schedule_id"] = schedule_id
+        args |= scope_args(include, exclude)
+        return self.command_runner.execute_task(
+            task,
+            command=f"logical_backup {id}",
+            command_type="backup",
+            args=args,
+            progress=True,
+            metrics=metrics,
+        )
+
+    def incremental_backup(
+        self,
+        id: str,
+        from_backup_id: str,  # noqa: ARG002
+        schedule_id: int | None = None,  # noqa: ARG002
+        include: list[str] | None = None,  # noqa: ARG002
+        exclude: list[str] | None = None,  # noqa: ARG002
+    ) -> tuple[Process, Queue]:
+        # refused by the validator already
+        msg = f"Logical backups are always full backups, not {id}"
+        raise ValueError(msg)
+
+    def restore_backup(
+        self,
+        id_list: list,
+        target: RestoreTarget,
+        # points in time are refused by the validator
+        until_time: str | None = None,  # noqa: ARG002
+        until_gtid: str | None = None,  # noqa: ARG002
+        tables: list[str] | None = None,
+    ) -> tuple[Process, Queue]:
+        # Use 'restores' folder for folder restores, 'tmp' for the others
+        subdirectory = "restores" if target == RestoreTarget.FOLDER else "tmp"
+        restore_dir = get_tmp_dir(self.backup_dir, subdirectory)
+        backup_id = id_list[-1]
+        loader = LogicalLoader(self.config)
+        selection = (
+            TablespaceSelection.for_target(target, tables or [])
+            if target in (RestoreTarget.TABLE, RestoreTarget.SCHEMA)
+            else None
+        )
+
+        def task(report: Callable[[str], None]) -> tuple[int, str, str]:
+            try:
+                source = self.backup_source(backup_id, restore_dir, report)
+                if target == RestoreTarget.FOLDER:
+                    if source.parent != Path(restore_dir):
+                        shutil.copytree(source, Path(restore_dir) / backup_id)
+                    return 0, f"Dump files of {backup_id} in {restore_dir}", ""
+                summary = loader.load(source, selection, report)
+            except (LoadError, RepositoryError, OSError) as e:
+                return 1, "", f"Logical restore failed: {e}"
+            return 0, summary, ""
+
+        args = {"id_list": id_list, "target": target, "tmp_dir": restore_dir}
+        if tables is not None:
+            args["tables"] = tables
+        return self.command_runner.execute_task(
+            task,
+            command=f"logical_restore {backup_id}",
+            command_type="restore",
+            args=args,
+            progress=True,
+        )
+
+    def test_restore(
+        self,
+        id: str,
+        id_list: list[str],
+        schedule_id: int | None = None,
+    ) -> tuple[Process, Queue]:
+        """Stage a dump and check every chunk against its checksum.
+
+        Loading it would change the running server, so the test stops at
+        reading back all the data a restore would load.
+        """
+        loader = LogicalLoader(self.config)
+
+        def task() -> tuple[int, str, str]:
+            restore_test = RestoreTest(
+                schedule_id=schedule_id,
+                backup_id=id,
+                chain_length=1,
+                start_time=datetime.now(tz=UTC),
+                status="failed",
+            )
+            scratch = get_tmp_dir(self.backup_dir, "restore-tests")
+            output = ""
+            try:
+                started = time.monotonic()
+                output = loader.check(self.backup_source(id, scratch))
+                restore_test.restore_seconds = time.monotonic() - started
+                restore_test.status = "success"
+            except (LoadError, RepositoryError, OSError) as e:
+                restore_test.message = str(e)
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+                restore_test.end_time = datetime.now(tz=UTC)
+                RestoreTestRepository().create(restore_test)
+            returncode = 0 if restore_test.status == "success" else 1
+            return returncode, output, restore_test.message or ""
+
+        args = {"id": id, "id_list": id_list}
+        if schedule_id is not None:
+            args["schedule_id"] = schedule_id
+        return self.command_runner.execute_task(
+            task,
+            command=f"test_restore {id}",
+            command_type="test_restore",
+            args=args,
+        )
@@ -1,10 +1,12 @@
 from dbcalm.config.config_factory import config_factory
 from dbcalm.data.data_types.enum_types import RestoreTarget
 from dbcalm.data.model.process import Process
+from dbcalm.util.backup_scope import scope_args
 from dbcalm.util.get_tmp_dir import get_tmp_dir
 from dbcalm_cmd.process.runner import Runner
 from dbcalm_mariadb_cmd.adapter import adapter
 from dbcalm_mariadb_cmd.builder.backup_cmd_builder import BackupCommandBuilder
+from dbcalm_mariadb_cmd.stream.chain_stager import ChainStager
 
 
 class Mariadb(adapter.Adapter):
@@ -17,11 +19,20 @@ class Mariadb(adapter.Adapter):
         self.command_runner = command_runner
         self.config = config_factory()
 
-    def full_backup(self, id: str, schedule_id: int | None = None) -> Process:
-        command = self.command_builder.build_full_backup_cmd(id)
+    def full_backup(
+        self,
+        id: str,
+        schedule_id: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+    ) -> Process:
+        command = self.command_builder.build_full_backup_cmd(id, include, exclude)
         args = {"id": id}
         if schedule_id is not None:
             args["schedule_id"] = schedule_id
+        args |= scope_args(include, exclude)
+        if self.command_builder.streaming:
+            return self.stream_backup(command, args)
         return self.command_runner.execute(
             command=command,
             command_type="backup",
@@ -33,25 +44,54 @@ class Mariadb(adapter.Adapter):
         id: str,
         from_backup_id: str,
         schedule_id: int | None = None,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
     ) -> Process:
         command = self.command_builder.build_incremental_backup_cmd(
             id,
             from_backup_id,
+            include,
+            exclude,
         )
         args = {"id": id, "from_backup_id": from_backup_id}
         if schedule_id is not None:
             args["schedule_id"] = schedule_id
+        args |= scope_args(include, exclude)
+        if self.command_builder.streaming:
+            return self.stream_backup(command, args)
         return self.command_runner.execute(
             command=command,
             command_type="backup",
             args=args,
         )
 
-    def restore_backup(self, id_list: list, target: RestoreTarget) -> Process:
+    def restore_backup(
+        self,
+        id_list: list,
+        target: RestoreTarget,
+        until_time: str | None = None,
+        until_gtid: str | None = None,
+        tables: list[str] | None = None,
+    ) -> Process:
         # Use 'restores' folder for folder restores, 'tmp' for database restores
         subdirectory = "restores" if target == RestoreTarget.FOLDER else "tmp"
         restore_dir = get_tmp_dir(self.config.value("backup_dir"), subdirectory)
 
+        if target in (RestoreTarget.TABLE, RestoreTarget.SCHEMA):
+            return self.restore_tables(id_list, target, restore_dir, tables or [])
+
+        if until_time is not None or until_gtid is not None:
+            return self.restore_to_point(
+                id_list,
+                target,
+                restore_dir,
+                until_time,
+                until_gtid,
+            )
+
+        if ChainStager(self.command_builder, self.config).required(id_list):
+            return self.restore_staged(id_list, target, restore_dir)
+
         commands = self.command_builder.build_restore_cmds(
             restore_dir,
             id_list,
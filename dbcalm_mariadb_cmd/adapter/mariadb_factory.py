@@ -8,12 +8,13 @@ from dbcalm_mariadb_cmd.adapter.mariadb import Mariadb
 from dbcalm_mariadb_cmd.builder.mariadb_backup_cmd_builder_factory import (
     mariadb_backup_cmd_builder_factory,
 )
+from dbcalm_mariadb_cmd.capability.server_load import server_load_probes
 
 
 def mariadb_factory(config: Config) -> Mariadb:
     return Mariadb(
         Annotated[mariadb_backup_cmd_builder_factory, Depends()](config),
-        Annotated[runner_factory, Depends()](),
+        Annotated[runner_factory, Depends()](server_load_probes(config)),
     )
 
 
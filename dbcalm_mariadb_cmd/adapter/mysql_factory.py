@@ -8,6 +8,7 @@ from dbcalm_mariadb_cmd.adapter.mysql import Mysql
 from dbcalm_mariadb_cmd.builder.mysql_backup_cmd_builder_factory import (
     mysql_backup_cmd_builder_factory,
 )
+from dbcalm_mariadb_cmd.capability.server_load import server_load_probes
 
 
 def mysql_factory(config: Config) -> Mysql:
@@ -21,5 +22,5 @@ def mysql_factory(config: Config) -> Mysql:
     """
     return Mysql(
         Annotated[mysql_backup_cmd_builder_factory, Depends()](config),
-        Annotated[runner_factory, Depends()](),
+        Annotated[runner_factory, Depends()](server_load_probes(config)),
     )
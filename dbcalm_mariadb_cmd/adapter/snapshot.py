@@ -0,0 +1,265 @@
+import contextlib
+import shutil
+import time
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from queue import Queue
+
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.data_types.enum_types import BackupEngine, RestoreTarget
+from dbcalm.data.model.process import Process
+from dbcalm.data.model.restore_test import RestoreTest
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.restore_test import RestoreTestRepository
+from dbcalm.storage.dedup_store import RepositoryError
+from dbcalm.util.get_tmp_dir import get_tmp_dir
+from dbcalm_cmd.process.runner import Runner
+from dbcalm_mariadb_cmd.adapter import adapter
+from dbcalm_mariadb_cmd.builder.backup_cmd_builder import BackupCommandBuilder
+from dbcalm_mariadb_cmd.logical.client_session import ClientError
+from dbcalm_mariadb_cmd.restore_test.restore_tester import (
+    RestoreTester,
+    RestoreTestError,
+)
+from dbcalm_mariadb_cmd.snapshot.snapshot_taker import SNAPSHOT_FILE, SnapshotTaker
+from dbcalm_mariadb_cmd.snapshot.volume import (
+    DEFAULT_DATA_DIR,
+    SnapshotError,
+    snapshot_name,
+    volume_factory,
+)
+
+# Runtime files of the running server, not part of its data
+IGNORED_FILES = shutil.ignore_patterns(SNAPSHOT_FILE, "*.sock", "*.pid")
+
+
+class Snapshot(adapter.Adapter):
+    """Backups from LVM, ZFS or btrfs snapshots of the data directory.
+
+    Commits are blocked just long enough to take the snapshot (see
+    SnapshotTaker), the data files are then copied from it into the
+    backup folder while the server takes writes and the snapshot is
+    removed. With `snapshot_keep` the snapshot itself is the backup,
+    the folder only describes it and retention drops the snapshot with
+    the backup. Restores copy the files back, the server recovers them
+    on startup like after a crash. Always full backups of the whole
+    instance. The command builder of the server type is only used to
+    stage backups kept in the dedup repository.
+    """
+
+    def __init__(
+            self,
+            command_builder: BackupCommandBuilder,
+            command_runner: Runner,
+        ) -> None:
+        self.command_builder = command_builder
+        self.command_runner = command_runner
+        self.config = config_factory()
+        self.backup_dir = self.config.value("backup_dir").rstrip("/")
+        self.keep = bool(self.config.value("snapshot_keep", False))  # noqa: FBT003
+
+    def full_backup(
+        self,
+        id: str,
+        schedule_id: int | None = None,
+        include: list[str] | None = None,  # noqa: ARG002
+        exclude: list[str] | None = None,  # noqa: ARG002
+    ) -> tuple[Process, Queue]:
+        # include and exclude are refused by the validator
+        name = snapshot_name(id)
+        metrics = {}
+
+        def task(report: Callable[[str], None]) -> tuple[int, str, str]:
+            target = Path(self.backup_dir) / id
+            try:
+                volume = volume_factory(self.config)
+                taken = SnapshotTaker(self.config, volume).take(name)
+            except (SnapshotError, ClientError) as e:
+                return 1, "", f"Snapshot backup failed: {e}"
+            metrics["lock_seconds"] = taken.lock_seconds
+            output = [(
+                f"Snapshot {name} taken, commits blocked for "
+                f"{taken.lock_seconds:.3f}s"
+            )]
+            report(output[0])
+            drop = not self.keep
+            try:
+                target.mkdir(parents=True)
+                if not self.keep:
+                    with volume.mounted(name) as root:
+                        output.append(
+                            copy_data(volume.data_files(root), target, report),
+                        )
+                taken.write(target, self.config.value("snapshot_type"), self.keep)
+            except (SnapshotError, OSError) as e:
+                # a failed backup keeps nothing
+                drop = True
+                return 1, "\n".join(output), f"Snapshot backup failed: {e}"
+            finally:
+                if drop:
+                    try:
+                        volume.remove(name)
+                    except SnapshotError as e:
+                        output.append(f"Snapshot {name} not removed: {e}")
+            return 0, "\n".join(output), ""
+
+        args = {"id": id, "engine": BackupEngine.SNAPSHOT.value}
+        if schedule_id is not None:
+            args["schedule_id"] = schedule_id
+        if self.keep:
+            args["snapshot"] = name
+        return self.command_runner.execute_task(
+            task,
+            command=f"snapshot_backup {id}",
+            command_type="backup",
+            args=args,
+            progress=True,
+            metrics=metrics,
+        )
+
+    def incremental_backup(
+        self,
+        id: str,
+        from_backup_id: str,  # noqa: ARG002
+        schedule_id: int | None = None,  # noqa: ARG002
+        include: list[str] | None = None,  # noqa: ARG002
+        exclude: list[str] | None = None,  # noqa: ARG002
+    ) -> tuple[Process, Queue]:
+        # refused by the validator already
+        msg = f"Snapshot backups are always full backups, not {id}"
+        raise ValueError(msg)
+
+    def restore_backup(
+        self,
+        id_list: list,
+        target: RestoreTarget,
+        # points in time, tables and schemas are refused by the validator
+        until_time: str | None = None,  # noqa: ARG002
+        until_gtid: str | None = None,  # noqa: ARG002
+        tables: list[str] | None = None,  # noqa: ARG002
+    ) -> tuple[Process, Queue]:
+        # Use 'restores' folder for folder restores, 'tmp' for the others
+        subdirectory = "restores" if target == RestoreTarget.FOLDER else "tmp"
+        restore_dir = get_tmp_dir(self.backup_dir, subdirectory)
+        backup_id = id_list[-1]
+        destination = (
+            Path(restore_dir) / backup_id
+            if target == RestoreTarget.FOLDER
+            else Path(self.config.value("data_dir", DEFAULT_DATA_DIR))
+        )
+
+        def task(report: Callable[[str], None]) -> tuple[int, str, str]:
+            try:
+                with self.data_files(backup_id, restore_dir, report) as source:
+                    output = copy_data(source, destination, report)
+            except (SnapshotError, RepositoryError, OSError) as e:
+                return 1, "", f"Snapshot restore failed: {e}"
+            return 0, f"{output} to {destination}", ""
+
+        return self.command_runner.execute_task(
+            task,
+            command=f"snapshot_restore {backup_id}",
+            command_type="restore",
+            args={"id_list": id_list, "target": target, "tmp_dir": restore_dir},
+            progress=True,
+        )
+
+    def test_restore(
+        self,
+        id: str,
+        id_list: list[str],
+        schedule_id: int | None = None,
+    ) -> tuple[Process, Queue]:
+        """Copy a snapshot backup into a scratch folder and start a server on it.
+
+        With `test_restore_sanity_check` the throwaway server runs crash
+        recovery on the copy, the same a restored server does.
+        """
+        tester = RestoreTester(self.command_builder, self.config)
+
+        def task() -> tuple[int, str, str]:
+            restore_test = RestoreTest(
+                schedule_id=schedule_id,
+                backup_id=id,
+                chain_length=1,
+                start_time=datetime.now(tz=UTC),
+                status="failed",
+            )
+            output = []
+            scratch = tester.scratch_dir()
+            try:
+                started = time.monotonic()
+                with self.data_files(id, str(scratch / "source")) as source:
+                    output.append(copy_data(source, scratch / id))
+                restore_test.restore_seconds = time.monotonic() - started
+                if tester.sanity_check:
+                    restore_test.startup_seconds, result = tester.check_server(
+                        scratch / id,
+                        scratch,
+                    )
+                    output.append(
+                        f"Server started in {restore_test.startup_seconds:.1f}s, "
+                        f"{tester.query}: {result}",
+                    )
+                restore_test.status = "success"
+            except (SnapshotError, RestoreTestError, RepositoryError, OSError) as e:
+                restore_test.message = str(e)
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+                restore_test.end_time = datetime.now(tz=UTC)
+                RestoreTestRepository().create(restore_test)
+            returncode = 0 if restore_test.status == "success" else 1
+            return returncode, "\n".join(output), restore_test.message or ""
+
+        args = {"id": id, "id_list": id_list}
+        if schedule_id is not None:
+            args["schedule_id"] = schedule_id
+        return self.command_runner.execute_task(
+            task,
+            command=f"test_restore {id}",
+            command_type="test_restore",
+            args=args,
+        )
+
+    @contextlib.contextmanager
+    def data_files(
+        self,
+        backup_id: str,
+        work_dir: str,
+        report: Callable[[str], None] | None = None,
+    ) -> Iterator[Path]:
+        """Data files of a backup, from its kept snapshot or its folder."""
+        backup = BackupRepository().get(backup_id)
+        if backup is None or backup.snapshot is None:
+            yield self.backup_source(backup_id, work_dir, report)
+            return
+        volume = volume_factory(self.config)
+        with volume.mounted(backup.snapshot) as root:
+            yield volume.data_files(root)
+
+
+def copy_data(
+    source: Path,
+    target: Path,
+    report: Callable[[str], None] | None = None,
+) -> str:
+    """Copy a data directory, returns the size and rate it was copied at."""
+    if report is not None:
+        report(f"Copying data files from {source}")
+    started = time.monotonic()
+    shutil.copytree(
+        source,
+        target,
+        symlinks=True,
+        ignore=IGNORED_FILES,
+        dirs_exist_ok=True,
+    )
+    seconds = time.monotonic() - started
+    megabytes = sum(
+        path.stat().st_size for path in target.rglob("*") if path.is_file()
+    ) / 1024 / 1024
+    return (
+        f"Copied {megabytes:.1f} MB in {seconds:.1f}s "
+        f"({megabytes / max(seconds, 0.001):.1f} MB/s)"
+    )
@@ -0,0 +1,33 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from dbcalm.config.config import Config
+from dbcalm_cmd.process.runner_factory import runner_factory
+from dbcalm_mariadb_cmd.adapter.snapshot import Snapshot
+from dbcalm_mariadb_cmd.builder.mariadb_backup_cmd_builder_factory import (
+    mariadb_backup_cmd_builder_factory,
+)
+from dbcalm_mariadb_cmd.builder.mysql_backup_cmd_builder_factory import (
+    mysql_backup_cmd_builder_factory,
+)
+
+
+def snapshot_factory(config: Config) -> Snapshot:
+    """Create the snapshot backup adapter for the configured server type.
+
+    Args:
+        config: Application configuration
+
+    Returns:
+        Snapshot: Configured snapshot adapter instance
+    """
+    builder_factory = (
+        mysql_backup_cmd_builder_factory
+        if config.value("db_type") == "mysql"
+        else mariadb_backup_cmd_builder_factory
+    )
+    return Snapshot(
+        Annotated[builder_factory, Depends()](config),
+        Annotated[runner_factory, Depends()](),
+    )
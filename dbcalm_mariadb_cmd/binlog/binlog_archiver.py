@@ -0,0 +1,322 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.model.binlog_file import BinlogFile
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.binlog_file import BinlogFileRepository
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm_mariadb_cmd.binlog.binlog_reader import (
+    BinlogFormatError,
+    read_binlog_info,
+)
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    get_clean_env_for_system_binaries,
+)
+from dbcalm_mariadb_cmd.restore_test.restore_tester import CLIENT_BINARIES
+
+BINLOG_BINARIES = {
+    "mariadb": "/usr/bin/mariadb-binlog",
+    "mysql": "/usr/bin/mysqlbinlog",
+}
+COMPRESS_CMDS = {
+    "zstd": (["zstd", "-q", "-c", "-T0"], ".zst"),
+    "gzip": (["gzip", "-c"], ".gz"),
+}
+# Seconds between looks at the spool folder for rotated logs
+DEFAULT_POLL_INTERVAL = 10
+# A stream that exited is restarted after this, doubling up to the maximum
+RESTART_DELAY = 5  # seconds
+MAX_RESTART_DELAY = 300  # seconds
+# Retention only changes when backups are removed, no need to check often
+RETENTION_INTERVAL = 600  # seconds
+QUERY_TIMEOUT = 30  # seconds
+
+
+class BinlogArchiver:
+    """Archive the server's binary logs as they are written.
+
+    A `mariadb-binlog`/`mysqlbinlog --read-from-remote-server --raw
+    --stop-never` process replicates the logs into a spool folder below
+    `binlog_dir`. Whenever the server rotated to a new log, the previous
+    one is complete: it is scanned for its time range and GTID state,
+    compressed into `binlog_dir` and cataloged as a BinlogFile. Between
+    backups these logs allow a restore up to any point in time.
+
+    Logs that ended before the oldest kept backup started can't be
+    replayed on top of any backup anymore and are removed, so the archive
+    follows the backup retention.
+    """
+
+    def __init__(self, config: Config | None = None) -> None:
+        self.config = config or config_factory()
+        self.logger = logger_factory()
+        db_type = self.config.value("db_type")
+        self.binlog_bin = self.config.value(
+            "binlog_bin",
+            BINLOG_BINARIES.get(db_type),
+        )
+        self.client_bin = CLIENT_BINARIES.get(db_type)
+        self.archive_dir = Path(
+            self.config.value(
+                "binlog_dir",
+                f"{self.config.value('backup_dir')}/binlogs",
+            ),
+        )
+        self.spool_dir = self.archive_dir / "spool"
+        self.poll_interval = float(
+            self.config.value("binlog_poll_interval", DEFAULT_POLL_INTERVAL),
+        )
+        compression = self.config.value("binlog_compression")
+        if compression is None:
+            compression = "zstd" if shutil.which("zstd") else "gzip"
+        self.compression = compression
+        self.process: subprocess.Popen | None = None
+        self._log = None
+        self._stop = threading.Event()
+        self._restart_at = 0.0
+        self._restart_delay = RESTART_DELAY
+        self._retention_at = 0.0
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.run,
+            daemon=True,
+            name="binlog-archiver",
+        )
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.keep_streaming()
+                    self.archive_rotated()
+                    if time.monotonic() >= self._retention_at:
+                        self.apply_retention()
+                        self._retention_at = time.monotonic() + RETENTION_INTERVAL
+                except Exception:
+                    self.logger.exception("Error in binlog archiver")
+                self._stop.wait(self.poll_interval)
+        finally:
+            if self.process is not None and self.process.poll() is None:
+                self.process.terminate()
+                self.process.wait()
+
+    def keep_streaming(self) -> None:
+        """Start the stream, or restart it with backoff after it exited."""
+        if self.process is not None:
+            returncode = self.process.poll()
+            if returncode is None:
+                self._restart_delay = RESTART_DELAY
+                return
+            self.logger.warning(
+                "Binlog stream exited with %d: %s",
+                returncode,
+                self._read_log(),
+            )
+            self.process = None
+            self._schedule_restart()
+        if time.monotonic() < self._restart_at:
+            return
+
+        first = self.resume_from(self.server_logs())
+        if first is None:
+            self._schedule_restart()
+            return
+        self.logger.info("Streaming binary logs from %s", first)
+        # outlives this call, closed once the stream exited
+        self._log = tempfile.TemporaryFile()  # noqa: SIM115
+        self.process = subprocess.Popen(  # noqa: S603
+            [*self.stream_cmd(), first],
+            stdout=subprocess.DEVNULL,
+            stderr=self._log,
+            env=get_clean_env_for_system_binaries(),
+        )
+
+    def stream_cmd(self) -> list[str]:
+        return [
+            self.binlog_bin,
+            *self._connection_options(),
+            "--read-from-remote-server",
+            "--raw",
+            "--stop-never",
+            # a prefix, the logs keep the server's names below it
+            f"--result-file={self.spool_dir}/",
+        ]
+
+    def server_logs(self) -> list[str]:
+        """Names of the logs the server still has, oldest first."""
+        try:
+            result = subprocess.run(  # noqa: S603
+                [
+                    self.client_bin,
+                    *self._connection_options(),
+                    "--batch",
+                    "--skip-column-names",
+                    "-e",
+                    "SHOW BINARY LOGS",
+                ],
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=QUERY_TIMEOUT,
+                env=get_clean_env_for_system_binaries(),
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            self.logger.warning("Listing binary logs failed", exc_info=True)
+            return []
+        if result.returncode != 0:
+            self.logger.warning(
+                "Listing binary logs failed: %s",
+                result.stderr.strip(),
+            )
+            return []
+        return [line.split("\t")[0] for line in result.stdout.splitlines() if line]
+
+    def resume_from(self, server_logs: list[str]) -> str | None:
+        """The log the stream starts with, None if there is none.
+
+        A log still in the spool folder is fetched again from its start,
+        otherwise the stream continues after the newest archived log. If
+        the server purged that one already, the archive has a gap and the
+        stream starts over with the oldest log the server has.
+        """
+        if not server_logs:
+            return None
+        spooled = self.spooled()
+        if spooled and spooled[-1].name in server_logs:
+            return spooled[-1].name
+        latest = BinlogFileRepository().latest()
+        if latest is None:
+            return server_logs[0]
+        newer = [name for name in server_logs if name > latest.name]
+        if newer and newer[0] == next_binlog_name(latest.name):
+            return newer[0]
+        if newer:
+            self.logger.warning(
+                "Binary logs after %s were purged before they were archived",
+                latest.name,
+            )
+            return newer[0]
+        return None
+
+    def spooled(self) -> list[Path]:
+        return sorted(
+            path
+            for path in self.spool_dir.iterdir()
+            if path.is_file() and not path.name.startswith(".")
+        )
+
+    def archive_rotated(self) -> None:
+        """Archive the spooled logs but the newest, which is still written."""
+        for path in self.spooled()[:-1]:
+            try:
+                self.archive(path)
+            except (BinlogFormatError, OSError, subprocess.CalledProcessError):
+                self.logger.exception("Archiving %s failed", path.name)
+
+    def archive(self, path: Path) -> BinlogFile:
+        info = read_binlog_info(path)
+        compress_cmd, extension = COMPRESS_CMDS.get(self.compression, (None, ""))
+        target = self.archive_dir / f"{path.name}{extension}"
+        partial = self.archive_dir / f".{target.name}.part"
+        with path.open("rb") as source, partial.open("wb") as output:
+            if compress_cmd is None:
+                shutil.copyfileobj(source, output)
+            else:
+                subprocess.run(  # noqa: S603
+                    compress_cmd,
+                    stdin=source,
+                    stdout=output,
+                    stderr=subprocess.PIPE,
+                    check=True,
+                    env=get_clean_env_for_system_binaries(),
+                )
+            output.flush()
+            os.fsync(output.fileno())
+        partial.rename(target)
+
+        # a log without timed events is one the server rotated right away
+        first_event_time = info.first_event_time or _modified(path)
+        binlog = BinlogFileRepository().save(
+            BinlogFile(
+                name=path.name,
+                path=str(target),
+                size_bytes=target.stat().st_size,
+                first_event_time=first_event_time,
+                last_event_time=info.last_event_time or first_event_time,
+                end_position=info.end_position,
+                start_gtid=info.start_gtid,
+                end_gtid=info.end_gtid,
+            ),
+        )
+        path.unlink()
+        self.logger.info(
+            "Archived binary log %s (%d bytes)",
+            path.name,
+            binlog.size_bytes,
+        )
+        return binlog
+
+    def apply_retention(self) -> int:
+        """Remove logs that ended before the oldest backup started."""
+        oldest = BackupRepository().oldest_start_time()
+        if oldest is None:
+            return 0
+        repository = BinlogFileRepository()
+        expired = repository.ended_before(oldest)
+        for _, path in expired:
+            Path(path).unlink(missing_ok=True)
+        if expired:
+            repository.delete_many([name for name, _ in expired])
+            self.logger.info(
+                "Removed %d binary logs older than the oldest backup",
+                len(expired),
+            )
+        return len(expired)
+
+    def _connection_options(self) -> list[str]:
+        credentials_file = (self.config.value("backup_credentials_file")
+                if self.config.value("backup_credentials_file") is not None
+                else f"/etc/{ self.config.PROJECT_NAME }/credentials.cnf")
+        return [
+            f"--defaults-file={credentials_file}",
+            "--defaults-group-suffix=-dbcalm",
+            f"--host={self.config.DB_HOST}",
+        ]
+
+    def _schedule_restart(self) -> None:
+        self._restart_at = time.monotonic() + self._restart_delay
+        self._restart_delay = min(self._restart_delay * 2, MAX_RESTART_DELAY)
+
+    def _read_log(self) -> str:
+        if self._log is None:
+            return ""
+        self._log.seek(0)
+        output = self._log.read().decode(errors="replace").strip()
+        self._log.close()
+        self._log = None
+        return output
+
+
+def next_binlog_name(name: str) -> str:
+    """mariadb-bin.000041 -> mariadb-bin.000042"""
+    base, _, number = name.rpartition(".")
+    return f"{base}.{int(number) + 1:0{len(number)}d}"
+
+
+def _modified(path: Path) -> datetime:
+    return datetime.fromtimestamp(path.stat().st_mtime, tz=UTC)
@@ -0,0 +1,166 @@
+import struct
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import BinaryIO
+
+BINLOG_MAGIC = b"\xfebin"
+# v4 event header: timestamp, type, server_id, event_size, log_pos, flags
+EVENT_HEADER = struct.Struct("<IBIIIH")
+
+# Event types the catalog needs, all others are skipped by their size
+MYSQL_GTID_EVENT = 33
+MYSQL_PREVIOUS_GTIDS_EVENT = 35
+MARIADB_GTID_EVENT = 162
+MARIADB_GTID_LIST_EVENT = 163
+
+
+class BinlogFormatError(Exception):
+    """A file is not a binary log the reader understands."""
+
+
+class BinlogInfo:
+    """What the catalog records about one binary log."""
+
+    def __init__(self) -> None:
+        self.first_event_time: datetime | None = None
+        self.last_event_time: datetime | None = None
+        # offset after the last complete event
+        self.end_position = len(BINLOG_MAGIC)
+        self.start_gtid: str | None = None
+        self.end_gtid: str | None = None
+
+
+def read_binlog_info(path: str | Path) -> BinlogInfo:
+    """Time range, end position and GTID state of a binary log.
+
+    Only the 19 byte event headers are read, bodies are skipped except for
+    the GTID events. A truncated last event (the file is still written)
+    ends the scan, end_position points before it.
+    """
+    with Path(path).open("rb") as file:
+        if file.read(len(BINLOG_MAGIC)) != BINLOG_MAGIC:
+            msg = f"{path} is not a binary log"
+            raise BinlogFormatError(msg)
+        return _scan(file)
+
+
+def _scan(file: BinaryIO) -> BinlogInfo:  # noqa: C901, PLR0912
+    info = BinlogInfo()
+    total = _size(file)
+    mariadb_state: dict[int, str] = {}
+    mysql_state: dict[str, list[list[int]]] = {}
+    while True:
+        header = file.read(EVENT_HEADER.size)
+        if len(header) < EVENT_HEADER.size:
+            break
+        timestamp, event_type, server_id, size, _, _ = EVENT_HEADER.unpack(header)
+        if size < EVENT_HEADER.size:
+            msg = f"Invalid event size {size} at {info.end_position}"
+            raise BinlogFormatError(msg)
+        if info.end_position + size > total:
+            break
+        body_size = size - EVENT_HEADER.size
+
+        if event_type in {
+            MYSQL_GTID_EVENT,
+            MYSQL_PREVIOUS_GTIDS_EVENT,
+            MARIADB_GTID_EVENT,
+            MARIADB_GTID_LIST_EVENT,
+        }:
+            body = file.read(body_size)
+            if event_type == MARIADB_GTID_LIST_EVENT:
+                mariadb_state = _gtid_list(body)
+                info.start_gtid = _mariadb_text(mariadb_state)
+            elif event_type == MARIADB_GTID_EVENT:
+                sequence, domain = struct.unpack_from("<QI", body)
+                mariadb_state[domain] = f"{domain}-{server_id}-{sequence}"
+            elif event_type == MYSQL_PREVIOUS_GTIDS_EVENT:
+                mysql_state = _previous_gtids(body)
+                info.start_gtid = _mysql_text(mysql_state)
+            else:
+                source = str(uuid.UUID(bytes=body[1:17]))
+                (number,) = struct.unpack_from("<Q", body, 17)
+                _add_gtid(mysql_state.setdefault(source, []), number)
+        else:
+            file.seek(body_size, 1)
+
+        info.end_position += size
+        # artificial events the server sends along carry no time
+        if timestamp:
+            moment = datetime.fromtimestamp(timestamp, tz=UTC)
+            if info.first_event_time is None:
+                info.first_event_time = moment
+            info.last_event_time = moment
+
+    if mariadb_state:
+        info.end_gtid = _mariadb_text(mariadb_state)
+    elif mysql_state:
+        info.end_gtid = _mysql_text(mysql_state)
+    return info
+
+
+def _size(file: BinaryIO) -> int:
+    position = file.tell()
+    size = file.seek(0, 2)
+    file.seek(position)
+    return size
+
+
+def _gtid_list(body: bytes) -> dict[int, str]:
+    """MariaDB Gtid_list: count (flags in the top 4 bits), then domain,
+    server id and sequence number of the last GTID of every domain."""
+    (count,) = struct.unpack_from("<I", body)
+    state = {}
+    for index in range(count & 0x0FFFFFFF):
+        domain, server_id, sequence = struct.unpack_from(
+            "<IIQ",
+            body,
+            4 + index * 16,
+        )
+        state[domain] = f"{domain}-{server_id}-{sequence}"
+    return state
+
+
+def _previous_gtids(body: bytes) -> dict[str, list[list[int]]]:
+    """MySQL Previous_gtids: per source uuid a list of [start, end) ranges."""
+    (sources,) = struct.unpack_from("<Q", body)
+    offset = 8
+    state = {}
+    for _ in range(sources):
+        source = str(uuid.UUID(bytes=body[offset:offset + 16]))
+        (ranges,) = struct.unpack_from("<Q", body, offset + 16)
+        offset += 24
+        intervals = []
+        for _ in range(ranges):
+            start, end = struct.unpack_from("<QQ", body, offset)
+            intervals.append([start, end - 1])
+            offset += 16
+        state[source] = intervals
+    return state
+
+
+def _add_gtid(intervals: list[list[int]], number: int) -> None:
+    """Add a transaction number to inclusive [start, end] ranges."""
+    if intervals and intervals[-1][1] + 1 == number:
+        intervals[-1][1] = number
+        return
+    if any(start <= number <= end for start, end in intervals):
+        return
+    intervals.append([number, number])
+    intervals.sort()
+
+
+def _mariadb_text(state: dict[int, str]) -> str:
+    return ",".join(state[domain] for domain in sorted(state))
+
+
+def _mysql_text(state: dict[str, list[list[int]]]) -> str:
+    """Format like gtid_executed, e.g. `3e11fa47-...:1-5:7`."""
+    return ",".join(
+        source + "".join(
+            f":{start}" if start == end else f":{start}-{end}"
+            for start, end in state[source]
+        )
+        for source in sorted(state)
+    )
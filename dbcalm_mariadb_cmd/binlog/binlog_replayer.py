@@ -0,0 +1,384 @@
+import contextlib
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.model.binlog_file import BinlogFile
+from dbcalm.data.repository.binlog_file import BinlogFileRepository
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.storage.storage_backend import READ_SIZE
+from dbcalm.util.gtid import gtid_state_contains, parse_gtid
+from dbcalm_cmd.process.job_cgroups import (
+    current_cgroup,
+    in_current_cgroup,
+    job_cgroup,
+)
+from dbcalm_mariadb_cmd.binlog.binlog_archiver import (
+    BINLOG_BINARIES,
+    next_binlog_name,
+)
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    ADMIN_BINARIES,
+    get_clean_env_for_system_binaries,
+)
+from dbcalm_mariadb_cmd.restore_test.restore_tester import (
+    CLIENT_BINARIES,
+    DEFAULT_STARTUP_TIMEOUT,
+    ERROR_TAIL_LINES,
+    SERVER_BINARIES,
+    RestoreTestError,
+    ScratchServer,
+)
+
+# Where the backup tools record the binary log position of a backup,
+# MariaDB 10.11+ uses the second name
+BINLOG_INFO_FILES = ["xtrabackup_binlog_info", "mariadb_backup_binlog_info"]
+DECOMPRESS_CMDS = {
+    ".zst": ["zstd", "-d", "-c", "-q"],
+    ".gz": ["gzip", "-d", "-c"],
+}
+# Virtual and view only schemas, parallel apply has nothing to replay there
+SERVER_SCHEMAS = {"information_schema", "performance_schema", "sys"}
+# Row events carry whole rows, statements with large blobs need room
+MAX_PACKET = "1G"
+
+
+class ReplayError(Exception):
+    """Binary logs could not be replayed onto a restored backup."""
+
+
+class BinlogReplayer:
+    """Roll a prepared backup forward to a point in time.
+
+    Reads where the backup ended in the binary logs from the
+    xtrabackup_binlog_info file the backup tool wrote, then replays the
+    archived logs from there up to the target into a throwaway server
+    running on the prepared folder. The logs are decoded by
+    mariadb-binlog/mysqlbinlog one after the other and piped into a single
+    client session, so session state like temporary tables carries over
+    and progress can be reported per log.
+
+    With `pitr_parallel` above 1 every database is replayed by its own
+    session (`--database`). Only safe when transactions don't span
+    databases and statements name their database with USE, see the
+    --database option of mysqlbinlog.
+    """
+
+    def __init__(self, config: Config | None = None) -> None:
+        self.config = config if config is not None else config_factory()
+        self.logger = logger_factory()
+        self.db_type = self.config.value("db_type")
+        self.binlog_bin = self.config.value(
+            "binlog_bin",
+            BINLOG_BINARIES.get(self.db_type),
+        )
+        self.client_bin = CLIENT_BINARIES.get(self.db_type)
+        self.admin_bin = ADMIN_BINARIES.get(self.db_type)
+        self.server_bin = self.config.value(
+            "test_restore_server_bin",
+            SERVER_BINARIES.get(self.db_type),
+        )
+        self.startup_timeout = float(
+            self.config.value(
+                "test_restore_startup_timeout",
+                DEFAULT_STARTUP_TIMEOUT,
+            ),
+        )
+        self.workers = max(1, int(self.config.value("pitr_parallel", 1)))
+
+    def coordinates(self, datadir: Path) -> tuple[str, int, str | None]:
+        """Binary log name, position and GTID state the backup ends at."""
+        for name in BINLOG_INFO_FILES:
+            path = datadir / name
+            if path.is_file():
+                fields = path.read_text().split()
+                if len(fields) >= 2:  # noqa: PLR2004
+                    gtid = fields[2] if len(fields) > 2 else None  # noqa: PLR2004
+                    return fields[0], int(fields[1]), gtid
+        msg = (
+            f"{datadir} has no binary log position, binary logging was off "
+            "when the backup was taken"
+        )
+        raise ReplayError(msg)
+
+    def binlogs(
+        self,
+        start: str,
+        until_time: datetime | None,
+        until_gtid: str | None,
+    ) -> list[BinlogFile]:
+        """Archived logs from start up to the one holding the target.
+
+        Raises:
+            ReplayError: If a log in between is missing from the archive
+        """
+        logs = BinlogFileRepository().since(start)
+        if not logs or logs[0].name != start:
+            msg = f"Binary log {start} the backup ends in was not archived"
+            raise ReplayError(msg)
+
+        needed = []
+        for binlog in logs:
+            if needed and binlog.name != next_binlog_name(needed[-1].name):
+                msg = (
+                    f"Binary logs between {needed[-1].name} and {binlog.name} "
+                    "are missing from the archive"
+                )
+                raise ReplayError(msg)
+            needed.append(binlog)
+            if until_gtid is not None and gtid_state_contains(
+                binlog.end_gtid,
+                until_gtid,
+            ):
+                return needed
+            if until_time is not None and _aware(binlog.last_event_time) >= until_time:
+                return needed
+        msg = "The archived binary logs end before the target"
+        raise ReplayError(msg)
+
+    def replay(
+        self,
+        datadir: Path,
+        work_dir: Path,
+        until_time: datetime | None = None,
+        until_gtid: str | None = None,
+        progress: Callable[[str], None] | None = None,
+    ) -> str:
+        """Replay archived logs onto the prepared backup in datadir.
+
+        work_dir holds the decompressed logs and the server's socket while
+        replaying and is removed afterwards.
+
+        Returns:
+            A summary of what was replayed
+        """
+        report = progress or (lambda _message: None)
+        if until_time is not None:
+            until_time = _aware(until_time)
+        name, position, backup_gtid = self.coordinates(datadir)
+        logs = self.binlogs(name, until_time, until_gtid)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            files = []
+            for index, binlog in enumerate(logs, 1):
+                report(f"Decompressing binary log {index} of {len(logs)}")
+                files.append(self._decompress(binlog, work_dir))
+
+            decode_cmds = self.decode_cmds(
+                files,
+                position,
+                backup_gtid,
+                until_time,
+                until_gtid,
+            )
+            server = ScratchServer(
+                self.server_bin,
+                self.admin_bin,
+                datadir,
+                work_dir,
+                startup_timeout=self.startup_timeout,
+                options=["--skip-log-bin", f"--max-allowed-packet={MAX_PACKET}"],
+            )
+            with server:
+                if self.workers > 1:
+                    databases = self._databases(server)
+                    self._apply_parallel(server, decode_cmds, databases, report)
+                    scope = f"{len(databases)} databases in parallel"
+                else:
+                    self._apply(server, decode_cmds, None, report)
+                    scope = "one session"
+        except RestoreTestError as e:
+            raise ReplayError(str(e)) from e
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        target = until_gtid if until_gtid is not None else until_time.isoformat()
+        return (
+            f"Replayed {len(logs)} binary logs from {name}:{position} up to "
+            f"{target} with {scope}"
+        )
+
+    def decode_cmds(
+        self,
+        files: list[Path],
+        position: int,
+        backup_gtid: str | None,
+        until_time: datetime | None,
+        until_gtid: str | None,
+    ) -> list[list[str]]:
+        """mariadb-binlog/mysqlbinlog call per log, in replay order."""
+        common = [self.binlog_bin, "--no-defaults"]
+        if until_time is not None:
+            # both tools read the option in the local time zone
+            stop = until_time.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+            common.append(f"--stop-datetime={stop}")
+
+        start_options = [f"--start-position={position}"]
+        if self.db_type == "mysql":
+            # the scratch server runs without GTIDs, later transactions of
+            # the target's source are left out
+            common.append("--skip-gtids")
+            if until_gtid is not None:
+                source, number = parse_gtid(until_gtid)
+                common.append(f"--exclude-gtids={source}:{number + 1}-{2**63 - 1}")
+        elif until_gtid is not None:
+            if backup_gtid is None:
+                msg = "The backup recorded no GTID position to start from"
+                raise ReplayError(msg)
+            # GTID positions apply to every log, offsets to the first only
+            common.append(f"--stop-position={until_gtid}")
+            common.append(f"--start-position={backup_gtid}")
+            start_options = []
+
+        return [
+            [*common, *(start_options if index == 0 else []), str(path)]
+            for index, path in enumerate(files)
+        ]
+
+    def _decompress(self, binlog: BinlogFile, work_dir: Path) -> Path:
+        target = work_dir / binlog.name
+        command = DECOMPRESS_CMDS.get(Path(binlog.path).suffix)
+        with Path(binlog.path).open("rb") as source, target.open("wb") as output:
+            if command is None:
+                shutil.copyfileobj(source, output)
+                return target
+            result = subprocess.run(  # noqa: S603
+                in_current_cgroup(command),
+                stdin=source,
+                stdout=output,
+                stderr=subprocess.PIPE,
+                check=False,
+                env=get_clean_env_for_system_binaries(),
+            )
+        if result.returncode != 0:
+            msg = f"Decompressing {binlog.path} failed: {_tail(result.stderr)}"
+            raise ReplayError(msg)
+        return target
+
+    def _client_cmd(self, server: ScratchServer) -> list[str]:
+        return [
+            self.client_bin,
+            "--no-defaults",
+            f"--socket={server.socket_path}",
+            "--binary-mode",
+            f"--max-allowed-packet={MAX_PACKET}",
+        ]
+
+    def _databases(self, server: ScratchServer) -> list[str]:
+        result = subprocess.run(  # noqa: S603
+            [*self._client_cmd(server), "--batch", "--skip-column-names", "-e",
+             "SHOW DATABASES"],
+            capture_output=True,
+            text=True,
+            check=False,
+            env=get_clean_env_for_system_binaries(),
+        )
+        if result.returncode != 0:
+            msg = f"Listing databases failed: {_tail(result.stderr.encode())}"
+            raise ReplayError(msg)
+        return [
+            name for name in result.stdout.split()
+            if name not in SERVER_SCHEMAS
+        ]
+
+    def _apply_parallel(
+        self,
+        server: ScratchServer,
+        decode_cmds: list[list[str]],
+        databases: list[str],
+        report: Callable[[str], None],
+    ) -> None:
+        lock = threading.Lock()
+        done = []
+        # pool threads don't see the task's context
+        cgroup = current_cgroup.get()
+
+        def apply(database: str) -> None:
+            with job_cgroup(cgroup):
+                self._apply(server, decode_cmds, database, lambda _message: None)
+            with lock:
+                done.append(database)
+                report(f"Replayed {len(done)} of {len(databases)} databases")
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="binlog-replay",
+        ) as pool:
+            # list() re-raises the first failure
+            list(pool.map(apply, databases))
+
+    def _apply(
+        self,
+        server: ScratchServer,
+        decode_cmds: list[list[str]],
+        database: str | None,
+        report: Callable[[str], None],
+    ) -> None:
+        """Pipe the decoded logs into one client session."""
+        with tempfile.TemporaryFile() as client_log:
+            client = subprocess.Popen(  # noqa: S603
+                in_current_cgroup(self._client_cmd(server)),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=client_log,
+                env=get_clean_env_for_system_binaries(),
+            )
+            try:
+                for index, command in enumerate(decode_cmds, 1):
+                    decode_cmd = command
+                    if database is not None:
+                        decode_cmd = [
+                            *command[:-1],
+                            f"--database={database}",
+                            command[-1],
+                        ]
+                    self._decode_into(decode_cmd, client)
+                    report(f"Replayed binary log {index} of {len(decode_cmds)}")
+            except BrokenPipeError:
+                # the client quit on an error, its log tells why
+                pass
+            finally:
+                with contextlib.suppress(BrokenPipeError):
+                    client.stdin.close()
+                returncode = client.wait()
+            if returncode != 0:
+                client_log.seek(0)
+                msg = f"Applying binary logs failed: {_tail(client_log.read())}"
+                raise ReplayError(msg)
+
+    def _decode_into(self, command: list[str], client: subprocess.Popen) -> None:
+        self.logger.debug("Replaying: %s", " ".join(command))
+        with tempfile.TemporaryFile() as decoder_log:
+            decoder = subprocess.Popen(  # noqa: S603
+                in_current_cgroup(command),
+                stdout=subprocess.PIPE,
+                stderr=decoder_log,
+                env=get_clean_env_for_system_binaries(),
+            )
+            try:
+                while piece := decoder.stdout.read(READ_SIZE):
+                    client.stdin.write(piece)
+            finally:
+                decoder.stdout.close()
+                decoder.wait()
+            if decoder.returncode != 0:
+                decoder_log.seek(0)
+                msg = f"Decoding {command[-1]} failed: {_tail(decoder_log.read())}"
+                raise ReplayError(msg)
+
+
+def _aware(moment: datetime) -> datetime:
+    # sqlite hands back naive datetimes, they are stored in UTC
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=UTC)
+
+
+def _tail(output: bytes) -> str:
+    lines = output.decode(errors="replace").strip().splitlines()
+    return "\n".join(lines[-ERROR_TAIL_LINES:])
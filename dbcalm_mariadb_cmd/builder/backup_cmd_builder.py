@@ -6,11 +6,39 @@ from dbcalm.data.data_types.enum_types import RestoreTarget
 
 class BackupCommandBuilder(ABC):
     @abstractmethod
-    def build_full_backup_cmd(self: str) -> list:
+    def build_full_backup_cmd(
+        self,
+        id: str,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+    ) -> list:
         pass
 
     @abstractmethod
-    def build_incremental_backup_cmd(self: str, from_backup_id: str) -> list:
+    def build_incremental_backup_cmd(
+        self,
+        id: str,
+        from_backup_id: str,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+    ) -> list:
+        pass
+
+    @property
+    @abstractmethod
+    def streaming(self) -> bool:
+        pass
+
+    @abstractmethod
+    def compress_cmd(self) -> list | None:
+        pass
+
+    @abstractmethod
+    def stream_key(self, id: str) -> str:
+        pass
+
+    @abstractmethod
+    def build_extract_cmds(self, location: str, target_dir: str) -> list:
         pass
 
     @abstractmethod
@@ -19,7 +47,12 @@ class BackupCommandBuilder(ABC):
             tmp_dir : str,
             id_list: list,
             target: RestoreTarget,
+            source_dir: str | None = None,
         ) -> list:
         pass
 
 
+
+    @abstractmethod
+    def build_copy_back_cmd(self, backup_path: str) -> list:
+        pass
@@ -1,19 +1,48 @@
 
 
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
 from packaging.version import Version
 
-from dbcalm.config.yaml_config import Config
 from dbcalm.data.data_types.enum_types import RestoreTarget
+from dbcalm.util.backup_scope import pattern_regex
+from dbcalm.util.checkpoint_dir import checkpoint_dir
 from dbcalm_mariadb_cmd.builder.backup_cmd_builder import BackupCommandBuilder
 
+if TYPE_CHECKING:
+    from dbcalm.config.yaml_config import Config
+    from dbcalm_mariadb_cmd.capability.capability_probe import Capabilities
+
 APPY_LOG_ONLY_BEFORE_VERSION = Version("10.2")
 
 DEFAULT_MARIA_BIN = "/usr/bin/mariabackup"
+DEFAULT_MARIA_STREAM_BIN = "/usr/bin/mbstream"
+# Threads writing extracted files when restoring streamed backups
+DEFAULT_EXTRACT_PARALLEL = 4
 
 class MariadbBackupCmdBuilder(BackupCommandBuilder):
-    def __init__(self, config :Config, server_version: Version) -> None:
+    def __init__(
+        self,
+        config :Config,
+        server_version: Version,
+        capabilities: Capabilities | None = None,
+    ) -> None:
         self.config = config
         self.server_version = server_version
+        self.capabilities = capabilities
+
+    def supports(self, flag: str) -> bool:
+        # without probe results assume the tool has the option
+        return self.capabilities is None or self.capabilities.supports(flag)
+
+    @property
+    def default_stream_compression(self) -> str:
+        if self.capabilities is not None and "zstd" in self.capabilities.compressors:
+            return "zstd"
+        return "gzip"
 
     def executable(self) -> str:
         if self.config.value("backup_bin") is not None:
@@ -24,6 +53,8 @@ class MariadbBackupCmdBuilder(BackupCommandBuilder):
             self,
             id: str,
             incremental_base_dir: str | None = None,
+            include: list[str] | None = None,
+            exclude: list[str] | None = None,
         ) -> list:
         command = [self.executable()]
 
@@ -49,54 +80,129 @@ class MariadbBackupCmdBuilder(BackupCommandBuilder):
         if incremental_base_dir is not None:
             command.append(f"--incremental-basedir={incremental_base_dir}")
 
-        ## Add option for stream backups
-        stream = self.config.value("stream")
-        if stream:
+        ## Keep the checkpoints apart from the data, streamed backups are
+        ## otherwise a single archive incrementals can't be based on
+        command.append(
+            f"--extra-lsndir={checkpoint_dir(self.config.value('backup_dir'), id)}",
+        )
+
+        ## Limit partial backups to the tables of their scope
+        command.extend(self.scope_options(include, exclude))
+
+        ## Copy data files with several threads if the tool supports it
+        parallel = self.config.value("backup_parallel")
+        if parallel is not None and self.supports("--parallel"):
+            command.append(f"--parallel={int(parallel)}")
+
+        ## Add option for stream backups, the adapter pipes the output
+        ## through compress_cmd() into the storage backend
+        if self.streaming:
             command.append("--stream=xbstream")
 
-        ## Add option for compression
+        return command
+
+    def scope_options(
+            self,
+            include: list[str] | None,
+            exclude: list[str] | None,
+        ) -> list:
+        """Options limiting a backup to the tables of a BackupScope."""
+        options = []
+        if include is not None:
+            if any("*" in pattern for pattern in include):
+                options.append(f"--tables={pattern_regex(include)}")
+            else:
+                # plain names, the tools take schema and schema.table here
+                options.append(f"--databases={' '.join(include)}")
+        if exclude is not None:
+            options.append(f"--tables-exclude={pattern_regex(exclude)}")
+        return options
+
+    @property
+    def streaming(self) -> bool:
+        return bool(self.config.value("stream"))
+
+    def compression(self) -> str | None:
         compression = self.config.value("compression")
-        if compression is None and stream:
-                compression = self.default_stream_compression
+        if compression is None and self.streaming:
+            compression = self.default_stream_compression
+        return compression
 
-        extension = ""
-        match compression:
+    def compress_cmd(self) -> list | None:
+        match self.compression():
             case "gzip":
-                command.append("| gzip")
-                extension = ".gz"
+                return ["gzip", "-c"]
             case "zstd":
                 # explanation of the command:
                 # - = read from stdin
                 # -c = write to stdout
                 # -T0 = use all available threads
-                command.append("| zstd - -c -T0")
-                extension = ".zst"
-
-        ## Add option to forward to another command (or write to file)
-        forward = self.config.value("forward")
-        if stream and forward is None:
-            command.append(
-                f"> { self.config.value('backup_dir') }/"
-                f"backup-{ id }.xbstream{extension}",
-            )
-
-        if forward is not None:
-            command.append("| " + forward)
-
-        return command
+                return ["zstd", "-", "-c", "-T0"]
+        return None
+
+    def stream_key(self, id: str) -> str:
+        """Name of the stored object of a streamed backup."""
+        extension = {"gzip": ".gz", "zstd": ".zst"}.get(self.compression(), "")
+        return f"backup-{ id }.xbstream{extension}"
+
+    def stream_executable(self) -> str:
+        return DEFAULT_MARIA_STREAM_BIN
+
+    def build_extract_cmds(self, location: str, target_dir: str) -> list:
+        """Pipeline that unpacks a streamed backup read from stdin.
+
+        The decompressor (if the stream is compressed) feeds the extractor,
+        both run at the same time and the extractor writes files with
+        several threads.
+        """
+        commands = []
+        if location.endswith(".zst"):
+            commands.append(["zstd", "-d", "-c", "-T0"])
+        elif location.endswith(".gz"):
+            # pigz decompresses with separate read, write and check threads
+            if (
+                self.capabilities is not None
+                and "pigz" in self.capabilities.compressors
+            ):
+                commands.append(["pigz", "-d", "-c"])
+            else:
+                commands.append(["gzip", "-d", "-c"])
+
+        parallel = int(
+            self.config.value("restore_parallel", DEFAULT_EXTRACT_PARALLEL),
+        )
+        commands.append(
+            [
+                self.stream_executable(),
+                "-x",
+                f"--parallel={parallel}",
+                "-C",
+                target_dir,
+            ],
+        )
+        return commands
 
-    def build_full_backup_cmd(self, id: str) -> list:
-        return self.build(id)
+    def build_full_backup_cmd(
+            self,
+            id: str,
+            include: list[str] | None = None,
+            exclude: list[str] | None = None,
+        ) -> list:
+        return self.build(id, None, include, exclude)
 
     def build_incremental_backup_cmd(
             self,
             id: str,
             from_backup_id: str,
+            include: list[str] | None = None,
+            exclude: list[str] | None = None,
         ) -> list:
-        incremental_base_dir = (
-            f"{ self.config.value('backup_dir') }/{ from_backup_id }"
-        )
-        return self.build(id, incremental_base_dir)
+        backup_dir = self.config.value("backup_dir")
+        incremental_base_dir = checkpoint_dir(backup_dir, from_backup_id)
+        # backups made before checkpoints were kept have their own folder
+        if not Path(incremental_base_dir).is_dir():
+            incremental_base_dir = f"{ backup_dir }/{ from_backup_id }"
+        return self.build(id, incremental_base_dir, include, exclude)
 
 
     def build_restore_cmds(
@@ -104,16 +210,30 @@ class MariadbBackupCmdBuilder(BackupCommandBuilder):
             tmp_dir : str,
             id_list: list,
             target: RestoreTarget,
+            source_dir: str | None = None,
         ) -> list:
+        """Commands to restore a chain of backups, full backup first.
 
+        Backups are read from backup_dir, or from source_dir when they were
+        staged there (e.g. written out of the dedup repository), in which
+        case the staged full backup is moved instead of copied.
+        """
         command_list = []
         id_list_copy = id_list.copy()
         full_backup_id = id_list_copy.pop(0)
-        original_backup_path = f"{self.config.value('backup_dir')}/{full_backup_id}"
-        # could do shutil.copytree but that would stop api flow
-        #  whereas this will run consecutively using the process
-        #  runner (although will not work on windows)
-        command_list.append(["/usr/bin/cp",  "-r", original_backup_path, tmp_dir])
+        source = source_dir or self.config.value("backup_dir")
+        original_backup_path = f"{source}/{full_backup_id}"
+        if source_dir is not None:
+            command_list.append(["/usr/bin/mv", original_backup_path, tmp_dir])
+        else:
+            # could do shutil.copytree but that would stop api flow
+            #  whereas this will run consecutively using the process
+            #  runner (although will not work on windows)
+            # --reflink=auto clones the files on copy-on-write filesystems
+            # (btrfs, XFS) instead of copying them, elsewhere it copies
+            command_list.append(
+                ["/usr/bin/cp", "-r", "--reflink=auto", original_backup_path, tmp_dir],
+            )
         new_backup_path = f"{tmp_dir}/{full_backup_id}"
 
         command = [self.executable()]
@@ -135,18 +255,26 @@ class MariadbBackupCmdBuilder(BackupCommandBuilder):
                 id,
                 incremental_left,
                 self.server_version,
+                source_dir,
             )
             command_list.append(command)
 
         if target == RestoreTarget.DATABASE:
-            command = [self.executable()]
-            command.append("--copy-back")
-            command.append("--target-dir")
-            command.append(new_backup_path)
-            command_list.append(command)
+            command_list.append(self.build_copy_back_cmd(new_backup_path))
+        elif target in (RestoreTarget.TABLE, RestoreTarget.SCHEMA):
+            # the last prepare writes .cfg files for IMPORT TABLESPACE
+            command_list[-1].append("--export")
 
         return command_list
 
+    def build_copy_back_cmd(self, backup_path: str) -> list:
+        """Copy a prepared backup into the server's data directory."""
+        command = [self.executable()]
+        command.append("--copy-back")
+        command.append("--target-dir")
+        command.append(backup_path)
+        return command
+
 
     def build_incremental_restore_cmd(
             self,
@@ -154,13 +282,14 @@ class MariadbBackupCmdBuilder(BackupCommandBuilder):
             id: str,
             incremental_left: int,
             server_version: str,
+            source_dir: str | None = None,
         ) -> list:
         command = [self.executable()]
         command.append("--prepare")
         command.append("--target-dir")
         command.append(full_backup_path)
         command.append("--incremental-dir")
-        command.append(self.config.value("backup_dir") + "/" + id)
+        command.append((source_dir or self.config.value("backup_dir")) + "/" + id)
         # Don't close redo log if there are more incremental backups to apply
         if server_version < APPY_LOG_ONLY_BEFORE_VERSION and incremental_left > 0:
             command.append("--apply-log-only")
@@ -1,9 +1,9 @@
-from dbcalm.data.data_types.enum_types import RestoreTarget
 from dbcalm_mariadb_cmd.builder.mariadb_backup_cmd_builder import (
     MariadbBackupCmdBuilder,
 )
 
 DEFAULT_MYSQL_BIN = "/usr/bin/xtrabackup"
+DEFAULT_MYSQL_STREAM_BIN = "/usr/bin/xbstream"
 DEFAULT_MYSQL_DATA_DIR = "/var/lib/mysql"
 
 
@@ -24,28 +24,13 @@ class MysqlBackupCmdBuilder(MariadbBackupCmdBuilder):
             return self.config.value("backup_bin")
         return DEFAULT_MYSQL_BIN
 
-    def build_restore_cmds(
-            self,
-            tmp_dir: str,
-            id_list: list,
-            target: RestoreTarget,
-        ) -> list:
-        """Build restore commands with --datadir for XtraBackup.
+    def stream_executable(self) -> str:
+        return DEFAULT_MYSQL_STREAM_BIN
 
-        XtraBackup requires explicit --datadir parameter for copy-back operation.
-        """
-        # Call parent method to get all restore commands
-        command_list = super().build_restore_cmds(tmp_dir, id_list, target)
-
-        # If restoring to database, modify the copy-back command to include --datadir
-        if target == RestoreTarget.DATABASE and len(command_list) > 0:
-            # The copy-back command is always the last command in the list
-            copy_back_cmd = command_list[-1]
-
-            # Get data_dir from config, default to /var/lib/mysql
-            data_dir = self.config.value("data_dir") or DEFAULT_MYSQL_DATA_DIR
-
-            # Add --datadir parameter
-            copy_back_cmd.append(f"--datadir={data_dir}")
-
-        return command_list
+    def build_copy_back_cmd(self, backup_path: str) -> list:
+        """XtraBackup requires an explicit --datadir for copy-back."""
+        command = super().build_copy_back_cmd(backup_path)
+        # Get data_dir from config, default to /var/lib/mysql
+        data_dir = self.config.value("data_dir") or DEFAULT_MYSQL_DATA_DIR
+        command.append(f"--datadir={data_dir}")
+        return command
@@ -1,43 +1,12 @@
-import re
-import subprocess
-
-from packaging.version import Version
-
 from dbcalm.config.config import Config
-from dbcalm_mariadb_cmd.builder.mariadb_backup_cmd_builder_factory import (
-    get_clean_env_for_system_binaries,
-)
 from dbcalm_mariadb_cmd.builder.mysql_backup_cmd_builder import (
     MysqlBackupCmdBuilder,
 )
-
-
-def server_version() -> Version:
-    """Get MySQL server version from mysqladmin.
-
-    Returns:
-        Version: MySQL server version (e.g., 8.0.35)
-    """
-    version = None
-    response = subprocess.run(
-        ["/usr/bin/mysqladmin", "--version"],
-        shell=False,
-        capture_output=True,
-        text=True,
-        check=True,
-        env=get_clean_env_for_system_binaries(),
-    )
-    if response.returncode == 0:
-        # Look for version pattern like "mysqladmin  Ver 8.0.35 for Linux"
-        # or "Ver 8.0.35-0ubuntu0.22.04.1 for Linux"
-        match = re.search(r"Ver (\d+\.\d+\.\d+)", response.stdout)
-        if match:
-            version = match.group(1)
-    return Version(version)
+from dbcalm_mariadb_cmd.capability.capability_probe import capability_probe
 
 
 def mysql_backup_cmd_builder_factory(config: Config) -> MysqlBackupCmdBuilder:
-    """Create MySQL backup command builder with server version detection.
+    """Create MySQL backup command builder with the detected server version.
 
     Args:
         config: Application configuration
@@ -45,4 +14,15 @@ def mysql_backup_cmd_builder_factory(config: Config) -> MysqlBackupCmdBuilder:
     Returns:
         MysqlBackupCmdBuilder: Configured builder instance
     """
-    return MysqlBackupCmdBuilder(config, server_version())
+    probe = capability_probe()
+    capabilities = probe.capabilities()
+    if capabilities.server_version is None:
+        # the server package may be mid upgrade, probe again on the next try
+        probe.invalidate()
+        msg = "Could not detect the MySQL server version"
+        raise ValueError(msg)
+    return MysqlBackupCmdBuilder(
+        config,
+        capabilities.server_version,
+        capabilities,
+    )
@@ -0,0 +1,268 @@
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from functools import cache
+
+from packaging.version import InvalidVersion, Version
+
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.logger.logger_factory import logger_factory
+
+# How long detected versions and flags are trusted before probing again
+DEFAULT_CAPABILITY_TTL = 3600  # seconds
+# How long a ping result is trusted
+DEFAULT_LIVENESS_TTL = 2  # seconds
+# Failed probes (tool missing, server package being upgraded) are retried
+# sooner than successful ones are refreshed
+FAILED_PROBE_TTL = 30  # seconds
+PROBE_TIMEOUT = 10  # seconds
+
+# Backup tool options the builders and validators care about
+TOOL_FLAGS = ["--parallel", "--stream", "--compress"]
+# Compression programs backups can be piped through, pigz only decompresses
+# gzip streams of restores faster
+COMPRESSORS = ["gzip", "zstd", "pigz"]
+
+ADMIN_BINARIES = {
+    "mariadb": "/usr/bin/mariadb-admin",
+    "mysql": "/usr/bin/mysqladmin",
+}
+DEFAULT_BACKUP_BINARIES = {
+    "mariadb": "/usr/bin/mariabackup",
+    "mysql": "/usr/bin/xtrabackup",
+}
+VERSION_PATTERNS = {
+    # e.g. "mariadb-admin  Ver 10.0 Distrib 10.11.6-MariaDB, for debian..."
+    "mariadb": r"(\d+\.\d+\.\d+)-MariaDB",
+    # e.g. "mysqladmin  Ver 8.0.35-0ubuntu0.22.04.1 for Linux"
+    "mysql": r"Ver (\d+\.\d+\.\d+)",
+}
+
+
+def get_clean_env_for_system_binaries() -> dict[str, str]:
+    """Get environment for system binaries when running from PyInstaller.
+
+    When running as a PyInstaller bundle, clear the bundled library path
+    and use system libraries instead. This prevents conflicts when executing
+    system binaries like mariabackup, mysqladmin, etc.
+    """
+    env = os.environ.copy()
+
+    # If running from PyInstaller bundle, use system libraries
+    if getattr(sys, "frozen", False):
+        # Clear the PyInstaller library path
+        env.pop("LD_LIBRARY_PATH", None)
+        # Use system library paths
+        env["LD_LIBRARY_PATH"] = "/usr/lib/x86_64-linux-gnu:/usr/lib:/lib"
+
+    return env
+
+
+def ping_command(config: Config) -> list[str]:
+    """mysqladmin ping with the backup credentials, works for both servers."""
+    credentials_file = (config.value("backup_credentials_file")
+            if config.value("backup_credentials_file") is not None
+            else f"/etc/{ config.PROJECT_NAME }/credentials.cnf")
+    return [
+        "mysqladmin",
+        f"--defaults-file={credentials_file}",
+        "--defaults-group-suffix=-dbcalm",
+        "ping",
+    ]
+
+
+class Capabilities:
+    """What the installed server and backup tool support."""
+
+    def __init__(
+        self,
+        server_version: Version | None,
+        tool_version: Version | None,
+        flags: frozenset[str],
+        compressors: frozenset[str],
+    ) -> None:
+        self.server_version = server_version
+        self.tool_version = tool_version
+        self.flags = flags
+        self.compressors = compressors
+
+    @property
+    def complete(self) -> bool:
+        return self.server_version is not None and self.tool_version is not None
+
+    def supports(self, flag: str) -> bool:
+        return flag in self.flags
+
+    def to_dict(self) -> dict:
+        return {
+            "server_version": str(self.server_version or "unknown"),
+            "tool_version": str(self.tool_version or "unknown"),
+            "flags": sorted(self.flags),
+            "compressors": sorted(self.compressors),
+        }
+
+
+class CapabilityProbe:
+    """Detect and cache server and backup tool capabilities.
+
+    Probing runs the admin and backup binaries, which takes hundreds of
+    milliseconds, so it is done once at startup and then only when the
+    cached result is older than `capability_ttl` (failed probes are retried
+    after FAILED_PROBE_TTL) or was invalidated after a failure. Liveness is
+    cached separately for `liveness_ttl` seconds. Safe to use from the socket
+    loop and scheduler threads at the same time.
+    """
+
+    def __init__(self, config: Config | None = None) -> None:
+        self.config = config if config is not None else config_factory()
+        self.logger = logger_factory()
+        self.capability_ttl = float(
+            self.config.value("capability_ttl", DEFAULT_CAPABILITY_TTL),
+        )
+        self.liveness_ttl = float(
+            self.config.value("liveness_ttl", DEFAULT_LIVENESS_TTL),
+        )
+        self._lock = threading.Lock()
+        self._capabilities: Capabilities | None = None
+        self._capabilities_expire = 0.0
+        self._alive: bool | None = None
+        self._alive_expire = 0.0
+        self._liveness_listeners: list[Callable[[bool], None]] = []
+
+    def capabilities(self) -> Capabilities:
+        with self._lock:
+            if (
+                self._capabilities is None
+                or time.monotonic() >= self._capabilities_expire
+            ):
+                self._refresh()
+            return self._capabilities
+
+    def refresh(self) -> Capabilities:
+        """Probe now, regardless of the cached result."""
+        with self._lock:
+            self._refresh()
+            return self._capabilities
+
+    def invalidate(self) -> None:
+        """Forget cached results, the next lookup probes again."""
+        with self._lock:
+            self._capabilities_expire = 0.0
+            self._alive_expire = 0.0
+
+    def server_alive(self) -> bool:
+        """Whether the server answers pings.
+
+        A recent "alive" is answered from memory (kept fresh by the liveness
+        monitor). Anything else pings right away, so a server that just came
+        back is not reported as down until the next scheduled check.
+        """
+        with self._lock:
+            if self._alive and time.monotonic() < self._alive_expire:
+                return True
+        alive = self.ping()
+        self.record_liveness(alive=alive)
+        return alive
+
+    def ping(self) -> bool:
+        result = self._run(ping_command(self.config))
+        return result is not None and result.returncode == 0
+
+    def record_liveness(self, *, alive: bool, ttl: float | None = None) -> None:
+        """Store a ping result and tell listeners if the state changed."""
+        with self._lock:
+            changed = self._alive != alive
+            self._alive = alive
+            self._alive_expire = time.monotonic() + (
+                self.liveness_ttl if ttl is None else ttl
+            )
+            listeners = list(self._liveness_listeners) if changed else []
+        for listener in listeners:
+            try:
+                listener(alive)
+            except Exception:
+                self.logger.exception("Error in liveness listener")
+
+    def on_liveness_change(self, listener: Callable[[bool], None]) -> None:
+        """Call listener(alive) whenever the server goes up or down."""
+        with self._lock:
+            self._liveness_listeners.append(listener)
+
+    def _refresh(self) -> None:
+        db_type = self.config.value("db_type")
+        backup_bin = self.config.value(
+            "backup_bin",
+            DEFAULT_BACKUP_BINARIES.get(db_type),
+        )
+        capabilities = Capabilities(
+            server_version=self._version(
+                [ADMIN_BINARIES.get(db_type), "--version"],
+                VERSION_PATTERNS.get(db_type),
+            ),
+            tool_version=self._version(
+                [backup_bin, "--version"],
+                r"(\d+\.\d+\.\d+)",
+            ),
+            flags=self._flags(backup_bin),
+            compressors=frozenset(
+                name for name in COMPRESSORS if shutil.which(name) is not None
+            ),
+        )
+        ttl = self.capability_ttl if capabilities.complete else FAILED_PROBE_TTL
+        self._capabilities = capabilities
+        self._capabilities_expire = time.monotonic() + ttl
+        self.logger.info("Detected capabilities: %s", capabilities.to_dict())
+
+    def _run(self, command: list) -> subprocess.CompletedProcess | None:
+        if None in command:
+            return None
+        try:
+            return subprocess.run(  # noqa: S603
+                command,
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=PROBE_TIMEOUT,
+                env=get_clean_env_for_system_binaries(),
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            self.logger.warning("Probe %s failed", command[0], exc_info=True)
+            return None
+
+    def _output(self, command: list) -> str | None:
+        """Combined stdout and stderr, tools differ in where they print."""
+        result = self._run(command)
+        if result is None:
+            return None
+        return result.stdout + result.stderr
+
+    def _version(self, command: list, pattern: str | None) -> Version | None:
+        output = self._output(command)
+        if output is None or pattern is None:
+            return None
+        match = re.search(pattern, output)
+        if match is None:
+            return None
+        try:
+            return Version(match.group(1))
+        except InvalidVersion:
+            return None
+
+    def _flags(self, backup_bin: str | None) -> frozenset[str]:
+        output = self._output([backup_bin, "--help"])
+        if output is None:
+            return frozenset()
+        return frozenset(
+            flag for flag in TOOL_FLAGS if re.search(rf"{flag}\b", output)
+        )
+
+@cache
+def capability_probe() -> CapabilityProbe:
+    """The probe shared by everything in the command service process."""
+    return CapabilityProbe()
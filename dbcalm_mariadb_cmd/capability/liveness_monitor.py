@@ -0,0 +1,89 @@
+import threading
+
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.model.server_state_change import ServerStateChange
+from dbcalm.data.repository.server_state_change import (
+    ServerStateChangeRepository,
+)
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm_mariadb_cmd.capability.capability_probe import CapabilityProbe
+
+# Seconds between pings while the server is up
+DEFAULT_INTERVAL = 5
+# Pings back off exponentially while the server is down, up to this
+DEFAULT_MAX_INTERVAL = 60
+
+
+class LivenessMonitor:
+    """Ping the database server in the background.
+
+    Keeps the probe's liveness state current so request validation only
+    reads memory, and records every up/down change as a ServerStateChange
+    row for the API, each ping marks the latest row as checked. While the
+    server is down the interval doubles up to `liveness_max_interval`,
+    requests still ping on their own in that case (see
+    CapabilityProbe.server_alive) so a recovered server is noticed right
+    away.
+    """
+
+    def __init__(self, probe: CapabilityProbe) -> None:
+        self.probe = probe
+        self.config = config_factory()
+        self.logger = logger_factory()
+        self.interval = float(
+            self.config.value("liveness_interval", DEFAULT_INTERVAL),
+        )
+        self.max_interval = float(
+            self.config.value("liveness_max_interval", DEFAULT_MAX_INTERVAL),
+        )
+        self._stop = threading.Event()
+        self._last_recorded: bool | None = None
+        self._record_lock = threading.Lock()
+        probe.on_liveness_change(self.record_change)
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.run,
+            daemon=True,
+            name="liveness-monitor",
+        )
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        interval = self.interval
+        while not self._stop.is_set():
+            try:
+                alive = self.probe.ping()
+                # trusted until shortly after the next ping is due
+                self.probe.record_liveness(alive=alive, ttl=interval * 2)
+                # the API no longer trusts a state it hasn't heard of lately
+                ServerStateChangeRepository().checked()
+            except Exception:
+                self.logger.exception("Error in liveness monitor")
+                alive = False
+
+            interval = (
+                self.interval if alive else min(interval * 2, self.max_interval)
+            )
+            self._stop.wait(interval)
+
+    def record_change(self, alive: bool) -> None:  # noqa: FBT001
+        # called from whichever thread pinged, the probe also reports its
+        # first result as a change, so compare with the stored state
+        with self._record_lock:
+            if self._last_recorded is None:
+                latest = ServerStateChangeRepository().recent(1)
+                if latest:
+                    self._last_recorded = latest[0].state == "up"
+            if self._last_recorded == alive:
+                return
+
+            self._last_recorded = alive
+            state = "up" if alive else "down"
+            log = self.logger.info if alive else self.logger.warning
+            log("Database server is %s", state)
+            ServerStateChangeRepository().create(ServerStateChange(state=state))
@@ -0,0 +1,68 @@
+from dbcalm.config.config import Config
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm_cmd.process.pressure_throttle import LoadProbe
+from dbcalm_mariadb_cmd.logical.client_session import (
+    ClientError,
+    ClientSession,
+    client_cmd,
+)
+
+THREADS_RUNNING_QUERY = "SHOW GLOBAL STATUS LIKE 'Threads_running'"
+# Sessions held up by BACKUP STAGE (MariaDB), LOCK INSTANCE FOR BACKUP or
+# FLUSH TABLES WITH READ LOCK (MySQL), as a backup's lock phase takes them
+LOCK_WAITERS_QUERY = (
+    "SELECT COUNT(*) FROM information_schema.PROCESSLIST WHERE STATE IN ("
+    "'Waiting for backup lock', 'Waiting for global read lock', "
+    "'Waiting for commit lock')"
+)
+
+
+class ServerLoadProbe:
+    """Load of the server as Threads_running over its limit.
+
+    Also tells whether sessions wait on a backup lock, a backup holding it
+    is never paused. One client session stays open while a job is
+    throttled. Without an answer from the server the load counts as none
+    and nothing as blocked, a failing probe doesn't hold backups back.
+    """
+
+    def __init__(self, config: Config, limit: int | None = None) -> None:
+        self.config = config
+        self.limit = limit
+        self.logger = logger_factory()
+        self._session: ClientSession | None = None
+
+    def __call__(self) -> float:
+        if self.limit is None:
+            return 0.0
+        running = self._value(THREADS_RUNNING_QUERY, "Threads_running")
+        # not counting the probe's own statement
+        return max((running or 0) - 1, 0) / self.limit
+
+    def blocking(self) -> bool:
+        return bool(self._value(LOCK_WAITERS_QUERY, "lock waiters"))
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _value(self, query: str, name: str) -> int | None:
+        """Last column of the one row query returns."""
+        try:
+            if self._session is None:
+                self._session = ClientSession(client_cmd(self.config))
+            ((*_columns, value),) = self._session.query(query)
+            return int(value)
+        except (ClientError, ValueError) as e:
+            self.logger.warning("Could not read %s: %s", name, e)
+            self.close()
+            return None
+
+
+def server_load_probes(config: Config) -> list[LoadProbe]:
+    """Probes of the server's load and locks for throttling backups."""
+    if not config.value("throttle", False):  # noqa: FBT003
+        return []
+    limit = config.value("throttle_threads_running")
+    return [ServerLoadProbe(config, int(limit) if limit is not None else None)]
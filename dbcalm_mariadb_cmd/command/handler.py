@@ -0,0 +1,56 @@
+import threading
+
+from dbcalm.errors.not_found_error import NotFoundError
+from dbcalm.handler.process_queue_handler import ProcessQueueHandler
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm_mariadb_cmd.adapter.adapter_factory import adapter_factory
+from dbcalm_mariadb_cmd.capability.capability_probe import capability_probe
+from dbcalm_mariadb_cmd.command.resolver import Resolver
+from dbcalm_mariadb_cmd.command.validator import NOT_FOUND, VALID_REQUEST
+from dbcalm_mariadb_cmd.command.validator import Validator as CommandValidator
+
+# Commands come from the socket and the internal scheduler's thread, the
+# checks against running jobs only hold if the job they allow is started
+# before the next command is checked
+command_lock = threading.Lock()
+
+
+def handle_command(command_data: dict) -> dict:
+    logger = logger_factory()
+    with command_lock:
+        try:
+            command_data = Resolver().resolve(command_data)
+        except NotFoundError as e:
+            return {"code": NOT_FOUND, "status": str(e)}
+
+        validator = CommandValidator()
+        response_code, message = validator.validate(command_data)
+        if(response_code != VALID_REQUEST):
+            logger.error(
+                "%s, command: %s ,arguments: %s",
+                message, command_data["cmd"], command_data["args"])
+
+            return {"code": response_code, "status": message }
+
+        try:
+            # the resolver names the engine of logical and snapshot backups
+            adapter = adapter_factory(command_data["args"].pop("engine", None))
+            # get the method from the adapter based on command called
+            method = getattr(adapter, command_data["cmd"])
+            # unpack arguments by name and call commands
+            process, queue = method(**command_data["args"])
+        except Exception:
+            # the server or backup tool may have changed, probe again next time
+            capability_probe().invalidate()
+            raise
+
+    queue_hander = ProcessQueueHandler(queue)
+
+    # Start a thread to process the queue
+    threading.Thread(target=queue_hander.handle, daemon=False).start()
+
+    command_id = (process[0].command_id
+                 if isinstance(process, list)
+                 else process.command_id)
+
+    return {"code": 202, "status": "Accepted", "id": command_id }
@@ -0,0 +1,91 @@
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.data_types.enum_types import BackupEngine
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.schedule import ScheduleRepository
+from dbcalm.errors.not_found_error import NotFoundError
+from dbcalm.util.backup_scope import BackupScope, scope_args
+
+
+class Resolver:
+    """Fill in command arguments callers may leave to the command service.
+
+    Runs before validation so requests coming from the API, the CLI or the
+    scheduler are all completed and validated the same way.
+    """
+
+    def resolve(self, command_data: dict) -> dict:
+        """Return command_data with defaults resolved.
+
+        Raises:
+            NotFoundError: If an incremental backup has no base backup or
+                the backup to test restore (or part of its chain) is missing
+        """
+        args = command_data.get("args", {})
+
+        if command_data.get("cmd") in ("full_backup", "incremental_backup"):
+            self._resolve_schedule(args)
+
+        if (
+            command_data.get("cmd") == "incremental_backup"
+            and args.get("from_backup_id") is None
+        ):
+            scope = BackupScope(args.get("include"), args.get("exclude"))
+            latest_backup = BackupRepository().latest_base(scope)
+            if not latest_backup:
+                msg = (
+                    "No backups of " + scope.describe()
+                    + " found to create incremental backup from"
+                )
+                raise NotFoundError(msg)
+            args["from_backup_id"] = latest_backup.id
+
+        if command_data.get("cmd") == "test_restore":
+            self._resolve_test_restore(args)
+
+        if command_data.get("cmd") == "restore_backup" and args.get("id_list"):
+            backup = BackupRepository().get(args["id_list"][-1])
+            if backup is not None and backup.engine is not None:
+                args["engine"] = backup.engine
+
+        command_data["args"] = args
+        return command_data
+
+    def _resolve_schedule(self, args: dict) -> None:
+        """Backups of a schedule cover what the schedule says by default.
+
+        The engine comes from the request, the schedule or backup_engine
+        in the config, in that order. Only logical and snapshot backups keep
+        it in the arguments, it picks the adapter running them.
+        """
+        schedule = None
+        if args.get("schedule_id") is not None:
+            schedule = ScheduleRepository().get(args["schedule_id"])
+        if schedule is not None and "include" not in args and "exclude" not in args:
+            args |= scope_args(schedule.include, schedule.exclude)
+
+        engine = (
+            args.pop("engine", None)
+            or (schedule.engine if schedule is not None else None)
+            or config_factory().value("backup_engine")
+        )
+        if engine in (BackupEngine.LOGICAL, BackupEngine.SNAPSHOT):
+            args["engine"] = BackupEngine(engine).value
+
+    def _resolve_test_restore(self, args: dict) -> None:
+        """Default to the latest backup and work out the chain to restore."""
+        repository = BackupRepository()
+        if args.get("id") is None:
+            backup = repository.latest_backup()
+            if not backup:
+                msg = "No backups found to test restore"
+                raise NotFoundError(msg)
+        else:
+            backup = repository.get(args["id"])
+            if not backup:
+                msg = f"Backup with id {args['id']} not found"
+                raise NotFoundError(msg)
+
+        args["id"] = backup.id
+        args["id_list"] = repository.required_backups(backup)
+        if backup.engine is not None:
+            args["engine"] = backup.engine
@@ -1,14 +1,19 @@
 
-import os
 import subprocess
-import sys
 from pathlib import Path
 
 from dbcalm.config.config_factory import config_factory
 from dbcalm.data.adapter.adapter_factory import (
     adapter_factory as data_adapter_factory,
 )
+from dbcalm.data.data_types.enum_types import BackupEngine
 from dbcalm.data.model.backup import Backup
+from dbcalm.util.backup_scope import BackupScope
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    capability_probe,
+    get_clean_env_for_system_binaries,
+    ping_command,
+)
 
 VALID_REQUEST = 200
 INVALID_REQUEST = 400
@@ -17,25 +22,6 @@ CONFLICT = 409
 NOT_FOUND = 404
 
 
-def get_clean_env_for_system_binaries() -> dict[str, str]:
-    """Get environment for system binaries when running from PyInstaller.
-
-    When running as a PyInstaller bundle, clear the bundled library path
-    and use system libraries instead. This prevents conflicts when executing
-    system binaries like mariabackup, mysqladmin, etc.
-    """
-    env = os.environ.copy()
-
-    # If running from PyInstaller bundle, use system libraries
-    if getattr(sys, "frozen", False):
-        # Clear the PyInstaller library path
-        env.pop("LD_LIBRARY_PATH", None)
-        # Use system library paths
-        env["LD_LIBRARY_PATH"] = "/usr/lib/x86_64-linux-gnu:/usr/lib:/lib"
-
-    return env
-
-
 class Validator:
     def __init__(self) -> None:
         self.config = config_factory()
@@ -46,13 +32,26 @@ class Validator:
             },
             "incremental_backup": {
                 "id": "unique|required",
-                "from_backup_id": "required",
+                "from_backup_id": "required|same_scope",
                 "|backup": ["server_alive"],
             },
             "restore_backup": {
                 "id_list": "required",
                 "target": "required",
                 "|database_restore": ["server_dead", "data_dir_empty"],
+                "|partial_restore": ["server_alive"],
+                "|logical_restore": ["server_alive"],
+            },
+            "verify_backup": {
+                "id": "required",
+            },
+            "test_restore": {
+                "id": "required",
+                "id_list": "required",
+            },
+            "gc_repository": {},
+            "drop_snapshots": {
+                "snapshots": "required",
             },
         }
 
@@ -68,16 +67,6 @@ class Validator:
                 value in self.commands[command].items() if "unique" in value
             ]
 
-    def _get_admin_binary(self) -> str:
-        """Get the admin binary name based on db_type configuration.
-
-        Returns:
-            str: 'mysqladmin' for both MariaDB and MySQL (mysqladmin works for both)
-        """
-        # mysqladmin works for both MariaDB and MySQL
-        # Could use mariadb-admin for MariaDB 10.5+ but mysqladmin is universal
-        return "mysqladmin"
-
     def _validate_required_args(self, command_data: dict) -> tuple[int, str]:
         """Check if all required arguments are present."""
         for arg in self.required_args(command_data["cmd"]):
@@ -103,6 +92,8 @@ class Validator:
         if (
             "|database_restore" not in self.commands[command_data["cmd"]]
             or command_data["args"]["target"] != "database"
+            # logical backups load into the running server
+            or command_data["args"].get("engine") == BackupEngine.LOGICAL
         ):
             return VALID_REQUEST, ""
 
@@ -114,6 +105,91 @@ class Validator:
 
         return VALID_REQUEST, ""
 
+    def _validate_logical_restore_checks(self, command_data: dict) -> tuple[int, str]:
+        """Validate logical backup and restore requirements."""
+        args = command_data["args"]
+        if args.get("engine") != BackupEngine.LOGICAL:
+            return VALID_REQUEST, ""
+
+        if command_data["cmd"] == "incremental_backup":
+            return INVALID_REQUEST, "Logical backups are always full backups"
+        if "|logical_restore" not in self.commands[command_data["cmd"]]:
+            return VALID_REQUEST, ""
+        if args.get("until_time") is not None or args.get("until_gtid") is not None:
+            return INVALID_REQUEST, (
+                "Logical backups can't be restored to a point in time"
+            )
+        if args["target"] != "database":
+            return VALID_REQUEST, ""
+
+        return self.partial_restore(
+            self.commands[command_data["cmd"]]["|logical_restore"],
+        )
+
+    def _validate_snapshot_checks(self, command_data: dict) -> tuple[int, str]:
+        """Snapshot backups are full copies of the whole data directory."""
+        args = command_data["args"]
+        if args.get("engine") != BackupEngine.SNAPSHOT:
+            return VALID_REQUEST, ""
+
+        if command_data["cmd"] == "incremental_backup":
+            return INVALID_REQUEST, "Snapshot backups are always full backups"
+        if args.get("include") or args.get("exclude"):
+            return INVALID_REQUEST, (
+                "Snapshot backups always cover the whole instance"
+            )
+        if args.get("until_time") is not None or args.get("until_gtid") is not None:
+            return INVALID_REQUEST, (
+                "Snapshot backups can't be restored to a point in time"
+            )
+        if args.get("target") in ("table", "schema"):
+            return INVALID_REQUEST, (
+                "Snapshot backups restore to the data directory or a folder"
+            )
+
+        return VALID_REQUEST, ""
+
+    def _validate_partial_restore_checks(self, command_data: dict) -> tuple[int, str]:
+        """Validate table and schema restore requirements."""
+        if (
+            "|partial_restore" not in self.commands[command_data["cmd"]]
+            or command_data["args"]["target"] not in ("table", "schema")
+        ):
+            return VALID_REQUEST, ""
+
+        if not command_data["args"].get("tables"):
+            return INVALID_REQUEST, "Missing required argument tables"
+
+        return self.partial_restore(
+            self.commands[command_data["cmd"]]["|partial_restore"],
+        )
+
+    def _validate_same_scope(self, command_data: dict) -> tuple[int, str]:
+        """Incrementals only build on a backup of the same tables."""
+        args = command_data["args"]
+        for arg, value in self.commands[command_data["cmd"]].items():
+            if "same_scope" not in value or not args.get(arg):
+                continue
+
+            base = data_adapter_factory().get(Backup, {"id": args[arg]})
+            if base is None:
+                return NOT_FOUND, f"Backup with id {args[arg]} not found"
+            scope = BackupScope(args.get("include"), args.get("exclude"))
+            base_scope = BackupScope(base.include, base.exclude)
+            if scope != base_scope:
+                return CONFLICT, (
+                    f"Backup {base.id} holds {base_scope.describe()}, an "
+                    f"incremental backup of {scope.describe()} can't be "
+                    "based on it"
+                )
+            if base.engine is not None:
+                return CONFLICT, (
+                    f"Backup {base.id} is a {base.engine} backup, incremental "
+                    "backups are based on physical ones"
+                )
+
+        return VALID_REQUEST, ""
+
     def _validate_unique_constraints(self, command_data: dict) -> tuple[int, str]:
         """Validate unique constraints for arguments."""
         # In the future we could make the unique validation more generic
@@ -139,8 +215,13 @@ class Validator:
 
         validators = [
             self._validate_required_args,
+            # refused before the server checks, whatever state it is in
+            self._validate_snapshot_checks,
             self._validate_backup_checks,
             self._validate_database_restore_checks,
+            self._validate_partial_restore_checks,
+            self._validate_logical_restore_checks,
+            self._validate_same_scope,
             self._validate_unique_constraints,
         ]
 
@@ -205,21 +286,26 @@ class Validator:
 
         return VALID_REQUEST, ""
 
+    def partial_restore(self, checks: list) -> tuple[int, str]:
+        if not self.credentials_file_valid():
+            return SERVICE_UNAVAILABLE, (
+                "credentials file not found or missing [client-dbcalm] section"
+            )
 
-    def server_dead(self) -> bool:
-        credentials_file = (self.config.value("backup_credentials_file")
-                if self.config.value("backup_credentials_file") is not None
-                else f"/etc/{ self.config.PROJECT_NAME }/credentials.cnf")
-
-        command = [
-            self._get_admin_binary(),
-            f"--defaults-file={credentials_file}",
-            "--defaults-group-suffix=-dbcalm",
-            "ping",
-        ]
+        # tables are imported into the running server
+        if "server_alive" in checks and not self.server_alive():
+            return SERVICE_UNAVAILABLE, (
+                "cannot restore tables, MySQL/MariaDB server is not running"
+            )
+
+        return VALID_REQUEST, ""
 
+
+    def server_dead(self) -> bool:
+        # Restores copy files into the data directory, so this always pings
+        # instead of trusting the cached state
         result = subprocess.run(  # noqa: S603
-            command,
+            ping_command(self.config),
             capture_output=True,
             text=True,
             check=False,
@@ -228,31 +314,14 @@ class Validator:
 
         # If admin ping succeeds (return code 0), the server is alive
         # If it fails (non-zero return code), the server is dead
-        return result.returncode != 0
+        alive = result.returncode == 0
+        capability_probe().record_liveness(alive=alive)
+        return not alive
 
     def server_alive(self) -> bool:
-        credentials_file = (self.config.value("backup_credentials_file")
-                if self.config.value("backup_credentials_file") is not None
-                else f"/etc/{ self.config.PROJECT_NAME }/credentials.cnf")
-
-        command = [
-            self._get_admin_binary(),
-            f"--defaults-file={credentials_file}",
-            "--defaults-group-suffix=-dbcalm",
-            "ping",
-        ]
-
-        result = subprocess.run(  # noqa: S603
-            command,
-            capture_output=True,
-            text=True,
-            check=False,
-            env=get_clean_env_for_system_binaries(),
-        )
-
-        # If mysqladmin ping succeeds (return code 0), the server is alive
-        # If it fails (non-zero return code), the server is dead
-        return result.returncode == 0
+        # cached for a few seconds, a stale answer only lets a backup start
+        # that then fails on its own
+        return capability_probe().server_alive()
 
     def data_dir_empty(self) -> bool:
         # Get data directory from config or use default
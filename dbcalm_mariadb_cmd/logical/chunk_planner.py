@@ -0,0 +1,144 @@
+import math
+from dataclasses import dataclass, field
+
+from dbcalm.util.backup_scope import BackupScope
+from dbcalm_mariadb_cmd.logical.client_session import ClientSession
+
+# Server metadata, not part of a logical dump
+SYSTEM_SCHEMAS = ("mysql", "information_schema", "performance_schema", "sys")
+# Primary keys of these types are split into ranges
+INTEGER_TYPES = {"tinyint", "smallint", "mediumint", "int", "integer", "bigint"}
+DEFAULT_CHUNK_ROWS = 500000
+
+
+@dataclass
+class Table:
+    schema: str
+    name: str
+    # insertable columns, generated ones are computed again on load
+    columns: list[str]
+    estimated_rows: int = 0
+    # the single integer primary key column, None if there is none
+    key: str | None = None
+
+    @property
+    def qualified(self) -> str:
+        return f"`{self.schema}`.`{self.name}`"
+
+
+@dataclass
+class Chunk:
+    table: Table
+    index: int
+    # bounds of the primary key range, None for an open end
+    low: int | None = None
+    high: int | None = None
+    conditions: list[str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        key = f"`{self.table.key}`"
+        self.conditions = []
+        if self.low is not None:
+            self.conditions.append(f"{key} >= {self.low}")
+        if self.high is not None:
+            self.conditions.append(f"{key} < {self.high}")
+
+    @property
+    def file_name(self) -> str:
+        return f"{self.table.schema}.{self.table.name}.{self.index:05d}.sql.gz"
+
+    def select(self) -> str:
+        """Query returning one line per row: its values as SQL literals.
+
+        QUOTE() escapes quotes and backslashes, line breaks are escaped on
+        top so every row stays on a single line of the client's output.
+        """
+        values = ", ".join(
+            f"REPLACE(REPLACE(QUOTE(`{column}`), CHAR(13), '\\\\r'), "
+            "CHAR(10), '\\\\n')"
+            for column in self.table.columns
+        )
+        statement = (
+            f"SELECT CONCAT('(', CONCAT_WS(',', {values}), ')') "  # noqa: S608
+            f"FROM {self.table.qualified}"
+        )
+        if self.conditions:
+            statement += " WHERE " + " AND ".join(self.conditions)
+        return statement
+
+
+class ChunkPlanner:
+    """Split the tables of a scope into chunks dumped by parallel workers.
+
+    Tables with a single integer primary key are cut into ranges of that
+    key holding about chunk_rows rows each (by the server's row estimate
+    and the key's spread), every other table is one chunk. Runs in a
+    session inside the dump's snapshot so the key bounds match the data
+    the workers read.
+    """
+
+    def __init__(self, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+        self.chunk_rows = max(1, chunk_rows)
+
+    def tables(self, session: ClientSession, scope: BackupScope) -> list[Table]:
+        excluded = ", ".join(f"'{schema}'" for schema in SYSTEM_SCHEMAS)
+        tables = {
+            (schema, name): Table(schema, name, [], int(rows or 0))
+            for schema, name, rows in session.query(
+                "SELECT table_schema, table_name, IFNULL(table_rows, 0) "  # noqa: S608
+                "FROM information_schema.tables WHERE table_type = 'BASE TABLE' "
+                f"AND table_schema NOT IN ({excluded}) "
+                "ORDER BY table_schema, table_name",
+            )
+            if scope.covers(schema, name)
+        }
+        keys: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for schema, name, column, data_type, column_key, extra in session.query(
+            "SELECT table_schema, table_name, column_name, data_type, "  # noqa: S608
+            "column_key, extra FROM information_schema.columns "
+            f"WHERE table_schema NOT IN ({excluded}) "
+            "ORDER BY table_schema, table_name, ordinal_position",
+        ):
+            table = tables.get((schema, name))
+            if table is None:
+                continue
+            if "GENERATED" not in extra.upper() and "PERSISTENT" not in extra.upper():
+                table.columns.append(column)
+            if column_key == "PRI":
+                keys.setdefault((schema, name), []).append((column, data_type))
+        for table_key, table in tables.items():
+            key = keys.get(table_key, [])
+            if len(key) == 1 and key[0][1].lower() in INTEGER_TYPES:
+                table.key = key[0][0]
+        return list(tables.values())
+
+    def chunks(self, session: ClientSession, tables: list[Table]) -> list[Chunk]:
+        chunks = []
+        for table in tables:
+            count = math.ceil(table.estimated_rows / self.chunk_rows)
+            if table.key is None or count < 2:  # noqa: PLR2004
+                chunks.append(Chunk(table, 0))
+                continue
+            ((low, high),) = session.query(
+                f"SELECT MIN(`{table.key}`), MAX(`{table.key}`) "  # noqa: S608
+                f"FROM {table.qualified}",
+            )
+            if low == "NULL":
+                chunks.append(Chunk(table, 0))
+                continue
+            chunks.extend(self.ranges(table, int(low), int(high), count))
+        return chunks
+
+    def ranges(self, table: Table, low: int, high: int, count: int) -> list[Chunk]:
+        """count chunks over the key range, the outer ones left open."""
+        step = max(1, math.ceil((high - low + 1) / count))
+        bounds = list(range(low + step, high + 1, step))
+        return [
+            Chunk(
+                table,
+                index,
+                bounds[index - 1] if index > 0 else None,
+                bounds[index] if index < len(bounds) else None,
+            )
+            for index in range(len(bounds) + 1)
+        ]
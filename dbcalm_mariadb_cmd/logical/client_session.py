@@ -0,0 +1,140 @@
+import contextlib
+import secrets
+import subprocess
+import tempfile
+from collections.abc import Callable
+from typing import IO, Self
+
+from dbcalm.config.config import Config
+from dbcalm.storage.storage_backend import READ_SIZE
+from dbcalm_cmd.process.job_cgroups import in_current_cgroup
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    get_clean_env_for_system_binaries,
+)
+from dbcalm_mariadb_cmd.restore_test.restore_tester import (
+    CLIENT_BINARIES,
+    ERROR_TAIL_LINES,
+)
+
+# Rows of a dump can carry large blobs
+MAX_PACKET = "1G"
+
+
+class ClientError(Exception):
+    """A statement failed or the client session ended."""
+
+
+class ClientSession:
+    """One server connection kept open across statements.
+
+    The client binary reads statements from stdin and, in batch mode,
+    quits at the first error. After every statement a SELECT of a random
+    marker is sent, the marker's line in the output ends the result. That
+    keeps session state like an open transaction between statements,
+    which several separate client runs can't share.
+    """
+
+    def __init__(self, command: list[str]) -> None:
+        self.marker = f"-- end of result {secrets.token_hex(16)} --".encode()
+        self._log = tempfile.TemporaryFile()  # noqa: SIM115
+        self._client = subprocess.Popen(  # noqa: S603
+            in_current_cgroup([
+                *command,
+                "--batch",
+                "--raw",
+                "--skip-column-names",
+                "--unbuffered",
+                "--binary-mode",
+                f"--max-allowed-packet={MAX_PACKET}",
+            ]),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self._log,
+            env=get_clean_env_for_system_binaries(),
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def execute(self, statement: str) -> None:
+        """Run statements without a result."""
+        self.query_lines(statement, lambda _line: None)
+
+    def query(self, statement: str) -> list[list[str]]:
+        """Rows of a result with tab separated columns.
+
+        Only for results without tabs and line breaks in their values,
+        such as names and numbers.
+        """
+        rows = []
+        self.query_lines(
+            statement,
+            lambda line: rows.append(line.decode().rstrip("\n").split("\t")),
+        )
+        return rows
+
+    def query_lines(self, statement: str, consume: Callable[[bytes], None]) -> int:
+        """Hand every output line of a result to consume.
+
+        Returns:
+            Number of lines
+        """
+        self._send(
+            f"{statement.rstrip().rstrip(';')};\n"
+            f"SELECT '{self.marker.decode()}';\n",
+        )
+        lines = 0
+        while line := self._client.stdout.readline():
+            if line.rstrip(b"\n") == self.marker:
+                return lines
+            consume(line)
+            lines += 1
+        raise ClientError(self._failure())
+
+    def run_script(self, script: IO[bytes]) -> None:
+        """Pipe a file of statements into the session and wait for it."""
+        try:
+            while piece := script.read(READ_SIZE):
+                self._client.stdin.write(piece)
+        except BrokenPipeError:
+            raise ClientError(self._failure()) from None
+        self.execute("SELECT 1")
+
+    def close(self) -> None:
+        with contextlib.suppress(BrokenPipeError):
+            self._client.stdin.close()
+        self._client.stdout.close()
+        self._client.wait()
+        self._log.close()
+
+    def _send(self, text: str) -> None:
+        try:
+            self._client.stdin.write(text.encode())
+            self._client.stdin.flush()
+        except BrokenPipeError:
+            raise ClientError(self._failure()) from None
+
+    def _failure(self) -> str:
+        self._client.wait()
+        self._log.seek(0)
+        lines = self._log.read().decode(errors="replace").strip().splitlines()
+        return (
+            f"Client exited with code {self._client.returncode}:\n"
+            + "\n".join(lines[-ERROR_TAIL_LINES:])
+        )
+
+
+def client_cmd(config: Config) -> list[str]:
+    """Client command connecting to the server with the backup credentials."""
+    credentials_file = (config.value("backup_credentials_file")
+            if config.value("backup_credentials_file") is not None
+            else f"/etc/{ config.PROJECT_NAME }/credentials.cnf")
+    return [
+        CLIENT_BINARIES.get(config.value("db_type")),
+        f"--defaults-file={credentials_file}",
+        "--defaults-group-suffix=-dbcalm",
+        f"--host={config.DB_HOST}",
+    ]
@@ -0,0 +1,282 @@
+import gzip
+import hashlib
+import json
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.util.backup_scope import BackupScope
+from dbcalm_mariadb_cmd.logical.chunk_planner import (
+    DEFAULT_CHUNK_ROWS,
+    Chunk,
+    ChunkPlanner,
+    Table,
+)
+from dbcalm_mariadb_cmd.logical.client_session import (
+    ClientError,
+    ClientSession,
+    client_cmd,
+)
+
+# Describes the dump, read by the LogicalLoader
+METADATA_FILE = "metadata.json"
+DEFAULT_LOGICAL_PARALLEL = 4
+# Rows per INSERT statement of a chunk file
+ROWS_PER_STATEMENT = 1000
+# Statements reading the GTID state of the snapshot, by server type
+GTID_QUERIES = {
+    "mariadb": "SELECT @@global.gtid_binlog_pos",
+    "mysql": "SELECT @@global.gtid_executed",
+}
+
+
+class DumpError(Exception):
+    """A logical dump could not be taken."""
+
+
+class LogicalDumper:
+    """Dump tables as compressed SQL with a pool of parallel sessions.
+
+    Consistency works like mydumper's: a coordinator session takes FLUSH
+    TABLES WITH READ LOCK, every worker session starts a transaction WITH
+    CONSISTENT SNAPSHOT, the GTID state is read and the lock is released
+    again. All workers then see the same point in time while the server
+    takes writes. Tables are split into primary key ranges (see
+    ChunkPlanner), each chunk is written to its own gzip file of
+    multi-row INSERTs with its row count and checksum in metadata.json.
+
+    Only tables are dumped, users, views, routines and triggers are not.
+    """
+
+    def __init__(self, config: Config | None = None) -> None:
+        self.config = config if config is not None else config_factory()
+        self.logger = logger_factory()
+        self.db_type = self.config.value("db_type")
+        self.workers = max(
+            1,
+            int(self.config.value("logical_parallel", DEFAULT_LOGICAL_PARALLEL)),
+        )
+        self.planner = ChunkPlanner(
+            int(self.config.value("logical_chunk_rows", DEFAULT_CHUNK_ROWS)),
+        )
+        # seconds tables were locked by the last dump
+        self.lock_seconds: float | None = None
+
+    def dump(
+        self,
+        target: Path,
+        scope: BackupScope,
+        progress: Callable[[str], None] | None = None,
+    ) -> str:
+        """Dump the tables of scope into the folder target.
+
+        Returns:
+            A summary with the throughput of the dump
+        """
+        report = progress or (lambda _message: None)
+        started = time.monotonic()
+        target.mkdir(parents=True)
+        sessions = []
+        try:
+            with ClientSession(client_cmd(self.config)) as coordinator:
+                coordinator.execute("FLUSH TABLES WITH READ LOCK")
+                locked = time.monotonic()
+                for _ in range(self.workers):
+                    session = ClientSession(client_cmd(self.config))
+                    sessions.append(session)
+                    session.execute(
+                        "SET NAMES binary; "
+                        "SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ; "
+                        "START TRANSACTION WITH CONSISTENT SNAPSHOT",
+                    )
+                ((gtid,),) = coordinator.query(GTID_QUERIES[self.db_type]) or [[""]]
+                coordinator.execute("UNLOCK TABLES")
+                lock_seconds = time.monotonic() - locked
+                self.lock_seconds = round(lock_seconds, 3)
+
+            tables = self.planner.tables(sessions[0], scope)
+            schemas = self.write_schemas(sessions[0], tables, target)
+            chunks = self.planner.chunks(sessions[0], tables)
+            report(f"Dumping {len(tables)} tables in {len(chunks)} chunks")
+            written = self.dump_chunks(sessions, chunks, target, report)
+        except ClientError as e:
+            raise DumpError(str(e)) from e
+        finally:
+            for session in sessions:
+                session.close()
+
+        seconds = time.monotonic() - started
+        rows = sum(chunk["rows"] for chunk in written.values())
+        size = sum(chunk["bytes"] for chunk in written.values())
+        metadata = {
+            "engine": "logical",
+            "db_type": self.db_type,
+            "gtid": gtid or None,
+            "finished": datetime.now(tz=UTC).isoformat(),
+            "lock_seconds": self.lock_seconds,
+            "schemas": schemas,
+            "tables": [
+                {
+                    "schema": table.schema,
+                    "name": table.name,
+                    "columns": table.columns,
+                    "chunks": [
+                        written[chunk.file_name]
+                        for chunk in chunks if chunk.table is table
+                    ],
+                }
+                for table in tables
+            ],
+        }
+        (target / METADATA_FILE).write_text(json.dumps(metadata, indent=2))
+        return (
+            f"Dumped {rows} rows of {len(tables)} tables in {len(chunks)} "
+            f"chunks with {self.workers} workers: "
+            f"{throughput(size, seconds)}, tables locked for {lock_seconds:.2f}s"
+        )
+
+    def write_schemas(
+        self,
+        session: ClientSession,
+        tables: list[Table],
+        target: Path,
+    ) -> dict[str, str]:
+        """Write the CREATE TABLE statements, return the CREATE DATABASEs."""
+        schemas = {}
+        for table in tables:
+            if table.schema not in schemas:
+                schemas[table.schema] = _second_column(
+                    session,
+                    f"SHOW CREATE DATABASE `{table.schema}`",
+                )
+            (target / f"{table.schema}.{table.name}-schema.sql").write_bytes(
+                _second_column(session, f"SHOW CREATE TABLE {table.qualified}")
+                .encode() + b";\n",
+            )
+        return schemas
+
+    def dump_chunks(
+        self,
+        sessions: list[ClientSession],
+        chunks: list[Chunk],
+        target: Path,
+        report: Callable[[str], None],
+    ) -> dict[str, dict]:
+        """Dump chunks with one thread per session, largest tables first."""
+        pending = queue.SimpleQueue()
+        for chunk in sorted(chunks, key=lambda c: -c.table.estimated_rows):
+            pending.put(chunk)
+        lock = threading.Lock()
+        failed = threading.Event()
+        written = {}
+
+        def work(session: ClientSession) -> None:
+            while not failed.is_set():
+                try:
+                    chunk = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    entry = self.dump_chunk(session, chunk, target)
+                except BaseException:
+                    # the other workers stop after their current chunk
+                    failed.set()
+                    raise
+                with lock:
+                    written[chunk.file_name] = entry
+                    report(f"Dumped chunk {len(written)} of {len(chunks)}")
+
+        with ThreadPoolExecutor(
+            max_workers=len(sessions),
+            thread_name_prefix="logical-dump",
+        ) as pool:
+            # list() re-raises the first failure
+            list(pool.map(work, sessions))
+        return written
+
+    def dump_chunk(self, session: ClientSession, chunk: Chunk, target: Path) -> dict:
+        path = target / chunk.file_name
+        self.logger.debug("Dumping %s", chunk.select())
+        with path.open("wb") as raw:
+            digest = _DigestWriter(raw)
+            with gzip.GzipFile(fileobj=digest, mode="wb", mtime=0) as output:
+                writer = InsertWriter(output, chunk.table)
+                session.query_lines(chunk.select(), writer.row)
+                writer.close()
+        return {
+            "file": chunk.file_name,
+            "rows": writer.rows,
+            "bytes": digest.size,
+            "sha256": digest.hexdigest(),
+        }
+
+
+class InsertWriter:
+    """Turn rows (a line of SQL values each) into multi-row INSERTs."""
+
+    def __init__(self, output: gzip.GzipFile, table: Table) -> None:
+        self.output = output
+        self.header = (
+            f"INSERT INTO `{table.name}` ("
+            + ", ".join(f"`{column}`" for column in table.columns)
+            + ") VALUES\n"
+        ).encode()
+        self.rows = 0
+        self._pending = 0
+
+    def row(self, line: bytes) -> None:
+        if self._pending == 0:
+            self.output.write(self.header)
+        else:
+            self.output.write(b",\n")
+        self.output.write(line.rstrip(b"\n"))
+        self.rows += 1
+        self._pending += 1
+        if self._pending == ROWS_PER_STATEMENT:
+            self.close()
+
+    def close(self) -> None:
+        if self._pending:
+            self.output.write(b";\n")
+            self._pending = 0
+
+
+class _DigestWriter:
+    """File wrapper hashing and counting what is written through it."""
+
+    def __init__(self, output: object) -> None:
+        self.output = output
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self._hash.update(data)
+        self.size += len(data)
+        return self.output.write(data)
+
+    def flush(self) -> None:
+        self.output.flush()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def _second_column(session: ClientSession, statement: str) -> str:
+    lines = []
+    session.query_lines(statement, lines.append)
+    return b"".join(lines).decode().split("\t", 1)[1].rstrip("\n")
+
+
+def throughput(size: int, seconds: float) -> str:
+    megabytes = size / 1024 / 1024
+    return (
+        f"{megabytes:.1f} MB compressed in {seconds:.1f}s "
+        f"({megabytes / max(seconds, 0.001):.1f} MB/s)"
+    )
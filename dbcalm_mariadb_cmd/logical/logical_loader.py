@@ -0,0 +1,223 @@
+import gzip
+import hashlib
+import json
+import queue
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.storage.storage_backend import READ_SIZE
+from dbcalm_mariadb_cmd.logical.client_session import (
+    ClientError,
+    ClientSession,
+    client_cmd,
+)
+from dbcalm_mariadb_cmd.logical.logical_dumper import (
+    DEFAULT_LOGICAL_PARALLEL,
+    METADATA_FILE,
+    throughput,
+)
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+
+# Checks the dump was consistent in itself, not needed again on load
+LOAD_SESSION = (
+    "SET NAMES binary; "
+    "SET SESSION foreign_key_checks = 0; "
+    "SET SESSION unique_checks = 0"
+)
+
+
+class LoadError(Exception):
+    """A logical dump could not be checked or loaded."""
+
+
+class LogicalLoader:
+    """Load a logical dump into the running server with parallel sessions.
+
+    Schemas are created when missing and every dumped table is dropped and
+    created again from its CREATE TABLE statement, then the chunk files
+    are loaded by logical_parallel sessions at once, largest tables first.
+    Tables outside the dump are left alone. A selection limits the load to
+    some tables or schemas of the dump.
+    """
+
+    def __init__(self, config: Config | None = None) -> None:
+        self.config = config if config is not None else config_factory()
+        self.logger = logger_factory()
+        self.workers = max(
+            1,
+            int(self.config.value("logical_parallel", DEFAULT_LOGICAL_PARALLEL)),
+        )
+
+    def tables(
+        self,
+        source: Path,
+        selection: TablespaceSelection | None = None,
+    ) -> list[dict]:
+        """Tables of the dump in source, those of selection if given.
+
+        Raises:
+            LoadError: If there is no dump in source or a selected table or
+                schema is not in it
+        """
+        try:
+            metadata = json.loads((source / METADATA_FILE).read_text())
+        except (OSError, ValueError) as e:
+            msg = f"{source} holds no logical dump: {e}"
+            raise LoadError(msg) from e
+        tables = metadata["tables"]
+        if selection is None:
+            return tables
+
+        dumped = {(table["schema"], table["name"]) for table in tables}
+        missing = sorted(
+            {".".join(name) for name in selection.tables - dumped}
+            | selection.schemas - {schema for schema, _ in dumped},
+        )
+        if missing:
+            msg = "The backup holds no " + ", ".join(missing)
+            raise LoadError(msg)
+        return [
+            table for table in tables
+            if table["schema"] in selection.schemas
+            or (table["schema"], table["name"]) in selection.tables
+        ]
+
+    def load(
+        self,
+        source: Path,
+        selection: TablespaceSelection | None = None,
+        progress: Callable[[str], None] | None = None,
+    ) -> str:
+        """Load the dump in source.
+
+        Returns:
+            A summary with the throughput of the load
+        """
+        report = progress or (lambda _message: None)
+        started = time.monotonic()
+        tables = self.tables(source, selection)
+        schemas = json.loads((source / METADATA_FILE).read_text())["schemas"]
+        chunks = [
+            (table, chunk)
+            for table in sorted(tables, key=lambda t: -_rows(t))
+            for chunk in table["chunks"]
+        ]
+        try:
+            with ClientSession(client_cmd(self.config)) as session:
+                session.execute(LOAD_SESSION)
+                for schema in sorted({table["schema"] for table in tables}):
+                    session.execute(
+                        schemas[schema].replace(
+                            "CREATE DATABASE",
+                            "CREATE DATABASE IF NOT EXISTS",
+                            1,
+                        ),
+                    )
+                for table in tables:
+                    report(f"Creating table {table['schema']}.{table['name']}")
+                    session.execute(
+                        f"USE `{table['schema']}`; "
+                        f"DROP TABLE IF EXISTS `{table['name']}`",
+                    )
+                    schema_file = f"{table['schema']}.{table['name']}-schema.sql"
+                    with (source / schema_file).open("rb") as script:
+                        session.run_script(script)
+            self.load_chunks(source, chunks, report)
+        except (ClientError, OSError, EOFError, zlib.error) as e:
+            raise LoadError(str(e)) from e
+
+        size = sum(chunk["bytes"] for _, chunk in chunks)
+        return (
+            f"Loaded {sum(_rows(table) for table in tables)} rows of "
+            f"{len(tables)} tables from {len(chunks)} chunks with "
+            f"{self.workers} workers: "
+            f"{throughput(size, time.monotonic() - started)}"
+        )
+
+    def load_chunks(
+        self,
+        source: Path,
+        chunks: list[tuple[dict, dict]],
+        report: Callable[[str], None],
+    ) -> None:
+        pending = queue.SimpleQueue()
+        for item in chunks:
+            pending.put(item)
+        lock = threading.Lock()
+        failed = threading.Event()
+        done = []
+
+        def work() -> None:
+            with ClientSession(client_cmd(self.config)) as session:
+                session.execute(LOAD_SESSION)
+                while not failed.is_set():
+                    try:
+                        table, chunk = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        session.execute(f"USE `{table['schema']}`")
+                        with gzip.open(source / chunk["file"], "rb") as script:
+                            session.run_script(script)
+                    except BaseException:
+                        # the other workers stop after their current chunk
+                        failed.set()
+                        raise
+                    with lock:
+                        done.append(chunk)
+                        report(f"Loaded chunk {len(done)} of {len(chunks)}")
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="logical-load",
+        ) as pool:
+            futures = [pool.submit(work) for _ in range(self.workers)]
+            for future in futures:
+                # re-raises the failure of a worker
+                future.result()
+
+    def check(
+        self,
+        source: Path,
+        progress: Callable[[str], None] | None = None,
+    ) -> str:
+        """Check every chunk file against its checksum and decompress it.
+
+        Raises:
+            LoadError: If a file is missing, changed or damaged
+        """
+        report = progress or (lambda _message: None)
+        tables = self.tables(source)
+        chunks = [chunk for table in tables for chunk in table["chunks"]]
+        for index, chunk in enumerate(chunks, 1):
+            path = source / chunk["file"]
+            try:
+                digest = hashlib.sha256()
+                with path.open("rb") as raw:
+                    while piece := raw.read(READ_SIZE):
+                        digest.update(piece)
+                if digest.hexdigest() != chunk["sha256"]:
+                    msg = f"{chunk['file']} doesn't match its checksum"
+                    raise LoadError(msg)
+                with gzip.open(path, "rb") as data:
+                    while data.read(READ_SIZE):
+                        pass
+            except (OSError, EOFError, zlib.error) as e:
+                msg = f"{chunk['file']} can't be read: {e}"
+                raise LoadError(msg) from e
+            report(f"Checked chunk {index} of {len(chunks)}")
+        return (
+            f"Checked {len(chunks)} chunks of {len(tables)} tables, "
+            f"{sum(_rows(table) for table in tables)} rows"
+        )
+
+
+def _rows(table: dict) -> int:
+    return sum(chunk["rows"] for chunk in table["chunks"])
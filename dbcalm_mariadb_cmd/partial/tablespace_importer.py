@@ -0,0 +1,186 @@
+import shutil
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    get_clean_env_for_system_binaries,
+)
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+from dbcalm_mariadb_cmd.restore_test.restore_tester import (
+    CLIENT_BINARIES,
+    ERROR_TAIL_LINES,
+)
+
+# Files of an exported table that go into the data directory, the .cfg
+# holds the table's metadata IMPORT TABLESPACE checks against
+EXPORT_SUFFIXES = [".ibd", ".cfg"]
+# The server's own metadata tables are never swapped out
+SYSTEM_SCHEMAS = {"mysql", "information_schema", "performance_schema", "sys"}
+
+
+class TablespaceImportError(Exception):
+    """Exported tables could not be imported into the running server."""
+
+
+class TablespaceImporter:
+    """Swap the tablespaces of live tables for exported ones.
+
+    Works on a backup prepared with --export: every table is discarded on
+    the running server with ALTER TABLE ... DISCARD TABLESPACE, the
+    exported .ibd and .cfg files are moved into its data directory and
+    ALTER TABLE ... IMPORT TABLESPACE takes them in. The rest of the server
+    keeps running. Tables have to exist with the definition they had when
+    the backup was taken, recreate dropped ones before restoring them.
+    """
+
+    def __init__(self, config: Config | None = None) -> None:
+        self.config = config if config is not None else config_factory()
+        self.logger = logger_factory()
+        self.client_bin = CLIENT_BINARIES.get(self.config.value("db_type"))
+
+    def tables(
+        self,
+        prepared: Path,
+        selection: TablespaceSelection,
+    ) -> list[tuple[str, str]]:
+        """Tables to import, found in the prepared backup.
+
+        Raises:
+            TablespaceImportError: If a requested table or schema has no
+                exported tablespace in the backup
+        """
+        tables = set()
+        for schema in selection.schemas:
+            if schema in SYSTEM_SCHEMAS:
+                msg = f"{schema} is a system schema and can't be restored"
+                raise TablespaceImportError(msg)
+            found = {(schema, path.stem) for path in prepared.glob(f"{schema}/*.ibd")}
+            if not found:
+                msg = f"The backup has no tables of schema {schema}"
+                raise TablespaceImportError(msg)
+            # t#P#p0.ibd, partitions are files of their own
+            partitioned = sorted(
+                {name.split("#")[0] for _, name in found if "#" in name},
+            )
+            if partitioned:
+                msg = (
+                    f"Partitioned tables of {schema} can't be imported: "
+                    + ", ".join(partitioned)
+                )
+                raise TablespaceImportError(msg)
+            tables |= found
+        for schema, table in selection.tables:
+            if not (prepared / schema / f"{table}.ibd").is_file():
+                msg = (
+                    f"The backup has no tablespace of {schema}.{table}, it "
+                    "doesn't exist there or isn't a file-per-table InnoDB table"
+                )
+                raise TablespaceImportError(msg)
+            tables.add((schema, table))
+        return sorted(tables)
+
+    def run(
+        self,
+        prepared: Path,
+        selection: TablespaceSelection,
+        progress: Callable[[str], None] | None = None,
+    ) -> str:
+        """Import the selected tables of a prepared backup.
+
+        Returns:
+            A summary of the imported tables
+        """
+        report = progress or (lambda _message: None)
+        tables = self.tables(prepared, selection)
+        missing = set(tables) - self.live_tables({schema for schema, _ in tables})
+        if missing:
+            msg = (
+                "Tables missing on the server, create them as they were when "
+                "the backup was taken: "
+                + ", ".join(f"{schema}.{table}" for schema, table in sorted(missing))
+            )
+            raise TablespaceImportError(msg)
+
+        datadir = Path(self.query("SELECT @@datadir").strip())
+        for index, (schema, table) in enumerate(tables, 1):
+            self.import_table(prepared, datadir, schema, table)
+            report(f"Imported table {index} of {len(tables)}")
+        return f"Imported {len(tables)} tables: " + ", ".join(
+            f"{schema}.{table}" for schema, table in tables
+        )
+
+    def import_table(
+        self,
+        prepared: Path,
+        datadir: Path,
+        schema: str,
+        table: str,
+    ) -> None:
+        name = f"`{schema}`.`{table}`"
+        self.query(f"ALTER TABLE {name} DISCARD TABLESPACE")
+        try:
+            for suffix in EXPORT_SUFFIXES:
+                exported = prepared / schema / f"{table}{suffix}"
+                if exported.is_file():
+                    # a rename when the backup and data directory share a
+                    # filesystem, the prepared copy is thrown away anyway
+                    shutil.move(exported, datadir / schema / exported.name)
+            self.query(f"ALTER TABLE {name} IMPORT TABLESPACE")
+        except (OSError, TablespaceImportError) as e:
+            msg = (
+                f"Importing {schema}.{table} failed, the table has no "
+                f"tablespace now and needs to be restored again: {e}"
+            )
+            raise TablespaceImportError(msg) from e
+        # only needed by the import
+        (datadir / schema / f"{table}.cfg").unlink(missing_ok=True)
+
+    def live_tables(self, schemas: set[str]) -> set[tuple[str, str]]:
+        """Tables of the given schemas on the running server."""
+        # plain names only, see parse_table_name
+        names = ", ".join(f"'{schema}'" for schema in sorted(schemas))
+        output = self.query(
+            "SELECT table_schema, table_name FROM information_schema.tables "  # noqa: S608
+            f"WHERE table_schema IN ({names}) AND table_type = 'BASE TABLE'",
+        )
+        return {
+            tuple(line.split("\t", 1)) for line in output.splitlines() if line
+        }
+
+    def query(self, statement: str) -> str:
+        self.logger.debug("Partial restore running: %s", statement)
+        result = subprocess.run(  # noqa: S603
+            [
+                self.client_bin,
+                *self._connection_options(),
+                "--batch",
+                "--skip-column-names",
+                "-e",
+                # discarding a referenced table needs it, IMPORT checks
+                # the data against the .cfg instead
+                f"SET SESSION foreign_key_checks = 0; {statement}",
+            ],
+            capture_output=True,
+            text=True,
+            check=False,
+            env=get_clean_env_for_system_binaries(),
+        )
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()[-ERROR_TAIL_LINES:]
+            msg = f"{statement} failed:\n" + "\n".join(lines)
+            raise TablespaceImportError(msg)
+        return result.stdout
+
+    def _connection_options(self) -> list[str]:
+        credentials_file = (self.config.value("backup_credentials_file")
+                if self.config.value("backup_credentials_file") is not None
+                else f"/etc/{ self.config.PROJECT_NAME }/credentials.cnf")
+        return [
+            f"--defaults-file={credentials_file}",
+            "--defaults-group-suffix=-dbcalm",
+            f"--host={self.config.DB_HOST}",
+        ]
@@ -0,0 +1,60 @@
+from collections.abc import Iterable
+from pathlib import PurePosixPath
+from typing import Self
+
+from dbcalm.data.data_types.enum_types import RestoreTarget
+from dbcalm.util.table_names import parse_table_name
+
+# Always staged: the system schema's tablespaces are read while preparing
+SYSTEM_SCHEMAS = {"mysql"}
+
+
+class TablespaceSelection:
+    """The files of a backup a table or schema restore needs.
+
+    That is every file in the top folder (system tablespace, redo and undo
+    logs, the backup tool's metadata), MySQL's #innodb_* folders, the
+    system schema and the files of the requested tables: .ibd, .frm,
+    .cfg and the .delta/.meta files of incrementals. Preparing a copy
+    with only these is enough to export the tables, the other
+    tablespaces are reported missing and skipped.
+    """
+
+    def __init__(
+        self,
+        tables: Iterable[str] = (),
+        schemas: Iterable[str] = (),
+    ) -> None:
+        self.tables = {parse_table_name(name) for name in tables}
+        self.schemas = {
+            parse_table_name(name, schema_only=True)[0] for name in schemas
+        }
+
+    @classmethod
+    def for_target(cls, target: RestoreTarget, names: list[str]) -> Self:
+        """Selection of a restore, names are tables or schemas by target."""
+        if target == RestoreTarget.SCHEMA:
+            return cls(schemas=names)
+        return cls(tables=names)
+
+    def matches(self, path: str) -> bool:
+        """Whether a path relative to the backup folder is needed."""
+        parts = PurePosixPath(path).parts
+        if ".." in parts:
+            return False
+        if len(parts) == 1 or parts[0].startswith("#"):
+            return True
+        if len(parts) != 2:  # noqa: PLR2004
+            return False
+        schema, file_name = parts
+        if schema in SYSTEM_SCHEMAS or schema in self.schemas:
+            return True
+        # t.ibd, t.ibd.delta, t.frm; partitions (t#P#p0.ibd) don't count
+        return (schema, file_name.split(".", 1)[0]) in self.tables
+
+    def arguments(self) -> list[str]:
+        """Command line of the xbstream filter selecting the same files."""
+        return [
+            *(f"--schema={schema}" for schema in sorted(self.schemas)),
+            *(f"--table={schema}.{table}" for schema, table in sorted(self.tables)),
+        ]
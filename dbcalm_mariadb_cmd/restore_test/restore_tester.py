@@ -0,0 +1,337 @@
+import shutil
+import subprocess
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Self
+
+from dbcalm.config.config import Config
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.data_types.enum_types import RestoreTarget
+from dbcalm.data.model.restore_test import RestoreTest
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.restore_test import RestoreTestRepository
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.storage.dedup_store import RepositoryError
+from dbcalm.storage.storage_backend import StorageError
+from dbcalm.util.backup_scope import BackupScope
+from dbcalm.util.get_tmp_dir import get_tmp_dir
+from dbcalm_cmd.process.job_cgroups import in_current_cgroup
+from dbcalm_mariadb_cmd.builder.backup_cmd_builder import BackupCommandBuilder
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    ADMIN_BINARIES,
+    get_clean_env_for_system_binaries,
+)
+from dbcalm_mariadb_cmd.stream.chain_stager import ChainStager
+from dbcalm_mariadb_cmd.stream.stream_extractor import StreamExtractError
+
+SERVER_BINARIES = {
+    "mariadb": "/usr/sbin/mariadbd",
+    "mysql": "/usr/sbin/mysqld",
+}
+CLIENT_BINARIES = {
+    "mariadb": "/usr/bin/mariadb",
+    "mysql": "/usr/bin/mysql",
+}
+DEFAULT_SANITY_QUERY = "SELECT COUNT(*) FROM information_schema.tables"
+# Crash recovery of a large data directory can take a while
+DEFAULT_STARTUP_TIMEOUT = 300  # seconds
+SHUTDOWN_TIMEOUT = 60  # seconds
+STARTUP_POLL_INTERVAL = 0.5  # seconds
+# Lines of tool output kept in the error of a failed step
+ERROR_TAIL_LINES = 20
+
+
+class RestoreTestError(Exception):
+    """A step of a test restore failed."""
+
+
+class RestoreTester:
+    """Restore a backup chain into a scratch folder to prove it is usable.
+
+    Copies and prepares the chain like a folder restore does and times it,
+    which is the recovery time a real restore of that chain needs. With
+    `test_restore_sanity_check` a throwaway server is then started on the
+    prepared folder, listening only on a socket inside it, to run
+    `test_restore_query`. The scratch folder is removed afterwards and the
+    outcome is stored as a RestoreTest row.
+    """
+
+    def __init__(
+        self,
+        command_builder: BackupCommandBuilder,
+        config: Config | None = None,
+    ) -> None:
+        self.command_builder = command_builder
+        self.config = config if config is not None else config_factory()
+        self.logger = logger_factory()
+        db_type = self.config.value("db_type")
+        self.sanity_check = bool(
+            self.config.value("test_restore_sanity_check", False),  # noqa: FBT003
+        )
+        self.server_bin = self.config.value(
+            "test_restore_server_bin",
+            SERVER_BINARIES.get(db_type),
+        )
+        self.client_bin = CLIENT_BINARIES.get(db_type)
+        self.admin_bin = ADMIN_BINARIES.get(db_type)
+        self.query = self.config.value("test_restore_query", DEFAULT_SANITY_QUERY)
+        self.startup_timeout = float(
+            self.config.value(
+                "test_restore_startup_timeout",
+                DEFAULT_STARTUP_TIMEOUT,
+            ),
+        )
+
+    def scratch_dir(self) -> Path:
+        # test_restore_dir lets the scratch copy live on a faster disk, on
+        # the backup filesystem cp can clone files instead of copying them
+        base = self.config.value("test_restore_dir") or self.config.value(
+            "backup_dir",
+        )
+        return Path(get_tmp_dir(base.rstrip("/"), "restore-tests"))
+
+    def run(
+        self,
+        id_list: list[str],
+        schedule_id: int | None = None,
+    ) -> tuple[int, str, str]:
+        """Test restore a chain, oldest backup first.
+
+        Returns:
+            Tuple of (returncode, output, error) for the process record
+        """
+        restore_test = RestoreTest(
+            schedule_id=schedule_id,
+            backup_id=id_list[-1],
+            chain_length=len(id_list),
+            start_time=datetime.now(tz=UTC),
+            status="failed",
+        )
+        output = []
+        scratch = self.scratch_dir()
+        try:
+            started = time.monotonic()
+            source_dir = self.stage(id_list, scratch)
+            for command in self.command_builder.build_restore_cmds(
+                str(scratch),
+                id_list,
+                RestoreTarget.FOLDER,
+                source_dir,
+            ):
+                self._run(command)
+            restore_test.restore_seconds = time.monotonic() - started
+            output.append(
+                f"Restored {len(id_list)} backups in "
+                f"{restore_test.restore_seconds:.1f}s",
+            )
+
+            if self.sanity_check and self.partial(id_list[-1]):
+                output.append("Partial backup, server check skipped")
+            elif self.sanity_check:
+                restore_test.startup_seconds, result = self.check_server(
+                    scratch / id_list[0],
+                    scratch,
+                )
+                output.append(
+                    f"Server started in {restore_test.startup_seconds:.1f}s, "
+                    f"{self.query}: {result}",
+                )
+            restore_test.status = "success"
+        except (
+            RestoreTestError,
+            StreamExtractError,
+            StorageError,
+            RepositoryError,
+            OSError,
+        ) as e:
+            self.logger.exception("Test restore of %s failed", id_list[-1])
+            restore_test.message = str(e)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+            restore_test.end_time = datetime.now(tz=UTC)
+            RestoreTestRepository().create(restore_test)
+
+        returncode = 0 if restore_test.status == "success" else 1
+        return returncode, "\n".join(output), restore_test.message or ""
+
+    def partial(self, backup_id: str) -> bool:
+        """Whether a backup leaves tables out, a server won't start cleanly."""
+        backup = BackupRepository().get(backup_id)
+        return backup is not None and BackupScope(
+            backup.include,
+            backup.exclude,
+        ).partial
+
+    def stage(self, id_list: list[str], scratch: Path) -> str | None:
+        """Unpack streamed and deduplicated backups of the chain below scratch.
+
+        Part of the measured restore time, a real restore has to do the same.
+        Returns the folder the restore commands read the chain from, None to
+        read it from backup_dir.
+        """
+        stager = ChainStager(self.command_builder, self.config)
+        if not stager.required(id_list):
+            return None
+        source_dir = scratch / "source"
+        stager.stage(id_list, source_dir)
+        return str(source_dir)
+
+    def check_server(self, datadir: Path, scratch: Path) -> tuple[float, str]:
+        """Start a server on datadir and run the sanity query.
+
+        Returns:
+            Tuple of (seconds until the server answered, query result)
+        """
+        server = ScratchServer(
+            self.server_bin,
+            self.admin_bin,
+            datadir,
+            scratch,
+            startup_timeout=self.startup_timeout,
+        )
+        with server:
+            result = self._run(
+                [
+                    self.client_bin,
+                    "--no-defaults",
+                    f"--socket={server.socket_path}",
+                    "--batch",
+                    "--skip-column-names",
+                    "-e",
+                    self.query,
+                ],
+            )
+        return server.startup_seconds, result.strip()
+
+    def _run(self, command: list[str]) -> str:
+        self.logger.debug("Test restore running: %s", " ".join(command))
+        result = subprocess.run(  # noqa: S603
+            in_current_cgroup(command),
+            capture_output=True,
+            text=True,
+            check=False,
+            env=get_clean_env_for_system_binaries(),
+        )
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()[-ERROR_TAIL_LINES:]
+            msg = (
+                f"{command[0]} failed with code {result.returncode}:\n"
+                + "\n".join(lines)
+            )
+            raise RestoreTestError(msg)
+        return result.stdout
+
+
+class ScratchServer:
+    """A throwaway server on a prepared backup, for checks and replays.
+
+    Listens on a socket below scratch only and skips the grant tables, so
+    it neither clashes with the production server nor needs credentials.
+    Used as a context manager: started and ready on enter, shut down on
+    exit.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        server_bin: str,
+        admin_bin: str,
+        datadir: Path,
+        scratch: Path,
+        *,
+        startup_timeout: float = DEFAULT_STARTUP_TIMEOUT,
+        options: list[str] | None = None,
+    ) -> None:
+        self.server_bin = server_bin
+        self.admin_bin = admin_bin
+        self.datadir = datadir
+        self.scratch = scratch
+        self.startup_timeout = startup_timeout
+        self.options = options or []
+        self.socket_path = scratch / "mysqld.sock"
+        self.error_log = scratch / "mysqld.err"
+        self.startup_seconds = 0.0
+        self.logger = logger_factory()
+        self._server: subprocess.Popen | None = None
+
+    def __enter__(self) -> Self:
+        started = time.monotonic()
+        self._server = subprocess.Popen(  # noqa: S603
+            in_current_cgroup([
+                self.server_bin,
+                "--no-defaults",
+                f"--datadir={self.datadir}",
+                f"--socket={self.socket_path}",
+                f"--pid-file={self.scratch / 'mysqld.pid'}",
+                f"--log-error={self.error_log}",
+                "--skip-networking",
+                "--skip-grant-tables",
+                *self.options,
+            ]),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=get_clean_env_for_system_binaries(),
+        )
+        try:
+            self._wait_ready()
+        except BaseException:
+            self.stop()
+            raise
+        self.startup_seconds = time.monotonic() - started
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
+
+    def _wait_ready(self) -> None:
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._server.poll() is not None:
+                msg = (
+                    f"Server exited with code {self._server.returncode}:\n"
+                    f"{self.tail()}"
+                )
+                raise RestoreTestError(msg)
+            if self._ping():
+                return
+            time.sleep(STARTUP_POLL_INTERVAL)
+        msg = f"Server did not start within {self.startup_timeout:.0f} seconds"
+        raise RestoreTestError(msg)
+
+    def _ping(self) -> bool:
+        result = subprocess.run(  # noqa: S603
+            [self.admin_bin, "--no-defaults", f"--socket={self.socket_path}", "ping"],
+            capture_output=True,
+            check=False,
+            env=get_clean_env_for_system_binaries(),
+        )
+        return result.returncode == 0
+
+    def stop(self) -> None:
+        if self._server is None or self._server.poll() is not None:
+            return
+        subprocess.run(  # noqa: S603
+            [
+                self.admin_bin,
+                "--no-defaults",
+                f"--socket={self.socket_path}",
+                "shutdown",
+            ],
+            capture_output=True,
+            check=False,
+            env=get_clean_env_for_system_binaries(),
+        )
+        try:
+            self._server.wait(timeout=SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.logger.warning("Scratch server did not stop, killing it")
+            self._server.kill()
+            self._server.wait()
+
+    def tail(self) -> str:
+        """Last lines of the server's error log."""
+        try:
+            lines = self.error_log.read_text(errors="replace").strip().splitlines()
+        except OSError:
+            return ""
+        return "\n".join(lines[-ERROR_TAIL_LINES:])
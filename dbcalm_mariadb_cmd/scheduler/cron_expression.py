@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+# Search horizon for the next fire time, a valid expression always fires
+# within a year (day_of_month is limited to 1-28)
+MAX_SEARCH_DAYS = 366
+
+FIELD_RANGES = [
+    (0, 59),  # minute
+    (0, 23),  # hour
+    (1, 31),  # day of month
+    (1, 12),  # month
+    (0, 6),   # day of week (0=Sunday)
+]
+
+
+class CronExpression:
+    """Evaluate the cron expressions generated by CronFileBuilder.
+
+    Supports the subset the builder emits: '*', '*/n' and plain numbers,
+    with cron's day matching rule (when both day of month and day of week
+    are restricted either one matching is enough).
+    """
+
+    def __init__(self, expression: str) -> None:
+        parts = expression.split()
+        if len(parts) != len(FIELD_RANGES):
+            msg = f"Invalid cron expression: {expression}"
+            raise ValueError(msg)
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(part, low, high)
+            for part, (low, high) in zip(parts, FIELD_RANGES, strict=True)
+        )
+        self.days_restricted = parts[2] != "*"
+        self.weekdays_restricted = parts[4] != "*"
+
+    def _parse_field(self, field: str, low: int, high: int) -> set[int]:
+        if field == "*":
+            return set(range(low, high + 1))
+        if field.startswith("*/"):
+            step = int(field[2:])
+            if step < 1:
+                msg = f"Invalid step in cron field: {field}"
+                raise ValueError(msg)
+            return set(range(low, high + 1, step))
+        value = int(field)
+        if not low <= value <= high:
+            msg = f"Cron field value {value} out of range {low}-{high}"
+            raise ValueError(msg)
+        return {value}
+
+    def _day_matches(self, moment: datetime) -> bool:
+        # python weekday() is 0=Monday, cron uses 0=Sunday
+        weekday = (moment.weekday() + 1) % 7
+        day_match = moment.day in self.days
+        weekday_match = weekday in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def next_after(self, after: datetime) -> datetime:
+        """Return the first matching minute strictly after the given time.
+
+        Works on naive local time like cron does, aware datetimes keep
+        their tzinfo.
+        """
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=MAX_SEARCH_DAYS)
+
+        while moment < limit:
+            if moment.month not in self.months:
+                year = moment.year + (moment.month == 12)  # noqa: PLR2004
+                month = moment.month % 12 + 1
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+                continue
+            if moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+                continue
+            return moment
+
+        msg = f"Cron expression never fires: {self.expression}"
+        raise ValueError(msg)
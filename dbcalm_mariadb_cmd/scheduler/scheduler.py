@@ -0,0 +1,348 @@
+import hashlib
+import heapq
+import socket
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from dbcalm.config.config_factory import config_factory
+from dbcalm.data.model.process import Process
+from dbcalm.data.model.schedule import Schedule
+from dbcalm.data.model.schedule_run import ScheduleRun
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.process import ProcessRepository
+from dbcalm.data.repository.restore_test import RestoreTestRepository
+from dbcalm.data.repository.schedule import ScheduleRepository
+from dbcalm.data.repository.schedule_run import ScheduleRunRepository
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.service.cron_file_builder import CronFileBuilder
+from dbcalm.util.parse_query_with_operators import QueryFilter
+from dbcalm_mariadb_cmd.scheduler.cron_expression import CronExpression
+
+# How often schedule rows are re-read to pick up changes
+POLL_INTERVAL = 30  # seconds
+# Fires handled later than this after their scheduled time, delayed by the
+# schedule's jitter, count as missed
+MISSED_GRACE = 300  # seconds
+# Cap on missed fires recorded per schedule after downtime
+MAX_MISSED_RECORDS = 100
+HTTP_ACCEPTED = 202
+
+# Backup types the scheduler runs, in order of precedence when fires overlap
+BACKUP_PRECEDENCE = ["full", "incremental"]
+# Schedule type that test restores the latest backup chain instead
+TEST_RESTORE = "test_restore"
+
+
+def to_local(moment: datetime) -> datetime:
+    """Convert a stored (UTC) datetime to naive local time, like cron uses."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return moment.astimezone().replace(tzinfo=None)
+
+
+class Scheduler:
+    """Run enabled schedules from inside the mariadb command service.
+
+    Replaces the per-schedule lines in /etc/cron.d/dbcalm when the
+    `scheduler` config option is set to `internal`. Next fire times are kept
+    in a heap, schedule rows are polled so changes apply without rewriting
+    any system files, fires that overlap or arrive while a backup is still
+    running are coalesced, and fires that could not run are recorded as
+    ScheduleRun rows.
+    """
+
+    def __init__(self, submit: Callable[[dict], dict]) -> None:
+        self.submit = submit
+        self.config = config_factory()
+        self.logger = logger_factory()
+        self.cron_file_builder = CronFileBuilder()
+        self.jitter = int(self.config.value("scheduler_jitter", 0))
+        self.hostname = socket.gethostname()
+        self._heap: list[tuple[float, float, int]] = []
+        self._schedules: dict[int, Schedule] = {}
+        self._expressions: dict[int, CronExpression] = {}
+        self._signature: list | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, daemon=True, name="scheduler")
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        self.logger.info("Internal scheduler started")
+        self._reload(record_missed=True)
+        last_poll = time.monotonic()
+
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_poll >= POLL_INTERVAL:
+                    self._reload()
+                    last_poll = time.monotonic()
+
+                due = self._pop_due(time.time())
+                if due:
+                    self._fire(due)
+            except Exception:
+                self.logger.exception("Error in scheduler loop")
+
+            wait = POLL_INTERVAL
+            if self._heap:
+                wait = min(wait, max(0.0, self._heap[0][0] - time.time()))
+            self._stop.wait(wait)
+
+    def jitter_offset(self, schedule_id: int) -> int:
+        """Stable per host and schedule delay so hosts don't fire in lockstep."""
+        if self.jitter <= 0:
+            return 0
+        digest = hashlib.sha256(f"{self.hostname}:{schedule_id}".encode()).digest()
+        return int.from_bytes(digest[:4], "big") % (self.jitter + 1)
+
+    def _load_schedules(self) -> list[Schedule]:
+        return ScheduleRepository().get_list(
+            query=[QueryFilter(field="enabled", operator="eq", value=True)],
+            order=None,
+            page=None,
+            per_page=None,
+        )[0]
+
+    def _reload(self, *, record_missed: bool = False) -> None:
+        schedules = [
+            s
+            for s in self._load_schedules()
+            if s.backup_type in BACKUP_PRECEDENCE or s.backup_type == TEST_RESTORE
+        ]
+        signature = sorted((s.id, s.updated_at) for s in schedules)
+        if signature == self._signature:
+            return
+
+        self._signature = signature
+        # keep pending fires of unchanged schedules so a reload never drops
+        # a fire that is waiting on its jitter delay
+        updated = {s.id: s.updated_at for s in schedules}
+        pending = {
+            entry[2]: entry
+            for entry in self._heap
+            if entry[2] in self._schedules
+            and self._schedules[entry[2]].updated_at == updated.get(entry[2])
+        }
+        self._schedules = {s.id: s for s in schedules}
+        self._expressions = {}
+        self._heap = []
+        now = datetime.now()  # noqa: DTZ005 - cron schedules use local time
+        for schedule in schedules:
+            try:
+                expression = CronExpression(
+                    self.cron_file_builder.generate_cron_expression(schedule),
+                )
+            except ValueError:
+                self.logger.exception("Skipping invalid schedule %s", schedule.id)
+                continue
+            self._expressions[schedule.id] = expression
+            if record_missed:
+                self._record_missed(schedule, expression, now)
+            if schedule.id in pending:
+                heapq.heappush(self._heap, pending[schedule.id])
+            else:
+                self._push(schedule.id, expression.next_after(now))
+
+        self.logger.info("Scheduler loaded %d schedules", len(self._expressions))
+
+    def _push(self, schedule_id: int, scheduled: datetime) -> None:
+        scheduled_ts = scheduled.timestamp()
+        fire_ts = scheduled_ts + self.jitter_offset(schedule_id)
+        heapq.heappush(self._heap, (fire_ts, scheduled_ts, schedule_id))
+
+    def _pop_due(self, now: float) -> list[tuple[float, float, int]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if entry[2] in self._schedules:
+                due.append(entry)
+        return due
+
+    def _record_missed(
+        self,
+        schedule: Schedule,
+        expression: CronExpression,
+        now: datetime,
+    ) -> None:
+        """Record fires that should have happened while the service was down."""
+        last_seen = [schedule.updated_at]
+        if schedule.backup_type == TEST_RESTORE:
+            latest = RestoreTestRepository().latest_for_schedule(schedule.id)
+        else:
+            latest = BackupRepository().latest_for_schedule(schedule.id)
+        if latest:
+            last_seen.append(latest.start_time)
+        latest_run = ScheduleRunRepository().latest(schedule.id)
+        if latest_run:
+            last_seen.append(latest_run.scheduled_time)
+
+        moment = max(to_local(m) for m in last_seen if m is not None)
+        offset = self.jitter_offset(schedule.id)
+        missed = 0
+        while True:
+            moment = expression.next_after(moment)
+            if moment.timestamp() + offset > now.timestamp() - MISSED_GRACE:
+                break
+            missed += 1
+            if missed <= MAX_MISSED_RECORDS:
+                self._record(schedule.id, moment.timestamp(), "missed")
+
+        if missed:
+            self.logger.warning(
+                "Schedule %s missed %d runs while the scheduler was not running",
+                schedule.id,
+                missed,
+            )
+
+    def _record(
+        self,
+        schedule_id: int,
+        scheduled_ts: float,
+        status: str,
+        message: str | None = None,
+    ) -> None:
+        try:
+            ScheduleRunRepository().create(
+                ScheduleRun(
+                    schedule_id=schedule_id,
+                    scheduled_time=datetime.fromtimestamp(scheduled_ts, tz=UTC),
+                    status=status,
+                    message=message,
+                ),
+            )
+        except Exception:
+            self.logger.exception("Failed to record %s run", status)
+
+    def backup_running(self) -> bool:
+        """Check for a backup process that is still alive."""
+        return self._process_running("backup")
+
+    def test_restore_running(self) -> bool:
+        """Check for a test restore that is still running."""
+        return self._process_running(TEST_RESTORE)
+
+    def _process_running(self, process_type: str) -> bool:
+        processes, _ = ProcessRepository().get_list(
+            [
+                QueryFilter(field="type", operator="eq", value=process_type),
+                QueryFilter(field="status", operator="eq", value="running"),
+            ],
+            None,
+            page=None,
+            per_page=None,
+        )
+        return any(self._pid_alive(p) for p in processes)
+
+    def _pid_alive(self, process: Process) -> bool:
+        return Path(f"/proc/{process.pid}").exists()
+
+    def _fire(self, due: list[tuple[float, float, int]]) -> None:
+        now = time.time()
+        runnable = []
+        for fire_ts, scheduled_ts, schedule_id in due:
+            expression = self._expressions[schedule_id]
+            self._push(
+                schedule_id,
+                expression.next_after(datetime.fromtimestamp(scheduled_ts)),  # noqa: DTZ006
+            )
+            # late only past the jitter delay the fire was meant to wait
+            if now - fire_ts > MISSED_GRACE:
+                self._record(schedule_id, scheduled_ts, "missed", "fired too late")
+                continue
+            runnable.append((scheduled_ts, schedule_id))
+
+        if not runnable:
+            return
+
+        backups = [
+            item
+            for item in runnable
+            if self._schedules[item[1]].backup_type != TEST_RESTORE
+        ]
+        if backups:
+            # Only one backup per wake-up: a full wins over an incremental
+            # that fires at the same time, the rest are coalesced into it
+            backups.sort(
+                key=lambda item: (
+                    BACKUP_PRECEDENCE.index(
+                        self._schedules[item[1]].backup_type,
+                    ),
+                    item[1],
+                ),
+            )
+            self._fire_first(
+                backups,
+                self.backup_running,
+                "another backup is still running",
+            )
+
+        # Test restores run next to backups, they only read finished ones
+        test_restores = sorted(
+            item
+            for item in runnable
+            if self._schedules[item[1]].backup_type == TEST_RESTORE
+        )
+        if test_restores:
+            self._fire_first(
+                test_restores,
+                self.test_restore_running,
+                "another test restore is still running",
+            )
+
+    def _fire_first(
+        self,
+        runnable: list[tuple[float, int]],
+        running: Callable[[], bool],
+        running_message: str,
+    ) -> None:
+        """Trigger the first fire and coalesce the others into it."""
+        scheduled_ts, schedule_id = runnable[0]
+        for other_ts, other_id in runnable[1:]:
+            self._record(
+                other_id,
+                other_ts,
+                "coalesced",
+                f"coalesced into schedule {schedule_id}",
+            )
+
+        if running():
+            self._record(schedule_id, scheduled_ts, "skipped", running_message)
+            return
+
+        self._trigger(self._schedules[schedule_id], scheduled_ts)
+
+    def _trigger(self, schedule: Schedule, scheduled_ts: float) -> None:
+        if schedule.backup_type == TEST_RESTORE:
+            # the command service picks the latest backup chain
+            command = {
+                "cmd": TEST_RESTORE,
+                "args": {"id": None, "schedule_id": schedule.id},
+            }
+        else:
+            args = {
+                "id": datetime.now(tz=UTC).strftime("%Y-%m-%d-%H-%M-%S"),
+                "schedule_id": schedule.id,
+            }
+            if schedule.backup_type == "incremental":
+                args["from_backup_id"] = None
+            command = {"cmd": f"{schedule.backup_type}_backup", "args": args}
+
+        self.logger.info("Schedule %s firing %s", schedule.id, command["cmd"])
+        try:
+            response = self.submit(command)
+        except Exception as e:
+            self.logger.exception("Schedule %s failed to start", schedule.id)
+            self._record(schedule.id, scheduled_ts, "failed", str(e))
+            return
+
+        if response.get("code") != HTTP_ACCEPTED:
+            self._record(schedule.id, scheduled_ts, "failed", response.get("status"))
@@ -0,0 +1,105 @@
+import contextlib
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm_mariadb_cmd.logical.client_session import (
+    ClientError,
+    ClientSession,
+    client_cmd,
+)
+from dbcalm_mariadb_cmd.logical.logical_dumper import GTID_QUERIES
+from dbcalm_mariadb_cmd.snapshot.volume import Volume
+
+# Describes a snapshot backup, written into its backup folder
+SNAPSHOT_FILE = "snapshot.json"
+# Give up instead of queueing behind long running statements
+DEFAULT_SNAPSHOT_LOCK_TIMEOUT = 60  # seconds
+# Statements run by server type before the lock, to lock and to unlock.
+# The preparing ones flush tables and wait out DDL while writes go on, so
+# the lock that blocks commits is held for the snapshot only.
+LOCKS = {
+    "mariadb": (
+        [
+            "BACKUP STAGE START",
+            "BACKUP STAGE FLUSH",
+            "BACKUP STAGE BLOCK_DDL",
+        ],
+        "BACKUP STAGE BLOCK_COMMIT",
+        "BACKUP STAGE END",
+    ),
+    "mysql": (
+        ["FLUSH NO_WRITE_TO_BINLOG TABLES"],
+        "FLUSH TABLES WITH READ LOCK",
+        "UNLOCK TABLES",
+    ),
+}
+
+
+@dataclass
+class TakenSnapshot:
+    name: str
+    # seconds commits were blocked
+    lock_seconds: float
+    # GTID state of the snapshot, None without GTIDs
+    gtid: str | None
+
+    def write(self, folder: Path, volume_type: str, kept: bool) -> None:  # noqa: FBT001
+        (folder / SNAPSHOT_FILE).write_text(json.dumps(
+            {
+                "engine": "snapshot",
+                "volume_type": volume_type,
+                "kept": kept,
+                "taken": datetime.now(tz=UTC).isoformat(),
+                **asdict(self),
+            },
+            indent=2,
+        ))
+
+
+class SnapshotTaker:
+    """Snapshot the data directory's volume while commits are blocked.
+
+    The server's files on disk are then what a crash at that moment would
+    leave, InnoDB recovers them from the redo log on startup like after
+    any crash. Non-transactional tables are flushed and consistent too.
+    """
+
+    def __init__(self, config: Config, volume: Volume) -> None:
+        self.config = config
+        self.volume = volume
+        self.logger = logger_factory()
+        self.db_type = config.value("db_type")
+        self.lock_timeout = int(
+            config.value("snapshot_lock_timeout", DEFAULT_SNAPSHOT_LOCK_TIMEOUT),
+        )
+
+    def take(self, name: str) -> TakenSnapshot:
+        """Raises ClientError if locking fails, SnapshotError if the snapshot does."""
+        prepare, lock, unlock = LOCKS[self.db_type]
+        with ClientSession(client_cmd(self.config)) as session:
+            session.execute(f"SET SESSION lock_wait_timeout = {self.lock_timeout}")
+            for statement in prepare:
+                session.execute(statement)
+            session.execute(lock)
+            locked = time.monotonic()
+            try:
+                ((gtid,),) = session.query(GTID_QUERIES[self.db_type]) or [[""]]
+                self.volume.create(name)
+            except BaseException:
+                # a lost session has released the lock already
+                with contextlib.suppress(ClientError):
+                    session.execute(unlock)
+                raise
+            session.execute(unlock)
+            lock_seconds = time.monotonic() - locked
+        self.logger.info(
+            "Snapshot %s taken, commits blocked for %.3fs",
+            name,
+            lock_seconds,
+        )
+        return TakenSnapshot(name, round(lock_seconds, 3), gtid or None)
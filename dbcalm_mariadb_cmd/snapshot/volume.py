@@ -0,0 +1,218 @@
+import contextlib
+import subprocess
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.util.get_tmp_dir import get_tmp_dir
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    get_clean_env_for_system_binaries,
+)
+from dbcalm_mariadb_cmd.restore_test.restore_tester import ERROR_TAIL_LINES
+
+DEFAULT_DATA_DIR = "/var/lib/mysql"
+# Copy-on-write space of an LVM snapshot, changes beyond it invalidate it
+DEFAULT_LVM_SNAPSHOT_SIZE = "20%ORIGIN"
+
+
+class SnapshotError(Exception):
+    """A volume snapshot could not be taken, read or removed."""
+
+
+def snapshot_name(backup_id: str) -> str:
+    return f"dbcalm-{backup_id}"
+
+
+class Volume(ABC):
+    """The volume holding the data directory, and its snapshots.
+
+    `snapshot_volume` names the volume (a btrfs subvolume path, an LVM
+    volume as vg/lv or a ZFS dataset) and `snapshot_data_path` where the
+    data directory lies inside it. Its redo logs and tablespaces have to be
+    on the volume too, a snapshot is only consistent within one volume.
+    Tools run as the service user, with `snapshot_sudo` through sudo -n.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.logger = logger_factory()
+        self.data_dir = config.value("data_dir", DEFAULT_DATA_DIR)
+        self.volume = config.value("snapshot_volume", self.data_dir)
+        self.data_path = config.value("snapshot_data_path", ".")
+        self.prefix = ["sudo", "-n"] if config.value("snapshot_sudo") else []
+
+    @abstractmethod
+    def create(self, name: str) -> None:
+        """Snapshot the volume, taken while the server is locked."""
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def remove(self, name: str) -> None:
+        pass
+
+    @abstractmethod
+    def mounted(self, name: str) -> contextlib.AbstractContextManager[Path]:
+        """Root of the snapshot, readable while the context lasts."""
+
+    def data_files(self, root: Path) -> Path:
+        """Data directory inside a mounted snapshot."""
+        return (root / self.data_path).resolve()
+
+    def run(self, command: list[str], check: bool = True) -> str:  # noqa: FBT001, FBT002
+        command = [*self.prefix, *command]
+        self.logger.debug("Snapshot running: %s", " ".join(command))
+        result = subprocess.run(  # noqa: S603
+            command,
+            capture_output=True,
+            text=True,
+            check=False,
+            env=get_clean_env_for_system_binaries(),
+        )
+        if check and result.returncode != 0:
+            lines = result.stderr.strip().splitlines()[-ERROR_TAIL_LINES:]
+            msg = (
+                f"{' '.join(command)} failed with code {result.returncode}:\n"
+                + "\n".join(lines)
+            )
+            raise SnapshotError(msg)
+        return result.stdout if result.returncode == 0 else ""
+
+
+class BtrfsVolume(Volume):
+    """Read-only snapshots of a btrfs subvolume, kept in snapshot_dir.
+
+    snapshot_dir has to be on the same btrfs filesystem. Owners of a
+    subvolume may snapshot it without root, deleting snapshots needs the
+    user_subvol_rm_allowed mount option or snapshot_sudo.
+    """
+
+    def __init__(self, config: Config) -> None:
+        super().__init__(config)
+        self.snapshot_dir = Path(
+            config.value(
+                "snapshot_dir",
+                str(Path(self.volume).parent / "dbcalm-snapshots"),
+            ),
+        )
+
+    def create(self, name: str) -> None:
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self.run([
+            "btrfs", "subvolume", "snapshot", "-r",
+            self.volume, str(self.snapshot_dir / name),
+        ])
+
+    def exists(self, name: str) -> bool:
+        return (self.snapshot_dir / name).is_dir()
+
+    def remove(self, name: str) -> None:
+        self.run(["btrfs", "subvolume", "delete", str(self.snapshot_dir / name)])
+
+    @contextlib.contextmanager
+    def mounted(self, name: str) -> Iterator[Path]:
+        # snapshots are part of the mounted filesystem
+        if not self.exists(name):
+            msg = f"Snapshot {self.snapshot_dir / name} not found"
+            raise SnapshotError(msg)
+        yield self.snapshot_dir / name
+
+
+class LvmVolume(Volume):
+    """LVM snapshots of snapshot_volume (vg/lv), mounted read-only to read.
+
+    The copy-on-write space is snapshot_size, as a size (10G) or share of
+    the origin (20%ORIGIN). XFS needs nouuid in snapshot_mount_options.
+    """
+
+    def __init__(self, config: Config) -> None:
+        super().__init__(config)
+        self.group = self.volume.split("/")[0]
+        self.size = str(config.value("snapshot_size", DEFAULT_LVM_SNAPSHOT_SIZE))
+        self.mount_options = config.value("snapshot_mount_options", "ro")
+        self.backup_dir = config.value("backup_dir").rstrip("/")
+
+    def create(self, name: str) -> None:
+        size = (
+            ["--extents", self.size] if "%" in self.size else ["--size", self.size]
+        )
+        self.run(["lvcreate", "--snapshot", *size, "--name", name, self.volume])
+
+    def exists(self, name: str) -> bool:
+        return bool(self.run(
+            ["lvs", "--noheadings", f"{self.group}/{name}"],
+            check=False,
+        ))
+
+    def remove(self, name: str) -> None:
+        self.run(["lvremove", "--yes", f"{self.group}/{name}"])
+
+    @contextlib.contextmanager
+    def mounted(self, name: str) -> Iterator[Path]:
+        mount_point = Path(get_tmp_dir(self.backup_dir, "snapshot-mounts"))
+        try:
+            self.run([
+                "mount", "-o", self.mount_options,
+                f"/dev/{self.group}/{name}", str(mount_point),
+            ])
+            try:
+                yield mount_point
+            finally:
+                self.run(["umount", str(mount_point)])
+        finally:
+            with contextlib.suppress(OSError):
+                mount_point.rmdir()
+
+
+class ZfsVolume(Volume):
+    """ZFS snapshots of the dataset snapshot_volume.
+
+    Read through the dataset's .zfs/snapshot folder. `zfs allow` can give
+    the service user the snapshot, destroy and mount permissions.
+    """
+
+    def create(self, name: str) -> None:
+        self.run(["zfs", "snapshot", f"{self.volume}@{name}"])
+
+    def exists(self, name: str) -> bool:
+        return bool(self.run(
+            ["zfs", "list", "-H", "-t", "snapshot", f"{self.volume}@{name}"],
+            check=False,
+        ))
+
+    def remove(self, name: str) -> None:
+        self.run(["zfs", "destroy", f"{self.volume}@{name}"])
+
+    @contextlib.contextmanager
+    def mounted(self, name: str) -> Iterator[Path]:
+        mount_point = self.run(
+            ["zfs", "get", "-H", "-o", "value", "mountpoint", self.volume],
+        ).strip()
+        root = Path(mount_point) / ".zfs" / "snapshot" / name
+        # mounted on first access
+        if not root.is_dir():
+            msg = f"Snapshot {self.volume}@{name} not found under {root}"
+            raise SnapshotError(msg)
+        yield root
+
+
+VOLUMES = {
+    "btrfs": BtrfsVolume,
+    "lvm": LvmVolume,
+    "zfs": ZfsVolume,
+}
+
+
+def volume_factory(config: Config) -> Volume:
+    volume_type = config.value("snapshot_type")
+    if volume_type not in VOLUMES:
+        msg = (
+            f"snapshot_type must be one of {list(VOLUMES)} for snapshot "
+            f"backups, got: {volume_type}"
+        )
+        raise SnapshotError(msg)
+    return VOLUMES[volume_type](config)
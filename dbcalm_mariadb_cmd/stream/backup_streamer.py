@@ -0,0 +1,95 @@
+import contextlib
+import subprocess
+import tempfile
+from typing import IO
+
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.storage.storage_backend import StorageBackend, StorageError
+from dbcalm_cmd.process.job_cgroups import in_current_cgroup
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    get_clean_env_for_system_binaries,
+)
+
+
+class BackupStreamer:
+    """Pipe a streaming backup through a compressor into a storage backend.
+
+    Replaces the shell pipeline the `forward` option used to build: the
+    backup tool writes xbstream to stdout, the optional compressor reads it
+    from there and the backend uploads its output as it is produced, so no
+    copy of the backup is ever written to local disk.
+    """
+
+    def __init__(self, backend: StorageBackend) -> None:
+        self.backend = backend
+        self.logger = logger_factory()
+
+    def run(
+        self,
+        key: str,
+        command: list[str],
+        compress_cmd: list[str] | None = None,
+    ) -> tuple[int, str, str]:
+        """Stream a backup to key.
+
+        Returns:
+            Tuple of (returncode, output, error) for the process record, the
+            backup tool logs to stderr so that is the output on success
+        """
+        # the tool's log can be long, a file can't fill up and block it
+        with (
+            tempfile.TemporaryFile() as tool_log,
+            tempfile.TemporaryFile() as compress_log,
+        ):
+            processes = [self._start(command, None, tool_log)]
+            if compress_cmd is not None:
+                processes.append(
+                    self._start(compress_cmd, processes[0].stdout, compress_log),
+                )
+                # only the compressor reads it now, so the tool gets SIGPIPE
+                # if the compressor dies
+                processes[0].stdout.close()
+
+            try:
+                stored = self.backend.upload(key, processes[-1].stdout)
+            except (StorageError, OSError) as e:
+                self._stop(processes)
+                return 1, "", f"Upload of {key} failed: {e}\n{_read(tool_log)}"
+
+            returncodes = [process.wait() for process in processes]
+            log = _read(tool_log) + _read(compress_log)
+            failed = next((code for code in returncodes if code != 0), 0)
+            if failed:
+                # the upload finished but holds a truncated stream
+                with contextlib.suppress(StorageError, OSError):
+                    self.backend.delete(stored.location)
+                return failed, "", log
+
+        return 0, f"Stored {stored.size} bytes at {stored.location}\n{log}", ""
+
+    def _start(
+        self,
+        command: list[str],
+        stdin: IO[bytes] | None,
+        stderr: IO[bytes],
+    ) -> subprocess.Popen:
+        self.logger.info("Streaming command: %s", " ".join(command))
+        return subprocess.Popen(  # noqa: S603
+            in_current_cgroup(command),
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            env=get_clean_env_for_system_binaries(),
+        )
+
+    def _stop(self, processes: list[subprocess.Popen]) -> None:
+        for process in processes:
+            if process.stdout is not None:
+                process.stdout.close()
+            process.kill()
+            process.wait()
+
+
+def _read(log: IO[bytes]) -> str:
+    log.seek(0)
+    return log.read().decode(errors="replace")
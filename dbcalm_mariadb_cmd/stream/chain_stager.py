@@ -0,0 +1,86 @@
+import shutil
+from pathlib import Path
+
+from dbcalm.config.config import Config
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.storage.dedup_store_factory import dedup_store_factory
+from dbcalm.storage.storage_backend_factory import storage_backend_factory
+from dbcalm_mariadb_cmd.builder.backup_cmd_builder import BackupCommandBuilder
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+from dbcalm_mariadb_cmd.stream.stream_extractor import StreamExtractor
+
+
+class ChainStager:
+    """Lay out a restore chain as folders the restore commands can read.
+
+    Chains can mix formats: streamed backups are downloaded and unpacked,
+    backups in the dedup repository are written out of it and plain
+    folders are used as they are. Each member ends up in source_dir/<id>.
+    """
+
+    def __init__(self, command_builder: BackupCommandBuilder, config: Config) -> None:
+        self.command_builder = command_builder
+        self.config = config
+        self.store = dedup_store_factory(config)
+
+    def required(self, id_list: list[str]) -> bool:
+        """Whether any member of the chain isn't a plain folder."""
+        if self.store is not None and any(self.store.has(id) for id in id_list):
+            return True
+        return bool(BackupRepository().storage_locations(id_list))
+
+    def stage(
+        self,
+        id_list: list[str],
+        source_dir: str | Path,
+        selection: TablespaceSelection | None = None,
+    ) -> None:
+        """Write the chain below source_dir, with a selection only its files.
+
+        A selection limits every member to the files a table or schema
+        restore needs, streams are filtered before they are unpacked.
+        """
+        source_dir = Path(source_dir)
+        source_dir.mkdir(parents=True, exist_ok=True)
+        backup_dir = Path(self.config.value("backup_dir"))
+        locations = BackupRepository().storage_locations(id_list)
+        backend = storage_backend_factory(self.config) if locations else None
+        for position, backup_id in enumerate(id_list):
+            target = source_dir / backup_id
+            if backup_id in locations:
+                target.mkdir()
+                StreamExtractor().extract(
+                    backend.download(locations[backup_id]),
+                    self.command_builder.build_extract_cmds(
+                        locations[backup_id],
+                        str(target),
+                    ),
+                    selection,
+                )
+            elif self.store is not None and self.store.has(backup_id):
+                self.store.restore(
+                    backup_id,
+                    target,
+                    selection.matches if selection is not None else None,
+                )
+            elif selection is not None:
+                _copy_selected(backup_dir / backup_id, target, selection)
+            elif position == 0:
+                # the full backup is prepared in place, incrementals only read
+                shutil.copytree(backup_dir / backup_id, target, symlinks=True)
+            else:
+                target.symlink_to(backup_dir / backup_id)
+
+
+def _copy_selected(
+    folder: Path,
+    target: Path,
+    selection: TablespaceSelection,
+) -> None:
+    for path in sorted(folder.rglob("*")):
+        relative = path.relative_to(folder).as_posix()
+        if path.is_dir() or not selection.matches(relative):
+            continue
+        destination = target / relative
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, destination)
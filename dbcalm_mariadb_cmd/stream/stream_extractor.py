@@ -0,0 +1,200 @@
+import io
+import subprocess
+import tempfile
+import threading
+from collections.abc import Iterable
+from typing import IO
+
+from dbcalm.logger.logger_factory import logger_factory
+from dbcalm.storage.storage_backend import StorageError
+from dbcalm_cmd.process.job_cgroups import in_current_cgroup
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    get_clean_env_for_system_binaries,
+)
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+from dbcalm_mariadb_cmd.stream.xbstream_filter import (
+    XbstreamFormatError,
+    filter_stream,
+)
+
+# Lines of tool output kept in the error of a failed extract
+ERROR_TAIL_LINES = 20
+
+
+class StreamExtractError(Exception):
+    """Downloading, decompressing or unpacking a streamed backup failed."""
+
+
+class StreamExtractor:
+    """Feed a downloaded backup stream through a pipeline of commands.
+
+    The commands (decompressor, then mbstream/xbstream -x) are connected
+    stdout to stdin and run at the same time, so downloading, decompressing
+    and writing files overlap and the archive never lands on disk.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logger_factory()
+
+    def extract(
+        self,
+        chunks: Iterable[bytes],
+        commands: list[list[str]],
+        selection: TablespaceSelection | None = None,
+    ) -> None:
+        """Unpack a stream, with a selection only the files it matches."""
+        with tempfile.TemporaryFile() as log:
+            if selection is None:
+                processes = self._start(commands, log)
+                self._feed(chunks, processes)
+            else:
+                processes = self._extract_selected(chunks, commands, selection, log)
+
+            for command, process in zip(commands, processes, strict=True):
+                if process.wait() != 0:
+                    msg = (
+                        f"{command[0]} failed with code {process.returncode}:\n"
+                        + _tail(log)
+                    )
+                    raise StreamExtractError(msg)
+
+    def _feed(self, chunks: Iterable[bytes], processes: list[subprocess.Popen]) -> None:
+        feed = processes[0].stdin
+        try:
+            for chunk in chunks:
+                feed.write(chunk)
+            feed.close()
+        except BrokenPipeError:
+            # a command exited early, its return code tells why
+            pass
+        except (StorageError, OSError) as e:
+            for process in processes:
+                process.kill()
+                process.wait()
+            msg = f"Reading the backup stream failed: {e}"
+            raise StreamExtractError(msg) from e
+
+    def _extract_selected(
+        self,
+        chunks: Iterable[bytes],
+        commands: list[list[str]],
+        selection: TablespaceSelection,
+        log: IO[bytes],
+    ) -> list[subprocess.Popen]:
+        """Run the pipeline with the stream filtered before the extractor.
+
+        The decompressor is fed by a thread while this one passes the
+        selected chunks of its output on to mbstream/xbstream.
+        """
+        front = self._start(commands[:-1], log, stdout=subprocess.PIPE)
+        extractor = self._start(commands[-1:], log)[0]
+        processes = [*front, extractor]
+        feed_errors = []
+        feeder = None
+        if front:
+            def feed() -> None:
+                try:
+                    self._feed(chunks, processes)
+                except StreamExtractError as e:
+                    feed_errors.append(e)
+
+            feeder = threading.Thread(target=feed, daemon=True)
+            feeder.start()
+            source = front[-1].stdout
+        else:
+            source = io.BufferedReader(_ChunkReader(chunks))
+
+        try:
+            self._filter(source, extractor.stdin, processes, selection, log)
+        finally:
+            # unblocks the decompressor and with it the feeder if the
+            # extractor quit early
+            source.close()
+            if feeder is not None:
+                feeder.join()
+            # a failed download cuts the stream short, that is the cause
+            if feed_errors:
+                raise feed_errors[0]
+        return processes
+
+    def _filter(
+        self,
+        source: IO[bytes],
+        target: IO[bytes],
+        processes: list[subprocess.Popen],
+        selection: TablespaceSelection,
+        log: IO[bytes],
+    ) -> None:
+        try:
+            filter_stream(source, target, selection)
+            target.close()
+        except BrokenPipeError:
+            # the extractor exited early, its return code tells why
+            pass
+        except XbstreamFormatError as e:
+            for process in processes:
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+            msg = f"Filtering the backup stream failed: {e}\n{_tail(log)}"
+            raise StreamExtractError(msg.strip()) from e
+        except (StorageError, OSError) as e:
+            for process in processes:
+                process.kill()
+                process.wait()
+            msg = f"Reading the backup stream failed: {e}"
+            raise StreamExtractError(msg) from e
+
+    def _start(
+        self,
+        commands: list[list[str]],
+        log: IO[bytes],
+        stdout: int = subprocess.DEVNULL,
+    ) -> list[subprocess.Popen]:
+        processes = []
+        stdin = subprocess.PIPE
+        for index, command in enumerate(commands):
+            self.logger.debug("Extract running: %s", " ".join(command))
+            last = index == len(commands) - 1
+            process = subprocess.Popen(  # noqa: S603
+                in_current_cgroup(command),
+                stdin=stdin,
+                stdout=stdout if last else subprocess.PIPE,
+                stderr=log,
+                env=get_clean_env_for_system_binaries(),
+            )
+            if processes:
+                # the next command holds it now, closing ours lets the
+                # previous one see a broken pipe if the next one dies
+                processes[-1].stdout.close()
+            processes.append(process)
+            stdin = process.stdout
+        return processes
+
+
+class _ChunkReader(io.RawIOBase):
+    """File-like view of downloaded chunks, for streams read uncompressed."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks = iter(chunks)
+        self.pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:
+        while not self.pending:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.pending = chunk
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def _tail(log: IO[bytes]) -> str:
+    log.seek(0)
+    lines = log.read().decode(errors="replace").splitlines()
+    return "\n".join(lines[-ERROR_TAIL_LINES:])
@@ -0,0 +1,85 @@
+import struct
+from typing import IO
+
+from dbcalm.storage.storage_backend import READ_SIZE
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+
+CHUNK_MAGIC = b"XBSTCK01"
+# magic, flags, type, path length
+CHUNK_HEADER = struct.Struct("<8sBcI")
+# payload length, payload offset, checksum
+PAYLOAD_HEADER = struct.Struct("<QQI")
+CHUNK_EOF = b"E"
+# XtraBackup 8.0 punches holes, the map of them sits before the payload
+CHUNK_SPARSE = b"S"
+SPARSE_ENTRY_SIZE = 8
+
+
+class XbstreamFormatError(Exception):
+    """The input is not a complete xbstream."""
+
+
+def filter_stream(
+    source: IO[bytes],
+    output: IO[bytes],
+    selection: TablespaceSelection,
+) -> int:
+    """Copy the chunks of selected files from source to output.
+
+    mbstream/xbstream -x can't extract single files, the stream is filtered
+    on its way to them so the other files are never written.
+
+    Returns:
+        Number of chunks passed on
+    """
+    passed = 0
+    while header := source.read(CHUNK_HEADER.size):
+        if len(header) < CHUNK_HEADER.size:
+            msg = "Stream ends inside a chunk header"
+            raise XbstreamFormatError(msg)
+        magic, _flags, chunk_type, path_length = CHUNK_HEADER.unpack(header)
+        if magic != CHUNK_MAGIC:
+            msg = "Not an xbstream, or the stream is damaged"
+            raise XbstreamFormatError(msg)
+        path = _read_exactly(source, path_length)
+        chunk = [header, path]
+
+        payload_length = 0
+        if chunk_type != CHUNK_EOF:
+            sparse_map_size = 0
+            if chunk_type == CHUNK_SPARSE:
+                sparse_header = _read_exactly(source, 4)
+                sparse_map_size = struct.unpack("<I", sparse_header)[0]
+                chunk.append(sparse_header)
+            payload_header = _read_exactly(source, PAYLOAD_HEADER.size)
+            payload_length = PAYLOAD_HEADER.unpack(payload_header)[0]
+            chunk.append(payload_header)
+            chunk.append(
+                _read_exactly(source, sparse_map_size * SPARSE_ENTRY_SIZE),
+            )
+
+        keep = selection.matches(path.decode(errors="surrogateescape"))
+        if keep:
+            output.write(b"".join(chunk))
+            passed += 1
+        _copy_payload(source, output if keep else None, payload_length)
+    return passed
+
+
+def _read_exactly(source: IO[bytes], size: int) -> bytes:
+    data = source.read(size)
+    if len(data) != size:
+        msg = "Stream ends inside a chunk"
+        raise XbstreamFormatError(msg)
+    return data
+
+
+def _copy_payload(source: IO[bytes], output: IO[bytes] | None, size: int) -> None:
+    while size > 0:
+        piece = source.read(min(size, READ_SIZE))
+        if not piece:
+            msg = "Stream ends inside a chunk payload"
+            raise XbstreamFormatError(msg)
+        if output is not None:
+            output.write(piece)
+        size -= len(piece)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Benchmark the API at different worker counts.
+
+Starts the API with uvicorn against a throwaway config and database, seeded
+with a client, schedules and backups, and measures:
+
+- startup: time until the first request is answered
+- token: client_credentials grants on POST /auth/token
+- list_backups / list_schedules: authenticated list endpoints
+
+Run from the repository root:
+
+    python dev/bench_api.py --workers 1 4 8 --duration 10 --concurrency 32
+
+The load generator runs on the same host, so give the machine more cores
+than the largest worker count or the numbers mostly show contention.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+# Set for the uvicorn workers, which import this module to get the app
+BENCH_DIR_ENV = "DBCALM_BENCH_DIR"
+CLIENT_ID = "bench-client"
+CLIENT_SECRET = "bench-secret"  # noqa: S105
+BACKUP_ROWS = 2000
+SCHEDULE_ROWS = 20
+STARTUP_TIMEOUT = 30  # seconds
+
+
+def use_bench_dir(bench_dir: Path) -> None:
+    from dbcalm.config.config import Config  # noqa: PLC0415
+
+    Config.CONFIG_PATH = str(bench_dir / "config.yml")
+    Config.DB_PATH = str(bench_dir / "db.sqlite3")
+
+
+if os.environ.get(BENCH_DIR_ENV):
+    use_bench_dir(Path(os.environ[BENCH_DIR_ENV]))
+    from dbcalm.cli.server import app  # noqa: F401
+
+
+def write_config(bench_dir: Path) -> None:
+    backup_dir = bench_dir / "backups"
+    backup_dir.mkdir()
+    (bench_dir / "config.yml").write_text(
+        "db_type: mariadb\n"
+        f"backup_dir: {backup_dir}\n"
+        "jwt_secret_key: bench_secret_key\n"
+        "cors_origins:\n"
+        "  - http://localhost\n"
+        f"log_file: {bench_dir / 'dbcalm.log'}\n"
+        "log_level: warning\n",
+    )
+
+
+def seed(bench_dir: Path) -> None:
+    use_bench_dir(bench_dir)
+    from dbcalm.auth.credential_cache import secret_context  # noqa: PLC0415
+    from dbcalm.data.adapter.local import Local  # noqa: PLC0415
+    from dbcalm.data.model.backup import Backup  # noqa: PLC0415
+    from dbcalm.data.model.client import Client  # noqa: PLC0415
+    from dbcalm.data.model.schedule import Schedule  # noqa: PLC0415
+
+    adapter = Local()
+    adapter.create(
+        Client(
+            id=CLIENT_ID,
+            secret=secret_context.hash(CLIENT_SECRET),
+            scopes=["*"],
+            label="bench",
+        ),
+    )
+    for schedule_id in range(1, SCHEDULE_ROWS + 1):
+        adapter.session.add(
+            Schedule(
+                id=schedule_id,
+                backup_type="full",
+                frequency="daily",
+                hour=3,
+                minute=0,
+                retention_value=30,
+                retention_unit="days",
+            ),
+        )
+    start = datetime.now(tz=UTC) - timedelta(hours=BACKUP_ROWS)
+    for number in range(BACKUP_ROWS):
+        start_time = start + timedelta(hours=number)
+        adapter.session.add(
+            Backup(
+                id=start_time.strftime("%Y-%m-%d-%H-%M-%S"),
+                schedule_id=number % SCHEDULE_ROWS + 1,
+                start_time=start_time,
+                end_time=start_time + timedelta(minutes=5),
+                process_id=number,
+                size_bytes=1024 * 1024 * 1024,
+            ),
+        )
+    adapter.session.commit()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(bench_dir: Path, workers: int, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        BENCH_DIR_ENV: str(bench_dir),
+        "PYTHONPATH": str(Path(__file__).parent.parent.resolve()),
+    }
+    return subprocess.Popen(  # noqa: S603
+        [
+            sys.executable, "-m", "uvicorn", "bench_api:app",
+            "--app-dir", str(Path(__file__).parent.resolve()),
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        env=env,
+    )
+
+
+async def wait_ready(base_url: str) -> float:
+    import httpx  # noqa: PLC0415
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() - start < STARTUP_TIMEOUT:
+            try:
+                await client.get("/docs")
+                return time.perf_counter() - start
+            except httpx.TransportError:
+                await asyncio.sleep(0.02)
+    msg = f"API did not start within {STARTUP_TIMEOUT} seconds"
+    raise TimeoutError(msg)
+
+
+async def load(
+    base_url: str,
+    scenario: str,
+    duration: float,
+    concurrency: int,
+) -> tuple[int, list[float], int]:
+    import httpx  # noqa: PLC0415
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        limits=limits,
+        # workers that are still starting can hold the first requests
+        timeout=STARTUP_TIMEOUT,
+    ) as client:
+        credentials = {
+            "grant_type": "client_credentials",
+            "client_id": CLIENT_ID,
+            "client_secret": CLIENT_SECRET,
+        }
+        response = await client.post("/auth/token", json=credentials)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        def request() -> asyncio.Future:
+            if scenario == "token":
+                return client.post("/auth/token", json=credentials)
+            if scenario == "list_backups":
+                return client.get("/backups?per_page=100", headers=headers)
+            return client.get("/schedules", headers=headers)
+
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await request()
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:  # noqa: PLR2004
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return len(latencies), latencies, errors
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return statistics.quantiles(values, n=100)[int(fraction * 100) - 1]
+
+
+def bench(
+    bench_dir: Path,
+    workers: int,
+    scenarios: list[str],
+    duration: float,
+    concurrency: int,
+) -> None:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(bench_dir, workers, port)
+    try:
+        startup = asyncio.run(wait_ready(base_url))
+        print(f"workers={workers} startup={startup * 1000:.0f}ms")
+        for scenario in scenarios:
+            count, latencies, errors = asyncio.run(
+                load(base_url, scenario, duration, concurrency),
+            )
+            print(
+                f"  {scenario:<15} {count / duration:8.1f} req/s  "
+                f"p50={percentile(latencies, 0.5) * 1000:6.1f}ms  "
+                f"p99={percentile(latencies, 0.99) * 1000:6.1f}ms  "
+                f"errors={errors}",
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=["token", "list_backups", "list_schedules"],
+        choices=["token", "list_backups", "list_schedules"],
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_dir = Path(tmp)
+        write_config(bench_dir)
+        seed(bench_dir)
+        for workers in args.workers:
+            bench(bench_dir, workers, args.scenarios, args.duration, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
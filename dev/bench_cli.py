@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Benchmark cold start of the dbcalm CLI.
+
+Measures wall time of:
+
+- help: `dbcalm backup --help`
+- trigger: `dbcalm backup incremental --schedule-id 1`, what cron runs for a
+  scheduled backup, answered by a stand-in command service
+
+From source it also sums the self import times of `dbcalm backup --help`
+and exits non-zero when they exceed the import budget.
+
+Run from the repository root against the sources:
+
+    python dev/bench_cli.py --runs 20
+
+or against a PyInstaller build, e.g. to compare onefile and onedir:
+
+    python dev/bench_cli.py --binary dist/production/dbcalm
+
+A binary can't be pointed at the stand-in service, so with --binary the
+trigger only runs with --live, against the installed command service. That
+really submits the backups.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TRIGGER_ARGS = ["backup", "incremental", "--schedule-id", "1"]
+# Sum of self import times for `dbcalm backup --help`, about 80ms when this
+# was set, the headroom is for slow machines
+IMPORT_BUDGET = 0.4  # seconds
+
+# Runs dbcalm.py from source against the benchmark's config and socket
+SOURCE_RUNNER = """
+import runpy, sys
+from dbcalm.config.config import Config
+Config.CONFIG_PATH, Config.MARIADB_CMD_SOCKET_PATH = sys.argv[1:3]
+sys.argv = ["dbcalm", *sys.argv[3:]]
+runpy.run_path("dbcalm.py", run_name="__main__")
+"""
+
+
+def serve(server: socket.socket) -> None:
+    """Accept every command, like the command service does for valid jobs."""
+    while True:
+        try:
+            connection, _ = server.accept()
+        except OSError:
+            return
+        with connection:
+            connection.recv(65536)
+            connection.sendall(
+                json.dumps({"code": 202, "status": "Accepted", "id": 1}).encode(),
+            )
+
+
+def timed(command: list[str], runs: int) -> list[float]:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(  # noqa: S603
+            command,
+            cwd=REPO_ROOT,
+            env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def import_time(*args: str) -> float:
+    """Sum of the self import times of dbcalm.py run with args, in seconds."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "dbcalm.py", *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, _module = line.removeprefix("import time:").split("|")
+        total += int(self_time)
+    return total / 1_000_000
+
+
+def report(name: str, durations: list[float]) -> None:
+    print(
+        f"{name:<8} min={min(durations) * 1000:6.0f}ms  "
+        f"median={statistics.median(durations) * 1000:6.0f}ms  "
+        f"max={max(durations) * 1000:6.0f}ms",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--binary", help="PyInstaller built dbcalm executable")
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="with --binary, also trigger backups on the installed service",
+    )
+    args = parser.parse_args()
+
+    if args.binary:
+        report("help", timed([args.binary, "backup", "--help"], args.runs))
+        if args.live:
+            report("trigger", timed([args.binary, *TRIGGER_ARGS], args.runs))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "config.yml"
+        config_path.write_text(f"log_file: {Path(tmp) / 'dbcalm.log'}\n")
+        socket_path = str(Path(tmp) / "mariadb-cmd.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socket_path)
+        server.listen(8)
+        threading.Thread(target=serve, args=(server,), daemon=True).start()
+
+        source = [
+            sys.executable, "-c", SOURCE_RUNNER, str(config_path), socket_path,
+        ]
+        report("help", timed([*source, "backup", "--help"], args.runs))
+        report("trigger", timed([*source, *TRIGGER_ARGS], args.runs))
+        server.close()
+
+    imports = min(import_time("backup", "--help") for _ in range(args.runs))
+    print(f"imports  min={imports * 1000:6.0f}ms  budget={IMPORT_BUDGET * 1000:.0f}ms")
+    if imports > IMPORT_BUDGET:
+        sys.exit("import time of `dbcalm backup --help` is over budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark logical backups and restores of an installed dbcalm.
+
+Runs full logical backups through the API and prints the summary of each,
+with the rows dumped, the throughput and how long tables were locked. With
+--restore every backup is also loaded back, which replaces the dumped
+tables of the live server, only use it on a test server.
+
+Run against a running API with a client of scope backups/restores:
+
+    python dev/bench_logical.py --client-id ID --client-secret SECRET --runs 3
+"""
+
+import argparse
+import time
+
+import requests
+import urllib3
+
+HTTP_TIMEOUT = 30  # seconds
+POLL_INTERVAL = 1  # seconds
+JOB_TIMEOUT = 3600  # seconds
+
+
+class Api:
+    def __init__(self, base_url: str, client_id: str, client_secret: str) -> None:
+        self.base_url = base_url
+        response = requests.post(
+            f"{base_url}/auth/token",
+            json={
+                "grant_type": "client_credentials",
+                "client_id": client_id,
+                "client_secret": client_secret,
+            },
+            verify=False,  # noqa: S501
+            timeout=HTTP_TIMEOUT,
+        )
+        response.raise_for_status()
+        self.headers = {
+            "Authorization": f"Bearer {response.json()['access_token']}",
+        }
+
+    def request(self, method: str, path: str, **kwargs: object) -> dict:
+        response = requests.request(
+            method,
+            f"{self.base_url}{path}",
+            headers=self.headers,
+            verify=False,  # noqa: S501
+            timeout=HTTP_TIMEOUT,
+            **kwargs,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def run(self, path: str, body: dict) -> tuple[dict, str]:
+        """Submit a job, wait for it, return its status and summary."""
+        pid = self.request("POST", path, json=body)["pid"]
+        deadline = time.monotonic() + JOB_TIMEOUT
+        while time.monotonic() < deadline:
+            status = self.request("GET", f"/status/{pid}")
+            if status.get("status") == "failed":
+                msg = f"{path} {body} failed: {status.get('error')}"
+                raise RuntimeError(msg)
+            if status.get("status") == "success":
+                process = self.request(
+                    "GET",
+                    "/processes",
+                    params={"query": f"command_id|{pid}"},
+                )["items"][0]
+                return status, process["output"]
+            time.sleep(POLL_INTERVAL)
+        msg = f"{path} {body} did not finish within {JOB_TIMEOUT}s"
+        raise TimeoutError(msg)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--api-url", default="https://localhost:8335")
+    parser.add_argument("--client-id", required=True)
+    parser.add_argument("--client-secret", required=True)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument(
+        "--restore",
+        action="store_true",
+        help="also load every backup back into the live server",
+    )
+    args = parser.parse_args()
+    # the API serves a self-signed certificate by default
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    api = Api(args.api_url, args.client_id, args.client_secret)
+    for run in range(1, args.runs + 1):
+        status, summary = api.run(
+            "/backups",
+            {"type": "full", "engine": "logical"},
+        )
+        print(f"backup {run}: {summary}")
+        if args.restore:
+            _status, summary = api.run(
+                "/restore",
+                {"id": status["resource_id"], "target": "database"},
+            )
+            print(f"restore {run}: {summary}")
+
+
+if __name__ == "__main__":
+    main()
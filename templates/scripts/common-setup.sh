@@ -50,6 +50,13 @@ chmod 750 /usr/bin/$project_name-cmd
 chown mysql:$project_name /usr/bin/$project_name-mariadb-cmd
 chmod 750 /usr/bin/$project_name-mariadb-cmd
 
+# onedir builds keep the unpacked bundles in /usr/lib/dbcalm, /usr/bin only
+# has links to their executables (chown and chmod above follow the links)
+if [ -d /usr/lib/$project_name ]; then
+    chown root:$project_name /usr/lib/$project_name
+    chmod 750 /usr/lib/$project_name
+fi
+
 # Create SSL directory and generate self-signed certificate if not exists
 ssl_dir="/etc/$project_name/ssl"
 ssl_cert="$ssl_dir/fullchain-cert.pem"
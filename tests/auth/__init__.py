@@ -0,0 +1 @@
+# Initialize auth tests package
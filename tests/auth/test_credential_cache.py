@@ -0,0 +1,92 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pytest
+
+from dbcalm.auth import credential_cache
+from dbcalm.data.model.client import Client
+
+SECRET_KEY = "test-secret-key-that-is-long-enough-for-hs256"  # noqa: S105
+
+
+class TestCredentialCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        credential_cache.clear()
+
+    @pytest.fixture
+    def client(self) -> Client:
+        return Client(
+            id="client-1",
+            secret="stored-hash",  # noqa: S106
+            label="test",
+            scopes=["*"],
+        )
+
+    def test_verify_client_secret_caches_success(self, client: Client) -> None:
+        with patch.object(
+            credential_cache.secret_context, "verify", return_value=True,
+        ) as mock_verify:
+            assert credential_cache.verify_client_secret(client, "secret")
+            assert credential_cache.verify_client_secret(client, "secret")
+
+        mock_verify.assert_called_once()
+
+    def test_verify_client_secret_does_not_cache_failure(
+        self, client: Client,
+    ) -> None:
+        with patch.object(
+            credential_cache.secret_context, "verify", return_value=False,
+        ) as mock_verify:
+            assert not credential_cache.verify_client_secret(client, "wrong")
+            assert not credential_cache.verify_client_secret(client, "wrong")
+
+        assert mock_verify.call_count == 2  # noqa: PLR2004
+
+    def test_wrong_secret_is_not_served_from_cache(self, client: Client) -> None:
+        verify = MagicMock(side_effect=[True, False])
+        with patch.object(credential_cache.secret_context, "verify", verify):
+            assert credential_cache.verify_client_secret(client, "secret")
+            assert not credential_cache.verify_client_secret(client, "other")
+
+    def test_revoke_and_changed_hash_force_bcrypt(self, client: Client) -> None:
+        with patch.object(
+            credential_cache.secret_context, "verify", return_value=True,
+        ) as mock_verify:
+            credential_cache.verify_client_secret(client, "secret")
+            credential_cache.revoke_client(client.id)
+            credential_cache.verify_client_secret(client, "secret")
+
+            client.secret = "recreated-hash"  # noqa: S105
+            credential_cache.verify_client_secret(client, "secret")
+
+        assert mock_verify.call_count == 3  # noqa: PLR2004
+
+    @patch("dbcalm.auth.credential_cache.jwt_settings")
+    def test_decode_token_caches_payload(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = (SECRET_KEY, "HS256")
+        token = jwt.encode(
+            {"sub": "client-1", "exp": time.time() + 3600},
+            SECRET_KEY,
+            algorithm="HS256",
+        )
+
+        with patch("dbcalm.auth.credential_cache.jwt.decode", wraps=jwt.decode) as d:
+            first = credential_cache.decode_token(token)
+            second = credential_cache.decode_token(token)
+
+        assert first == second
+        d.assert_called_once()
+
+    @patch("dbcalm.auth.credential_cache.jwt_settings")
+    def test_decode_token_rejects_expired(self, mock_settings: MagicMock) -> None:
+        mock_settings.return_value = (SECRET_KEY, "HS256")
+        token = jwt.encode(
+            {"sub": "client-1", "exp": time.time() - 10},
+            SECRET_KEY,
+            algorithm="HS256",
+        )
+
+        with pytest.raises(jwt.ExpiredSignatureError):
+            credential_cache.decode_token(token)
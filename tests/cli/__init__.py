@@ -0,0 +1 @@
+# Initialize cli tests package
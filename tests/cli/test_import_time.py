@@ -0,0 +1,48 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+# Modules the API server needs, a cron triggered backup must not load them
+API_STACK = ["fastapi", "uvicorn", "starlette", "sqlalchemy", "sqlmodel", "asyncio"]
+
+
+def imported_modules(*args: str) -> set[str]:
+    """Run dbcalm.py with -X importtime, return the modules it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "dbcalm.py", *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        line.split("|")[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "self [us]" not in line
+    }
+
+
+@pytest.fixture(scope="module")
+def backup_help() -> set[str]:
+    return imported_modules("backup", "--help")
+
+
+class TestImportTime:
+    def test_backup_does_not_import_api_stack(self, backup_help: set[str]) -> None:
+        loaded = {module.split(".")[0] for module in backup_help}
+        assert loaded.isdisjoint(API_STACK), sorted(loaded & set(API_STACK))
+        assert "dbcalm.cli.server" not in backup_help
+
+    def test_help_lists_all_commands(self) -> None:
+        result = subprocess.run(
+            [sys.executable, "dbcalm.py", "--help"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for command in ["server", "users", "clients", "backup", "cleanup"]:
+            assert command in result.stdout
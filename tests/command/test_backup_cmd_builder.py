@@ -0,0 +1,110 @@
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from packaging.version import Version
+
+from dbcalm.data.data_types.enum_types import RestoreTarget
+from dbcalm_mariadb_cmd.builder.mariadb_backup_cmd_builder import (
+    MariadbBackupCmdBuilder,
+)
+
+
+@pytest.fixture
+def builder(
+    tmp_path: Path,
+    make_config: Callable[..., MagicMock],
+) -> Callable[..., MariadbBackupCmdBuilder]:
+    """Command builders of MariaDB 10.11 keeping backups in tmp_path."""
+
+    def builder(**values: object) -> MariadbBackupCmdBuilder:
+        config = make_config(backup_dir=str(tmp_path), **values)
+        config.PROJECT_NAME = "dbcalm"
+        config.DB_HOST = "localhost"
+        return MariadbBackupCmdBuilder(config, Version("10.11.6"))
+
+    return builder
+
+
+class TestMariadbBackupCmdBuilder:
+    def test_incremental_is_based_on_checkpoints(
+        self,
+        tmp_path: Path,
+        builder: Callable[..., MariadbBackupCmdBuilder],
+    ) -> None:
+        (tmp_path / "full.checkpoints").mkdir()
+        command = builder(stream=True).build_incremental_backup_cmd(
+            "inc",
+            "full",
+        )
+
+        assert "--stream=xbstream" in command
+        assert f"--incremental-basedir={tmp_path}/full.checkpoints" in command
+        assert f"--extra-lsndir={tmp_path}/inc.checkpoints" in command
+
+    def test_incremental_of_old_backup_uses_its_folder(
+        self,
+        tmp_path: Path,
+        builder: Callable[..., MariadbBackupCmdBuilder],
+    ) -> None:
+        command = builder().build_incremental_backup_cmd("inc", "full")
+        assert f"--incremental-basedir={tmp_path}/full" in command
+
+    def test_streaming_pipeline(
+        self,
+        builder: Callable[..., MariadbBackupCmdBuilder],
+    ) -> None:
+        streaming = builder(stream=True, compression="zstd")
+
+        # pipes are set up by the adapter, not passed to the tool
+        assert not any(
+            part.startswith(("|", ">"))
+            for part in streaming.build_full_backup_cmd("b1")
+        )
+        assert streaming.compress_cmd() == ["zstd", "-", "-c", "-T0"]
+        assert streaming.stream_key("b1") == "backup-b1.xbstream.zst"
+        assert streaming.build_extract_cmds(
+            "s3://backups/backup-b1.xbstream.zst",
+            "/staging/b1",
+        ) == [
+            ["zstd", "-d", "-c", "-T0"],
+            ["/usr/bin/mbstream", "-x", "--parallel=4", "-C", "/staging/b1"],
+        ]
+
+    def test_table_restore_exports(
+        self,
+        builder: Callable[..., MariadbBackupCmdBuilder],
+    ) -> None:
+        commands = builder().build_restore_cmds(
+            "/restore",
+            ["full", "inc"],
+            RestoreTarget.TABLE,
+            "/staging",
+        )
+
+        assert commands[0] == ["/usr/bin/mv", "/staging/full", "/restore"]
+        assert "--export" in commands[-1]
+        assert "--incremental-dir" in commands[-1]
+        assert not any("--copy-back" in command for command in commands)
+
+    def test_partial_backup_options(
+        self,
+        builder: Callable[..., MariadbBackupCmdBuilder],
+    ) -> None:
+        command = builder().build_full_backup_cmd(
+            "b1",
+            ["crm.contacts", "shop"],
+            ["shop.cache"],
+        )
+        assert "--databases=crm.contacts shop" in command
+        assert r"--tables-exclude=^(shop\.cache)$" in command
+
+        # wildcards need the regex option
+        assert builder().scope_options(["log*", "shop.order_*"], None) == [
+            r"--tables=^(log[^.]*\.[^.]*|shop\.order_[^.]*)$",
+        ]
+        assert not any(
+            option.startswith(("--databases", "--tables"))
+            for option in builder().build_full_backup_cmd("b2")
+        )
@@ -0,0 +1,51 @@
+import gzip
+from pathlib import Path
+
+from dbcalm.storage.local_backend import LocalBackend
+from dbcalm_cmd.process.job_cgroups import JobCgroup, job_cgroup
+from dbcalm_mariadb_cmd.stream.backup_streamer import BackupStreamer
+
+
+class TestBackupStreamer:
+    def test_streams_compressed_output(self, tmp_path: Path) -> None:
+        streamer = BackupStreamer(LocalBackend(tmp_path))
+        returncode, output, error = streamer.run(
+            "backup-1.xbstream.gz",
+            ["sh", "-c", "echo log line >&2; printf 'xbstream data'"],
+            ["gzip", "-c"],
+        )
+
+        assert returncode == 0
+        assert error == ""
+        assert str(tmp_path / "backup-1.xbstream.gz") in output
+        # the tool logs to stderr, that is the output of a good backup
+        assert "log line" in output
+        stored = (tmp_path / "backup-1.xbstream.gz").read_bytes()
+        assert gzip.decompress(stored) == b"xbstream data"
+
+    def test_failed_backup_is_not_kept(self, tmp_path: Path) -> None:
+        streamer = BackupStreamer(LocalBackend(tmp_path))
+        returncode, _, error = streamer.run(
+            "backup-1.xbstream",
+            ["sh", "-c", "printf partial; echo server went away >&2; exit 3"],
+        )
+
+        assert returncode == 3  # noqa: PLR2004
+        assert "server went away" in error
+        assert list(tmp_path.iterdir()) == []
+
+    def test_backup_joins_the_job_cgroup(self, tmp_path: Path) -> None:
+        cgroup = tmp_path / "backup-1"
+        cgroup.mkdir()
+        streamer = BackupStreamer(LocalBackend(tmp_path))
+
+        with job_cgroup(JobCgroup(cgroup)):
+            returncode, _, _ = streamer.run(
+                "backup-1.xbstream",
+                ["sh", "-c", "printf $$"],
+            )
+
+        assert returncode == 0
+        # the tool wrote its own pid, the same the join script wrote
+        pid = (tmp_path / "backup-1.xbstream").read_text()
+        assert (cgroup / "cgroup.procs").read_text().strip() == pid
@@ -0,0 +1,156 @@
+import gzip
+import struct
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm.data.model.backup import Backup
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.binlog_file import BinlogFileRepository
+from dbcalm_mariadb_cmd.binlog.binlog_archiver import BinlogArchiver
+from dbcalm_mariadb_cmd.binlog.binlog_reader import (
+    BINLOG_MAGIC,
+    EVENT_HEADER,
+    MARIADB_GTID_EVENT,
+    MARIADB_GTID_LIST_EVENT,
+    MYSQL_GTID_EVENT,
+    MYSQL_PREVIOUS_GTIDS_EVENT,
+    BinlogFormatError,
+    read_binlog_info,
+)
+
+FORMAT_DESCRIPTION_EVENT = 15
+QUERY_EVENT = 2
+SOURCE = uuid.UUID("3e11fa47-71ca-11e1-9e33-c80aa9429562")
+
+
+def event(event_type: int, timestamp: int, body: bytes, server_id: int = 1) -> bytes:
+    size = EVENT_HEADER.size + len(body)
+    return EVENT_HEADER.pack(timestamp, event_type, server_id, size, 0, 0) + body
+
+
+def mariadb_binlog() -> bytes:
+    return BINLOG_MAGIC + b"".join(
+        [
+            event(FORMAT_DESCRIPTION_EVENT, 1700000000, b"\0" * 80),
+            # one domain at sequence 10 before the log starts
+            event(MARIADB_GTID_LIST_EVENT, 0, struct.pack("<IIIQ", 1, 0, 1, 10)),
+            event(MARIADB_GTID_EVENT, 1700000060, struct.pack("<QIB", 11, 0, 0)),
+            event(QUERY_EVENT, 1700000060, b"INSERT"),
+            event(MARIADB_GTID_EVENT, 1700000120, struct.pack("<QIB", 12, 0, 0)),
+            event(QUERY_EVENT, 1700000120, b"UPDATE"),
+        ],
+    )
+
+
+def mysql_gtid(number: int) -> bytes:
+    return b"\0" + SOURCE.bytes + struct.pack("<Q", number)
+
+
+class TestBinlogReader:
+    def test_mariadb_log(self, tmp_path: Path) -> None:
+        path = tmp_path / "mariadb-bin.000001"
+        path.write_bytes(mariadb_binlog())
+
+        info = read_binlog_info(path)
+
+        assert info.first_event_time == datetime.fromtimestamp(1700000000, tz=UTC)
+        assert info.last_event_time == datetime.fromtimestamp(1700000120, tz=UTC)
+        assert info.end_position == path.stat().st_size
+        assert info.start_gtid == "0-1-10"
+        assert info.end_gtid == "0-1-12"
+
+    def test_mysql_log(self, tmp_path: Path) -> None:
+        previous = struct.pack("<Q", 1) + SOURCE.bytes + struct.pack("<QQQ", 1, 1, 6)
+        path = tmp_path / "binlog.000003"
+        path.write_bytes(
+            BINLOG_MAGIC
+            + event(FORMAT_DESCRIPTION_EVENT, 1700000000, b"\0" * 80)
+            + event(MYSQL_PREVIOUS_GTIDS_EVENT, 1700000000, previous)
+            + event(MYSQL_GTID_EVENT, 1700000001, mysql_gtid(6))
+            + event(MYSQL_GTID_EVENT, 1700000002, mysql_gtid(9)),
+        )
+
+        info = read_binlog_info(path)
+
+        assert info.start_gtid == f"{SOURCE}:1-5"
+        assert info.end_gtid == f"{SOURCE}:1-6:9"
+
+    def test_truncated_event_ends_scan(self, tmp_path: Path) -> None:
+        data = mariadb_binlog()
+        path = tmp_path / "mariadb-bin.000001"
+        path.write_bytes(data[:-3])
+
+        info = read_binlog_info(path)
+
+        assert info.end_position == len(data) - EVENT_HEADER.size - len(b"UPDATE")
+        assert info.last_event_time == datetime.fromtimestamp(1700000120, tz=UTC)
+
+    def test_other_file_is_rejected(self, tmp_path: Path) -> None:
+        path = tmp_path / "notes.txt"
+        path.write_bytes(b"hello")
+        with pytest.raises(BinlogFormatError):
+            read_binlog_info(path)
+
+
+@pytest.mark.usefixtures("database")
+class TestBinlogArchiver:
+    @pytest.fixture
+    def archiver(
+        self,
+        tmp_path: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> BinlogArchiver:
+        archiver = BinlogArchiver(make_config(
+            db_type="mariadb",
+            backup_dir=str(tmp_path),
+            binlog_compression="gzip",
+        ))
+        archiver.spool_dir.mkdir(parents=True)
+        return archiver
+
+    def test_rotated_logs_are_archived(self, archiver: BinlogArchiver) -> None:
+        for name in ("mariadb-bin.000001", "mariadb-bin.000002"):
+            (archiver.spool_dir / name).write_bytes(mariadb_binlog())
+
+        archiver.archive_rotated()
+
+        # the newest log is still written by the stream
+        assert [path.name for path in archiver.spooled()] == ["mariadb-bin.000002"]
+        archived = BinlogFileRepository().get("mariadb-bin.000001")
+        assert archived.end_gtid == "0-1-12"
+        assert gzip.decompress(Path(archived.path).read_bytes()) == mariadb_binlog()
+        assert archived.size_bytes == Path(archived.path).stat().st_size
+
+    def test_stream_resumes_after_archive(self, archiver: BinlogArchiver) -> None:
+        server_logs = ["mariadb-bin.000001", "mariadb-bin.000002"]
+        assert archiver.resume_from(server_logs) == "mariadb-bin.000001"
+
+        (archiver.spool_dir / "mariadb-bin.000001").write_bytes(mariadb_binlog())
+        archiver.archive(archiver.spool_dir / "mariadb-bin.000001")
+        assert archiver.resume_from(server_logs) == "mariadb-bin.000002"
+        # purged before it was archived, continue with what is left
+        assert archiver.resume_from(["mariadb-bin.000005"]) == "mariadb-bin.000005"
+
+    def test_retention_follows_oldest_backup(self, archiver: BinlogArchiver) -> None:
+        for name in ("mariadb-bin.000001", "mariadb-bin.000002"):
+            (archiver.spool_dir / name).write_bytes(mariadb_binlog())
+            archived = archiver.archive(archiver.spool_dir / name)
+        assert archiver.apply_retention() == 0
+
+        # logs end at 1700000120, the backup started after them
+        BackupRepository().create(
+            Backup(
+                id="full",
+                process_id=1,
+                start_time=datetime.fromtimestamp(1700000500, tz=UTC),
+                end_time=datetime.fromtimestamp(1700000600, tz=UTC),
+            ),
+        )
+        assert archiver.apply_retention() == 2  # noqa: PLR2004
+        assert BinlogFileRepository().get_list() == ([], 0)
+        assert not Path(archived.path).exists()
@@ -0,0 +1,141 @@
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm.data.model.binlog_file import BinlogFile
+from dbcalm.data.repository.binlog_file import BinlogFileRepository
+from dbcalm_mariadb_cmd.binlog.binlog_replayer import BinlogReplayer, ReplayError
+
+SOURCE = "3e11fa47-71ca-11e1-9e33-c80aa9429562"
+
+
+@pytest.fixture
+def replayer(make_config: Callable[..., MagicMock]) -> Callable[..., BinlogReplayer]:
+    def replayer(db_type: str = "mariadb") -> BinlogReplayer:
+        return BinlogReplayer(make_config(db_type=db_type))
+
+    return replayer
+
+
+def catalog(*numbers: int) -> None:
+    for number in numbers:
+        BinlogFileRepository().save(
+            BinlogFile(
+                name=f"mariadb-bin.{number:06d}",
+                path=f"/archive/mariadb-bin.{number:06d}.zst",
+                size_bytes=100,
+                first_event_time=datetime(2024, 10, 17, number, tzinfo=UTC),
+                last_event_time=datetime(2024, 10, 17, number, 59, tzinfo=UTC),
+                end_position=1000,
+                start_gtid=f"0-1-{number * 10}",
+                end_gtid=f"0-1-{number * 10 + 10}",
+            ),
+        )
+
+
+@pytest.mark.usefixtures("database")
+class TestBinlogReplayer:
+    def test_coordinates(
+        self,
+        tmp_path: Path,
+        replayer: Callable[..., BinlogReplayer],
+    ) -> None:
+        (tmp_path / "mariadb_backup_binlog_info").write_text(
+            "mariadb-bin.000003\t1234\t0-1-31\n",
+        )
+        coordinates = replayer().coordinates(tmp_path)
+        assert coordinates == ("mariadb-bin.000003", 1234, "0-1-31")
+
+        (tmp_path / "mariadb_backup_binlog_info").unlink()
+        with pytest.raises(ReplayError, match="binary logging was off"):
+            replayer().coordinates(tmp_path)
+
+    def test_replay_window(self, replayer: Callable[..., BinlogReplayer]) -> None:
+        catalog(1, 2, 3, 4)
+        logs = replayer().binlogs(
+            "mariadb-bin.000002",
+            datetime(2024, 10, 17, 3, 30, tzinfo=UTC),
+            None,
+        )
+        assert [log.name for log in logs] == [
+            "mariadb-bin.000002",
+            "mariadb-bin.000003",
+        ]
+
+        logs = replayer().binlogs("mariadb-bin.000001", None, "0-1-35")
+        assert len(logs) == 3  # noqa: PLR2004
+
+    def test_gap_in_archive(self, replayer: Callable[..., BinlogReplayer]) -> None:
+        catalog(1, 2, 4)
+        with pytest.raises(ReplayError, match="missing from the archive"):
+            replayer().binlogs("mariadb-bin.000001", None, "0-1-45")
+        with pytest.raises(ReplayError, match="was not archived"):
+            replayer().binlogs("mariadb-bin.000003", None, "0-1-45")
+
+    def test_decode_cmds(self, replayer: Callable[..., BinlogReplayer]) -> None:
+        files = [Path("/work/mariadb-bin.000002"), Path("/work/mariadb-bin.000003")]
+
+        first, second = replayer().decode_cmds(files, 1234, "0-1-20", None, "0-1-35")
+        assert "--start-position=0-1-20" in first
+        assert "--stop-position=0-1-35" in second
+        assert "--start-position=1234" not in first
+
+        until = datetime(2024, 10, 17, 3, 30, tzinfo=UTC)
+        first, second = replayer("mysql").decode_cmds(
+            files,
+            1234,
+            None,
+            until,
+            f"{SOURCE}:35",
+        )
+        assert "--start-position=1234" in first
+        assert not any(option.startswith("--start") for option in second)
+        assert "--skip-gtids" in second
+        assert f"--exclude-gtids={SOURCE}:36-{2**63 - 1}" in second
+        assert any(option.startswith("--stop-datetime=") for option in second)
+
+    def test_logs_are_piped_into_one_session(
+        self,
+        tmp_path: Path,
+        replayer: Callable[..., BinlogReplayer],
+    ) -> None:
+        for name in ("a", "b"):
+            (tmp_path / name).write_text(f"events of {name}\n")
+        applied = tmp_path / "applied"
+        messages = []
+        replayer_ = replayer()
+        replayer_._client_cmd = lambda _server: ["sh", "-c", f"cat > {applied}"]  # noqa: SLF001
+
+        replayer_._apply(  # noqa: SLF001
+            MagicMock(),
+            [["cat", str(tmp_path / "a")], ["cat", str(tmp_path / "b")]],
+            None,
+            messages.append,
+        )
+
+        assert applied.read_text() == "events of a\nevents of b\n"
+        assert messages[-1] == "Replayed binary log 2 of 2"
+
+    def test_failed_apply(
+        self,
+        tmp_path: Path,
+        replayer: Callable[..., BinlogReplayer],
+    ) -> None:
+        (tmp_path / "a").write_text("events\n")
+        replayer_ = replayer()
+        replayer_._client_cmd = lambda _server: [  # noqa: SLF001
+            "sh",
+            "-c",
+            "cat > /dev/null; echo 'ERROR 1062: Duplicate entry' >&2; exit 1",
+        ]
+
+        with pytest.raises(ReplayError, match="Duplicate entry"):
+            replayer_._apply(  # noqa: SLF001
+                MagicMock(),
+                [["cat", str(tmp_path / "a")]],
+                None,
+                lambda _message: None,
+            )
@@ -0,0 +1,147 @@
+import subprocess
+from collections.abc import Callable
+from unittest.mock import MagicMock, patch
+
+import pytest
+from packaging.version import Version
+
+from dbcalm_mariadb_cmd.builder.mariadb_backup_cmd_builder import (
+    MariadbBackupCmdBuilder,
+)
+from dbcalm_mariadb_cmd.capability.capability_probe import (
+    Capabilities,
+    CapabilityProbe,
+)
+
+OUTPUTS = {
+    "/usr/bin/mariadb-admin": (
+        "mariadb-admin  Ver 10.0 Distrib 10.11.6-MariaDB, for debian-linux-gnu"
+    ),
+    "/usr/bin/mariabackup": (
+        "mariabackup based on MariaDB server 10.11.6-MariaDB Linux (x86_64)\n"
+        "  --parallel=#        Number of threads to use for parallel copy\n"
+        "  --stream=name       Stream all backup files to the standard output\n"
+    ),
+}
+
+
+def fake_run(command: list, **_kwargs: object) -> subprocess.CompletedProcess:
+    if command[-1] == "ping":
+        return subprocess.CompletedProcess(command, 0, "mysqld is alive", "")
+    return subprocess.CompletedProcess(command, 0, OUTPUTS[command[0]], "")
+
+
+class TestCapabilityProbe:
+    @pytest.fixture
+    def config(self, make_config: Callable[..., MagicMock]) -> MagicMock:
+        config = make_config(db_type="mariadb")
+        config.PROJECT_NAME = "dbcalm"
+        return config
+
+    @pytest.fixture
+    def run(self) -> MagicMock:
+        with patch(
+            "dbcalm_mariadb_cmd.capability.capability_probe.subprocess.run",
+            side_effect=fake_run,
+        ) as run:
+            yield run
+
+    def test_probes_once(self, config: MagicMock, run: MagicMock) -> None:
+        probe = CapabilityProbe(config)
+        capabilities = probe.capabilities()
+
+        assert capabilities.server_version == Version("10.11.6")
+        assert capabilities.tool_version == Version("10.11.6")
+        assert capabilities.supports("--parallel")
+        assert capabilities.supports("--stream")
+        assert not capabilities.supports("--compress")
+
+        calls = run.call_count
+        assert probe.capabilities() is capabilities
+        assert run.call_count == calls
+
+    def test_invalidate_probes_again(
+        self,
+        config: MagicMock,
+        run: MagicMock,
+    ) -> None:
+        probe = CapabilityProbe(config)
+        first = probe.capabilities()
+        probe.invalidate()
+        assert probe.capabilities() is not first
+        assert run.call_count > 0
+
+    def test_failed_probe_is_retried(
+        self,
+        config: MagicMock,
+        run: MagicMock,
+    ) -> None:
+        run.side_effect = FileNotFoundError
+        probe = CapabilityProbe(config)
+        assert probe.capabilities().server_version is None
+
+        run.side_effect = fake_run
+        with patch(
+            "dbcalm_mariadb_cmd.capability.capability_probe.time.monotonic",
+            return_value=10**9,
+        ):
+            assert probe.capabilities().server_version == Version("10.11.6")
+
+    def test_liveness_is_cached(self, config: MagicMock, run: MagicMock) -> None:
+        probe = CapabilityProbe(config)
+        assert probe.server_alive()
+        assert probe.server_alive()
+        assert run.call_count == 1
+
+        # a cached "down" is checked again right away
+        probe.record_liveness(alive=False)
+        assert probe.server_alive()
+        assert run.call_count == 2  # noqa: PLR2004
+
+    def test_listeners_only_see_changes(
+        self,
+        config: MagicMock,
+        run: MagicMock,  # noqa: ARG002
+    ) -> None:
+        probe = CapabilityProbe(config)
+        changes = []
+        probe.on_liveness_change(changes.append)
+
+        probe.record_liveness(alive=True)
+        probe.record_liveness(alive=True)
+        probe.record_liveness(alive=False)
+        probe.record_liveness(alive=False)
+        probe.record_liveness(alive=True)
+
+        assert changes == [True, False, True]
+
+
+class TestBuilderCapabilities:
+    def test_parallel_only_when_supported(self) -> None:
+        config = MagicMock()
+        config.PROJECT_NAME = "dbcalm"
+        config.DB_HOST = "localhost"
+        config.value.side_effect = {
+            "backup_dir": "/backups",
+            "backup_parallel": 4,
+        }.get
+
+        supported = Capabilities(
+            Version("10.11.6"),
+            Version("10.11.6"),
+            frozenset(["--parallel"]),
+            frozenset(["zstd"]),
+        )
+        builder = MariadbBackupCmdBuilder(config, Version("10.11.6"), supported)
+        assert "--parallel=4" in builder.build_full_backup_cmd("b1")
+        assert builder.default_stream_compression == "zstd"
+
+        unsupported = Capabilities(
+            Version("10.11.6"),
+            Version("10.11.6"),
+            frozenset(),
+            frozenset(["gzip"]),
+        )
+        builder = MariadbBackupCmdBuilder(config, Version("10.11.6"), unsupported)
+        assert "--parallel=4" not in builder.build_full_backup_cmd("b1")
+        assert builder.default_stream_compression == "gzip"
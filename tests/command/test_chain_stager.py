@@ -0,0 +1,84 @@
+import gzip
+import io
+import tarfile
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm.data.model.backup import Backup
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm_mariadb_cmd.stream.chain_stager import ChainStager
+from dbcalm_mariadb_cmd.stream.stream_extractor import (
+    StreamExtractError,
+    StreamExtractor,
+)
+
+
+def archive(files: dict[str, bytes]) -> bytes:
+    """gzip compressed tar, standing in for a compressed xbstream."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return gzip.compress(buffer.getvalue())
+
+
+def extract_cmds(_location: str, target_dir: str) -> list:
+    return [["gzip", "-d", "-c"], ["tar", "-x", "-C", target_dir]]
+
+
+class TestStreamExtractor:
+    def test_pipeline_unpacks_stream(self, tmp_path: Path) -> None:
+        data = archive({"ibdata1": b"pages", "xtrabackup_checkpoints": b"lsn"})
+        # handed over in pieces like a download
+        pieces = [data[i:i + 100] for i in range(0, len(data), 100)]
+
+        StreamExtractor().extract(pieces, extract_cmds("", str(tmp_path)))
+
+        assert (tmp_path / "ibdata1").read_bytes() == b"pages"
+
+    def test_damaged_stream_fails(self, tmp_path: Path) -> None:
+        data = archive({"ibdata1": b"pages"})
+        with pytest.raises(StreamExtractError, match="gzip failed"):
+            StreamExtractor().extract(
+                [data[:20], b"garbage" * 100],
+                extract_cmds("", str(tmp_path)),
+            )
+
+
+@pytest.mark.usefixtures("database")
+class TestChainStager:
+    def test_mixed_chain(
+        self,
+        tmp_path: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        backup_dir = tmp_path / "backups"
+        backup_dir.mkdir()
+        # a streamed full backup and a plain incremental on top of it
+        stream = backup_dir / "backup-full.xbstream.gz"
+        stream.write_bytes(archive({"ibdata1": b"full pages"}))
+        (backup_dir / "inc").mkdir()
+        (backup_dir / "inc" / "ibdata1.delta").write_bytes(b"changed pages")
+        repository = BackupRepository()
+        repository.create(
+            Backup(id="full", process_id=1, storage_location=str(stream)),
+        )
+        repository.create(Backup(id="inc", from_backup_id="full", process_id=2))
+
+        builder = MagicMock()
+        builder.build_extract_cmds.side_effect = extract_cmds
+        stager = ChainStager(builder, make_config(backup_dir=str(backup_dir)))
+
+        assert stager.required(["full", "inc"])
+        assert not stager.required(["inc"])
+
+        stager.stage(["full", "inc"], tmp_path / "source")
+
+        source = tmp_path / "source"
+        assert (source / "full" / "ibdata1").read_bytes() == b"full pages"
+        assert (source / "inc").resolve() == backup_dir / "inc"
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm_mariadb_cmd.command import handler
+from dbcalm_mariadb_cmd.command.handler import handle_command
+from dbcalm_mariadb_cmd.command.validator import CONFLICT, VALID_REQUEST
+
+
+class FakeAdapter:
+    """Starts backups slowly, the window a second check could slip into."""
+
+    def __init__(self, started: list[str]) -> None:
+        self.started = started
+
+    def full_backup(self, id: str) -> tuple[MagicMock, MagicMock]:
+        time.sleep(0.1)
+        self.started.append(id)
+        return MagicMock(command_id=id), MagicMock()
+
+
+@pytest.fixture
+def started(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Backups started by handle_command, later ones refused while one runs."""
+    started = []
+    resolver = MagicMock()
+    resolver.resolve.side_effect = lambda command_data: command_data
+    validator = MagicMock()
+    validator.validate.side_effect = lambda _command_data: (
+        (CONFLICT, "backup already running") if started else (VALID_REQUEST, "")
+    )
+    monkeypatch.setattr(handler, "Resolver", lambda: resolver)
+    monkeypatch.setattr(handler, "CommandValidator", lambda: validator)
+    monkeypatch.setattr(
+        handler,
+        "adapter_factory",
+        lambda _engine: FakeAdapter(started),
+    )
+    monkeypatch.setattr(handler, "ProcessQueueHandler", MagicMock())
+    return started
+
+
+class TestHandleCommand:
+    def test_concurrent_submits_start_one_backup(
+        self,
+        started: list[str],
+    ) -> None:
+        responses = []
+
+        def submit(id: str) -> Callable[[], None]:
+            return lambda: responses.append(
+                handle_command({"cmd": "full_backup", "args": {"id": id}}),
+            )
+
+        # the socket loop and the internal scheduler
+        threads = [threading.Thread(target=submit(id)) for id in ("api", "cron")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(started) == 1
+        assert sorted(response["code"] for response in responses) == [
+            202,
+            CONFLICT,
+        ]
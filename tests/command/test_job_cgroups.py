@@ -0,0 +1,168 @@
+import subprocess
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm_cmd.process.job_cgroups import (
+    SERVICE_LEAF,
+    JobCgroup,
+    JobCgroups,
+    current_cgroup,
+    job_cgroup,
+    job_cgroups,
+    limit_settings,
+)
+
+
+@pytest.fixture
+def cgroup_root(tmp_path: Path) -> Path:
+    """Files of a delegated cgroup holding the service, as cgroupfs has them."""
+    root = tmp_path / "dbcalm-cmd.service"
+    root.mkdir()
+    (root / "cgroup.procs").write_text("4242\n")
+    (root / "cgroup.controllers").write_text("cpuset cpu io memory pids\n")
+    # left from an earlier start, with the files the kernel created
+    (root / "backup").mkdir()
+    (root / "backup" / "cgroup.controllers").write_text("cpuset cpu io memory\n")
+    return root
+
+
+class TestLimitSettings:
+    def test_converts_limits(self) -> None:
+        settings = limit_settings({
+            "io_weight": 50,
+            "io_max": ["8:0 rbps=1048576", "8:16 wiops=100"],
+            "cpu_quota": "150%",
+            "memory_max": "2G",
+            "cpus": "0-3",
+        })
+
+        assert settings == [
+            ("io.weight", "default 50"),
+            ("io.max", "8:0 rbps=1048576"),
+            ("io.max", "8:16 wiops=100"),
+            ("cpu.max", "150000 100000"),
+            ("memory.max", "2G"),
+            ("cpuset.cpus", "0-3"),
+        ]
+
+    def test_no_limits(self) -> None:
+        assert limit_settings({}) == []
+
+
+class TestJobCgroups:
+    def test_disabled_runs_unconfined(
+        self,
+        cgroup_root: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        cgroups = JobCgroups(make_config(cgroup_root=str(cgroup_root)))
+
+        assert cgroups.create("backup", "abc") is None
+
+    def test_creates_job_below_its_type(
+        self,
+        cgroup_root: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        cgroups = JobCgroups(make_config(
+            cgroup=True,
+            cgroup_root=str(cgroup_root),
+            cgroup_limits={"backup": {"io_weight": 50, "cpu_quota": "50%"}},
+        ))
+
+        first = cgroups.create("backup", "abc")
+        second = cgroups.create("backup", "abc")
+
+        # the service moved out of the way of its jobs
+        assert (cgroup_root / SERVICE_LEAF / "cgroup.procs").read_text() == "4242"
+        assert (cgroup_root / "cgroup.subtree_control").read_text() == (
+            "+cpu +cpuset +io +memory"
+        )
+        assert (cgroup_root / "backup" / "io.weight").read_text() == "default 50"
+        assert (cgroup_root / "backup" / "cpu.max").read_text() == "50000 100000"
+        assert first.path == cgroup_root / "backup" / "abc-1"
+        assert second.path == cgroup_root / "backup" / "abc-2"
+        assert first.path.is_dir()
+
+    def test_concurrent_jobs_get_cgroups_of_their_own(
+        self,
+        cgroup_root: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        cgroups = JobCgroups(make_config(cgroup=True, cgroup_root=str(cgroup_root)))
+
+        with ThreadPoolExecutor(8) as pool:
+            created = list(pool.map(
+                lambda command_id: cgroups.create("backup", command_id),
+                ["a", "b", "c", "d"] * 4,
+            ))
+
+        assert None not in created
+        assert len({cgroup.path for cgroup in created}) == 16  # noqa: PLR2004
+
+    def test_shared_by_the_service(self) -> None:
+        assert job_cgroups() is job_cgroups()
+
+    def test_unusable_tree_runs_unconfined(
+        self,
+        tmp_path: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        cgroups = JobCgroups(
+            make_config(cgroup=True, cgroup_root=str(tmp_path / "gone")),
+        )
+
+        assert cgroups.create("backup", "abc") is None
+
+
+class TestJobCgroup:
+    def test_usage(self, tmp_path: Path) -> None:
+        (tmp_path / "cpu.stat").write_text(
+            "usage_usec 2500000\nuser_usec 2000000\nsystem_usec 500000\n"
+            "nr_periods 10\nnr_throttled 2\nthrottled_usec 750000\n",
+        )
+        (tmp_path / "io.stat").write_text(
+            "8:0 rbytes=1000 wbytes=2000 rios=1 wios=2 dbytes=0 dios=0\n"
+            "8:16 rbytes=24 wbytes=48 rios=1 wios=1 dbytes=0 dios=0\n",
+        )
+        (tmp_path / "memory.peak").write_text("1048576\n")
+
+        assert JobCgroup(tmp_path).usage() == {
+            "cpu_seconds": 2.5,
+            "cpu_throttled_seconds": 0.75,
+            "read_bytes": 1024,
+            "write_bytes": 2048,
+            "memory_peak_bytes": 1048576,
+        }
+
+    def test_release_removes_cgroup(self, tmp_path: Path) -> None:
+        leaf = tmp_path / "abc-1"
+        leaf.mkdir()
+
+        assert JobCgroup(leaf).release() == {}
+        assert not leaf.exists()
+
+    def test_wrapped_command_joins_before_running(self, tmp_path: Path) -> None:
+        command = JobCgroup(tmp_path).wrap(["/bin/sh", "-c", "echo $$"])
+
+        result = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        # same process, the shell exec'd the command
+        joined = (tmp_path / "cgroup.procs").read_text().strip()
+        assert joined == result.stdout.strip()
+
+    def test_current_cgroup_of_the_block(self, tmp_path: Path) -> None:
+        cgroup = JobCgroup(tmp_path)
+
+        with job_cgroup(cgroup):
+            assert current_cgroup.get() is cgroup
+        assert current_cgroup.get() is None
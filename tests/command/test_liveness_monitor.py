@@ -0,0 +1,73 @@
+from collections.abc import Callable
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from dbcalm.data.repository.server_state_change import (
+    ServerStateChangeRepository,
+)
+from dbcalm_mariadb_cmd.capability.liveness_monitor import LivenessMonitor
+
+
+@pytest.mark.usefixtures("database")
+class TestLivenessMonitor:
+    @pytest.fixture
+    def monitor(self, make_config: Callable[..., MagicMock]) -> LivenessMonitor:
+        with (
+            patch(
+                "dbcalm_mariadb_cmd.capability.liveness_monitor.config_factory",
+                return_value=make_config(),
+            ),
+            patch(
+                "dbcalm_mariadb_cmd.capability.liveness_monitor.logger_factory",
+            ),
+        ):
+            return LivenessMonitor(MagicMock())
+
+    def states(self) -> list[str]:
+        return [change.state for change in ServerStateChangeRepository().recent()]
+
+    def test_records_only_transitions(self, monitor: LivenessMonitor) -> None:
+        monitor.record_change(True)  # noqa: FBT003
+        monitor.record_change(True)  # noqa: FBT003
+        monitor.record_change(False)  # noqa: FBT003
+        monitor.record_change(True)  # noqa: FBT003
+
+        assert self.states() == ["up", "down", "up"]
+
+    def test_restart_continues_from_stored_state(
+        self,
+        monitor: LivenessMonitor,
+    ) -> None:
+        monitor.record_change(False)  # noqa: FBT003
+
+        # a new process reports its first ping as a change again
+        monitor._last_recorded = None  # noqa: SLF001
+        monitor.record_change(False)  # noqa: FBT003
+
+        assert self.states() == ["down"]
+
+    def test_backs_off_while_down(self, monitor: LivenessMonitor) -> None:
+        monitor.probe.ping.return_value = False
+        waits = []
+
+        def wait(interval: float) -> bool:
+            waits.append(interval)
+            if len(waits) == 6:  # noqa: PLR2004
+                monitor.stop()
+            return False
+
+        monitor._stop.wait = wait  # noqa: SLF001
+        monitor.run()
+
+        assert waits == [10, 20, 40, 60, 60, 60]
+
+    def test_each_ping_is_a_heartbeat(self, monitor: LivenessMonitor) -> None:
+        monitor.record_change(True)  # noqa: FBT003
+        recorded = ServerStateChangeRepository().recent(1)[0].checked_at
+        monitor.probe.ping.return_value = True
+        monitor._stop.wait = lambda _interval: monitor.stop()  # noqa: SLF001
+
+        monitor.run()
+
+        assert ServerStateChangeRepository().recent(1)[0].checked_at > recorded
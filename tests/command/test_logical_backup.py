@@ -0,0 +1,202 @@
+import gzip
+import hashlib
+import json
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm_mariadb_cmd.logical.chunk_planner import Chunk, ChunkPlanner, Table
+from dbcalm_mariadb_cmd.logical.client_session import ClientError, ClientSession
+from dbcalm_mariadb_cmd.logical.logical_dumper import (
+    METADATA_FILE,
+    ROWS_PER_STATEMENT,
+    InsertWriter,
+)
+from dbcalm_mariadb_cmd.logical.logical_loader import LoadError, LogicalLoader
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+
+# Answers SELECT '<text>'; with <text>, fails on FAIL like a batch client
+FAKE_CLIENT = """\
+import re, sys
+for line in sys.stdin:
+    if line.startswith("FAIL"):
+        sys.stderr.write("ERROR 1064 (42000): syntax error\\n")
+        sys.exit(1)
+    match = re.match(r"SELECT '(.*)';$", line.strip())
+    if match:
+        print(match.group(1), flush=True)
+"""
+
+
+def orders(rows: int = 1000) -> Table:
+    return Table("shop", "orders", ["id", "note"], rows, "id")
+
+
+def write_dump(source: Path, tables: dict[tuple[str, str], bytes]) -> None:
+    """Dump folder with one chunk per table holding data."""
+    source.mkdir()
+    entries = []
+    for (schema, name), data in tables.items():
+        file_name = f"{schema}.{name}.00000.sql.gz"
+        compressed = gzip.compress(data, mtime=0)
+        (source / file_name).write_bytes(compressed)
+        entries.append({
+            "schema": schema,
+            "name": name,
+            "columns": ["id"],
+            "chunks": [{
+                "file": file_name,
+                "rows": data.count(b"("),
+                "bytes": len(compressed),
+                "sha256": hashlib.sha256(compressed).hexdigest(),
+            }],
+        })
+    (source / METADATA_FILE).write_text(json.dumps({
+        "engine": "logical",
+        "schemas": {schema: f"CREATE DATABASE `{schema}`" for schema, _ in tables},
+        "tables": entries,
+    }))
+
+
+class TestChunkPlanner:
+    def test_ranges_cover_the_key_with_open_ends(self) -> None:
+        chunks = ChunkPlanner().ranges(orders(), 1, 1000, 4)
+
+        assert [(chunk.low, chunk.high) for chunk in chunks] == [
+            (None, 251), (251, 501), (501, 751), (751, None),
+        ]
+        assert chunks[1].conditions == ["`id` >= 251", "`id` < 501"]
+        assert chunks[3].file_name == "shop.orders.00003.sql.gz"
+
+    def test_narrow_key_range_gives_fewer_chunks(self) -> None:
+        chunks = ChunkPlanner().ranges(orders(), 5, 6, 8)
+
+        assert [(chunk.low, chunk.high) for chunk in chunks] == [
+            (None, 6), (6, None),
+        ]
+
+    def test_select_returns_rows_as_sql_values(self) -> None:
+        statement = Chunk(orders(), 1, 251, 501).select()
+
+        assert statement.startswith("SELECT CONCAT('(', CONCAT_WS(',', ")
+        assert "QUOTE(`note`)" in statement
+        assert statement.endswith(
+            "FROM `shop`.`orders` WHERE `id` >= 251 AND `id` < 501",
+        )
+
+    def test_whole_table_chunk_has_no_conditions(self) -> None:
+        table = Table("shop", "log", ["line"])
+
+        assert Chunk(table, 0).select().endswith("FROM `shop`.`log`")
+
+
+class TestInsertWriter:
+    def test_rows_are_batched_into_inserts(self, tmp_path: Path) -> None:
+        path = tmp_path / "chunk.sql.gz"
+        with gzip.open(path, "wb") as output:
+            writer = InsertWriter(output, orders())
+            for row in range(ROWS_PER_STATEMENT + 2):
+                writer.row(f"({row},'x')\n".encode())
+            writer.close()
+
+        script = gzip.decompress(path.read_bytes()).decode()
+        assert writer.rows == ROWS_PER_STATEMENT + 2
+        statements = script.count("INSERT INTO `orders` (`id`, `note`) VALUES\n")
+        assert statements == 2  # noqa: PLR2004
+        assert script.endswith(f"({ROWS_PER_STATEMENT},'x'),\n"
+                               f"({ROWS_PER_STATEMENT + 1},'x');\n")
+
+    def test_empty_chunk_writes_nothing(self, tmp_path: Path) -> None:
+        path = tmp_path / "chunk.sql.gz"
+        with gzip.open(path, "wb") as output:
+            writer = InsertWriter(output, orders())
+            writer.close()
+
+        assert gzip.decompress(path.read_bytes()) == b""
+
+
+class TestClientSession:
+    @pytest.fixture
+    def client(self, tmp_path: Path) -> list[str]:
+        script = tmp_path / "client.py"
+        script.write_text(FAKE_CLIENT)
+        return [sys.executable, str(script)]
+
+    def test_results_end_at_the_marker(self, client: list[str]) -> None:
+        with ClientSession(client) as session:
+            assert session.query("SELECT 'a\tb'") == [["a", "b"]]
+            # the session stays open for the next statement
+            assert session.query("SELECT 'c'") == [["c"]]
+
+    def test_failed_statement_raises_with_client_error(
+        self,
+        client: list[str],
+    ) -> None:
+        with ClientSession(client) as session, pytest.raises(
+            ClientError,
+            match="exited with code 1:\nERROR 1064",
+        ):
+            session.execute("FAIL")
+
+
+class TestLogicalLoader:
+    @pytest.fixture
+    def loader(self, make_config: Callable[..., MagicMock]) -> LogicalLoader:
+        return LogicalLoader(make_config())
+
+    def test_selection_picks_tables(
+        self,
+        tmp_path: Path,
+        loader: LogicalLoader,
+    ) -> None:
+        source = tmp_path / "dump"
+        write_dump(source, {
+            ("shop", "orders"): b"(1),(2)",
+            ("shop", "items"): b"(1)",
+            ("crm", "leads"): b"(1)",
+        })
+
+        tables = loader.tables(source, TablespaceSelection(schemas=["shop"]))
+
+        assert [table["name"] for table in tables] == ["orders", "items"]
+
+    def test_missing_selection_is_refused(
+        self,
+        tmp_path: Path,
+        loader: LogicalLoader,
+    ) -> None:
+        source = tmp_path / "dump"
+        write_dump(source, {("shop", "orders"): b"(1)"})
+
+        with pytest.raises(LoadError, match=r"holds no crm, shop\.items"):
+            loader.tables(
+                source,
+                TablespaceSelection(tables=["shop.items"], schemas=["crm"]),
+            )
+
+    def test_check_reads_every_chunk(
+        self,
+        tmp_path: Path,
+        loader: LogicalLoader,
+    ) -> None:
+        source = tmp_path / "dump"
+        write_dump(source, {("shop", "orders"): b"(1),(2)"})
+
+        assert loader.check(source) == "Checked 1 chunks of 1 tables, 2 rows"
+
+    def test_check_finds_changed_chunk(
+        self,
+        tmp_path: Path,
+        loader: LogicalLoader,
+    ) -> None:
+        source = tmp_path / "dump"
+        write_dump(source, {("shop", "orders"): b"(1),(2)"})
+        (source / "shop.orders.00000.sql.gz").write_bytes(
+            gzip.compress(b"(3)", mtime=0),
+        )
+
+        with pytest.raises(LoadError, match="doesn't match its checksum"):
+            loader.check(source)
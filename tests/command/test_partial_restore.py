@@ -0,0 +1,256 @@
+import gzip
+import io
+import struct
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm.data.data_types.enum_types import RestoreTarget
+from dbcalm_mariadb_cmd.partial.tablespace_importer import (
+    TablespaceImporter,
+    TablespaceImportError,
+)
+from dbcalm_mariadb_cmd.partial.tablespace_selection import TablespaceSelection
+from dbcalm_mariadb_cmd.stream.stream_extractor import (
+    StreamExtractError,
+    StreamExtractor,
+)
+from dbcalm_mariadb_cmd.stream.xbstream_filter import (
+    CHUNK_HEADER,
+    PAYLOAD_HEADER,
+    XbstreamFormatError,
+    filter_stream,
+)
+
+
+def xbstream(files: dict[str, bytes]) -> bytes:
+    """Payload chunks of every file, then its end chunk, like mbstream -c."""
+    stream = b""
+    for path, data in files.items():
+        name = path.encode()
+        header = CHUNK_HEADER.pack(b"XBSTCK01", 0, b"P", len(name)) + name
+        stream += header + PAYLOAD_HEADER.pack(len(data), 0, 0) + data
+        stream += CHUNK_HEADER.pack(b"XBSTCK01", 0, b"E", len(name)) + name
+    return stream
+
+
+def paths(stream: bytes) -> list[str]:
+    """Files of a stream, in the order their end chunks appear."""
+    found = []
+    source = io.BytesIO(stream)
+    while header := source.read(CHUNK_HEADER.size):
+        _, _, chunk_type, length = CHUNK_HEADER.unpack(header)
+        path = source.read(length).decode()
+        if chunk_type == b"E":
+            found.append(path)
+            continue
+        size = PAYLOAD_HEADER.unpack(source.read(PAYLOAD_HEADER.size))[0]
+        source.read(size)
+    return found
+
+
+BACKUP = {
+    "ibdata1": b"system",
+    "xtrabackup_checkpoints": b"lsn",
+    "mysql/innodb_index_stats.ibd": b"stats",
+    "shop/orders.ibd": b"orders",
+    "shop/orders.frm": b"definition",
+    "shop/order_items.ibd": b"items",
+    "shop/logs#P#p0.ibd": b"partition",
+    "crm/contacts.ibd.delta": b"changed",
+}
+
+
+class TestTablespaceSelection:
+    def test_table_files(self) -> None:
+        selection = TablespaceSelection.for_target(
+            RestoreTarget.TABLE,
+            ["shop.orders", "crm.contacts"],
+        )
+        assert [path for path in BACKUP if selection.matches(path)] == [
+            "ibdata1",
+            "xtrabackup_checkpoints",
+            "mysql/innodb_index_stats.ibd",
+            "shop/orders.ibd",
+            "shop/orders.frm",
+            "crm/contacts.ibd.delta",
+        ]
+        assert not selection.matches("#innodb_redo/../shop/items.ibd")
+
+    def test_schema_files(self) -> None:
+        selection = TablespaceSelection.for_target(RestoreTarget.SCHEMA, ["shop"])
+        assert selection.matches("shop/logs#P#p0.ibd")
+        assert not selection.matches("crm/contacts.ibd.delta")
+        assert selection.arguments() == ["--schema=shop"]
+
+    def test_names_are_checked(self) -> None:
+        with pytest.raises(ValueError, match=r"not a schema\.table name"):
+            TablespaceSelection(tables=["orders"])
+        with pytest.raises(ValueError, match="not a schema name"):
+            TablespaceSelection(schemas=["shop.orders"])
+        with pytest.raises(ValueError, match=r"not a schema\.table name"):
+            TablespaceSelection(tables=["shop.`orders`; DROP"])
+
+
+class TestXbstreamFilter:
+    def test_only_selected_files_pass(self) -> None:
+        output = io.BytesIO()
+        passed = filter_stream(
+            io.BytesIO(xbstream(BACKUP)),
+            output,
+            TablespaceSelection(tables=["shop.orders"]),
+        )
+
+        assert passed == 10  # noqa: PLR2004
+        assert paths(output.getvalue()) == [
+            "ibdata1",
+            "xtrabackup_checkpoints",
+            "mysql/innodb_index_stats.ibd",
+            "shop/orders.ibd",
+            "shop/orders.frm",
+        ]
+
+    def test_sparse_chunks_keep_their_map(self) -> None:
+        name = b"shop/orders.ibd"
+        chunk = (
+            CHUNK_HEADER.pack(b"XBSTCK01", 0, b"S", len(name)) + name
+            + struct.pack("<I", 1)
+            + PAYLOAD_HEADER.pack(4, 0, 0)
+            + struct.pack("<II", 16384, 4)
+            + b"data"
+        )
+        output = io.BytesIO()
+        filter_stream(
+            io.BytesIO(chunk + xbstream({"crm/contacts.ibd": b"skipped"})),
+            output,
+            TablespaceSelection(tables=["shop.orders"]),
+        )
+        assert output.getvalue() == chunk
+
+    def test_damaged_stream(self) -> None:
+        with pytest.raises(XbstreamFormatError, match="Not an xbstream"):
+            filter_stream(
+                io.BytesIO(b"garbage" * 10),
+                io.BytesIO(),
+                TablespaceSelection(),
+            )
+        with pytest.raises(XbstreamFormatError, match="ends inside"):
+            filter_stream(
+                io.BytesIO(xbstream(BACKUP)[:-5]),
+                io.BytesIO(),
+                TablespaceSelection(),
+            )
+
+    def test_extract_pipeline_filters(self, tmp_path: Path) -> None:
+        data = gzip.compress(xbstream(BACKUP))
+        extracted = tmp_path / "extracted"
+        commands = [["gzip", "-d", "-c"], ["sh", "-c", f"cat > {extracted}"]]
+        selection = TablespaceSelection(schemas=["crm"])
+
+        StreamExtractor().extract(
+            [data[i:i + 50] for i in range(0, len(data), 50)],
+            commands,
+            selection,
+        )
+        assert paths(extracted.read_bytes()) == [
+            "ibdata1",
+            "xtrabackup_checkpoints",
+            "mysql/innodb_index_stats.ibd",
+            "crm/contacts.ibd.delta",
+        ]
+
+        # uncompressed streams go straight from the download to the filter
+        StreamExtractor().extract([xbstream(BACKUP)], commands[1:], selection)
+        assert len(paths(extracted.read_bytes())) == 4  # noqa: PLR2004
+
+        with pytest.raises(StreamExtractError, match="Filtering the backup"):
+            StreamExtractor().extract([b"garbage" * 100], commands[1:], selection)
+
+
+class TestTablespaceImporter:
+    @pytest.fixture
+    def prepared(self, tmp_path: Path) -> Path:
+        for path in [
+            "shop/orders.ibd",
+            "shop/orders.cfg",
+            "shop/order_items.ibd",
+            "shop/order_items.cfg",
+        ]:
+            (tmp_path / "prepared" / path).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / "prepared" / path).write_text(path)
+        (tmp_path / "datadir" / "shop").mkdir(parents=True)
+        return tmp_path / "prepared"
+
+    @pytest.fixture
+    def importer(
+        self,
+        make_config: Callable[..., MagicMock],
+    ) -> Callable[..., tuple[TablespaceImporter, list]]:
+        """Importers into datadir of a server with the live tables given."""
+
+        def importer(datadir: Path, live: str) -> tuple[TablespaceImporter, list]:
+            importer = TablespaceImporter(make_config(db_type="mariadb"))
+            statements = []
+
+            def query(statement: str) -> str:
+                statements.append(statement)
+                if statement.startswith("SELECT @@datadir"):
+                    return f"{datadir}\n"
+                if statement.startswith("SELECT"):
+                    return live
+                # the files are in place when the table takes them in
+                if statement.endswith("IMPORT TABLESPACE"):
+                    table = statement.split("`")[3]
+                    assert (datadir / "shop" / f"{table}.ibd").is_file()
+                return ""
+
+            importer.query = query
+            return importer, statements
+
+        return importer
+
+    def test_tables_are_swapped_in(
+        self,
+        prepared: Path,
+        importer: Callable[..., tuple[TablespaceImporter, list]],
+    ) -> None:
+        datadir = prepared.parent / "datadir"
+        importer, statements = importer(
+            datadir,
+            "shop\torders\nshop\torder_items\n",
+        )
+        messages = []
+
+        summary = importer.run(
+            prepared,
+            TablespaceSelection(schemas=["shop"]),
+            messages.append,
+        )
+
+        assert statements[2:4] == [
+            "ALTER TABLE `shop`.`order_items` DISCARD TABLESPACE",
+            "ALTER TABLE `shop`.`order_items` IMPORT TABLESPACE",
+        ]
+        assert (datadir / "shop" / "orders.ibd").read_text() == "shop/orders.ibd"
+        assert not (datadir / "shop" / "orders.cfg").exists()
+        assert messages[-1] == "Imported table 2 of 2"
+        assert summary == "Imported 2 tables: shop.order_items, shop.orders"
+
+    def test_tables_must_exist(
+        self,
+        prepared: Path,
+        importer: Callable[..., tuple[TablespaceImporter, list]],
+    ) -> None:
+        importer, statements = importer(prepared.parent, "shop\torders\n")
+        with pytest.raises(TablespaceImportError, match=r"shop\.order_items"):
+            importer.run(prepared, TablespaceSelection(schemas=["shop"]))
+        assert not any("DISCARD" in statement for statement in statements)
+
+        with pytest.raises(TablespaceImportError, match=r"no tablespace of shop\.x"):
+            importer.tables(prepared, TablespaceSelection(tables=["shop.x"]))
+
+        (prepared / "shop" / "logs#P#p0.ibd").write_text("partition")
+        with pytest.raises(TablespaceImportError, match="Partitioned tables"):
+            importer.tables(prepared, TablespaceSelection(schemas=["shop"]))
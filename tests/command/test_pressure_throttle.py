@@ -0,0 +1,345 @@
+import subprocess
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm_cmd.process import pressure_throttle
+from dbcalm_cmd.process.job_cgroups import JobCgroup
+from dbcalm_cmd.process.pressure_throttle import (
+    PressureGauge,
+    PressureThrottle,
+    ResourcePressure,
+    ThrottledJob,
+    server_cgroup,
+)
+from dbcalm_mariadb_cmd.capability import server_load
+from dbcalm_mariadb_cmd.capability.server_load import (
+    LOCK_WAITERS_QUERY,
+    ServerLoadProbe,
+    server_load_probes,
+)
+from dbcalm_mariadb_cmd.logical.client_session import ClientError
+
+
+def pressure(total: int) -> str:
+    return (
+        f"some avg10=0.00 avg60=0.00 avg300=0.00 total={total}\n"
+        "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+    )
+
+
+class FixedLoad:
+    def __init__(self, load: float, blocking: list[bool] | None = None) -> None:
+        self.load = load
+        # answers to blocking(), the last one repeated
+        self.blocked = blocking or [False]
+        self.closed = False
+
+    def __call__(self) -> float:
+        return self.load
+
+    def blocking(self) -> bool:
+        if len(self.blocked) > 1:
+            return self.blocked.pop(0)
+        return self.blocked[0]
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def sleeper() -> Iterator[subprocess.Popen]:
+    process = subprocess.Popen(["sleep", "30"])
+    yield process
+    process.kill()
+    process.wait()
+
+
+@pytest.fixture
+def throttle(
+        tmp_path: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> Callable[..., PressureThrottle]:
+    """Throttles of fast intervals, reading pressure below tmp_path."""
+
+    def throttle(
+            load: float,
+            blocking: list[bool] | None = None,
+            **values: object,
+        ) -> PressureThrottle:
+        return PressureThrottle(
+            make_config(
+                throttle=True,
+                throttle_interval=0.05,
+                throttle_min_duty=0.25,
+                throttle_server_cgroup=str(tmp_path),
+                **values,
+            ),
+            [FixedLoad(load, blocking)],
+            pressure_dir=tmp_path,
+        )
+
+    return throttle
+
+
+def process_state(pid: int) -> str:
+    return Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0]
+
+
+class TestPressureGauge:
+    def test_share_of_time_stalled(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        clock = iter([10.0, 12.0])
+        monkeypatch.setattr(pressure_throttle.time, "monotonic", lambda: next(clock))
+        (tmp_path / "io").write_text(pressure(1_000_000))
+        gauge = PressureGauge(tmp_path / "io")
+
+        # one of the two seconds stalled
+        (tmp_path / "io").write_text(pressure(2_000_000))
+
+        assert gauge.sample() == pytest.approx(50.0)
+
+    def test_without_pressure_information(self, tmp_path: Path) -> None:
+        assert PressureGauge(tmp_path / "io").sample() == 0.0
+
+
+class TestResourcePressure:
+    @staticmethod
+    def clock(monkeypatch: pytest.MonkeyPatch, gauges: int) -> None:
+        """Samples of every gauge one second apart."""
+        ticks = iter([10.0] * gauges + [11.0] * gauges)
+        monkeypatch.setattr(pressure_throttle.time, "monotonic", lambda: next(ticks))
+
+    def test_reads_the_servers_cgroup(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        self.clock(monkeypatch, 1)
+        server = tmp_path / "mariadb.service"
+        server.mkdir()
+        (server / "io.pressure").write_text(pressure(0))
+        (tmp_path / "io").write_text(pressure(0))
+        io = ResourcePressure("io", server, None, tmp_path)
+
+        (server / "io.pressure").write_text(pressure(200_000))
+        (tmp_path / "io").write_text(pressure(900_000))
+
+        assert io.sample() == pytest.approx(20.0)
+
+    def test_host_pressure_without_the_jobs_own(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        self.clock(monkeypatch, 2)
+        leaf = tmp_path / "abc-1"
+        leaf.mkdir()
+        (leaf / "io.pressure").write_text(pressure(0))
+        (tmp_path / "io").write_text(pressure(0))
+        io = ResourcePressure("io", None, JobCgroup(leaf), tmp_path)
+
+        # the backup waited on its own reads most of the second
+        (leaf / "io.pressure").write_text(pressure(700_000))
+        (tmp_path / "io").write_text(pressure(750_000))
+
+        assert io.sample() == pytest.approx(5.0)
+
+    def test_server_cgroup(
+        self,
+        tmp_path: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        config = make_config(throttle_server_cgroup=str(tmp_path))
+
+        assert server_cgroup(config) is None
+        (tmp_path / "io.pressure").write_text(pressure(0))
+        assert server_cgroup(config) == tmp_path
+
+
+class TestPressureThrottle:
+    def test_only_watches_its_job_types(
+        self,
+        tmp_path: Path,
+        make_config: Callable[..., MagicMock],
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        assert throttle(2.0).watch("restore", 1, None) is None
+        disabled = PressureThrottle(make_config(), pressure_dir=tmp_path)
+        assert disabled.watch("backup", 1, None) is None
+
+    def test_pauses_loaded_job(
+        self,
+        sleeper: subprocess.Popen,
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        job = throttle(2.0).watch("backup", sleeper.pid, None)
+
+        time.sleep(0.5)
+        job.stop()
+
+        assert job.duty == pytest.approx(0.25)
+        assert job.throttled_seconds > 0
+        # never left stopped
+        assert process_state(sleeper.pid) != "T"
+        assert job.throttle.probes[0].closed
+
+    def test_leaves_job_running_without_load(
+        self,
+        sleeper: subprocess.Popen,
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        job = throttle(0.5).watch("backup", sleeper.pid, None)
+
+        time.sleep(0.2)
+        job.stop()
+
+        assert job.duty == 1.0
+        assert job.throttled_seconds == 0
+
+    def test_never_pauses_a_job_holding_up_the_server(
+        self,
+        sleeper: subprocess.Popen,
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        job = throttle(2.0, [True]).watch("backup", sleeper.pid, None)
+
+        time.sleep(0.3)
+        job.stop()
+
+        assert job.duty == 1.0
+        assert job.throttled_seconds == 0
+
+    def test_resumes_when_the_server_waits(
+        self,
+        sleeper: subprocess.Popen,
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        # free when the pause starts, sessions wait on the job's lock after
+        job = ThrottledJob(
+            throttle(2.0, [False, True]),
+            sleeper.pid,
+            None,
+        )
+
+        job._pause(5)  # noqa: SLF001
+
+        assert job.throttled_seconds < 1
+        assert process_state(sleeper.pid) != "T"
+
+    def test_freezes_job_cgroup(
+        self,
+        tmp_path: Path,
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        leaf = tmp_path / "abc-1"
+        leaf.mkdir()
+        job = throttle(2.0).watch("backup", 1, JobCgroup(leaf))
+
+        time.sleep(0.2)
+        job.stop()
+
+        assert job.throttled_seconds > 0
+        assert (leaf / "cgroup.freeze").read_text() == "0"
+
+    def test_freezes_task_cgroup(
+        self,
+        tmp_path: Path,
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        leaf = tmp_path / "abc-1"
+        leaf.mkdir()
+        job = throttle(2.0).watch_task("backup", JobCgroup(leaf))
+
+        time.sleep(0.2)
+        job.stop()
+
+        assert job.throttled_seconds > 0
+        assert (leaf / "cgroup.freeze").read_text() == "0"
+
+    def test_task_without_cgroup_is_left_alone(
+        self,
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        # pausing it would stop the service the task runs in
+        assert throttle(2.0).watch_task("backup", None) is None
+
+    def test_metrics(
+        self,
+        throttle: Callable[..., PressureThrottle],
+    ) -> None:
+        job = ThrottledJob(throttle(0.0), 1, None)
+        job.throttled_seconds = 1.23456
+        job.io_bytes = 4 * 1024 * 1024
+
+        assert job.metrics({}, 2.0) == {
+            "throttled_seconds": 1.235,
+            "throughput_mb_s": 2.0,
+        }
+        # the cgroup's accounting wins over sampled bytes
+        usage = {"read_bytes": 1024 * 1024, "write_bytes": 1024 * 1024}
+        assert job.metrics(usage, 2.0)["throughput_mb_s"] == 1.0
+
+
+class TestServerLoadProbe:
+    def test_load_over_limit(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        session = MagicMock()
+        session.query.return_value = [["Threads_running", "33"]]
+        monkeypatch.setattr(server_load, "ClientSession", lambda _command: session)
+        monkeypatch.setattr(server_load, "client_cmd", lambda _config: [])
+        probe = ServerLoadProbe(make_config(), 16)
+
+        assert probe() == 2.0  # noqa: PLR2004
+        probe.close()
+        session.close.assert_called_once()
+
+    def test_blocking_while_sessions_wait_on_a_lock(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        session = MagicMock()
+        session.query.side_effect = [[["3"]], [["0"]]]
+        monkeypatch.setattr(server_load, "ClientSession", lambda _command: session)
+        monkeypatch.setattr(server_load, "client_cmd", lambda _config: [])
+        probe = ServerLoadProbe(make_config())
+
+        assert probe.blocking()
+        assert not probe.blocking()
+        session.query.assert_called_with(LOCK_WAITERS_QUERY)
+        # without a limit the server's load isn't asked for
+        assert probe() == 0.0
+
+    def test_failing_server_counts_as_no_load(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        session = MagicMock()
+        session.query.side_effect = ClientError("gone away")
+        monkeypatch.setattr(server_load, "ClientSession", lambda _command: session)
+        monkeypatch.setattr(server_load, "client_cmd", lambda _config: [])
+
+        probe = ServerLoadProbe(make_config(), 16)
+        assert probe() == 0.0
+        assert not probe.blocking()
+        assert session.close.call_count == 2  # noqa: PLR2004
+
+    def test_configured_probes(self, make_config: Callable[..., MagicMock]) -> None:
+        assert server_load_probes(make_config(throttle_threads_running=32)) == []
+        (probe,) = server_load_probes(make_config(throttle=True))
+        assert probe.limit is None
+        (probe,) = server_load_probes(
+            make_config(throttle=True, throttle_threads_running=32),
+        )
+        assert probe.limit == 32  # noqa: PLR2004
@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from dbcalm.errors.not_found_error import NotFoundError
+from dbcalm.util.backup_scope import BackupScope
+from dbcalm_mariadb_cmd.command.resolver import Resolver
+
+
+class TestResolver:
+    @patch("dbcalm_mariadb_cmd.command.resolver.BackupRepository")
+    def test_incremental_uses_latest_backup(self, mock_repo: MagicMock) -> None:
+        mock_repo.return_value.latest_base.return_value = MagicMock(id="base")
+
+        command_data = Resolver().resolve({
+            "cmd": "incremental_backup",
+            "args": {"id": "new", "from_backup_id": None},
+        })
+
+        assert command_data["args"]["from_backup_id"] == "base"
+
+    @patch("dbcalm_mariadb_cmd.command.resolver.BackupRepository")
+    def test_incremental_keeps_given_base(self, mock_repo: MagicMock) -> None:
+        command_data = Resolver().resolve({
+            "cmd": "incremental_backup",
+            "args": {"id": "new", "from_backup_id": "given"},
+        })
+
+        assert command_data["args"]["from_backup_id"] == "given"
+        mock_repo.assert_not_called()
+
+    @patch("dbcalm_mariadb_cmd.command.resolver.BackupRepository")
+    def test_incremental_without_backups(self, mock_repo: MagicMock) -> None:
+        mock_repo.return_value.latest_base.return_value = None
+
+        with pytest.raises(NotFoundError):
+            Resolver().resolve({"cmd": "incremental_backup", "args": {"id": "new"}})
+
+    @patch("dbcalm_mariadb_cmd.command.resolver.ScheduleRepository")
+    @patch("dbcalm_mariadb_cmd.command.resolver.BackupRepository")
+    def test_scheduled_backup_takes_schedule_scope(
+        self,
+        mock_repo: MagicMock,
+        mock_schedules: MagicMock,
+    ) -> None:
+        mock_schedules.return_value.get.return_value = MagicMock(
+            include=["shop"],
+            exclude=None,
+        )
+        mock_repo.return_value.latest_base.return_value = MagicMock(id="shop")
+
+        command_data = Resolver().resolve({
+            "cmd": "incremental_backup",
+            "args": {"id": "new", "schedule_id": 2, "from_backup_id": None},
+        })
+
+        assert command_data["args"]["include"] == ["shop"]
+        assert "exclude" not in command_data["args"]
+        # the base is the latest backup of the same tables
+        mock_repo.return_value.latest_base.assert_called_once_with(
+            BackupScope(["shop"]),
+        )
+        assert command_data["args"]["from_backup_id"] == "shop"
+
+    def test_other_commands_untouched(self) -> None:
+        command_data = {"cmd": "full_backup", "args": {"id": "new"}}
+        assert Resolver().resolve(command_data) == command_data
+
+    @patch("dbcalm_mariadb_cmd.command.resolver.BackupRepository")
+    def test_test_restore_resolves_latest_chain(self, mock_repo: MagicMock) -> None:
+        mock_repo.return_value.latest_backup.return_value = MagicMock(
+            id="inc2",
+            engine=None,
+        )
+        mock_repo.return_value.required_backups.return_value = [
+            "full",
+            "inc1",
+            "inc2",
+        ]
+
+        command_data = Resolver().resolve({
+            "cmd": "test_restore",
+            "args": {"id": None, "schedule_id": 3},
+        })
+
+        assert command_data["args"] == {
+            "id": "inc2",
+            "id_list": ["full", "inc1", "inc2"],
+            "schedule_id": 3,
+        }
+
+    @patch("dbcalm_mariadb_cmd.command.resolver.BackupRepository")
+    def test_test_restore_unknown_backup(self, mock_repo: MagicMock) -> None:
+        mock_repo.return_value.get.return_value = None
+
+        with pytest.raises(NotFoundError):
+            Resolver().resolve({"cmd": "test_restore", "args": {"id": "gone"}})
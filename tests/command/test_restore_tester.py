@@ -0,0 +1,112 @@
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from dbcalm.data.repository.restore_test import RestoreTestRepository
+from dbcalm_mariadb_cmd.restore_test.restore_tester import RestoreTester
+
+
+def completed(command: list, returncode: int = 0) -> subprocess.CompletedProcess:
+    stderr = "" if returncode == 0 else "[ERROR] InnoDB: Page corrupted\n"
+    return subprocess.CompletedProcess(command, returncode, "", stderr)
+
+
+@pytest.mark.usefixtures("database")
+class TestRestoreTester:
+    @pytest.fixture
+    def tester(
+        self,
+        tmp_path: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> RestoreTester:
+        config = make_config(
+            db_type="mariadb",
+            backup_dir=str(tmp_path / "backups"),
+        )
+        builder = MagicMock()
+        builder.build_restore_cmds.side_effect = lambda tmp_dir, id_list, *_: [
+            ["/usr/bin/cp", "-r", f"/backups/{id_list[0]}", tmp_dir],
+            *(["mariabackup", "--prepare", backup_id] for backup_id in id_list),
+        ]
+        return RestoreTester(builder, config)
+
+    def test_records_restore_time(
+        self,
+        tester: RestoreTester,
+        tmp_path: Path,
+    ) -> None:
+        with patch(
+            "dbcalm_mariadb_cmd.restore_test.restore_tester.subprocess.run",
+            side_effect=lambda command, **_: completed(command),
+        ) as run:
+            returncode, output, error = tester.run(["full", "inc1"], schedule_id=3)
+
+        assert returncode == 0
+        assert error == ""
+        assert "Restored 2 backups" in output
+        assert run.call_count == 3  # noqa: PLR2004
+        # the scratch folder is gone again
+        assert list((tmp_path / "backups" / "restore-tests").iterdir()) == []
+
+        items, _ = RestoreTestRepository().get_list()
+        assert len(items) == 1
+        assert items[0].status == "success"
+        assert items[0].backup_id == "inc1"
+        assert items[0].chain_length == 2  # noqa: PLR2004
+        assert items[0].schedule_id == 3  # noqa: PLR2004
+        assert items[0].restore_seconds is not None
+        assert items[0].startup_seconds is None
+
+        rto = RestoreTestRepository().rto_by_chain_length()
+        assert [(row.chain_length, row.runs) for row in rto] == [(2, 1)]
+
+    def test_failed_prepare(self, tester: RestoreTester) -> None:
+        def run(command: list, **_kwargs: object) -> subprocess.CompletedProcess:
+            return completed(command, 1 if "inc1" in command else 0)
+
+        with patch(
+            "dbcalm_mariadb_cmd.restore_test.restore_tester.subprocess.run",
+            side_effect=run,
+        ):
+            returncode, _, error = tester.run(["full", "inc1"])
+
+        assert returncode == 1
+        assert "Page corrupted" in error
+
+        items, _ = RestoreTestRepository().get_list()
+        assert items[0].status == "failed"
+        assert items[0].restore_seconds is None
+        assert RestoreTestRepository().rto_by_chain_length() == []
+
+    def test_sanity_check_stops_server(self, tester: RestoreTester) -> None:
+        tester.sanity_check = True
+        server = MagicMock()
+        server.poll.return_value = None
+
+        def run(command: list, **_kwargs: object) -> subprocess.CompletedProcess:
+            result = completed(command)
+            if "-e" in command:
+                result.stdout = "312\n"
+            return result
+
+        with (
+            patch(
+                "dbcalm_mariadb_cmd.restore_test.restore_tester.subprocess.run",
+                side_effect=run,
+            ) as mock_run,
+            patch(
+                "dbcalm_mariadb_cmd.restore_test.restore_tester.subprocess.Popen",
+                return_value=server,
+            ),
+        ):
+            returncode, output, _ = tester.run(["full"])
+
+        assert returncode == 0
+        assert output.endswith(": 312")
+        assert mock_run.call_args_list[-1].args[0][-1] == "shutdown"
+        server.wait.assert_called_once()
+        items, _ = RestoreTestRepository().get_list()
+        assert items[0].startup_seconds is not None
@@ -0,0 +1,350 @@
+import json
+import os
+import shutil
+import subprocess
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Self
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm_mariadb_cmd.adapter.snapshot import copy_data
+from dbcalm_mariadb_cmd.logical.client_session import ClientError
+from dbcalm_mariadb_cmd.snapshot import snapshot_taker, volume
+from dbcalm_mariadb_cmd.snapshot.snapshot_taker import (
+    SNAPSHOT_FILE,
+    SnapshotTaker,
+)
+from dbcalm_mariadb_cmd.snapshot.volume import (
+    BtrfsVolume,
+    LvmVolume,
+    SnapshotError,
+    ZfsVolume,
+    volume_factory,
+)
+
+
+class RecordingSession:
+    """Stands in for ClientSession, remembers the statements it ran."""
+
+    def __init__(self, statements: list[str], fail_on: str | None = None) -> None:
+        self.statements = statements
+        self.fail_on = fail_on
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.statements.append("closed")
+
+    def execute(self, statement: str) -> None:
+        self.statements.append(statement)
+        if statement == self.fail_on:
+            raise ClientError(statement)
+
+    def query(self, statement: str) -> list[list[str]]:
+        self.statements.append(statement)
+        return [["0-1-42"]]
+
+
+class TestVolume:
+    @pytest.fixture
+    def commands(self, monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+        commands = []
+
+        def run(command: list[str], **_kwargs: object) -> MagicMock:
+            commands.append(command)
+            return MagicMock(returncode=0, stdout="", stderr="")
+
+        monkeypatch.setattr(volume.subprocess, "run", run)
+        return commands
+
+    def test_lvm_commands(
+        self,
+        commands: list[list[str]],
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        lvm = LvmVolume(make_config(
+            snapshot_volume="data/mysql",
+            snapshot_sudo=True,
+            backup_dir="/backups",
+        ))
+
+        lvm.create("dbcalm-b1")
+        lvm.remove("dbcalm-b1")
+
+        assert commands == [
+            [
+                "sudo", "-n", "lvcreate", "--snapshot", "--extents", "20%ORIGIN",
+                "--name", "dbcalm-b1", "data/mysql",
+            ],
+            ["sudo", "-n", "lvremove", "--yes", "data/dbcalm-b1"],
+        ]
+
+    def test_lvm_fixed_size(
+        self,
+        commands: list[list[str]],
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        lvm = LvmVolume(make_config(
+            snapshot_volume="data/mysql",
+            snapshot_size="10G",
+            backup_dir="/backups",
+        ))
+
+        lvm.create("dbcalm-b1")
+
+        assert commands[0][:4] == ["lvcreate", "--snapshot", "--size", "10G"]
+
+    def test_zfs_commands(
+        self,
+        commands: list[list[str]],
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        zfs = ZfsVolume(make_config(snapshot_volume="tank/mysql"))
+
+        zfs.create("dbcalm-b1")
+        zfs.remove("dbcalm-b1")
+
+        assert commands == [
+            ["zfs", "snapshot", "tank/mysql@dbcalm-b1"],
+            ["zfs", "destroy", "tank/mysql@dbcalm-b1"],
+        ]
+
+    def test_failure_raises_with_stderr(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        monkeypatch.setattr(
+            volume.subprocess,
+            "run",
+            lambda *_args, **_kwargs: MagicMock(
+                returncode=5,
+                stdout="",
+                stderr="Insufficient free space\n",
+            ),
+        )
+
+        with pytest.raises(SnapshotError, match="Insufficient free space"):
+            ZfsVolume(make_config(snapshot_volume="tank/mysql")).create("dbcalm-b1")
+
+    def test_btrfs_snapshot_dir_defaults_next_to_volume(
+        self,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        btrfs = BtrfsVolume(make_config(data_dir="/srv/mysql"))
+
+        assert btrfs.snapshot_dir == Path("/srv/dbcalm-snapshots")
+
+    def test_data_files_inside_snapshot(
+        self,
+        tmp_path: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        btrfs = BtrfsVolume(make_config(
+            snapshot_volume="/srv/volume",
+            snapshot_data_path="mysql",
+        ))
+
+        assert btrfs.data_files(tmp_path) == tmp_path / "mysql"
+
+    def test_factory_rejects_unknown_type(
+        self,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        with pytest.raises(SnapshotError, match="snapshot_type must be one of"):
+            volume_factory(make_config(snapshot_type="xfs"))
+
+
+class TestSnapshotTaker:
+    @pytest.fixture
+    def take(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        make_config: Callable[..., MagicMock],
+    ) -> Callable[..., tuple[list[str], object]]:
+        """Takes a snapshot, with the statements the session ran."""
+
+        def take(
+            db_type: str,
+            volume_mock: MagicMock,
+            fail_on: str | None = None,
+        ) -> tuple[list[str], object]:
+            statements = []
+            monkeypatch.setattr(
+                snapshot_taker,
+                "ClientSession",
+                lambda _command: RecordingSession(statements, fail_on),
+            )
+            monkeypatch.setattr(snapshot_taker, "client_cmd", lambda _config: [])
+            volume_mock.create.side_effect = (
+                volume_mock.create.side_effect
+                or (lambda name: statements.append(f"snapshot {name}"))
+            )
+            taker = SnapshotTaker(
+                make_config(db_type=db_type, snapshot_lock_timeout=5),
+                volume_mock,
+            )
+            return statements, taker.take("dbcalm-b1")
+
+        return take
+
+    def test_mariadb_blocks_commits_for_the_snapshot_only(
+        self,
+        take: Callable[..., tuple[list[str], object]],
+    ) -> None:
+        statements, taken = take("mariadb", MagicMock())
+
+        assert statements == [
+            "SET SESSION lock_wait_timeout = 5",
+            "BACKUP STAGE START",
+            "BACKUP STAGE FLUSH",
+            "BACKUP STAGE BLOCK_DDL",
+            "BACKUP STAGE BLOCK_COMMIT",
+            "SELECT @@global.gtid_binlog_pos",
+            "snapshot dbcalm-b1",
+            "BACKUP STAGE END",
+            "closed",
+        ]
+        assert taken.name == "dbcalm-b1"
+        assert taken.gtid == "0-1-42"
+        assert taken.lock_seconds >= 0
+
+    def test_mysql_uses_global_read_lock(
+        self,
+        take: Callable[..., tuple[list[str], object]],
+    ) -> None:
+        statements, _taken = take("mysql", MagicMock())
+
+        lock = statements.index("FLUSH TABLES WITH READ LOCK")
+        assert statements[lock + 2:lock + 4] == [
+            "snapshot dbcalm-b1",
+            "UNLOCK TABLES",
+        ]
+
+    def test_failed_snapshot_unlocks(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        statements = []
+        failing = MagicMock()
+        failing.create.side_effect = SnapshotError("volume full")
+        monkeypatch.setattr(
+            snapshot_taker,
+            "ClientSession",
+            lambda _command: RecordingSession(statements),
+        )
+        monkeypatch.setattr(snapshot_taker, "client_cmd", lambda _config: [])
+        taker = SnapshotTaker(make_config(db_type="mariadb"), failing)
+
+        with pytest.raises(SnapshotError, match="volume full"):
+            taker.take("dbcalm-b1")
+
+        assert statements[-2:] == ["BACKUP STAGE END", "closed"]
+
+    def test_failed_lock_takes_no_snapshot(
+        self,
+        take: Callable[..., tuple[list[str], object]],
+    ) -> None:
+        volume_mock = MagicMock()
+
+        with pytest.raises(ClientError):
+            take("mariadb", volume_mock, fail_on="BACKUP STAGE BLOCK_COMMIT")
+
+        volume_mock.create.assert_not_called()
+
+    def test_written_description(
+        self,
+        take: Callable[..., tuple[list[str], object]],
+        tmp_path: Path,
+    ) -> None:
+        _statements, taken = take("mariadb", MagicMock())
+
+        taken.write(tmp_path, "btrfs", kept=True)
+
+        described = json.loads((tmp_path / SNAPSHOT_FILE).read_text())
+        assert described["engine"] == "snapshot"
+        assert described["volume_type"] == "btrfs"
+        assert described["kept"] is True
+        assert described["gtid"] == "0-1-42"
+
+
+class TestCopyData:
+    def test_copies_data_without_runtime_files(self, tmp_path: Path) -> None:
+        source = tmp_path / "snapshot"
+        (source / "shop").mkdir(parents=True)
+        (source / "ibdata1").write_bytes(b"x" * 1024)
+        (source / "shop" / "orders.ibd").write_bytes(b"y" * 1024)
+        (source / "mysqld.pid").write_text("123")
+        (source / "mysql.sock").write_text("")
+        (source / SNAPSHOT_FILE).write_text("{}")
+        target = tmp_path / "backup"
+        target.mkdir()
+        reports = []
+
+        summary = copy_data(source, target, reports.append)
+
+        copied = sorted(
+            str(path.relative_to(target)) for path in target.rglob("*")
+        )
+        assert copied == ["ibdata1", "shop", "shop/orders.ibd"]
+        assert summary.startswith("Copied 0.0 MB")
+        assert reports == [f"Copying data files from {source}"]
+
+
+@pytest.fixture
+def btrfs_volume(tmp_path: Path) -> Iterator[Path]:
+    """A btrfs filesystem on a loopback file, mounted below tmp_path."""
+    if os.geteuid() != 0 or not (shutil.which("mkfs.btrfs") and shutil.which("btrfs")):
+        pytest.skip("needs root and btrfs-progs")
+    image = tmp_path / "btrfs.img"
+    mount_point = tmp_path / "mnt"
+    mount_point.mkdir()
+    with image.open("wb") as file:
+        file.truncate(256 * 1024 * 1024)
+    subprocess.run(["mkfs.btrfs", "-q", str(image)], check=True)
+    try:
+        subprocess.run(
+            ["mount", "-o", "loop", str(image), str(mount_point)],
+            check=True,
+            capture_output=True,
+        )
+    except subprocess.CalledProcessError as e:
+        pytest.skip(f"loop mount unavailable: {e.stderr.decode().strip()}")
+    try:
+        yield mount_point
+    finally:
+        subprocess.run(["umount", str(mount_point)], check=False)
+
+
+class TestBtrfsLoopback:
+    def test_snapshot_copy_and_remove(
+        self,
+        btrfs_volume: Path,
+        make_config: Callable[..., MagicMock],
+    ) -> None:
+        data_dir = btrfs_volume / "mysql"
+        subprocess.run(
+            ["btrfs", "subvolume", "create", str(data_dir)],
+            check=True,
+            capture_output=True,
+        )
+        (data_dir / "ibdata1").write_bytes(b"before")
+        btrfs = BtrfsVolume(make_config(
+            data_dir=str(data_dir),
+            snapshot_dir=str(btrfs_volume / "snapshots"),
+        ))
+
+        btrfs.create("dbcalm-b1")
+        # writes after the snapshot don't reach it
+        (data_dir / "ibdata1").write_bytes(b"after")
+        target = btrfs_volume / "backup"
+        with btrfs.mounted("dbcalm-b1") as root:
+            copy_data(btrfs.data_files(root), target)
+        btrfs.remove("dbcalm-b1")
+
+        assert (target / "ibdata1").read_bytes() == b"before"
+        assert not btrfs.exists("dbcalm-b1")
@@ -154,6 +154,68 @@ class TestValidator:
         assert status == VALID_REQUEST
         assert message == ""
 
+    @patch("dbcalm_mariadb_cmd.command.validator.Validator.credentials_file_valid")
+    @patch("dbcalm_mariadb_cmd.command.validator.Validator.server_alive")
+    def test_table_restore_needs_running_server(
+        self,
+        mock_server_alive: MagicMock,
+        mock_credentials_file_valid: MagicMock,
+        validator: Validator,
+    ) -> None:
+        mock_credentials_file_valid.return_value = True
+        command_data = {
+            "cmd": "restore_backup",
+            "args": {"id_list": ["backup1"], "target": "table"},
+        }
+
+        status, message = validator.validate(command_data)
+        assert status == INVALID_REQUEST
+        assert "tables" in message
+
+        command_data["args"]["tables"] = ["shop.orders"]
+        mock_server_alive.return_value = False
+        status, message = validator.validate(command_data)
+        assert status == SERVICE_UNAVAILABLE
+        assert "not running" in message
+
+        mock_server_alive.return_value = True
+        assert validator.validate(command_data) == (VALID_REQUEST, "")
+
+    @pytest.mark.parametrize(
+        ("cmd", "args", "message"),
+        [
+            (
+                "incremental_backup",
+                {"id": "b2", "from_backup_id": "b1"},
+                "always full backups",
+            ),
+            ("full_backup", {"id": "b1", "include": ["shop"]}, "whole instance"),
+            (
+                "restore_backup",
+                {"id_list": ["b1"], "target": "database", "until_gtid": "0-1-5"},
+                "point in time",
+            ),
+            (
+                "restore_backup",
+                {"id_list": ["b1"], "target": "table", "tables": ["shop.orders"]},
+                "data directory or a folder",
+            ),
+        ],
+    )
+    def test_snapshot_refusals(
+        self,
+        validator: Validator,
+        cmd: str,
+        args: dict,
+        message: str,
+    ) -> None:
+        command_data = {"cmd": cmd, "args": {**args, "engine": "snapshot"}}
+
+        status, error = validator.validate(command_data)
+
+        assert status == INVALID_REQUEST
+        assert message in error
+
     @patch("dbcalm_mariadb_cmd.command.validator.Validator.credentials_file_valid")
     @patch("dbcalm_mariadb_cmd.command.validator.Validator.data_dir_empty")
     def test_database_restore_data_dir_empty_check(
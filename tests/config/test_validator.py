@@ -29,6 +29,33 @@ class TestConfigValidator:
         self, validator: Validator, config_mock: MagicMock,
     ) -> None:
 
+        values = {
+            "cors_origins": ["http://example.com"],
+            "api_port": 123,
+            "db_type": "mariadb",
+            "scheduler": "internal",
+            "backup_engine": "logical",
+            "snapshot_type": "btrfs",
+            "scheduler_jitter": 30,
+            "cgroup_limits": {"backup": {"io_weight": 50, "cpu_quota": "50%"}},
+            "api_workers": 4,
+            "log_max_bytes": None,
+            "log_rotate_when": None,
+            "forward": None,
+        }
+
+        def config_side_effect(key: str) -> str | list[str] | int:
+            return values.get(key, "test_value")
+
+        # Setup the config to return valid values for all keys
+        config_mock.value.side_effect = config_side_effect
+
+        # Test successful validation
+        validator.validate()  # Should not raise an exception
+
+    def test_validate_invalid_scheduler(
+        self, validator: Validator, config_mock: MagicMock,
+    ) -> None:
         def config_side_effect(key: str) -> str | list[str] | int:
             if key == "cors_origins":
                 return ["http://example.com"]
@@ -36,13 +63,141 @@ class TestConfigValidator:
                 return 123
             if key == "db_type":
                 return "mariadb"
+            if key == "scheduler":
+                return "systemd"
             return "test_value"
 
-        # Setup the config to return valid values for all keys
         config_mock.value.side_effect = config_side_effect
 
-        # Test successful validation
-        validator.validate()  # Should not raise an exception
+        with pytest.raises(ValidationError) as excinfo:
+            validator.validate()
+
+        assert "scheduler must be one of" in str(excinfo.value)
+
+    def test_validate_invalid_backup_engine(
+        self, validator: Validator, config_mock: MagicMock,
+    ) -> None:
+        values = {
+            "cors_origins": ["http://example.com"],
+            "api_port": 123,
+            "db_type": "mariadb",
+            "scheduler": "cron",
+            "backup_engine": "mydumper",
+        }
+        config_mock.value.side_effect = lambda key: values.get(key, "test_value")
+
+        with pytest.raises(ValidationError) as excinfo:
+            validator.validate()
+
+        assert "backup_engine must be one of" in str(excinfo.value)
+
+    def test_validate_invalid_snapshot_type(
+        self, validator: Validator, config_mock: MagicMock,
+    ) -> None:
+        values = {
+            "cors_origins": ["http://example.com"],
+            "api_port": 123,
+            "db_type": "mariadb",
+            "scheduler": "cron",
+            "backup_engine": "snapshot",
+            "snapshot_type": "xfs",
+        }
+        config_mock.value.side_effect = lambda key: values.get(key, "test_value")
+
+        with pytest.raises(ValidationError) as excinfo:
+            validator.validate()
+
+        assert "snapshot_type must be one of" in str(excinfo.value)
+
+    def test_validate_unknown_cgroup_limit(
+        self, validator: Validator, config_mock: MagicMock,
+    ) -> None:
+        values = {
+            "cors_origins": ["http://example.com"],
+            "api_port": 123,
+            "db_type": "mariadb",
+            "scheduler": "cron",
+            "backup_engine": "physical",
+            "snapshot_type": "lvm",
+            "scheduler_jitter": 30,
+            "api_workers": 4,
+            "cgroup_limits": {"backup": {"io_weight": 50, "swap_max": "1G"}},
+        }
+        config_mock.value.side_effect = lambda key: values.get(key, "test_value")
+
+        with pytest.raises(ValidationError) as excinfo:
+            validator.validate()
+
+        assert "cgroup_limits of backup can only set" in str(excinfo.value)
+        assert "swap_max" in str(excinfo.value)
+
+    def test_validate_cgroup_limit_of_in_process_job(
+        self, validator: Validator, config_mock: MagicMock,
+    ) -> None:
+        values = {
+            "cors_origins": ["http://example.com"],
+            "api_port": 123,
+            "db_type": "mariadb",
+            "scheduler": "cron",
+            "backup_engine": "physical",
+            "snapshot_type": "lvm",
+            "scheduler_jitter": 30,
+            "api_workers": 4,
+            "cgroup_limits": {"cleanup_backups": {"io_weight": 50}},
+        }
+        config_mock.value.side_effect = lambda key: values.get(key, "test_value")
+
+        with pytest.raises(ValidationError) as excinfo:
+            validator.validate()
+
+        assert "cgroup_limits of cleanup_backups" in str(excinfo.value)
+        assert "cleanup_rate_limit" in str(excinfo.value)
+
+    def test_validate_log_rotation_with_api_workers(
+        self, validator: Validator, config_mock: MagicMock,
+    ) -> None:
+        values = {
+            "cors_origins": ["http://example.com"],
+            "api_port": 123,
+            "db_type": "mariadb",
+            "scheduler": "cron",
+            "backup_engine": "physical",
+            "snapshot_type": "lvm",
+            "scheduler_jitter": 30,
+            "api_workers": 4,
+            "cgroup_limits": None,
+            "log_max_bytes": 52428800,
+            "log_rotate_when": None,
+        }
+        config_mock.value.side_effect = lambda key: values.get(key, "test_value")
+
+        with pytest.raises(ValidationError) as excinfo:
+            validator.validate()
+
+        assert "rotate the log with logrotate" in str(excinfo.value)
+
+    def test_validate_removed_forward(
+        self, validator: Validator, config_mock: MagicMock,
+    ) -> None:
+        values = {
+            "cors_origins": ["http://example.com"],
+            "api_port": 123,
+            "db_type": "mariadb",
+            "scheduler": "cron",
+            "backup_engine": "physical",
+            "snapshot_type": "lvm",
+            "scheduler_jitter": 30,
+            "api_workers": 1,
+            "cgroup_limits": None,
+            "forward": "ssh backup-host 'cat > backup.xbstream'",
+        }
+        config_mock.value.side_effect = lambda key: values.get(key, "test_value")
+
+        with pytest.raises(ValidationError) as excinfo:
+            validator.validate()
+
+        assert "forward in" in str(excinfo.value)
+        assert "storage_backend" in str(excinfo.value)
 
     def test_validate_missing_config_parameter(
         self, validator: Validator, config_mock: MagicMock,
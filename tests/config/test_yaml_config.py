@@ -0,0 +1,40 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from dbcalm.config.yaml_config import YamlConfig
+
+
+class TestYamlConfig:
+    @pytest.fixture
+    def config_path(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        path = tmp_path / "config.yml"
+        path.write_text("api_workers: 2\n")
+        monkeypatch.setattr(YamlConfig, "CONFIG_PATH", str(path))
+        return path
+
+    def test_parses_file_once(
+        self,
+        config_path: Path,  # noqa: ARG002
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        config = YamlConfig()
+        assert config.value("api_workers") == 2  # noqa: PLR2004
+
+        def fail(*_args: object) -> None:
+            pytest.fail("config file parsed again")
+
+        monkeypatch.setattr("dbcalm.config.yaml_config.yaml.safe_load", fail)
+        assert config.value("api_workers") == 2  # noqa: PLR2004
+        assert config.value("api_port", 8335) == 8335  # noqa: PLR2004
+
+    def test_reloads_changed_file(self, config_path: Path) -> None:
+        config = YamlConfig()
+        assert config.value("api_workers") == 2  # noqa: PLR2004
+
+        config_path.write_text("api_workers: 4\n")
+        # make sure the change is visible even on coarse mtime resolution
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert config.value("api_workers") == 4  # noqa: PLR2004
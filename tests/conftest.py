@@ -0,0 +1,30 @@
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm.config.config import Config
+
+
+@pytest.fixture
+def database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """An empty SQLite database of the test's own."""
+    path = tmp_path / "db.sqlite3"
+    monkeypatch.setattr(Config, "DB_PATH", str(path))
+    return path
+
+
+@pytest.fixture
+def make_config() -> Callable[..., MagicMock]:
+    """Config mocks answering value() from keyword arguments.
+
+    Keys not given return the default passed to value().
+    """
+
+    def make_config(**values: object) -> MagicMock:
+        config = MagicMock()
+        config.value.side_effect = lambda key, default=None: values.get(key, default)
+        return config
+
+    return make_config
@@ -0,0 +1,82 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Inspector, create_engine, inspect
+
+from dbcalm.config.config import Config
+from dbcalm.data.adapter import local
+from dbcalm.data.adapter.local import Local
+from dbcalm.data.model.schedule import Schedule
+
+TABLE = Schedule.__tablename__
+
+
+def columns(path: Path, table: str) -> set[str]:
+    with sqlite3.connect(path) as connection:
+        return {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+
+
+def drop_column(path: Path, table: str, column: str) -> None:
+    """Turn the database back into one of a release before column."""
+    with sqlite3.connect(path) as connection:
+        connection.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+
+class StaleInspector:
+    """Inspector that still sees the columns TABLE had earlier."""
+
+    def __init__(self, inspector: Inspector, columns: list[dict]) -> None:
+        self.inspector = inspector
+        self.columns = columns
+
+    def has_table(self, name: str) -> bool:
+        return self.inspector.has_table(name)
+
+    def get_columns(self, name: str) -> list[dict]:
+        if name == TABLE:
+            return self.columns
+        return self.inspector.get_columns(name)
+
+
+class TestMigrate:
+    def test_every_database_file_is_migrated(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        for name in ("first.sqlite3", "second.sqlite3"):
+            path = tmp_path / name
+            path.touch()
+            monkeypatch.setattr(Config, "DB_PATH", str(path))
+            # an older release's database
+            with sqlite3.connect(path) as connection:
+                connection.execute(
+                    f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, "
+                    "backup_type VARCHAR NOT NULL, frequency VARCHAR NOT NULL)",
+                )
+
+            Local()
+
+            assert "engine" in columns(path, TABLE)
+
+    def test_columns_another_process_added_count_as_done(
+        self,
+        database: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        adapter = Local()
+        drop_column(database, TABLE, "engine")
+        engine = create_engine(f"sqlite:///{database}")
+        # what this process saw before the other one migrated
+        before = inspect(engine).get_columns(TABLE)
+        adapter.migrate(engine)
+        monkeypatch.setattr(
+            local,
+            "inspect",
+            lambda connection: StaleInspector(inspect(connection), before),
+        )
+
+        adapter.migrate(engine)
+
+        assert "engine" in columns(database, TABLE)
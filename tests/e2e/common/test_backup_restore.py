@@ -482,3 +482,58 @@ class TestBackupListing:
         assert backup["id"] == backup_id
         # Verify it's a full backup (from_backup_id should be None)
         assert backup["from_backup_id"] is None
+
+
+class TestLogicalBackupRestore:
+    """Test logical backups loaded back into the running server."""
+
+    def test_logical_backup_and_restore(
+        self,
+        api_token: str,
+        api_base_url: str,
+        db_connection: pymysql.Connection,
+    ) -> None:
+        """Dump with parallel workers, change the data, load the dump back."""
+        load_sql_file(db_connection, "fixtures/initial_data.sql")
+        response = requests.post(
+            f"{api_base_url}/backups",
+            headers={"Authorization": f"Bearer {api_token}"},
+            json={"type": "full", "engine": "logical"},
+            verify=False,  # noqa: S501
+            timeout=HTTP_TIMEOUT,
+        )
+        error_msg = f"Failed to create logical backup: {response.text}"
+        assert response.status_code in (HTTP_OK, HTTP_ACCEPTED), error_msg
+        backup_pid = response.json()["pid"]
+        process_status = wait_for_backup_completion(
+            api_token,
+            backup_pid,
+            api_base_url=api_base_url,
+        )
+        backup_id = process_status["resource_id"]
+        backup_dir = Path(f"/var/backups/dbcalm/{backup_id}")
+        assert (backup_dir / "metadata.json").exists()
+        assert list(backup_dir.glob("testdb.users.*.sql.gz"))
+
+        load_sql_file(db_connection, "fixtures/incremental_data.sql")
+        assert verify_row_count(db_connection, {"users": 8, "orders": 7})
+
+        # the server keeps running, the dumped tables are replaced
+        response = requests.post(
+            f"{api_base_url}/restore",
+            headers={"Authorization": f"Bearer {api_token}"},
+            json={"id": backup_id, "target": "database"},
+            verify=False,  # noqa: S501
+            timeout=HTTP_TIMEOUT,
+        )
+        error_msg = f"Failed to start logical restore: {response.text}"
+        assert response.status_code in (HTTP_OK, HTTP_ACCEPTED), error_msg
+        restore_pid = response.json()["pid"]
+        wait_for_restore_completion(
+            api_token,
+            restore_pid,
+            api_base_url=api_base_url,
+        )
+
+        assert verify_row_count(db_connection, {"users": 5, "orders": 5})
+        assert verify_data_integrity(db_connection, "initial")
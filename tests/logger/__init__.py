@@ -0,0 +1 @@
+# Initialize logger tests package
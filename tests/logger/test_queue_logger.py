@@ -0,0 +1,151 @@
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm.logger.correlation import CorrelationFilter, correlation
+from dbcalm.logger.json_formatter import JsonFormatter
+from dbcalm.logger.queue_logger import (
+    DroppingQueueHandler,
+    ModuleLevelFilter,
+    QueueLogger,
+    module_path,
+    service_name,
+)
+
+
+def make_record(
+    message: str,
+    level: int = logging.INFO,
+    pathname: str = "/nowhere/module.py",
+) -> logging.LogRecord:
+    return logging.LogRecord("dbcalm", level, pathname, 1, message, None, None)
+
+
+class TestDroppingQueueHandler:
+    def test_drops_when_full_and_reports_count(self) -> None:
+        log_queue = queue.Queue(2)
+        handler = DroppingQueueHandler(log_queue)
+
+        for i in range(5):
+            handler.handle(make_record(f"message {i}"))
+
+        assert handler.dropped == 3  # noqa: PLR2004
+        assert [log_queue.get_nowait().msg for _ in range(2)] == [
+            "message 0",
+            "message 1",
+        ]
+
+        handler.handle(make_record("after"))
+
+        warning = log_queue.get_nowait()
+        assert warning.levelno == logging.WARNING
+        assert warning.msg == "Log queue full, dropped 3 log records"
+        assert log_queue.get_nowait().msg == "after"
+        assert handler.dropped == 0
+
+    def test_prepare_keeps_exception_separate(self) -> None:
+        handler = DroppingQueueHandler(queue.Queue())
+        try:
+            msg = "boom"
+            raise ValueError(msg)  # noqa: TRY301
+        except ValueError:
+            record = logging.LogRecord(
+                "dbcalm", logging.ERROR, __file__, 1, "failed %s", ("x",),
+                exc_info=sys.exc_info(),
+            )
+
+        prepared = handler.prepare(record)
+
+        assert prepared.msg == "failed x"
+        assert prepared.args is None
+        assert prepared.exc_info is None
+        assert "ValueError: boom" in prepared.exc_text
+
+
+class TestModuleLevelFilter:
+    def test_longest_prefix_wins(self) -> None:
+        level_filter = ModuleLevelFilter(
+            logging.DEBUG,
+            {"dbcalm_cmd": logging.WARNING, "dbcalm_cmd.process": logging.INFO},
+        )
+
+        assert level_filter.level_for("dbcalm_cmd.process.runner") == logging.INFO
+        assert level_filter.level_for("dbcalm_cmd.adapter") == logging.WARNING
+        assert level_filter.level_for("dbcalm_cmd_client") == logging.DEBUG
+        assert level_filter.level_for("dbcalm.routes") == logging.DEBUG
+
+    def test_filters_by_emitting_module(self) -> None:
+        level_filter = ModuleLevelFilter(logging.DEBUG, {"tests": logging.ERROR})
+
+        assert not level_filter.filter(make_record("x", pathname=__file__))
+        assert level_filter.filter(make_record("x", logging.ERROR, __file__))
+        assert module_path(__file__) == "tests.logger.test_queue_logger"
+
+
+class TestJsonFormatter:
+    def test_includes_correlation_id(self) -> None:
+        record = make_record("hello")
+        with correlation("cmd-1"):
+            CorrelationFilter().filter(record)
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "hello"
+        assert entry["level"] == "INFO"
+        assert entry["correlation_id"] == "cmd-1"
+
+    def test_without_correlation_id(self) -> None:
+        record = make_record("hello")
+        CorrelationFilter().filter(record)
+
+        assert "correlation_id" not in json.loads(JsonFormatter().format(record))
+
+
+class TestFileHandler:
+    @staticmethod
+    def handler(tmp_path: Path, **values: object) -> logging.FileHandler:
+        config = MagicMock(PROJECT_NAME="dbcalm")
+        # the default log file, moved below tmp_path
+        config.value.side_effect = lambda key, default=None: (
+            str(tmp_path / Path(default).name)
+            if key == "log_file"
+            else values.get(key, default)
+        )
+        queue_logger = QueueLogger.__new__(QueueLogger)
+        queue_logger.config = config
+        return queue_logger.file_handler()
+
+    @pytest.fixture(autouse=True)
+    def server(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(sys, "argv", ["/usr/bin/dbcalm", "server"])
+
+    def test_shared_file_left_to_logrotate(self, tmp_path: Path) -> None:
+        handler = self.handler(tmp_path)
+
+        assert type(handler) is logging.handlers.WatchedFileHandler
+        assert handler.baseFilename == str(tmp_path / "dbcalm.log")
+        handler.close()
+
+    def test_rotating_in_process_uses_a_file_per_service(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        handler = self.handler(tmp_path, log_max_bytes=1024)
+
+        assert isinstance(handler, logging.handlers.RotatingFileHandler)
+        assert handler.maxBytes == 1024  # noqa: PLR2004
+        assert handler.baseFilename == str(tmp_path / "dbcalm-server.log")
+        handler.close()
+
+    def test_service_names(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        assert service_name("dbcalm") == "dbcalm-server"
+        monkeypatch.setattr(sys, "argv", ["/usr/bin/dbcalm", "-v"])
+        assert service_name("dbcalm") == "dbcalm"
+        monkeypatch.setattr(sys, "argv", ["dbcalm-mariadb-cmd.py"])
+        assert service_name("dbcalm") == "dbcalm-mariadb-cmd"
@@ -0,0 +1 @@
+# Initialize routes tests package
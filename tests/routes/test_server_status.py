@@ -0,0 +1,57 @@
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm.data.model.server_state_change import ServerStateChange
+from dbcalm.data.repository.server_state_change import (
+    ServerStateChangeRepository,
+)
+from dbcalm.routes import server_status
+from dbcalm.routes.server_status import get_server_status
+
+MAX_INTERVAL = 60
+
+
+@pytest.fixture
+def recorded(
+    monkeypatch: pytest.MonkeyPatch,
+    make_config: Callable[..., MagicMock],
+    database: Path,  # noqa: ARG001
+) -> Callable[[float], None]:
+    """Records the server as up, last checked seconds ago."""
+    config = make_config(liveness_max_interval=MAX_INTERVAL)
+    monkeypatch.setattr(server_status, "config_factory", lambda: config)
+
+    def recorded(seconds_ago: float) -> None:
+        checked_at = datetime.now(tz=UTC) - timedelta(seconds=seconds_ago)
+        ServerStateChangeRepository().create(ServerStateChange(
+            state="up",
+            changed_at=checked_at - timedelta(hours=1),
+            checked_at=checked_at,
+        ))
+
+    return recorded
+
+
+class TestServerStatus:
+    def test_recently_checked_state(self, recorded: Callable[[float], None]) -> None:
+        recorded(MAX_INTERVAL)
+
+        status = get_server_status({})
+
+        assert status.state == "up"
+        assert [change.state for change in status.changes] == ["up"]
+
+    def test_unknown_without_heartbeat(
+        self,
+        recorded: Callable[[float], None],
+    ) -> None:
+        recorded(MAX_INTERVAL * (server_status.STALE_INTERVALS + 1))
+
+        status = get_server_status({})
+
+        assert status.state == "unknown"
+        assert [change.state for change in status.changes] == ["up"]
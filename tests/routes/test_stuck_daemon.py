@@ -0,0 +1,75 @@
+import asyncio
+import socket
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from dbcalm.auth.verify_token import verify_token
+from dbcalm.cli.server import app
+from dbcalm.config.config import Config
+
+COMMAND_TIMEOUT = 1.5  # seconds
+CONCURRENT_REQUESTS = 20
+# generous bound, a blocked event loop would hold requests for the full
+# command timeout
+MAX_LATENCY = 0.75  # seconds
+
+
+def no_auth() -> dict:
+    return {}
+
+
+@pytest.fixture
+def stuck_daemon(
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        database: Path,  # noqa: ARG001
+    ) -> Iterator[None]:
+    """A command socket that accepts connections but never answers."""
+    socket_path = str(tmp_path / "mariadb-cmd.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+
+    monkeypatch.setattr(Config, "MARIADB_CMD_SOCKET_PATH", socket_path)
+    monkeypatch.setattr(Config, "DEFAULT_TIMEOUT", COMMAND_TIMEOUT)
+    monkeypatch.setattr(Config, "DEV_MODE", False)
+    app.dependency_overrides[verify_token] = no_auth
+    yield
+    app.dependency_overrides.clear()
+    server.close()
+
+
+class TestStuckDaemon:
+    def test_requests_are_served_while_backup_waits(self, stuck_daemon: None) -> None:  # noqa: ARG002
+        async def scenario() -> tuple[httpx.Response, list[float]]:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport,
+                base_url="http://test",
+            ) as client:
+                backup = asyncio.create_task(
+                    client.post("/backups", json={"type": "full"}),
+                )
+                # let the backup request reach the stuck socket
+                await asyncio.sleep(0.2)
+
+                async def timed_get() -> float:
+                    start = time.perf_counter()
+                    response = await client.get("/schedules")
+                    assert response.status_code == 200  # noqa: PLR2004
+                    return time.perf_counter() - start
+
+                latencies = await asyncio.gather(
+                    *(timed_get() for _ in range(CONCURRENT_REQUESTS)),
+                )
+                assert not backup.done()
+                return await backup, latencies
+
+        backup_response, latencies = asyncio.run(scenario())
+
+        assert max(latencies) < MAX_LATENCY
+        assert backup_response.status_code == 503  # noqa: PLR2004
@@ -0,0 +1 @@
+# Initialize scheduler tests package
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+from dbcalm_mariadb_cmd.scheduler.cron_expression import CronExpression
+
+
+def local(*args: int) -> datetime:
+    # cron fields are evaluated against naive local wall-clock time
+    return datetime(*args)  # noqa: DTZ001
+
+
+class TestCronExpression:
+    def test_interval_minutes(self) -> None:
+        expression = CronExpression("*/15 * * * *")
+        assert expression.next_after(local(2025, 1, 1, 10, 7, 30)) == local(
+            2025, 1, 1, 10, 15,
+        )
+        # resets at the top of the hour like cron does
+        assert expression.next_after(local(2025, 1, 1, 10, 45)) == local(
+            2025, 1, 1, 11, 0,
+        )
+
+    def test_interval_hours(self) -> None:
+        expression = CronExpression("0 */4 * * *")
+        assert expression.next_after(local(2025, 1, 1, 21, 0)) == local(
+            2025, 1, 2, 0, 0,
+        )
+
+    def test_daily_is_strictly_after(self) -> None:
+        expression = CronExpression("30 3 * * *")
+        assert expression.next_after(local(2025, 1, 1, 3, 30)) == local(
+            2025, 1, 2, 3, 30,
+        )
+
+    def test_weekly_uses_sunday_as_zero(self) -> None:
+        expression = CronExpression("0 3 * * 0")
+        # 2025-01-01 is a Wednesday, the next Sunday is the 5th
+        assert expression.next_after(local(2025, 1, 1)) == local(
+            2025, 1, 5, 3, 0,
+        )
+
+    def test_monthly_rolls_over_year(self) -> None:
+        expression = CronExpression("0 0 1 * *")
+        assert expression.next_after(local(2025, 12, 15)) == local(
+            2026, 1, 1, 0, 0,
+        )
+
+    def test_invalid_expression(self) -> None:
+        with pytest.raises(ValueError, match="Invalid cron expression"):
+            CronExpression("* * *")
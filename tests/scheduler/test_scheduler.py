@@ -0,0 +1,75 @@
+import time
+from collections.abc import Callable
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbcalm.data.model.schedule import Schedule
+from dbcalm.service import cron_file_builder
+from dbcalm_mariadb_cmd.scheduler import scheduler
+from dbcalm_mariadb_cmd.scheduler.scheduler import MISSED_GRACE, Scheduler
+
+JITTER = 3 * MISSED_GRACE
+
+
+@pytest.fixture
+def jittered(
+    monkeypatch: pytest.MonkeyPatch,
+    make_config: Callable[..., MagicMock],
+) -> Scheduler:
+    """Scheduler with a jitter well above the grace period, nothing recorded."""
+    config = make_config(scheduler_jitter=JITTER)
+    monkeypatch.setattr(scheduler, "config_factory", lambda: config)
+    monkeypatch.setattr(cron_file_builder, "config_factory", lambda: config)
+    jittered = Scheduler(MagicMock())
+    for name in ("_record", "_trigger"):
+        monkeypatch.setattr(jittered, name, MagicMock())
+    monkeypatch.setattr(jittered, "backup_running", lambda: False)
+    monkeypatch.setattr(
+        jittered,
+        "_load_schedules",
+        lambda: [Schedule(
+            id=delayed_schedule(jittered),
+            backup_type="full",
+            frequency="daily",
+            hour=1,
+            minute=0,
+        )],
+    )
+    jittered._reload()  # noqa: SLF001
+    return jittered
+
+
+def delayed_schedule(jittered: Scheduler) -> int:
+    """Id of a schedule this host delays by more than the grace period."""
+    return next(
+        schedule_id
+        for schedule_id in range(1, 1000)
+        if jittered.jitter_offset(schedule_id) > MISSED_GRACE
+    )
+
+
+def fire_after_delay(jittered: Scheduler, lateness: float) -> None:
+    """Handle a fire lateness seconds after its jitter delay ran out."""
+    schedule_id = delayed_schedule(jittered)
+    scheduled = time.time() - jittered.jitter_offset(schedule_id) - lateness
+    jittered._push(schedule_id, datetime.fromtimestamp(scheduled))  # noqa: DTZ006, SLF001
+    jittered._fire(jittered._pop_due(time.time()))  # noqa: SLF001
+
+
+class TestJitter:
+    def test_fires_delayed_past_the_grace_period(self, jittered: Scheduler) -> None:
+        fire_after_delay(jittered, 1)
+
+        jittered._trigger.assert_called_once()  # noqa: SLF001
+        jittered._record.assert_not_called()  # noqa: SLF001
+
+    def test_late_past_the_jitter_delay_is_missed(self, jittered: Scheduler) -> None:
+        fire_after_delay(jittered, MISSED_GRACE + 60)
+
+        jittered._trigger.assert_not_called()  # noqa: SLF001
+        assert jittered._record.call_args.args[2:] == (  # noqa: SLF001
+            "missed",
+            "fired too late",
+        )
@@ -0,0 +1 @@
+# Initialize service tests package
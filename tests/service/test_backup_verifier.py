@@ -0,0 +1,88 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from dbcalm.service import backup_verifier
+from dbcalm.service.backup_verifier import BackupVerifier
+from dbcalm.util.rate_limiter import RateLimiter
+
+IBDATA_SIZE = 100_000
+
+
+@pytest.fixture
+def backup(tmp_path: Path) -> Path:
+    folder = tmp_path / "2024-10-17-03-00-00"
+    (folder / "shop").mkdir(parents=True)
+    (folder / "ibdata1").write_bytes(b"a" * IBDATA_SIZE)
+    (folder / "shop" / "orders.ibd").write_bytes(b"b" * 5000)
+    (folder / "xtrabackup_checkpoints").write_text("backup_type = full-backuped\n")
+    (folder / "empty").touch()
+    return folder
+
+
+@pytest.fixture
+def verifier() -> BackupVerifier:
+    return BackupVerifier(4, RateLimiter(0))
+
+
+class TestBackupVerifier:
+    def test_manifest(self, backup: Path, verifier: BackupVerifier) -> None:
+        files = verifier.manifest(backup)
+
+        assert sorted(files) == [
+            "empty",
+            "ibdata1",
+            "shop/orders.ibd",
+            "xtrabackup_checkpoints",
+        ]
+        assert files["ibdata1"]["size"] == IBDATA_SIZE
+        assert files["empty"]["size"] == 0
+        assert files["ibdata1"]["checksum"] != files["shop/orders.ibd"]["checksum"]
+
+    def test_intact_backup_verifies(
+        self,
+        backup: Path,
+        verifier: BackupVerifier,
+    ) -> None:
+        result = verifier.verify(backup, verifier.manifest(backup))
+
+        assert result.ok
+        assert result.checked == 4  # noqa: PLR2004
+        assert result.problems() == []
+
+    def test_reports_damage(self, backup: Path, verifier: BackupVerifier) -> None:
+        files = verifier.manifest(backup)
+        # bit rot keeps the size
+        with (backup / "ibdata1").open("r+b") as file:
+            file.seek(50_000)
+            file.write(b"x")
+        (backup / "shop" / "orders.ibd").write_bytes(b"b" * 10)
+        (backup / "xtrabackup_checkpoints").unlink()
+        (backup / "stray.log").write_text("hello")
+
+        result = verifier.verify(backup, files)
+
+        assert not result.ok
+        assert result.missing == ["xtrabackup_checkpoints"]
+        assert result.corrupt == ["ibdata1", "shop/orders.ibd"]
+        assert result.unexpected == ["stray.log"]
+
+    def test_missing_folder(self, tmp_path: Path, verifier: BackupVerifier) -> None:
+        result = verifier.verify(tmp_path / "gone", {"ibdata1": {"size": 1}})
+
+        assert result.missing == ["ibdata1"]
+
+    def test_reads_are_throttled_per_chunk(
+        self,
+        backup: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(backup_verifier, "CHUNK_SIZE", 4096)
+        limiter = RateLimiter(1024 * 1024)
+        with patch.object(limiter, "acquire", return_value=0.0) as acquire:
+            BackupVerifier(2, limiter).manifest(backup)
+
+        amounts = [call.args[0] for call in acquire.call_args_list]
+        assert max(amounts) == 4096  # noqa: PLR2004
+        assert sum(amounts) == IBDATA_SIZE + 5000 + len("backup_type = full-backuped\n")
@@ -0,0 +1,104 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from dbcalm.data.model.backup import Backup
+from dbcalm.data.model.binlog_file import BinlogFile
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.binlog_file import BinlogFileRepository
+from dbcalm.errors.not_found_error import NotFoundError
+from dbcalm.errors.validation_error import ValidationError
+from dbcalm.service.recovery_planner import RecoveryPlanner
+from dbcalm.util.gtid import gtid_state_contains
+
+SOURCE = "3e11fa47-71ca-11e1-9e33-c80aa9429562"
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2024, 10, 17, hour, minute, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+def chain(database: Path) -> None:  # noqa: ARG001
+    backups = BackupRepository()
+    backups.create(
+        Backup(id="full", process_id=1, start_time=at(1), end_time=at(2)),
+    )
+    backups.create(
+        Backup(
+            id="inc",
+            from_backup_id="full",
+            process_id=2,
+            start_time=at(6),
+            end_time=at(6, 10),
+        ),
+    )
+    binlogs = BinlogFileRepository()
+    for number, (first, last, start, end) in enumerate(
+        [(at(0), at(4), "0-1-10", "0-1-50"), (at(4), at(8), "0-1-50", "0-1-90")],
+        1,
+    ):
+        binlogs.save(
+            BinlogFile(
+                name=f"mariadb-bin.00000{number}",
+                path=f"/archive/mariadb-bin.00000{number}.zst",
+                size_bytes=100,
+                first_event_time=first,
+                last_event_time=last,
+                end_position=1000,
+                start_gtid=start,
+                end_gtid=end,
+            ),
+        )
+
+
+class TestRecoveryPlanner:
+    def test_newest_backup_before_the_target(self) -> None:
+        planner = RecoveryPlanner()
+        assert planner.plan(until_time=at(7)) == ["full", "inc"]
+        assert planner.plan(until_time=at(5)) == ["full"]
+
+    def test_target_past_the_archive(self) -> None:
+        with pytest.raises(ValidationError, match="FLUSH BINARY LOGS"):
+            RecoveryPlanner().plan(until_time=at(9))
+
+    def test_target_before_any_backup(self) -> None:
+        with pytest.raises(NotFoundError):
+            RecoveryPlanner().plan(until_time=at(1, 30))
+
+    def test_gtid_target(self) -> None:
+        planner = RecoveryPlanner()
+        # in the second log, which started before the incremental finished
+        assert planner.plan(until_gtid="0-1-60") == ["full"]
+        with pytest.raises(ValidationError, match="No archived"):
+            planner.plan(until_gtid="0-1-95")
+        with pytest.raises(ValidationError, match="not a GTID"):
+            planner.plan(until_gtid="yesterday")
+
+    def test_given_backup_must_precede_target(self) -> None:
+        with pytest.raises(ValidationError, match="did not finish"):
+            RecoveryPlanner().plan(until_time=at(5), backup_id="inc")
+
+    def test_partial_backups_are_passed_over(self) -> None:
+        BackupRepository().create(
+            Backup(
+                id="shop",
+                process_id=3,
+                start_time=at(6, 20),
+                end_time=at(6, 30),
+                include=["shop"],
+            ),
+        )
+        planner = RecoveryPlanner()
+        assert planner.plan(until_time=at(7)) == ["full", "inc"]
+        with pytest.raises(ValidationError, match="partial backup"):
+            planner.plan(until_time=at(7), backup_id="shop")
+
+
+def test_gtid_state_contains() -> None:
+    assert gtid_state_contains("0-1-100,1-2-5", "1-2-5")
+    assert not gtid_state_contains("0-1-100,1-2-5", "1-2-6")
+    assert not gtid_state_contains("0-1-100", "2-1-1")
+    assert gtid_state_contains(f"{SOURCE}:1-5:7", f"{SOURCE}:7")
+    assert not gtid_state_contains(f"{SOURCE}:1-5:7", f"{SOURCE}:6")
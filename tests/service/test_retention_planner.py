@@ -0,0 +1,135 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from dbcalm.data.model.backup import Backup
+from dbcalm.data.model.schedule import Schedule
+from dbcalm.data.repository.backup import BackupRepository
+from dbcalm.data.repository.schedule import ScheduleRepository
+from dbcalm.service.retention_planner import (
+    RetentionPlan,
+    RetentionPlanner,
+    retention_cutoff,
+    subtract_months,
+)
+
+NOW = datetime(2025, 3, 31, 12, 0, tzinfo=UTC)
+
+
+def schedule(id: int, value: int | None = 7, unit: str | None = "days") -> Schedule:
+    return Schedule(
+        id=id,
+        backup_type="full",
+        frequency="daily",
+        retention_value=value,
+        retention_unit=unit,
+    )
+
+
+def backup(
+    id: str,
+    days_old: int,
+    schedule_id: int | None = 1,
+    from_backup_id: str | None = None,
+) -> Backup:
+    return Backup(
+        id=id,
+        from_backup_id=from_backup_id,
+        schedule_id=schedule_id,
+        start_time=NOW - timedelta(days=days_old),
+        process_id=1,
+        size_bytes=days_old * 100,
+    )
+
+
+class TestRetentionCutoff:
+    def test_units(self) -> None:
+        assert retention_cutoff(schedule(1, 2, "days"), NOW) == NOW - timedelta(2)
+        assert retention_cutoff(schedule(1, 2, "weeks"), NOW) == NOW - timedelta(14)
+        assert retention_cutoff(schedule(1, 1, "months"), NOW) == datetime(
+            2025, 2, 28, 12, 0, tzinfo=UTC,
+        )
+
+    @pytest.mark.parametrize(
+        ("value", "unit"), [(None, "days"), (7, None), (0, "days")],
+    )
+    def test_no_retention(self, value: int | None, unit: str | None) -> None:
+        assert retention_cutoff(schedule(1, value, unit), NOW) is None
+
+    def test_subtract_months_crosses_year(self) -> None:
+        assert subtract_months(NOW, 15) == datetime(2023, 12, 31, 12, 0, tzinfo=UTC)
+
+
+@pytest.mark.usefixtures("database")
+class TestRetentionPlanner:
+    def plan(
+        self,
+        backups: list[Backup],
+        schedules: list[Schedule],
+    ) -> RetentionPlan:
+        for item in schedules:
+            ScheduleRepository().create(item)
+        for item in backups:
+            BackupRepository().create(item)
+        return RetentionPlanner().current_plan(NOW)
+
+    def test_expires_old_backups_oldest_first(self) -> None:
+        backups = [backup("b", 9), backup("a", 10), backup("c", 1)]
+        plan = self.plan(backups, [schedule(1)])
+        assert plan.expired_ids == ["a", "b"]
+        assert plan.bytes_reclaimed == 1900  # noqa: PLR2004
+        assert plan.unknown_size_count == 0
+
+    def test_keeps_manual_and_unknown_schedule_backups(self) -> None:
+        backups = [backup("manual", 100, None), backup("orphan", 100, 2)]
+        assert self.plan(backups, [schedule(1)]).expired_ids == []
+
+    def test_kept_incremental_pins_its_chain(self) -> None:
+        schedules = [schedule(1), schedule(2, 30)]
+        backups = [
+            backup("full", 20),
+            backup("inc1", 19, 1, "full"),
+            # kept by the longer retention of schedule 2
+            backup("inc2", 18, 2, "inc1"),
+            backup("old-full", 40),
+            backup("old-inc", 39, 1, "old-full"),
+        ]
+        plan = self.plan(backups, schedules)
+        assert plan.expired_ids == ["old-full", "old-inc"]
+        assert {
+            backup_id: required_by
+            for backup_id, (_, required_by) in plan.kept_for_dependents.items()
+        } == {"full": ["inc1"], "inc1": ["inc2"]}
+
+    def test_manual_incremental_pins_its_base(self) -> None:
+        backups = [backup("full", 20), backup("inc", 19, None, "full")]
+        plan = self.plan(backups, [schedule(1)])
+        assert plan.expired_ids == []
+        assert list(plan.kept_for_dependents) == ["full"]
+
+    def test_expired_leaf_of_kept_base_is_removed(self) -> None:
+        schedules = [schedule(1, 30), schedule(2)]
+        backups = [backup("full", 20, 1), backup("inc", 19, 2, "full")]
+        plan = self.plan(backups, schedules)
+        assert plan.expired_ids == ["inc"]
+        assert plan.kept_for_dependents == {}
+
+    def test_totals_cover_all_pages(self) -> None:
+        backups = [backup(f"b{day}", day) for day in range(8, 13)]
+        backups[0].size_bytes = None
+        plan = self.plan(backups, [schedule(1)])
+        page = RetentionPlanner().current_plan(NOW, page=2, per_page=2)
+        assert page.expired_ids == ["b10", "b9"]
+        assert page.expired_count == 5  # noqa: PLR2004
+        assert page.bytes_reclaimed == plan.bytes_reclaimed == 4200  # noqa: PLR2004
+        assert page.unknown_size_count == 1
+
+    def test_expired_backups_skip_pinned_bases(self) -> None:
+        schedules = [schedule(1), schedule(2, 30)]
+        backups = [
+            backup("full", 20),
+            backup("inc", 19, 2, "full"),
+            backup("old", 40),
+        ]
+        self.plan(backups, schedules)
+        assert RetentionPlanner().expired_backups(NOW) == ["old"]
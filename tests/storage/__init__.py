@@ -0,0 +1 @@
+# Initialize storage tests package